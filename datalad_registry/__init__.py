@@ -11,6 +11,7 @@ from . import overview, root
 from .conf import OperationMode, compile_config_from_env
 from .models import db, init_db_command, migrate
 from .utils.pydantic_json import pydantic_dumps, pydantic_loads
+from .utils.response_cache import response_cache_init_app
 
 __version__ = version("datalad-registry")
 
@@ -48,6 +49,9 @@ def create_app() -> Flask:
     # Integrate Flask-Migrate
     migrate.init_app(app, db)
 
+    # Set up the response cache
+    response_cache_init_app(app)
+
     # Register CLI commands
     app.cli.add_command(init_db_command)
 
@@ -56,12 +60,14 @@ def create_app() -> Flask:
     app.register_blueprint(root.bp)
 
     from .blueprints.api import HTTPExceptionResp
+    from .blueprints.api.dataset_files import bp as dataset_files_bp
     from .blueprints.api.dataset_urls import bp as dataset_urls_bp
     from .blueprints.api.url_metadata import bp as url_metadata_bp
 
     # Register API blueprints
     app.register_api(dataset_urls_bp)
     app.register_api(url_metadata_bp)
+    app.register_api(dataset_files_bp)
 
     @app.errorhandler(HTTPException)
     def handle_exception(e):
@@ -10,6 +10,10 @@ DATASET_URLS_PATH = "dataset-urls"
 # the base API endpoint of the instance.
 URL_METADATA_PATH = "url-metadata"
 
+# The path of the dataset file resources on the DataLad Registry instance relative to
+# the base API endpoint of the instance.
+DATASET_FILES_PATH = "dataset-files"
+
 
 class HTTPExceptionResp(BaseModel):
     """
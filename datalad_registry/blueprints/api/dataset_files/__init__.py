@@ -0,0 +1,96 @@
+# This file is for defining the API endpoints related to dataset files, i.e.,
+# the files of datasets as recorded along with the metadata extracted from them.
+
+from json import loads
+
+from flask import url_for
+from flask_openapi3 import APIBlueprint, Tag
+from sqlalchemy import ColumnElement, and_, select
+from sqlalchemy.orm import contains_eager
+
+from datalad_registry.models import DatasetFile, URLMetadata, db
+from datalad_registry.search import get_ilike_search
+from datalad_registry.utils.flask_tools import json_resp_from_str
+
+from .models import DatasetFileModel, DatasetFilePage, QueryParams
+from .. import API_URL_PREFIX, COMMON_API_RESPONSES, DATASET_FILES_PATH
+
+bp = APIBlueprint(
+    "dataset_files_api",
+    __name__,
+    url_prefix=f"{API_URL_PREFIX}/{DATASET_FILES_PATH}",
+    abp_tags=[Tag(name="Dataset Files", description="API endpoints for dataset files")],
+    abp_responses=COMMON_API_RESPONSES,
+)
+
+
+@bp.get("", responses={"200": DatasetFilePage})
+def dataset_files(query: QueryParams):
+    """
+    Get all dataset files that satisfy the constraints imposed by the query parameters.
+
+    The dataset files are the files of the datasets as recorded by the metadata
+    extractors that list the files of the datasets, i.e., "dandi:files" and
+    "bids_dataset". Each constraint is answered through an index of the recorded files.
+    """
+    constraints: list[ColumnElement] = []
+    if query.path is not None:
+        constraints.append(get_ilike_search(DatasetFile, "path", query.path))
+    if query.content_type is not None:
+        constraints.append(DatasetFile.content_type == query.content_type)
+    if query.annex_key is not None:
+        constraints.append(DatasetFile.annex_key == query.annex_key)
+    if query.dataset_url_id is not None:
+        constraints.append(URLMetadata.url_id == query.dataset_url_id)
+
+    ep = ".dataset_files"  # Endpoint of `dataset_files`
+    base_qry = loads(query.json(exclude={"page"}, exclude_none=True))
+
+    max_per_page = 100  # The overriding limit to `per_page` provided by the requester
+
+    pagination = db.paginate(
+        select(DatasetFile)
+        .join(DatasetFile.url_metadata)
+        .options(contains_eager(DatasetFile.url_metadata))  # type: ignore[arg-type]
+        .filter(and_(True, *constraints))
+        .order_by(DatasetFile.id),
+        page=query.page,
+        per_page=query.per_page,
+        max_per_page=max_per_page,
+    )
+    total_pages = pagination.pages  # Total number of pages
+
+    dataset_files_ = [
+        DatasetFileModel(
+            path=f.path,
+            size=f.size,
+            content_type=f.content_type,
+            annex_key=f.annex_key,
+            dataset_url_id=f.url_metadata.url_id,
+            dataset_version=f.url_metadata.dataset_version,
+            extractor_name=f.url_metadata.extractor_name,
+            url_metadata=url_for(
+                "url_metadata_api.url_metadata", url_metadata_id=f.url_metadata_id
+            ),
+        )
+        for f in pagination.items
+    ]
+
+    page = DatasetFilePage(
+        cur_pg_num=pagination.page,
+        prev_pg=(
+            url_for(ep, **base_qry, page=pagination.prev_num)
+            if pagination.has_prev
+            else None
+        ),
+        next_pg=(
+            url_for(ep, **base_qry, page=pagination.next_num)
+            if pagination.has_next
+            else None
+        ),
+        first_pg=url_for(ep, **base_qry, page=1),
+        last_pg=url_for(ep, **base_qry, page=1 if total_pages == 0 else total_pages),
+        dataset_files=dataset_files_,
+    )
+
+    return json_resp_from_str(page.json(exclude_none=True))
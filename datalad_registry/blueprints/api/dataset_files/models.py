@@ -0,0 +1,106 @@
+from typing import Optional
+
+from pydantic import BaseModel, Field, PositiveInt, StrictInt, StrictStr, root_validator
+
+DEFAULT_PAGE = 1  # Default page query param value
+DEFAULT_PER_PAGE = 20  # Default per_page query param value
+
+# The query parameters that constrain the dataset files to be returned
+_CONSTRAINING_QUERY_PARAMS = ["path", "content_type", "annex_key", "dataset_url_id"]
+
+
+def at_least_one_constraint(cls, values):  # noqa: U100 (unused argument)
+    """
+    Validator for the query parameters that ensures that at least one of the
+    constraining query parameters is provided
+    """
+    if all(values.get(p) is None for p in _CONSTRAINING_QUERY_PARAMS):
+        raise ValueError(
+            "At least one of the query parameters "
+            f"{', '.join(f'`{p}`' for p in _CONSTRAINING_QUERY_PARAMS)} "
+            "must be provided"
+        )
+    return values
+
+
+class QueryParams(BaseModel):
+    """
+    Pydantic model for representing the query parameters to query
+    the dataset_files endpoint
+    """
+
+    path: Optional[str] = Field(
+        None,
+        description="A substring of the paths of the files to be returned "
+        "(case-insensitive)",
+        regex=r".*\S.*",
+    )
+    content_type: Optional[str] = Field(
+        None, description="The media type of the content of the files"
+    )
+    annex_key: Optional[str] = Field(None, description="The git-annex key of the files")
+    dataset_url_id: Optional[int] = Field(
+        None, description="The ID of the dataset URL of the files"
+    )
+
+    # Pagination parameters
+    page: PositiveInt = Field(
+        DEFAULT_PAGE,
+        description="The current page (used to calculate the offset "
+        f"of the pagination). Defaults to {DEFAULT_PAGE}.",
+    )
+    per_page: PositiveInt = Field(
+        DEFAULT_PER_PAGE,
+        description="The maximum number of items on a page "
+        "(used to calculate the offset and limit of the pagination). "
+        f"Defaults to {DEFAULT_PER_PAGE}.",
+    )
+
+    _at_least_one_constraint = root_validator(allow_reuse=True)(at_least_one_constraint)
+
+
+class DatasetFileModel(BaseModel):
+    """
+    Model for representing the database model DatasetFile for communication
+    """
+
+    path: StrictStr = Field(
+        description="The path of the file relative to the root of the dataset"
+    )
+    size: Optional[StrictInt] = Field(None, description="The size of the file in bytes")
+    content_type: Optional[StrictStr] = Field(
+        None, description="The media type of the content of the file"
+    )
+    annex_key: Optional[StrictStr] = Field(
+        None, description="The git-annex key of the file if the file is annexed"
+    )
+
+    dataset_url_id: StrictInt = Field(description="The ID of the dataset URL")
+    dataset_version: StrictStr = Field(
+        description="The version of the dataset in which the file was recorded"
+    )
+    extractor_name: StrictStr = Field(
+        description="The name of the extractor with which the file was recorded"
+    )
+    url_metadata: StrictStr = Field(
+        description="The link to the metadata extracted along with the recording "
+        "of the file"
+    )
+
+
+class DatasetFilePage(BaseModel):
+    """
+    Model for representing a page of dataset files in response communication
+    """
+
+    cur_pg_num: StrictInt = Field(description="The number of the current page")
+    prev_pg: Optional[StrictStr] = Field(
+        None, description="The link to the previous page"
+    )
+    next_pg: Optional[StrictStr] = Field(None, description="The link to the next page")
+    first_pg: StrictStr = Field(description="The link to the first page")
+    last_pg: StrictStr = Field(description="The link to the last page")
+
+    dataset_files: list[DatasetFileModel] = Field(
+        description="The list of dataset files in the current page"
+    )
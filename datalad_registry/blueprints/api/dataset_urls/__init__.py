@@ -1,38 +1,55 @@
 # This file is for defining the API endpoints related to dataset URls
 
+from collections.abc import Iterable, Iterator
+from datetime import datetime, timezone
+from functools import wraps
 from json import loads
 import operator
 from pathlib import Path
+from typing import Any, Optional
+import zlib
 
 from celery import group
-from flask import abort, current_app, url_for
+from flask import abort, current_app, request, stream_with_context, url_for
 from flask_openapi3 import APIBlueprint, Tag
 from lark.exceptions import GrammarError, UnexpectedInput
 from psycopg2.errors import UniqueViolation
-from sqlalchemy import ColumnElement, and_, select
-from sqlalchemy.exc import IntegrityError
+from sqlalchemy import ColumnElement, Select, and_, select, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import DataError, IntegrityError
+from sqlalchemy.orm import selectinload
 
-from datalad_registry.models import RepoUrl, db
+from datalad_registry.models import RepoUrl, URLMetadata, db
 from datalad_registry.search import parse_query
-from datalad_registry.tasks import (
-    extract_ds_meta,
-    log_error,
-    mark_for_chk,
-    process_dataset_url,
+from datalad_registry.tasks import mark_for_chk, new_url_processing
+from datalad_registry.utils.flask_tools import (
+    conditional_on_registry_version,
+    json_resp_from_str,
+    paginate,
 )
-from datalad_registry.utils.flask_tools import json_resp_from_str
 
 from .models import (
+    DatasetURLBatchRespItemModel,
+    DatasetURLBatchRespModel,
+    DatasetURLBatchSubmitModel,
     DatasetURLPage,
     DatasetURLRespBaseModel,
     DatasetURLRespModel,
     DatasetURLSubmitModel,
+    FilterParams,
     MetadataReturnOption,
     OrderKey,
     PathParams,
     QueryParams,
 )
-from .tools import get_collection_stats
+from .tools import (
+    decode_cursor,
+    encode_cursor,
+    get_all_collection_stats,
+    get_collection_stats,
+    get_keyset_page,
+    mark_collection_stats_stale,
+)
 from .. import (
     API_URL_PREFIX,
     COMMON_API_RESPONSES,
@@ -42,6 +59,11 @@ from .. import (
 from ..url_metadata.models import URLMetadataRef
 from ..utils import disable_in_read_only_mode
 
+# The numbers of dataset URLs fetched from the database at a time in an export
+# of dataset URLs, without and with the content of their metadata respectively
+_EXPORT_BATCH_SIZE = 1000
+_EXPORT_BATCH_SIZE_WITH_METADATA = 100
+
 _ORDER_KEY_TO_SQLA_ATTR = {
     OrderKey.url: RepoUrl.url,
     OrderKey.annex_key_count: RepoUrl.annex_key_count,
@@ -104,6 +126,7 @@ def declare_dataset_url(body: DatasetURLSubmitModel):
         url_uniqueness_failure_count = 0
         while url_uniqueness_failure_count < max_url_uniqueness_failures:
             db.session.add(repo_url_to_add)
+            mark_collection_stats_stale()
 
             try:
                 db.session.commit()
@@ -140,20 +163,7 @@ def declare_dataset_url(body: DatasetURLSubmitModel):
             else:
                 # Initiate celery tasks to process the RepoUrl
                 # and extract metadata from the corresponding dataset
-                url_processing = process_dataset_url.signature(
-                    (repo_url_to_add.id,), link_error=log_error.s()
-                )
-                meta_extractions = [
-                    extract_ds_meta.signature(
-                        (repo_url_to_add.id, extractor),
-                        immutable=True,
-                        link_error=log_error.s(),
-                    )
-                    for extractor in current_app.config[
-                        "DATALAD_REGISTRY_METADATA_EXTRACTORS"
-                    ]
-                ]
-                (url_processing | group(meta_extractions)).apply_async()
+                new_url_processing(repo_url_to_add.id).apply_async()
                 repo_url_to_resp = repo_url_to_add
                 break
         else:
@@ -180,10 +190,111 @@ def declare_dataset_url(body: DatasetURLSubmitModel):
         return json_resp_from_str(resp_model, status=202)
 
 
-@bp.get("", responses={"200": DatasetURLPage, "400": HTTPExceptionResp})
-def dataset_urls(query: QueryParams):
+@bp.post(
+    "/batch",
+    responses={
+        "200": DatasetURLBatchRespModel,
+        "405": HTTPExceptionResp,  # Occurs only when the server is in read-only mode
+    },
+)
+@disable_in_read_only_mode
+def declare_dataset_urls(body: DatasetURLBatchSubmitModel):
     """
-    Get all dataset URLs that satisfy the constraints imposed by the query parameters.
+    Handle the submission of a batch of dataset URLs, adding the new ones and updating
+    the existing ones
+
+    Each unique URL in the batch is handled as it would be if it were submitted
+    by itself, but the URLs are added to the database in a single statement,
+    the existing ones are flagged to be updated in a single statement, and the Celery
+    tasks to process the new ones are initiated in bulk.
+
+    The response lists the outcome of the submission of each unique URL, in the order
+    of their first occurrences in the batch, with the status code, 201 or 202, that
+    the submission of the URL by itself would have resulted in.
+    """
+    urls = list(dict.fromkeys(str(url) for url in body.urls))
+
+    # Add the URLs that don't exist in the database
+    new_repo_urls: dict[str, RepoUrl] = {
+        repo_url.url: repo_url
+        for repo_url in db.session.scalars(
+            insert(RepoUrl)
+            .values([{"url": url} for url in urls])
+            .on_conflict_do_nothing(index_elements=[RepoUrl.url])
+            .returning(RepoUrl)
+        )
+    }
+    existing_urls = [url for url in urls if url not in new_repo_urls]
+
+    existing_repo_urls: dict[str, RepoUrl] = {}
+    if existing_urls:
+        # Get the current representations of the existing URLs in the database
+        existing_repo_urls = {
+            repo_url.url: repo_url
+            for repo_url in db.session.scalars(
+                select(RepoUrl).filter(RepoUrl.url.in_(existing_urls))
+            )
+        }
+
+        # Mark the existing URLs that have been processed and have no unhandled
+        # request for check for update for check for update, and bring their next
+        # scheduled checks forward to now
+        now = datetime.now(timezone.utc)
+        db.session.execute(
+            update(RepoUrl)
+            .filter(
+                RepoUrl.url.in_(existing_urls),
+                RepoUrl.processed,
+                RepoUrl.chk_req_dt.is_(None),
+            )
+            .values(chk_req_dt=now, next_chk_dt=now),
+            execution_options={"synchronize_session": False},
+        )
+
+    if new_repo_urls:
+        mark_collection_stats_stale()
+
+    results = []
+    for url in urls:
+        if url in new_repo_urls:
+            results.append(
+                DatasetURLBatchRespItemModel(
+                    status=201,
+                    dataset_url=DatasetURLRespModel.from_orm(new_repo_urls[url]),
+                )
+            )
+        elif url in existing_repo_urls:
+            results.append(
+                DatasetURLBatchRespItemModel(
+                    status=202,
+                    dataset_url=DatasetURLRespModel.from_orm(existing_repo_urls[url]),
+                )
+            )
+        else:
+            # The URL has been removed from the database by another request
+            # while the current request is being processed.
+            raise RuntimeError(f"Failed to add the URL, {url}, to the database.")
+
+    db.session.commit()
+
+    # Initiate celery tasks to process the new RepoUrls
+    # and extract metadata from the corresponding datasets
+    if new_repo_urls:
+        group(
+            new_url_processing(repo_url.id) for repo_url in new_repo_urls.values()
+        ).apply_async()
+
+    return json_resp_from_str(
+        DatasetURLBatchRespModel(results=results).json(exclude_none=True)
+    )
+
+
+def _get_filter_constraints(query: FilterParams) -> list[ColumnElement]:
+    """
+    Get the filter constraints on the dataset URLs imposed by the query parameters
+
+    Note: This function aborts the current request with a 400 response if the search
+          query parameter is invalid.
     """
 
     def append_search_constraint() -> None:
@@ -283,42 +394,82 @@ def dataset_urls(query: QueryParams):
 
     # ==== Gathering constraints from query parameters ends ====
 
-    ep = ".dataset_urls"  # Endpoint of `dataset_urls`
-    base_qry = loads(query.json(exclude={"page"}, exclude_none=True))
+    return constraints
 
-    base_select_stmt = select(RepoUrl).filter(and_(True, *constraints))
 
-    max_per_page = 100  # The overriding limit to `per_page` provided by the requester
-    pagination = db.paginate(
-        base_select_stmt.order_by(
-            getattr(
-                _ORDER_KEY_TO_SQLA_ATTR[query.order_by], query.order_dir.value
-            )().nulls_last()
-        ),
-        page=query.page,
-        per_page=query.per_page,
-        max_per_page=max_per_page,
-    )
-    orm_ds_urls = pagination.items
-    cur_pg_num = pagination.page
-    total_pages = pagination.pages  # Total number of pages
+def _search_rejected_as_bad_request(view_func):
+    """
+    Decorator for view functions that filter the dataset URLs by the search query
+    parameter so that a search rejected by PostgreSQL, e.g., one with a regular
+    expression that is valid in Python but not in PostgreSQL, results in a 400
+    response instead of a 500 response
+
+    :param view_func: The view function to decorate
+    :return: The decorated view function
+    """
+
+    @wraps(view_func)
+    def wrapper(*args, **kwargs):
+        try:
+            return view_func(*args, **kwargs)
+        except DataError as e:
+            if request.args.get("search") is None:
+                raise
+
+            db.session.rollback()
+            abort(400, description=f"Invalid search string: {str(e.orig).strip()}")
+
+    return wrapper
+
+
+def _load_metadata(
+    select_stmt: Select, return_metadata: Optional[MetadataReturnOption]
+) -> Select:
+    """
+    Add to a select statement of dataset URLs the options to load the metadata of
+    the dataset URLs, if it is to be returned, in a batched query per batch of
+    dataset URLs instead of in a lazy query per dataset URL
+    """
+    if return_metadata is MetadataReturnOption.content:
+        return select_stmt.options(
+            selectinload(RepoUrl.metadata_)  # type: ignore[arg-type]
+        )
+    elif return_metadata is MetadataReturnOption.reference:
+        # Only the columns needed to build the references are loaded
+        return select_stmt.options(
+            selectinload(RepoUrl.metadata_).load_only(  # type: ignore[arg-type]
+                URLMetadata.id, URLMetadata.extractor_name
+            )
+        )
+    else:
+        return select_stmt
+
 
-    if query.return_metadata is None:
+def _to_resp_models(
+    orm_ds_urls: Iterable[RepoUrl], return_metadata: Optional[MetadataReturnOption]
+) -> list[DatasetURLRespModel]:
+    """
+    Convert dataset URLs, loaded with `_load_metadata`, to the models representing
+    them in a response with the metadata returned as specified
+
+    Note: This requires an active request context of Flask
+    """
+    if return_metadata is None:
         # === No metadata should be returned ===
 
         # noinspection PyArgumentList
-        ds_urls = [
+        return [
             DatasetURLRespModel(
                 **DatasetURLRespBaseModel.from_orm(i).dict(), metadata_=None
             )
             for i in orm_ds_urls
         ]
 
-    elif query.return_metadata is MetadataReturnOption.reference:
+    elif return_metadata is MetadataReturnOption.reference:
         # === Metadata should be returned by reference ===
 
         # noinspection PyArgumentList
-        ds_urls = [
+        return [
             DatasetURLRespModel(
                 **DatasetURLRespBaseModel.from_orm(i).dict(),
                 metadata_=[
@@ -328,7 +479,7 @@ def dataset_urls(query: QueryParams):
                             "url_metadata_api.url_metadata", url_metadata_id=j.id
                         ),
                     )
-                    for j in i.metadata_
+                    for j in i.metadata_  # type: ignore
                 ],
             )
             for i in orm_ds_urls
@@ -337,32 +488,196 @@ def dataset_urls(query: QueryParams):
     else:
         # === Metadata should be returned by content ===
 
-        ds_urls = orm_ds_urls
+        return [DatasetURLRespModel.from_orm(i) for i in orm_ds_urls]
 
-    assert pagination.total is not None
 
-    page = DatasetURLPage(
-        cur_pg_num=cur_pg_num,
-        prev_pg=(
+@bp.get("", responses={"200": DatasetURLPage, "400": HTTPExceptionResp})
+@conditional_on_registry_version
+@_search_rejected_as_bad_request
+def dataset_urls(query: QueryParams):
+    """
+    Get all dataset URLs that satisfy the constraints imposed by the query parameters.
+    """
+
+    constraints = _get_filter_constraints(query)
+
+    ep = ".dataset_urls"  # Endpoint of `dataset_urls`
+    base_qry = loads(query.json(exclude={"page", "after"}, exclude_none=True))
+
+    base_select_stmt = select(RepoUrl).filter(and_(True, *constraints))
+
+    pg_select_stmt = _load_metadata(base_select_stmt, query.return_metadata)
+
+    order_col = _ORDER_KEY_TO_SQLA_ATTR[query.order_by]
+
+    max_per_page = 100  # The overriding limit to `per_page` provided by the requester
+
+    if query.cursor:
+        # === Cursor pagination ===
+
+        after = None
+        if query.after is not None:
+            try:
+                after = decode_cursor(
+                    query.after,
+                    query.order_by,
+                    query.order_dir,
+                    order_col.type.python_type,
+                )
+            except ValueError as e:
+                abort(400, description=str(e))
+
+        per_page = min(query.per_page, max_per_page)
+
+        # Fetch one extra dataset URL to find out if there is a next page
+        orm_ds_urls: list[Any] = get_keyset_page(
+            pg_select_stmt, order_col, query.order_dir, after, per_page + 1
+        )
+        has_next = len(orm_ds_urls) > per_page
+        orm_ds_urls = orm_ds_urls[:per_page]
+
+        cur_pg_num = None
+        first_pg = url_for(ep, **base_qry)
+        prev_pg = None
+        next_pg = (
+            url_for(
+                ep,
+                **base_qry,
+                after=encode_cursor(
+                    query.order_by,
+                    query.order_dir,
+                    getattr(orm_ds_urls[-1], order_col.key),
+                    orm_ds_urls[-1].id,
+                ),
+            )
+            if has_next
+            else None
+        )
+        last_pg = None
+        total = None
+        total_is_exact = None
+        compile_stats = bool(query.with_stats)
+    else:
+        # === Page-number pagination ===
+
+        pagination = paginate(
+            pg_select_stmt.order_by(
+                getattr(order_col, query.order_dir.value)().nulls_last(),
+                getattr(RepoUrl.id, query.order_dir.value)(),
+            ),
+            count_mode=(
+                query.count_mode
+                if query.count_mode is not None
+                else current_app.config["DATALAD_REGISTRY_COUNT_MODE"]
+            ),
+            count_cap=current_app.config["DATALAD_REGISTRY_COUNT_CAP"],
+            page=query.page,
+            per_page=query.per_page,
+            max_per_page=max_per_page,
+        )
+        orm_ds_urls = pagination.items
+        cur_pg_num = pagination.page
+        total_pages = pagination.pages  # Total number of pages
+
+        assert pagination.total is not None
+        total = pagination.total
+        total_is_exact = pagination.total_is_exact
+
+        first_pg = url_for(ep, **base_qry, page=1)
+        prev_pg = (
             url_for(ep, **base_qry, page=pagination.prev_num)
             if pagination.has_prev
             else None
-        ),
-        next_pg=(
+        )
+        next_pg = (
             url_for(ep, **base_qry, page=pagination.next_num)
             if pagination.has_next
             else None
-        ),
-        first_pg=url_for(ep, **base_qry, page=1),
-        last_pg=url_for(ep, **base_qry, page=1 if total_pages == 0 else total_pages),
+        )
+        last_pg = url_for(ep, **base_qry, page=1 if total_pages == 0 else total_pages)
+        compile_stats = True
+
+    ds_urls = _to_resp_models(orm_ds_urls, query.return_metadata)
+
+    page = DatasetURLPage(
+        cur_pg_num=cur_pg_num,
+        prev_pg=prev_pg,
+        next_pg=next_pg,
+        first_pg=first_pg,
+        last_pg=last_pg,
+        total=total,
+        total_is_exact=total_is_exact,
         dataset_urls=ds_urls,
-        collection_stats=get_collection_stats(base_select_stmt),
+        collection_stats=(
+            (
+                get_collection_stats(base_select_stmt)
+                if constraints
+                else get_all_collection_stats()
+            )
+            if compile_stats
+            else None
+        ),
     )
 
     return json_resp_from_str(page.json(exclude_none=True))
 
 
+@bp.get("/export", responses={"400": HTTPExceptionResp})
+def export_dataset_urls(query: FilterParams):
+    """
+    Export all dataset URLs that satisfy the constraints imposed by the query
+    parameters as newline-delimited JSON (NDJSON), one dataset URL, represented as
+    in the dataset_urls endpoint, per line, in the order of their IDs.
+
+    The dataset URLs are streamed from the database in batches so that the entire
+    collection of dataset URLs can be exported in a single request. The response is
+    compressed with gzip if the requester accepts the gzip content coding, as
+    indicated by the `Accept-Encoding` header.
+    """
+    select_stmt = _load_metadata(
+        select(RepoUrl)
+        .filter(and_(True, *_get_filter_constraints(query)))
+        .order_by(RepoUrl.id),
+        query.return_metadata,
+    ).execution_options(
+        yield_per=(
+            _EXPORT_BATCH_SIZE_WITH_METADATA
+            if query.return_metadata is MetadataReturnOption.content
+            else _EXPORT_BATCH_SIZE
+        )
+    )
+
+    def generate_ndjson() -> Iterator[bytes]:
+        # The dataset URLs are fetched through a server-side cursor, a batch at
+        # a time, and each batch is released once it is sent
+        for orm_ds_urls in db.session.scalars(select_stmt).partitions():
+            yield "".join(
+                f"{ds_url.json(exclude_none=True)}\n"
+                for ds_url in _to_resp_models(orm_ds_urls, query.return_metadata)
+            ).encode()
+
+    def generate_gzip() -> Iterator[bytes]:
+        compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)  # gzip format
+        for chunk in generate_ndjson():
+            data = compressor.compress(chunk)
+            if data:
+                yield data
+        yield compressor.flush()
+
+    headers = {"Vary": "Accept-Encoding"}
+    if request.accept_encodings["gzip"]:
+        body = generate_gzip()
+        headers["Content-Encoding"] = "gzip"
+    else:
+        body = generate_ndjson()
+
+    return current_app.response_class(
+        stream_with_context(body), mimetype="application/x-ndjson", headers=headers
+    )
+
+
 @bp.get("/<int:id>", responses={"200": DatasetURLRespModel})
+@conditional_on_registry_version
 def dataset_url(path: PathParams):
     """
     Get a dataset URL by ID.
@@ -11,17 +11,20 @@ from pydantic import (
     FileUrl,
     NonNegativeInt,
     PositiveInt,
+    StrictBool,
     StrictInt,
     StrictStr,
     validator,
 )
 
+from datalad_registry.conf import CountMode
 from datalad_registry.utils import StrEnum
 
 from ..url_metadata.models import URLMetadataModel, URLMetadataRef
 
 DEFAULT_PAGE = 1  # Default page query param value
 DEFAULT_PER_PAGE = 20  # Default per_page query param value
+MAX_BATCH_SIZE = 1000  # Maximum number of URLs in a batch submission
 
 
 def path_url_must_be_absolute(url):
@@ -33,6 +36,18 @@ def path_url_must_be_absolute(url):
     return url
 
 
+def cursor_pagination_only(v, values, field):
+    """
+    Validator for the query parameters that are only applicable in cursor pagination
+    """
+    if v is not None and not values.get("cursor"):
+        raise ValueError(
+            f"`{field.name}` is only applicable in cursor pagination, "
+            "i.e. when `cursor` is true"
+        )
+    return v
+
+
 class OrderDir(StrEnum):
     """
     Enum for representing the order directions
@@ -73,10 +88,10 @@ class PathParams(BaseModel):
     id: int = Field(..., description="The ID of the dataset URL")
 
 
-class QueryParams(BaseModel):
+class FilterParams(BaseModel):
     """
-    Pydantic model for representing the query parameters to query
-    the dataset_urls endpoint
+    Pydantic model for representing the query parameters to filter the dataset URLs
+    and to specify whether and how to return their metadata
     """
 
     search: Optional[str] = Field(
@@ -160,6 +175,18 @@ class QueryParams(BaseModel):
         "each presenting a piece of metadata of the dataset at the URL.",
     )
 
+    # Validator
+    _path_url_must_be_absolute = validator("url", allow_reuse=True)(
+        path_url_must_be_absolute
+    )
+
+
+class QueryParams(FilterParams):
+    """
+    Pydantic model for representing the query parameters to query
+    the dataset_urls endpoint
+    """
+
     # Pagination parameters
     page: PositiveInt = Field(
         DEFAULT_PAGE,
@@ -173,6 +200,37 @@ class QueryParams(BaseModel):
         f"Defaults to {DEFAULT_PER_PAGE}.",
     )
 
+    count_mode: Optional[CountMode] = Field(
+        None,
+        description="How to count the total number of the dataset URLs satisfying "
+        'the constraints: "exact" for an exact count, "capped" for a count up to '
+        'a cap, or "estimated" for a count up to a cap, beyond which the total is '
+        "estimated by the query planner of the database. Defaults to the way "
+        "configured for the registry. (ignored in cursor pagination)",
+    )
+
+    cursor: Optional[bool] = Field(
+        None,
+        description="Whether to paginate by a cursor instead of by page numbers. "
+        "In cursor pagination, the `page` query parameter is ignored, "
+        "a page only links to the next page, through the `after` query parameter, "
+        "and the collection statistics are not compiled unless "
+        "the `with_stats` query parameter is true. Cursor pagination is "
+        "the efficient way to walk through the entire collection of dataset URLs.",
+    )
+    after: Optional[str] = Field(
+        None,
+        description="An opaque token, as provided in the link to the next page, "
+        "marking the position after which the current page starts "
+        "(only applicable in cursor pagination)",
+    )
+    with_stats: Optional[bool] = Field(
+        None,
+        description="Whether to compile the collection statistics "
+        "(only applicable in cursor pagination; the statistics are always "
+        "compiled in page-number pagination)",
+    )
+
     # Ordering parameters
     order_by: OrderKey = Field(
         OrderKey.last_update_dt,
@@ -183,8 +241,8 @@ class QueryParams(BaseModel):
     )
 
     # Validator
-    _path_url_must_be_absolute = validator("url", allow_reuse=True)(
-        path_url_must_be_absolute
+    _cursor_pagination_only = validator("after", "with_stats", allow_reuse=True)(
+        cursor_pagination_only
     )
 
 
@@ -201,6 +259,24 @@ class DatasetURLSubmitModel(BaseModel):
     )
 
 
+class DatasetURLBatchSubmitModel(BaseModel):
+    """
+    Model for representing a batch of dataset URLs for submission communication
+    """
+
+    urls: list[Union[FileUrl, AnyUrl, Path]] = Field(
+        ...,
+        min_items=1,
+        max_items=MAX_BATCH_SIZE,
+        description=f"The URLs, at most {MAX_BATCH_SIZE} of them",
+    )
+
+    # Validator
+    _path_url_must_be_absolute = validator("urls", each_item=True, allow_reuse=True)(
+        path_url_must_be_absolute
+    )
+
+
 class DatasetURLRespBaseModel(DatasetURLSubmitModel):
     """
     Base model for `DatasetURLRespModel`
@@ -257,6 +333,34 @@ class DatasetURLRespModel(DatasetURLRespBaseModel):
         by_alias = False
 
 
+class DatasetURLBatchRespItemModel(BaseModel):
+    """
+    Model for representing the outcome of the submission of a dataset URL
+    in a batch submission
+    """
+
+    status: StrictInt = Field(
+        description="The status code that the submission of the URL by itself would "
+        "have resulted in, i.e. 201 if the URL has been newly added "
+        "and 202 if the URL already exists"
+    )
+    dataset_url: DatasetURLRespModel = Field(
+        description="The representation of the URL in the database"
+    )
+
+
+class DatasetURLBatchRespModel(BaseModel):
+    """
+    Model for representing the outcomes of a batch submission of dataset URLs
+    in response communication
+    """
+
+    results: list[DatasetURLBatchRespItemModel] = Field(
+        description="The outcomes of the submissions of the unique URLs in the batch, "
+        "in the order of their first occurrences in the batch"
+    )
+
+
 class AnnexDsCollectionStats(BaseModel):
     """
     Model with the base components of annex dataset collection statistics
@@ -325,19 +429,39 @@ class DatasetURLPage(BaseModel):
     Model for representing a page of dataset URLs in response communication
     """
 
-    cur_pg_num: StrictInt = Field(description="The number of the current page")
+    cur_pg_num: Optional[StrictInt] = Field(
+        None,
+        description="The number of the current page "
+        "(not provided in cursor pagination)",
+    )
     prev_pg: Optional[StrictStr] = Field(
         None, description="The link to the previous page"
     )
     next_pg: Optional[StrictStr] = Field(None, description="The link to the next page")
     first_pg: StrictStr = Field(description="The link to the first page")
-    last_pg: StrictStr = Field(description="The link to the last page")
+    last_pg: Optional[StrictStr] = Field(
+        None,
+        description="The link to the last page (not provided in cursor pagination)",
+    )
+
+    total: Optional[NonNegativeInt] = Field(
+        None,
+        description="The total number of dataset URLs across all pages, "
+        "which is a lower bound or an estimate if `total_is_exact` is false "
+        "(not provided in cursor pagination)",
+    )
+    total_is_exact: Optional[StrictBool] = Field(
+        None,
+        description="Whether `total` is exact. If not, the last page is the last page "
+        "within `total` (not provided in cursor pagination)",
+    )
 
     dataset_urls: list[DatasetURLRespModel] = Field(
         description="The list of dataset URLs in the current page"
     )
-    collection_stats: CollectionStats = Field(
+    collection_stats: Optional[CollectionStats] = Field(
+        None,
         description="Statistics about the collection of dataset URLs, "
         "not just the URLs in the current page but the entire collection "
-        "returned"
+        "returned (not provided in cursor pagination unless requested)",
     )
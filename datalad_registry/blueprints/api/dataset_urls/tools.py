@@ -1,5 +1,14 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime, timezone
+import json
+import operator
+from typing import Any, Optional
+
+from pydantic import StrictInt, parse_obj_as
+from pydantic.json import pydantic_encoder
 from sqlalchemy import (
     CTE,
+    ColumnElement,
     ScalarSelect,
     Select,
     Subquery,
@@ -8,11 +17,14 @@ from sqlalchemy import (
     not_,
     or_,
     select,
+    tuple_,
+    update,
 )
+from sqlalchemy.dialects.postgresql import insert
 
-from datalad_registry.models import RepoUrl, db
+from datalad_registry.models import CollectionStatsSnapshot, RepoUrl, db
 
-from .models import CollectionStats
+from .models import CollectionStats, OrderDir, OrderKey
 
 
 def _get_annex_ds_collection_stats(q: Subquery) -> ScalarSelect:
@@ -225,3 +237,243 @@ def get_collection_stats(select_stmt: Select) -> CollectionStats:
             )
         ).scalar_one()
     )
+
+
+def get_all_collection_stats() -> CollectionStats:
+    """
+    Get the statistics of the entire collection of dataset URLs in the registry
+
+    :return: The statistics of the entire collection of dataset URLs
+
+    Note: The statistics are served from the precomputed snapshot if there is one,
+          which can lag behind the latest changes to the collection by up to
+          a refresh cycle. Otherwise, the statistics are computed live.
+    Note: The execution of this function requires the Flask app's context
+    """
+    snapshot_stats = db.session.execute(
+        select(CollectionStatsSnapshot.stats)
+    ).scalar_one_or_none()
+
+    if snapshot_stats is not None:
+        return CollectionStats.parse_obj(snapshot_stats)
+    else:
+        return get_collection_stats(select(RepoUrl))
+
+
+def refresh_collection_stats_snapshot(force: bool = False) -> bool:
+    """
+    Refresh the precomputed snapshot of the statistics of the entire collection of
+    dataset URLs if it is absent or stale
+
+    :param force: Whether to refresh the snapshot even if it is not stale
+    :return: Whether the snapshot has been refreshed
+
+    Note: The statistics are computed without holding any lock on the snapshot.
+          The snapshot is first marked as not stale, and the computed statistics
+          are only stored if the generation of the snapshot is unchanged since then,
+          i.e., if the snapshot has not been marked stale again in the meantime.
+          Otherwise, the snapshot is left stale for the next refresh. The first
+          snapshot, of which no generation precedes the computation of
+          the statistics, is stored as stale so that it is confirmed by
+          the next refresh.
+    Note: This function commits the current transaction of the session.
+    Note: The execution of this function requires the Flask app's context
+    """
+    claim_stmt = (
+        update(CollectionStatsSnapshot)
+        .values(is_stale=False)
+        .returning(CollectionStatsSnapshot.generation)
+    )
+    if not force:
+        claim_stmt = claim_stmt.filter(CollectionStatsSnapshot.is_stale)
+    generation = db.session.execute(claim_stmt).scalar_one_or_none()
+    db.session.commit()
+
+    if generation is None:
+        if (
+            db.session.execute(select(CollectionStatsSnapshot.id)).scalar_one_or_none()
+            is not None
+        ):
+            # The snapshot is up-to-date
+            db.session.rollback()
+            return False
+
+        stats = get_collection_stats(select(RepoUrl)).dict()
+        refreshed = (
+            db.session.execute(
+                insert(CollectionStatsSnapshot)
+                .values(
+                    id=1,
+                    stats=stats,
+                    computed_dt=datetime.now(timezone.utc),
+                    # The collection may have changed without a marking of
+                    # the snapshot, which didn't exist, while the statistics were
+                    # computed
+                    is_stale=True,
+                )
+                .on_conflict_do_nothing(index_elements=[CollectionStatsSnapshot.id])
+            ).rowcount
+            > 0
+        )
+        db.session.commit()
+        return refreshed
+
+    try:
+        stats = get_collection_stats(select(RepoUrl)).dict()
+    except Exception:
+        # Restore the staleness claimed above
+        db.session.rollback()
+        mark_collection_stats_stale()
+        db.session.commit()
+        raise
+
+    refreshed = (
+        db.session.execute(
+            update(CollectionStatsSnapshot)
+            .filter(CollectionStatsSnapshot.generation == generation)
+            .values(stats=stats, computed_dt=datetime.now(timezone.utc)),
+            execution_options={"synchronize_session": False},
+        ).rowcount
+        > 0
+    )
+    db.session.commit()
+
+    return refreshed
+
+
+def mark_collection_stats_stale() -> None:
+    """
+    Mark the precomputed snapshot of the statistics of the entire collection of
+    dataset URLs, if there is one, as stale
+
+    The generation of the snapshot is incremented even if the snapshot is stale
+    already so that a refresh that has claimed the staleness of the snapshot detects
+    the marking, see `refresh_collection_stats_snapshot`.
+
+    Note: This function is meant to be called in the transaction that changes
+          the collection of dataset URLs, right before the transaction is committed
+          since the snapshot is locked from then on until the end of
+          the transaction. It doesn't commit the transaction.
+    Note: The execution of this function requires the Flask app's context
+    """
+    db.session.execute(
+        update(CollectionStatsSnapshot).values(
+            is_stale=True, generation=CollectionStatsSnapshot.generation + 1
+        ),
+        execution_options={"synchronize_session": False},
+    )
+
+
+def encode_cursor(
+    order_by: OrderKey, order_dir: OrderDir, value: Any, repo_url_id: int
+) -> str:
+    """
+    Encode the position of a dataset URL in an ordering of dataset URLs
+    as an opaque cursor
+
+    :param order_by: The key of the ordering
+    :param order_dir: The direction of the ordering
+    :param value: The value of the ordering key of the dataset URL
+    :param repo_url_id: The ID of the dataset URL, the tie-breaker of the ordering
+    :return: The cursor, a URL-safe string
+    """
+    payload = json.dumps(
+        [order_by, order_dir, value, repo_url_id],
+        default=pydantic_encoder,
+        separators=(",", ":"),
+    )
+    return urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_cursor(
+    cursor: str, order_by: OrderKey, order_dir: OrderDir, value_type: type
+) -> tuple[Any, int]:
+    """
+    Decode a cursor produced by `encode_cursor`
+
+    :param cursor: The cursor
+    :param order_by: The key of the ordering the cursor is expected to be for
+    :param order_dir: The direction of the ordering the cursor is expected to be for
+    :param value_type: The type of the values of the ordering key
+    :return: The value of the ordering key and the ID of the dataset URL
+             at the position marked by the cursor
+    :raises ValueError: If the cursor is invalid or is for a different ordering
+    """
+    try:
+        cursor_order_by, cursor_order_dir, value, repo_url_id = json.loads(
+            urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        )
+        if value is not None:
+            value = parse_obj_as(value_type, value)
+        repo_url_id = parse_obj_as(StrictInt, repo_url_id)
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Invalid cursor: {cursor!r}") from e
+
+    if cursor_order_by != order_by or cursor_order_dir != order_dir:
+        raise ValueError(f"The cursor, {cursor!r}, is for a different ordering")
+
+    return value, repo_url_id
+
+
+def get_keyset_page(
+    select_stmt: Select,
+    order_col: ColumnElement,
+    order_dir: OrderDir,
+    after: Optional[tuple[Any, int]],
+    limit: int,
+) -> list[RepoUrl]:
+    """
+    Get a page of dataset URLs by seeking past the position of the last dataset URL
+    of the previous page in the ordering, instead of by skipping over the previous
+    pages with an offset
+
+    The dataset URLs are ordered by the given column, with nulls last, and then
+    by ID in the same direction. The dataset URLs with a non-null value in the
+    column and those with a null value are fetched by separate queries so that
+    each query can be served by a seek on an index over the column and `id`.
+
+    :param select_stmt: The statement selecting the entire collection of
+                        dataset URLs to paginate
+    :param order_col: The column to order the dataset URLs by
+    :param order_dir: The direction of the ordering
+    :param after: The value of the ordering column and the ID of the last
+                  dataset URL of the previous page. `None` for the first page.
+    :param limit: The maximum number of dataset URLs in the page
+    :return: The dataset URLs in the page
+
+    Note: The execution of this function requires the Flask app's context
+    """
+    seek = operator.gt if order_dir is OrderDir.asc else operator.lt
+
+    def ordered(col: ColumnElement) -> ColumnElement:
+        return getattr(col, order_dir.value)()
+
+    repo_urls: list[RepoUrl] = []
+
+    if after is None or after[0] is not None:
+        # === The page starts among the dataset URLs with a non-null value
+        # in the ordering column ===
+        stmt = select_stmt.filter(order_col.is_not(None))
+        if after is not None:
+            stmt = stmt.filter(seek(tuple_(order_col, RepoUrl.id), after))
+
+        repo_urls.extend(
+            db.session.execute(
+                stmt.order_by(ordered(order_col), ordered(RepoUrl.id)).limit(limit)
+            ).scalars()
+        )
+
+    if len(repo_urls) < limit:
+        # === The page extends into the dataset URLs with a null value
+        # in the ordering column ===
+        stmt = select_stmt.filter(order_col.is_(None))
+        if after is not None and after[0] is None:
+            stmt = stmt.filter(seek(RepoUrl.id, after[1]))
+
+        repo_urls.extend(
+            db.session.execute(
+                stmt.order_by(ordered(RepoUrl.id)).limit(limit - len(repo_urls))
+            ).scalars()
+        )
+
+    return repo_urls
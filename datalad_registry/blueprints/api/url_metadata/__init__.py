@@ -1,9 +1,14 @@
 # This file is for defining the API endpoints related to dataset URL metadata,
 # i.e. the metadata of datasets at individual URLs.
 
+from hashlib import sha256
+
+from flask import current_app
 from flask_openapi3 import APIBlueprint, Tag
+from sqlalchemy.orm import defer
 
 from datalad_registry.models import URLMetadata, db
+from datalad_registry.utils.flask_tools import APP_VERSION, conditional_resp
 
 from .models import PathParams, URLMetadataModel
 from .. import API_URL_PREFIX, COMMON_API_RESPONSES, URL_METADATA_PATH
@@ -22,5 +27,32 @@ def url_metadata(path: PathParams):
     """
     Get URL metadata by ID.
     """
-    data = URLMetadataModel.from_orm(db.get_or_404(URLMetadata, path.url_metadata_id))
-    return data.dict()
+    # The extracted metadata, which can be large, is only loaded if it is to be
+    # returned, i.e., if the requester doesn't have the current version of the record
+    url_metadata_ = db.get_or_404(
+        URLMetadata,
+        path.url_metadata_id,
+        options=[defer(URLMetadata.extracted_metadata)],
+    )
+
+    # A record is only changed in place when it is restamped with a new version of
+    # the dataset. The extracted metadata of a record never changes. The version of
+    # the app is included since the representation of a record may differ between
+    # versions of the app.
+    etag = sha256(
+        "\0".join(
+            [
+                APP_VERSION,
+                str(url_metadata_.id),
+                url_metadata_.dataset_version,
+                url_metadata_.dataset_describe,
+                url_metadata_.extractor_version,
+            ]
+        ).encode()
+    ).hexdigest()[:32]
+
+    return conditional_resp(
+        lambda: URLMetadataModel.from_orm(url_metadata_).dict(),
+        etag=etag,
+        max_age=current_app.config["DATALAD_REGISTRY_URL_METADATA_CACHE_MAX_AGE"],
+    )
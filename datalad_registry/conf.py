@@ -1,12 +1,13 @@
 from enum import auto
 from pathlib import Path
-from typing import Any, Literal, Union
+from typing import Any, Literal, Optional, Union
 
 from pydantic import (
     AnyHttpUrl,
     BaseSettings,
     NonNegativeInt,
     PositiveFloat,
+    PositiveInt,
     PostgresDsn,
     validator,
 )
@@ -23,6 +24,83 @@ class OperationMode(StrEnum):
     READ_ONLY = auto()
 
 
+class CloneStrategy(StrEnum):
+    """
+    The strategies of cloning datasets into the local cache
+
+    With a strategy other than `FULL`, the working tree, the branches, including
+    the git-annex branch, and the tags are still available, so the information
+    extracted from a clone, including the annex key counts, is the same, with
+    the following exceptions:
+      - `git_objects_kb` measures the git objects stored locally in the clone,
+        which is less than the full history of the dataset
+      - With `SHALLOW`, `head_describe` falls back to the abbreviated hexsha of
+        the HEAD if no tag is reachable within the cloned depth
+
+    Note: `BLOBLESS` and `TREELESS` make partial clones only of datasets served
+          with filtering allowed, e.g., by `uploadpack.allowFilter=true` on the
+          server. Otherwise, and for datasets at a local path, the filter is ignored
+          and a full clone is made.
+    Note: git-annex reads the git-annex branch, of which a partial clone lacks the
+          blobs, and, with `TREELESS`, the trees. git-annex has them fetched
+          lazily, in a round trip to the origin remote per object, when it
+          initializes a new clone, so the cloning of a dataset with a large
+          git-annex branch can be much slower than with `FULL`. When a clone is
+          updated, the newly fetched objects at the tip of the git-annex branch
+          are prefetched in batch before the branch is merged.
+    """
+
+    # Clone the complete history of the dataset
+    FULL = auto()
+
+    # Clone all commits and trees, but only the blobs needed for checking out
+    # the working tree, with `--filter=blob:none`. The other blobs are fetched
+    # on demand.
+    BLOBLESS = auto()
+
+    # Clone all commits, but only the trees and blobs needed for checking out
+    # the working tree, with `--filter=tree:0`. The other trees and blobs are fetched
+    # on demand.
+    TREELESS = auto()
+
+    # Clone the history of all branches, including the git-annex branch,
+    # up to the depth of `DATALAD_REGISTRY_CLONE_DEPTH` commits
+    SHALLOW = auto()
+
+
+class CountMode(StrEnum):
+    """
+    The ways of counting the total number of items across the pages of
+    a paginated collection
+    """
+
+    # Count all the items
+    exact = auto()
+
+    # Count the items up to a cap. A total above the cap is reported as the cap.
+    capped = auto()
+
+    # Count the items up to a cap. A total above the cap is reported as estimated
+    # by the query planner of PostgreSQL, or as the cap if the estimate is lower.
+    estimated = auto()
+
+
+class ResponseCacheBackend(StrEnum):
+    """
+    The backends of the cache of the responses of the read endpoints presenting
+    the dataset URLs
+    """
+
+    # Don't cache the responses
+    NONE = auto()
+
+    # Cache the responses in the memory of each process of the web service
+    MEMORY = auto()
+
+    # Cache the responses in Redis, shared by all processes of the web service
+    REDIS = auto()
+
+
 class OperationConfig(BaseSettings):
     DATALAD_REGISTRY_OPERATION_MODE: OperationMode
 
@@ -36,15 +114,79 @@ class BaseConfig(OperationConfig):
 
     # URL check dispatcher related configuration
     DATALAD_REGISTRY_MIN_CHK_INTERVAL_PER_URL: NonNegativeInt = 3600  # seconds
+    # The interval between checks of a URL doubles with each consecutive check that
+    # finds no update, starting from `DATALAD_REGISTRY_MIN_CHK_INTERVAL_PER_URL`,
+    # up to this value
+    DATALAD_REGISTRY_MAX_CHK_INTERVAL_PER_URL: NonNegativeInt = (
+        60 * 60 * 24 * 7
+    )  # A week in seconds
     DATALAD_REGISTRY_MAX_FAILED_CHKS_PER_URL: NonNegativeInt = 10
     DATALAD_REGISTRY_MAX_URL_CHKS_ISSUED_PER_DISPATCH_CYCLE: NonNegativeInt = 10
     DATALAD_REGISTRY_DISPATCH_CYCLE_LENGTH: PositiveFloat = 60.0  # seconds
 
+    # Strategy of cloning datasets into the local cache
+    DATALAD_REGISTRY_CLONE_STRATEGY: CloneStrategy = CloneStrategy.FULL
+    # The number of commits to clone with the `SHALLOW` clone strategy
+    DATALAD_REGISTRY_CLONE_DEPTH: PositiveInt = 1
+
     # Configurations related to syncing with the usage dashboard
     DATALAD_REGISTRY_USAGE_DASHBOARD_SYNC_CYCLE_LENGTH: PositiveFloat = (
         60.0 * 60 * 24
     )  # A day in seconds
 
+    # URL processing dispatcher related configuration. The new dataset URLs found in
+    # a sync with the usage dashboard are left pending submission for processing, and
+    # the dispatcher submits at most the given number of them per cycle of the given
+    # length so that a large number of new URLs does not flood the workers.
+    DATALAD_REGISTRY_MAX_URL_PROCESSINGS_ISSUED_PER_DISPATCH_CYCLE: PositiveInt = 100
+    DATALAD_REGISTRY_URL_PROCESSING_DISPATCH_CYCLE_LENGTH: PositiveFloat = (
+        60.0 * 10
+    )  # 10 minutes in seconds
+
+    # Length of the cycle for refreshing the precomputed statistics of the entire
+    # collection of dataset URLs (if the collection has changed since the last refresh)
+    DATALAD_REGISTRY_COLLECTION_STATS_REFRESH_CYCLE_LENGTH: PositiveFloat = (
+        60.0 * 5
+    )  # 5 minutes in seconds
+
+    # The way of counting the total number of dataset URLs satisfying a search in
+    # the Web UI and, by default, in the API, and the cap of the count if the way is
+    # not `exact`. Counting the dataset URLs satisfying a search can cost as much as
+    # the search itself.
+    DATALAD_REGISTRY_COUNT_MODE: CountMode = CountMode.exact
+    DATALAD_REGISTRY_COUNT_CAP: PositiveInt = 10000
+
+    # The `max-age`, in seconds, in the `Cache-Control` header of the responses of
+    # the read endpoints presenting the dataset URLs, i.e., the time for which
+    # the responses can be served by caches, e.g., a CDN in front of a read-only
+    # instance, without revalidation. The value of 0 requires revalidation
+    # of the responses, by the `ETag` header, upon each use.
+    DATALAD_REGISTRY_CACHE_MAX_AGE: NonNegativeInt = 0
+    # The `max-age`, in seconds, in the `Cache-Control` header of the responses of
+    # the endpoint presenting individual URL metadata records. A record is replaced,
+    # under a new ID, when metadata is extracted from a new version of the dataset,
+    # and is otherwise at most restamped with the new version of the dataset, so it
+    # can be cached for long.
+    DATALAD_REGISTRY_URL_METADATA_CACHE_MAX_AGE: NonNegativeInt = (
+        60 * 60 * 24
+    )  # A day in seconds
+
+    # The server-side cache of the responses of the read endpoints presenting
+    # the dataset URLs. A cached response is used for as long as the content of
+    # the registry remains at the version at which the response was made.
+    DATALAD_REGISTRY_RESPONSE_CACHE_BACKEND: ResponseCacheBackend = (
+        ResponseCacheBackend.NONE
+    )
+    # The maximum total size, in bytes, of the responses cached in the memory of
+    # a process with the `MEMORY` backend
+    DATALAD_REGISTRY_RESPONSE_CACHE_MAX_BYTES: PositiveInt = 64 * 1024 * 1024
+    # The URL of the Redis database used by the `REDIS` backend. Defaults to
+    # `CELERY_RESULT_BACKEND`.
+    DATALAD_REGISTRY_RESPONSE_CACHE_REDIS_URL: Optional[str] = None
+    # The time, in seconds, for which a response is kept in Redis
+    # with the `REDIS` backend
+    DATALAD_REGISTRY_RESPONSE_CACHE_TTL: PositiveInt = 60 * 60  # An hour in seconds
+
     # Metadata extractors to use
     DATALAD_REGISTRY_METADATA_EXTRACTORS: list[str] = [
         "metalad_core",
@@ -53,9 +195,16 @@ class BaseConfig(OperationConfig):
         "bids_dataset",
         # === DANDI related extractors ===
         "dandi",
-        # "dandi:files",  # Not enabled for usual setups because of performance impact
+        "dandi:files",
     ]
 
+    # The number of assets of a DANDI dataset that the "dandi:files" extractor holds
+    # in memory, and writes to the database, at a time. Along with the size of the
+    # largest asset record, this bounds the memory used by the extractor. (With
+    # asset records of about 700 bytes in JSON, the extractor with the default batch
+    # size uses about 11 MiB of memory, regardless of the number of assets.)
+    DATALAD_REGISTRY_DANDI_ASSETS_BATCH_SIZE: PositiveInt = 1000
+
     # === worker, Celery, related configuration  ===
     CELERY_BROKER_URL: Union[str, list[str]]
     CELERY_RESULT_BACKEND: str
@@ -79,6 +228,28 @@ class BaseConfig(OperationConfig):
                         "expires": self.DATALAD_REGISTRY_USAGE_DASHBOARD_SYNC_CYCLE_LENGTH
                     },
                 },
+                "url-processing-dispatcher": {
+                    "task": "datalad_registry.tasks.url_processing_dispatcher",
+                    "schedule": (
+                        self.DATALAD_REGISTRY_URL_PROCESSING_DISPATCH_CYCLE_LENGTH
+                    ),
+                    "options": {
+                        "expires": (
+                            self.DATALAD_REGISTRY_URL_PROCESSING_DISPATCH_CYCLE_LENGTH
+                        )
+                    },
+                },
+                "collection-stats-refresh": {
+                    "task": "datalad_registry.tasks.refresh_collection_stats",
+                    "schedule": (
+                        self.DATALAD_REGISTRY_COLLECTION_STATS_REFRESH_CYCLE_LENGTH
+                    ),
+                    "options": {
+                        "expires": (
+                            self.DATALAD_REGISTRY_COLLECTION_STATS_REFRESH_CYCLE_LENGTH
+                        )
+                    },
+                },
             },
             task_ignore_result=True,
             worker_max_tasks_per_child=1000,
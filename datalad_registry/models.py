@@ -6,11 +6,51 @@ from flask import current_app
 from flask.cli import with_appcontext
 from flask_migrate import Migrate
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import DDL, Index, Text, event
 from sqlalchemy.dialects.postgresql import JSONB
 
 db = SQLAlchemy()
 migrate = Migrate()
 
+# The `pg_trgm` extension provides the trigram operator classes used by the GIN indexes
+# that support the substring (`ilike`) searches in `datalad_registry.search`
+event.listen(
+    db.metadata, "before_create", DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+)
+
+# The columns of `RepoUrl` that are searched, by substring, as they are
+# in `datalad_registry.search`
+_TRGM_INDEXED_REPO_URL_COLS = ["url", "ds_id", "head", "head_describe", "tags"]
+
+# The columns of `RepoUrl` that are matched exactly, and by range, in
+# `datalad_registry.search`, other than `url` which already has a unique index
+_BTREE_INDEXED_REPO_URL_COLS = ["ds_id", "head", "head_describe"]
+
+# The columns of `RepoUrl` by which the dataset URLs can be ordered in the API,
+# other than `url` which already has a unique index. Each is indexed together with
+# `id`, the tie-breaker of the ordering, to support keyset (cursor) pagination.
+_KEYSET_INDEXED_REPO_URL_COLS = [
+    "annex_key_count",
+    "annexed_files_in_wt_count",
+    "annexed_files_in_wt_size",
+    "last_update_dt",
+    "git_objects_kb",
+]
+
+
+def _trgm_index(name: str, col) -> Index:
+    """
+    Build a GIN index with the trigram operator class over a column or expression
+
+    :param name: The name of the index
+    :param col: The column or expression, given as a column name or as an expression
+                labeled with `name`, to index
+    """
+    key = col if isinstance(col, str) else name
+    return Index(
+        name, col, postgresql_using="gin", postgresql_ops={key: "gin_trgm_ops"}
+    )
+
 
 class RepoUrl(db.Model):  # type: ignore
 
@@ -50,9 +90,27 @@ class RepoUrl(db.Model):  # type: ignore
     # The number of consecutive check for update operations that have failed
     n_failed_chks = db.Column(db.Integer, default=0, nullable=False)
 
+    # The number of consecutive check for update operations that have found
+    # no update of the dataset at the URL
+    n_unchanged_chks = db.Column(db.Integer, default=0, nullable=False)
+
+    # The time at or after which the dataset at the URL is due to be checked for update.
+    # The interval between the last check, or update, and this time grows with
+    # `n_unchanged_chks` so that dormant datasets are checked less often than active
+    # ones. A request for check for update brings this time forward to the time of
+    # the request. The value of `None` means that no check is scheduled, i.e.,
+    # the URL has not been processed, or it is no longer checked for its checks have
+    # failed `DATALAD_REGISTRY_MAX_FAILED_CHKS_PER_URL` times in a row.
+    next_chk_dt = db.Column(db.DateTime(timezone=True))
+
     #: Whether initial data has been collected for this URL
     processed = db.Column(db.Boolean, default=False, nullable=False)
 
+    # Whether the URL is pending submission for processing by the URL processing
+    # dispatcher, `datalad_registry.tasks.url_processing_dispatcher`, which submits
+    # a bounded number of the pending URLs per cycle
+    processing_pending = db.Column(db.Boolean, default=False, nullable=False)
+
     # The path in the local cache where a copy of the dataset at the URL is stored
     # This column always contains a value generated by
     # `datalad_registry.utils.allocate_ds_path` in `str` format which is
@@ -64,6 +122,38 @@ class RepoUrl(db.Model):  # type: ignore
         "URLMetadata", back_populates="url", cascade_backrefs=False
     )
 
+    __table_args__ = (
+        *[_trgm_index(f"ix_repo_url_{c}_trgm", c) for c in _TRGM_INDEXED_REPO_URL_COLS],
+        _trgm_index(
+            "ix_repo_url_branches_text_trgm",
+            branches.cast(Text).label("ix_repo_url_branches_text_trgm"),
+        ),
+        *[Index(f"ix_repo_url_{c}", c) for c in _BTREE_INDEXED_REPO_URL_COLS],
+        *[Index(f"ix_repo_url_{c}_id", c, "id") for c in _KEYSET_INDEXED_REPO_URL_COLS],
+        # Partial indexes for the check dispatcher to range-scan the processed URLs
+        # that are due to be checked, with and without a request for check for update
+        # respectively, in the order of due time
+        Index(
+            "ix_repo_url_requested_chk_due",
+            next_chk_dt,
+            id,
+            postgresql_where=processed & chk_req_dt.is_not(None),
+        ),
+        Index(
+            "ix_repo_url_scheduled_chk_due",
+            next_chk_dt,
+            id,
+            postgresql_where=processed & chk_req_dt.is_(None),
+        ),
+        # Partial index for the URL processing dispatcher to range-scan the URLs
+        # pending submission for processing in the order of their IDs
+        Index(
+            "ix_repo_url_processing_pending",
+            id,
+            postgresql_where=processing_pending,
+        ),
+    )
+
     def __repr__(self) -> str:
         return f"<RepoUrl(url={self.url!r}, ds_id={self.ds_id!r})>"
 
@@ -102,17 +192,260 @@ class URLMetadata(db.Model):  # type: ignore
 
     extracted_metadata = db.Column(JSONB, nullable=False)
 
+    # The git blob IDs of the files, required by the extractor, from which
+    # the metadata was extracted, keyed by the paths of the files. This serves as
+    # the fingerprint of the input of the extractor. Null if the output of
+    # the extractor is not determined by its required files alone.
+    required_files_blob_ids = db.Column(JSONB)
+
     # The ID of the associated RepoUrl
     url_id = db.Column(db.Integer, db.ForeignKey("repo_url.id"), nullable=False)
 
     url = db.relationship("RepoUrl", back_populates="metadata_", cascade_backrefs=False)
 
+    __table_args__ = (
+        _trgm_index("ix_url_metadata_extractor_name_trgm", "extractor_name"),
+        _trgm_index(
+            "ix_url_metadata_extracted_metadata_text_trgm",
+            extracted_metadata.cast(Text).label(
+                "ix_url_metadata_extracted_metadata_text_trgm"
+            ),
+        ),
+        # Supports the searches of values at given paths in the extracted metadata,
+        # i.e., the jsonpath matches, `@?`, in `datalad_registry.search`
+        Index(
+            "ix_url_metadata_extracted_metadata_path_ops",
+            extracted_metadata,
+            postgresql_using="gin",
+            postgresql_ops={"extracted_metadata": "jsonb_path_ops"},
+        ),
+    )
+
     def __repr__(self) -> str:
         return (
             f"<URLMetadata(url={self.url.url!r}, extractor={self.extractor_name!r})> "
         )
 
 
+class DandiAsset(db.Model):  # type: ignore
+    """
+    Model for the metadata of an asset of a DANDI dataset, as listed in the
+    `.dandi/assets.json` file of the dataset
+
+    The records of this model are produced by the "dandi:files" extractor, one per
+    asset, and are associated with the `URLMetadata` record containing the summary
+    of the assets produced by the same extraction.
+    """
+
+    id = db.Column(db.Integer, primary_key=True, nullable=False)
+
+    # The ID of the associated URLMetadata
+    url_metadata_id = db.Column(
+        db.Integer,
+        db.ForeignKey("url_metadata.id", ondelete="CASCADE"),
+        index=True,
+        nullable=False,
+    )
+
+    # The position of the asset in the list of assets in `.dandi/assets.json`
+    idx = db.Column(db.Integer, nullable=False)
+
+    # The metadata of the asset as given in `.dandi/assets.json`
+    asset_metadata = db.Column(JSONB, nullable=False)
+
+    url_metadata = db.relationship("URLMetadata")
+
+    def __repr__(self) -> str:
+        return (
+            f"<DandiAsset(url_metadata_id={self.url_metadata_id!r}, idx={self.idx!r})>"
+        )
+
+
+class DatasetFile(db.Model):  # type: ignore
+    """
+    Model for a file of a dataset, as recorded along with the metadata extracted
+    from the dataset by an extractor that lists the files of the dataset,
+    i.e., "dandi:files" or "bids_dataset"
+    """
+
+    id = db.Column(db.Integer, primary_key=True, nullable=False)
+
+    # The ID of the associated URLMetadata
+    url_metadata_id = db.Column(
+        db.Integer,
+        db.ForeignKey("url_metadata.id", ondelete="CASCADE"),
+        index=True,
+        nullable=False,
+    )
+
+    # The path of the file relative to the root of the dataset
+    path = db.Column(db.Text, nullable=False)
+
+    # The size of the file in bytes
+    size = db.Column(db.BigInteger)
+
+    # The media type of the content of the file
+    content_type = db.Column(db.Text, index=True)
+
+    # The git-annex key of the file if the file is annexed
+    annex_key = db.Column(db.Text, index=True)
+
+    url_metadata = db.relationship("URLMetadata")
+
+    __table_args__ = (_trgm_index("ix_dataset_file_path_trgm", "path"),)
+
+    def __repr__(self) -> str:
+        return (
+            f"<DatasetFile(url_metadata_id={self.url_metadata_id!r}, "
+            f"path={self.path!r})>"
+        )
+
+
+class RegistryVersion(db.Model):  # type: ignore
+    """
+    Model for the version of the content of the registry, which is incremented upon
+    the commit of any transaction that changes the content of the registry as
+    presented through the read endpoints, i.e., the dataset URLs, their metadata,
+    and the statistics of the collection of the dataset URLs
+
+    The version is maintained by triggers in the database, see
+    `_VERSIONED_TABLE_EVENTS`, and serves as the validator in the conditional
+    requests to the read endpoints.
+
+    Note: There is exactly one row in the corresponding table
+    """
+
+    id = db.Column(db.Integer, primary_key=True, nullable=False)
+
+    version = db.Column(db.BigInteger, nullable=False)
+
+    def __repr__(self) -> str:
+        return f"<RegistryVersion(version={self.version!r})>"
+
+
+class CollectionStatsSnapshot(db.Model):  # type: ignore
+    """
+    Model for a precomputed snapshot of the statistics of the entire collection of
+    dataset URLs in the registry
+
+    Note: There is at most one row in the corresponding table
+    """
+
+    id = db.Column(db.Integer, primary_key=True, nullable=False)
+
+    # The statistics, a `CollectionStats` in JSON form
+    stats = db.Column(JSONB, nullable=False)
+
+    # The time at which the statistics were computed
+    computed_dt = db.Column(db.DateTime(timezone=True), nullable=False)
+
+    # Whether the collection of dataset URLs may have changed since the statistics
+    # were computed
+    is_stale = db.Column(db.Boolean, default=False, nullable=False)
+
+    # The number of times the snapshot has been marked stale, which lets a refresh
+    # of the snapshot detect a marking made while the statistics are computed
+    generation = db.Column(db.BigInteger, default=0, nullable=False)
+
+    def __repr__(self) -> str:
+        return (
+            f"<CollectionStatsSnapshot(computed_dt={self.computed_dt!r}, "
+            f"is_stale={self.is_stale!r})>"
+        )
+
+
+class UsageDashboardSyncState(db.Model):  # type: ignore
+    """
+    Model for the state of the syncing of the registry with
+    the datalad-usage-dashboard, which allows a sync to be skipped if
+    the collection of the repos in the dashboard is unchanged since the last sync
+
+    Note: There is at most one row in the corresponding table
+    """
+
+    id = db.Column(db.Integer, primary_key=True, nullable=False)
+
+    # The entity tag of the JSON document of the collection of the repos in
+    # the dashboard as of the last sync, if provided by the server of the document
+    etag = db.Column(db.Text)
+
+    # The time of the last sync
+    synced_dt = db.Column(db.DateTime(timezone=True), nullable=False)
+
+    def __repr__(self) -> str:
+        return (
+            f"<UsageDashboardSyncState(etag={self.etag!r}, "
+            f"synced_dt={self.synced_dt!r})>"
+        )
+
+
+event.listen(
+    RegistryVersion.__table__,
+    "after_create",
+    DDL("INSERT INTO registry_version (id, version) VALUES (1, 0)"),
+)
+
+# The function incrementing the registry version. It is called by deferred
+# triggers, so at the commit of a transaction, and increments the version at most
+# once per transaction, with the help of a transaction-local setting, so that
+# the row of the version is locked only briefly, at the end of the transaction.
+_BUMP_REGISTRY_VERSION_FUNC = """
+CREATE OR REPLACE FUNCTION bump_registry_version() RETURNS trigger AS $$
+BEGIN
+    IF current_setting('datalad_registry.version_bumped', true) IS DISTINCT FROM 'on'
+    THEN
+        UPDATE registry_version
+        SET version = version + 1;
+        PERFORM set_config('datalad_registry.version_bumped', 'on', true);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+# The columns of `RepoUrl` used only to schedule the checks for update and
+# the processing of the URLs. The changes to these columns don't increment
+# the registry version so that the scheduling doesn't invalidate the caches of
+# the responses of the read endpoints.
+# Note: Migration 5b9e2d7c1a04 creates the trigger of `repo_url` with a fixed list of
+#       the other columns, which must be kept in agreement with this set.
+_UNVERSIONED_REPO_URL_COLS = {
+    "chk_req_dt",
+    "n_failed_chks",
+    "n_unchanged_chks",
+    "next_chk_dt",
+    "processing_pending",
+}
+
+# The changes that increment the registry version, keyed by the tables they are
+# made to
+# (The changes to the `DatasetFile` and `DandiAsset` records are always made along
+# with changes to the associated `URLMetadata` records in the same transaction.)
+_VERSIONED_TABLE_EVENTS = {
+    "repo_url": "INSERT OR DELETE OR UPDATE OF "
+    + ", ".join(
+        c.name
+        for c in RepoUrl.__table__.columns
+        if c.name not in _UNVERSIONED_REPO_URL_COLS
+    ),
+    "url_metadata": "INSERT OR DELETE OR UPDATE",
+    "collection_stats_snapshot": "INSERT OR DELETE OR UPDATE",
+}
+
+event.listen(db.metadata, "before_create", DDL(_BUMP_REGISTRY_VERSION_FUNC))
+for _table_name, _events in _VERSIONED_TABLE_EVENTS.items():
+    event.listen(
+        db.metadata.tables[_table_name],
+        "after_create",
+        DDL(
+            f"CREATE CONSTRAINT TRIGGER {_table_name}_bump_registry_version "
+            f"AFTER {_events} ON {_table_name} "
+            "DEFERRABLE INITIALLY DEFERRED FOR EACH ROW "
+            "EXECUTE FUNCTION bump_registry_version()"
+        ),
+    )
+
+
 @click.command("init-db")
 @with_appcontext
 def init_db_command() -> None:
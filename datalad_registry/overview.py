@@ -3,13 +3,19 @@
 
 import logging
 
-from flask import Blueprint, render_template, request
+from flask import Blueprint, current_app, render_template, request
 from humanize import intcomma
 from sqlalchemy import nullslast, select
-
-from datalad_registry.blueprints.api.dataset_urls.tools import get_collection_stats
-from datalad_registry.models import RepoUrl, db
+from sqlalchemy.exc import DataError
+from sqlalchemy.orm import selectinload
+
+from datalad_registry.blueprints.api.dataset_urls.tools import (
+    get_all_collection_stats,
+    get_collection_stats,
+)
+from datalad_registry.models import RepoUrl, URLMetadata, db
 from datalad_registry.search import parse_query
+from datalad_registry.utils.flask_tools import conditional_on_registry_version, paginate
 
 lgr = logging.getLogger(__name__)
 bp = Blueprint("overview", __name__, url_prefix="/overview")
@@ -35,6 +41,7 @@ bp.add_app_template_filter(intcomma, "intcomma")
 
 
 @bp.get("/")
+@conditional_on_registry_version
 def overview():  # No type hints due to mypy#7187.
     default_sort_scheme = "update-desc"
 
@@ -45,6 +52,7 @@ def overview():  # No type hints due to mypy#7187.
     # as we would add search to individual files.
     query = request.args.get("query", None, type=str)
     search_error = None
+    is_filtered = False
     if query is not None:
         lgr.debug("Search by '%s'", query)
         try:
@@ -53,6 +61,7 @@ def overview():  # No type hints due to mypy#7187.
             search_error = str(e)
         else:
             base_select_stmt = base_select_stmt.filter(criteria)
+            is_filtered = True
 
     # Decipher sorting scheme
     sort_by = request.args.get("sort", default_sort_scheme, type=str)
@@ -61,22 +70,58 @@ def overview():  # No type hints due to mypy#7187.
         sort_by = default_sort_scheme
     col, sort_method = _SORT_ATTRS[sort_by]
 
-    # Apply sorting
-    select_stmt = base_select_stmt.order_by(
-        nullslast(getattr(getattr(RepoUrl, col), sort_method)())
-    )
-
-    # Paginate
-    pagination = db.paginate(select_stmt)
-
-    # Gather stats of the returned collection of datasets
-    stats = get_collection_stats(base_select_stmt)
-
-    return render_template(
-        "overview.html",
-        pagination=pagination,
-        stats=stats,
-        sort_by=sort_by,
-        search_query=query,
-        search_error=search_error,
+    def query_page(base_select_stmt, is_filtered):
+        # Apply sorting
+        select_stmt = base_select_stmt.order_by(
+            nullslast(getattr(getattr(RepoUrl, col), sort_method)())
+        )
+
+        # Load the references to the metadata of the dataset URLs in a page
+        # in a single batched query, without the extracted metadata itself
+        select_stmt = select_stmt.options(
+            selectinload(RepoUrl.metadata_).load_only(
+                URLMetadata.id, URLMetadata.extractor_name
+            )
+        )
+
+        # Paginate
+        pagination = paginate(
+            select_stmt,
+            count_mode=current_app.config["DATALAD_REGISTRY_COUNT_MODE"],
+            count_cap=current_app.config["DATALAD_REGISTRY_COUNT_CAP"],
+        )
+
+        # Gather stats of the returned collection of datasets
+        stats = (
+            get_collection_stats(base_select_stmt)
+            if is_filtered
+            else get_all_collection_stats()
+        )
+
+        return pagination, stats
+
+    status = 200
+    try:
+        pagination, stats = query_page(base_select_stmt, is_filtered)
+    except DataError as e:
+        if not is_filtered:
+            raise
+
+        # The search is rejected by PostgreSQL, e.g., for a regular expression that
+        # is valid in Python but not in PostgreSQL
+        db.session.rollback()
+        search_error = str(e.orig).strip()
+        status = 400
+        pagination, stats = query_page(select(RepoUrl), False)
+
+    return (
+        render_template(
+            "overview.html",
+            pagination=pagination,
+            stats=stats,
+            sort_by=sort_by,
+            search_query=query,
+            search_error=search_error,
+        ),
+        status,
     )
@@ -1,13 +1,18 @@
 """Functionality for support of ad-hoc search "language".
 """
 
-from functools import partial
+from functools import cache, lru_cache, partial
+import json
 import logging
+import math
+import re
 
-from lark import GrammarError, Lark, Token, Transformer, Tree, v_args
-from sqlalchemy import CollectionAggregate, ColumnElement, Text, and_, not_, or_
+from lark import GrammarError, Lark, Token, Tree, v_args
+from lark.visitors import Transformer_NonRecursive
+from sqlalchemy import ColumnElement, Text, and_, not_, or_, select
+from sqlalchemy.dialects.postgresql import JSONB
 
-from .models import RepoUrl, URLMetadata
+from .models import DatasetFile, RepoUrl, URLMetadata
 
 lgr = logging.getLogger(__name__)
 
@@ -32,6 +37,12 @@ def _escape_for_ilike(value: str) -> str:
 known_fields_RepoUrl_1to1 = ["url", "ds_id", "head", "head_describe", "tags"]
 
 
+# Note: All the substring searches below are expressed as `ilike` over the very
+#       columns, or expressions, that are covered by the trigram GIN indexes declared
+#       in `datalad_registry.models` so that PostgreSQL can answer them through
+#       the indexes instead of sequentially scanning the tables.
+
+
 def get_ilike_search(model, field: str, value: str):
     model_field = getattr(model, field)
     return and_(
@@ -40,9 +51,24 @@ def get_ilike_search(model, field: str, value: str):
     )
 
 
+def get_metadata_search(criterion: ColumnElement[bool]) -> ColumnElement[bool]:
+    """
+    Get the search for RepoUrls having any URLMetadata satisfying a given criterion
+
+    :param criterion: The criterion on URLMetadata
+    :return: The search expression on RepoUrl
+
+    Note: The search is expressed as an uncorrelated `IN` subquery, instead of
+          a correlated `EXISTS` subquery, so that the subquery is evaluated only
+          once, through the indexes of the `url_metadata` table, instead of once
+          for every row of the `repo_url` table.
+    """
+    return RepoUrl.id.in_(select(URLMetadata.url_id).filter(criterion))
+
+
 def get_metadata_ilike_search(value):
     escaped_value = _escape_for_ilike(value)
-    return RepoUrl.metadata_.any(
+    return get_metadata_search(
         or_(
             URLMetadata.extractor_name.ilike(escaped_value, escape=escape),
             URLMetadata.extracted_metadata.cast(Text).ilike(
@@ -52,6 +78,152 @@ def get_metadata_ilike_search(value):
     )
 
 
+def get_file_ilike_search(value):
+    """
+    Get the search for RepoUrls having any recorded file, `DatasetFile`, with a path
+    containing a given value
+    """
+    return get_metadata_search(
+        URLMetadata.id.in_(
+            select(DatasetFile.url_metadata_id).filter(
+                DatasetFile.path.ilike(_escape_for_ilike(value), escape=escape)
+            )
+        )
+    )
+
+
+def get_eq_search(model, field: str, value: str):
+    model_field = getattr(model, field)
+    return and_(model_field.is_not(None), model_field == value)
+
+
+def get_gt_search(model, field: str, value: str):
+    model_field = getattr(model, field)
+    return and_(model_field.is_not(None), model_field > value)
+
+
+def _validate_regex(value: str) -> None:
+    """
+    Validate a regular expression to be matched by PostgreSQL
+
+    :raises GrammarValueError: If the regular expression is invalid
+
+    Note: The validation is done with Python's `re` module, whose syntax coincides
+          with that of PostgreSQL's regular expressions for the common constructs,
+          so that an invalid regular expression is reported as an error in
+          the search query instead of failing the execution of the search.
+          A regular expression that is valid only in Python, e.g., one with
+          a named group, still fails the execution with a `DataError`, which
+          the views turn into a 400 response.
+    """
+    try:
+        re.compile(value)
+    except re.error as e:
+        raise GrammarValueError(f"Invalid regular expression {value!r}: {e}") from e
+
+
+def get_regex_search(model, field: str, value: str):
+    _validate_regex(value)
+    model_field = getattr(model, field)
+    return and_(model_field.is_not(None), model_field.regexp_match(value, flags="i"))
+
+
+def get_metadata_regex_search(value):
+    _validate_regex(value)
+    return get_metadata_search(
+        or_(
+            URLMetadata.extractor_name.regexp_match(value, flags="i"),
+            URLMetadata.extracted_metadata.cast(Text).regexp_match(value, flags="i"),
+        )
+    )
+
+
+def _get_jsonpath_predicate(op: str, value: str) -> str:
+    """
+    Get the jsonpath predicate, on `@`, of a search operation with a given value
+
+    :raises GrammarValueError: If the value is an invalid regular expression for
+                               the `~` operation
+
+    Note: The values are compared as strings, and, if a value is also a JSON scalar
+          other than a string, e.g., `2020` or `true`, as that scalar as well.
+    """
+    if op == "?":
+        return f'@ like_regex {json.dumps(re.escape(value))} flag "i"'
+    elif op == "~":
+        _validate_regex(value)
+        return f'@ like_regex {json.dumps(value)} flag "i"'
+    elif op in ("=", ">"):
+        jsonpath_op = "==" if op == "=" else op
+        literals = [json.dumps(value)]
+        try:
+            scalar = json.loads(value)
+        except ValueError:
+            pass
+        else:
+            if scalar is None or (
+                isinstance(scalar, (bool, int, float)) and math.isfinite(scalar)
+            ):
+                literals.append(json.dumps(scalar))
+        return " || ".join(f"@ {jsonpath_op} {lit}" for lit in literals)
+    else:  # pragma: no cover
+        raise AssertionError(f"Unknown operation: {op}")
+
+
+def get_metadata_path_search(
+    extractors: list[str], keys: list[str], op: str, value: str
+) -> ColumnElement[bool]:
+    """
+    Get the search for RepoUrls having any URLMetadata, produced by one of
+    given extractors, with a value at a given path satisfying a search operation
+
+    :param extractors: The names of the extractors
+    :param keys: The keys along the path to the value in the extracted metadata.
+                 Any arrays along the path are searched element-wise.
+    :param op: The search operation, one of `?`, `=`, `>`, and `~`
+    :param value: The value to search with
+
+    Note: The search is expressed as a jsonpath match, `@?`, the operator form of
+          `jsonb_path_exists`, on the extracted metadata, instead of on its text,
+          so that the equality searches are answered through the `jsonb_path_ops`
+          GIN index of the extracted metadata.
+    """
+    jsonpath = "$" + "".join(f".{json.dumps(k)}" for k in keys)
+    return get_metadata_search(
+        and_(
+            URLMetadata.extractor_name.in_(extractors),
+            URLMetadata.extracted_metadata.path_exists(
+                f"{jsonpath} ? ({_get_jsonpath_predicate(op, value)})"
+            ),
+        )
+    )
+
+
+def get_file_eq_search(value):
+    """
+    Get the search for RepoUrls having any recorded file with a given path
+
+    Note: The equality is answered through the trigram index of the paths, which
+          supports equality since PostgreSQL 14.
+    """
+    return get_metadata_search(
+        URLMetadata.id.in_(
+            select(DatasetFile.url_metadata_id).filter(DatasetFile.path == value)
+        )
+    )
+
+
+def get_file_regex_search(value):
+    _validate_regex(value)
+    return get_metadata_search(
+        URLMetadata.id.in_(
+            select(DatasetFile.url_metadata_id).filter(
+                DatasetFile.path.regexp_match(value, flags="i")
+            )
+        )
+    )
+
+
 def get_branches_ilike_search(value):
     return and_(
         RepoUrl.branches.is_not(None),
@@ -59,6 +231,38 @@ def get_branches_ilike_search(value):
     )
 
 
+def get_branches_eq_search(value):
+    """
+    Get the search for RepoUrls having a branch with a given name
+    """
+    return and_(RepoUrl.branches.is_not(None), RepoUrl.branches.has_key(value))
+
+
+def get_tags_eq_search(value):
+    """
+    Get the search for RepoUrls having a tag with a given name
+
+    Note: The tags of a RepoUrl are stored, in text form, as a JSON array of objects
+          each with the `name` and the `hexsha` of a tag. The RepoUrls are first
+          narrowed down, through the trigram index of the column, to those of which
+          the tags contain the name in JSON form. The name is then matched exactly
+          against the names of the tags parsed from the text.
+    """
+    return and_(
+        RepoUrl.tags.is_not(None),
+        RepoUrl.tags.ilike(_escape_for_ilike(json.dumps(value)), escape=escape),
+        RepoUrl.tags.cast(JSONB).contains([{"name": value}]),
+    )
+
+
+def get_branches_regex_search(value):
+    _validate_regex(value)
+    return and_(
+        RepoUrl.branches.is_not(None),
+        RepoUrl.branches.cast(Text).regexp_match(value, flags="i"),
+    )
+
+
 # mapping to schema of fields
 known_fields = {
     _: partial(get_ilike_search, RepoUrl, _) for _ in known_fields_RepoUrl_1to1
@@ -66,6 +270,35 @@ known_fields = {
 
 known_fields["branches"] = get_branches_ilike_search  # type: ignore
 known_fields["metadata"] = get_metadata_ilike_search  # type: ignore
+known_fields["file"] = get_file_ilike_search  # type: ignore
+
+# mapping to schema of fields for each of the operations other than `?`, which
+# is served by `known_fields`.
+# `=` and `>` compare the values as strings, and they are answered through
+# the btree indexes of the columns, except that `=` on `tags` matches the name of
+# a tag. `~` matches a (case-insensitive) PostgreSQL
+# regular expression, and it is answered through the trigram indexes.
+known_fields_by_op = {
+    "=": {
+        **{_: partial(get_eq_search, RepoUrl, _) for _ in known_fields_RepoUrl_1to1},
+        "branches": get_branches_eq_search,
+        "tags": get_tags_eq_search,
+        "file": get_file_eq_search,
+    },
+    # The tags are excluded since comparing them as a JSON array in text form
+    # is meaningless
+    ">": {
+        _: partial(get_gt_search, RepoUrl, _)
+        for _ in known_fields_RepoUrl_1to1
+        if _ != "tags"
+    },
+    "~": {
+        **{_: partial(get_regex_search, RepoUrl, _) for _ in known_fields_RepoUrl_1to1},
+        "branches": get_branches_regex_search,
+        "metadata": get_metadata_regex_search,
+        "file": get_file_regex_search,
+    },
+}
 
 # TODO: add "metadata_extractor"?
 known_fields_str = "|".join(f'"{_}"' for _ in known_fields)
@@ -93,12 +326,12 @@ grammar = rf"""
         | WORD  -> search_word
         | quoted_string  -> search_string
 
-// later to subselect metadata
-// ?field_select: (field | metadata_field "[" metadata_extractors "]") value_path?
-// ?value_path: ("[" (WORD|quoted_string) "]")+
+// to subselect metadata, and, optionally, a value within it by the keys along
+// the path to the value, e.g., `metadata[bids_dataset][Authors]:Haxby`
 ?field_select: field
-    | metadata_field "[" metadata_extractors "]" -> field_select
+    | metadata_field "[" metadata_extractors "]" value_path? -> field_select
 ?metadata_extractors: WORD (","WORD)*
+value_path: ("[" (WORD|quoted_string) "]")+
 !field: {known_fields_str}
 !metadata_field: "metadata"
 // To make it easier for user to be informed about an unknown field being \
@@ -128,6 +361,68 @@ WORD: /[-_.*?+\w]+/
 """
 
 
+#
+# This is an LALR(1) version of the above grammar, which is the one used to parse
+# the search queries. The above grammar, which requires the much slower Earley
+# parser, is kept as the reference of the language. The two grammars accept
+# the same language and produce equivalent parse trees, which are transformed into
+# the same SQLAlchemy expressions, except for the following:
+#   - The binary operations are left-nested instead of flattened, e.g.,
+#     `a OR b OR c` is parsed as `(a OR b) OR c`. (SQLAlchemy flattens them again.)
+#   - "OR", "AND", and "NOT" are always taken as operators where an operator can
+#     be, e.g., `a OR` and `NOT` are rejected instead of being taken as searches
+#     for the words "a" and "OR" and for the word "NOT", `a NOT b` is taken as
+#     a search for "a" and not "b", and `a OR b c` is taken as `(a OR b) AND c`
+#     instead of a search for the words "a", "OR", "b", and "c".
+#   - `a ORb` is taken as a search for the words "a" and "ORb" instead of a search
+#     for "a" or "b".
+#
+# A token can't be told to be a field or a search word until the next token, ":",
+# or the lack of it, is seen, so the fields are recognized by lookahead in
+# the terminals, `FIELD` and `METADATA_FIELD`, instead of by rules.
+#
+lalr_grammar = rf"""
+?start: search
+?search: orand_exp
+?orand_exp: not_exp
+        | orand_exp "OR" not_exp -> or_search
+        | orand_exp "AND" not_exp -> and_search
+        | orand_exp not_exp -> and_search
+?not_exp: primary
+        | "NOT" primary -> not_expr
+
+?primary: "(" search ")"
+        | secondary
+
+?secondary: (field_select | unknown_field_error) ":" op? (quoted_string | WORD) -> field_matched
+        | WORD  -> search_word
+        | quoted_string  -> search_string
+
+?field_select: field
+    | metadata_field "[" metadata_extractors "]" value_path? -> field_select
+?metadata_extractors: WORD (","WORD)*
+value_path: ("[" (WORD|quoted_string) "]")+
+field: FIELD
+metadata_field: METADATA_FIELD
+unknown_field_error: WORD
+
+FIELD.2: /({"|".join(re.escape(_) for _ in known_fields)})(?=\s*:)/
+METADATA_FIELD.2: /metadata(?=\s*\[)/
+
+?quoted_string: ESCAPED_STRING
+WORD: /[-_.*?+\w]+/
+
+// An operator is to be taken as such instead of the start of a value, e.g.,
+// `url:?foo` is a search for "foo"
+op: OP
+OP.2: /[?=>~]/
+
+%import common.ESCAPED_STRING
+%import common.WS
+%ignore WS
+"""
+
+
 def _dump_grammar():
     # Could be used for debugging on the web -- the schema with those fields embedded
     with open("/tmp/grammar.lark", "w") as f:
@@ -148,8 +443,12 @@ class GrammarValueError(ValueError, GrammarError):
 
 
 @v_args(inline=True)  # Affects the signatures of the methods
-class SearchQueryTransformer(Transformer):
-    """Convert the parsed search query into SQLAlchemy expressions."""
+class SearchQueryTransformer(Transformer_NonRecursive):
+    """Convert the parsed search query into SQLAlchemy expressions.
+
+    The transformation is not recursive so that the deeply nested parse trees of
+    long queries, e.g., long OR-chains, don't exhaust the Python stack.
+    """
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -171,8 +470,8 @@ class SearchQueryTransformer(Transformer):
         return not_(arg)
 
     def get_field_select_search(
-        self, metadata_field_l, metadata_extractors_l, value
-    ) -> CollectionAggregate[bool]:
+        self, op, value, metadata_field_l, metadata_extractors_l, value_path_l=None
+    ) -> ColumnElement[bool]:
         assert metadata_field_l.data.value == "metadata_field"
         if isinstance(metadata_extractors_l, Token):
             extractors = [metadata_extractors_l.value]
@@ -189,18 +488,27 @@ class SearchQueryTransformer(Transformer):
         # TODO: might want to provide a dedicated simpler one
         # elif len(extractors) == 1:
         #     raise NotImplementedError(f"Single extractor {extractors}")
+        elif value_path_l is not None:
+            assert value_path_l.data.value == "value_path"
+            keys = list(map(self._get_str_value, value_path_l.children))
+            return get_metadata_path_search(extractors, keys, op, value)
         else:
             # ??? it seems we do not have search target value here, so we are to
             # return the function to search with but we can't since here we already
             # need to know ilike vs exact match
-            return RepoUrl.metadata_.any(
-                and_(
-                    or_(*(URLMetadata.extractor_name == _ for _ in extractors)),
-                    # search the entire JSON column as text
-                    URLMetadata.extracted_metadata.cast(Text).icontains(
-                        value, autoescape=True
-                    ),
+            # search the entire JSON column as text
+            metadata_text = URLMetadata.extracted_metadata.cast(Text)
+            if op == "?":
+                criterion = metadata_text.ilike(_escape_for_ilike(value), escape=escape)
+            elif op == "~":
+                _validate_regex(value)
+                criterion = metadata_text.regexp_match(value, flags="i")
+            else:
+                raise GrammarValueError(
+                    f"Operation {op} is not supported for field metadata[...]"
                 )
+            return get_metadata_search(
+                and_(URLMetadata.extractor_name.in_(extractors), criterion)
             )
 
     def field_matched(self, *args):
@@ -217,19 +525,24 @@ class SearchQueryTransformer(Transformer):
         else:  # pragma: no cover
             raise AssertionError(f"Unexpected number of args: {len(args)} in {args}")
 
+        value = self._get_str_value(value_l)
         if field_l.data == "field_select":
-            search = partial(self.get_field_select_search, *field_l.children)
+            return self.get_field_select_search(op, value, *field_l.children)
         elif field_l.data.value == "field":
             assert len(field_l.children) == 1  # TODO: handle multiple??
             field = field_l.children[0].value
-            search = known_fields[field]
+            fields = known_fields if op == "?" else known_fields_by_op[op]
+            try:
+                search = fields[field]
+            except KeyError:
+                raise GrammarValueError(
+                    f"Operation {op} is not supported for field {field}. "
+                    f"Supported fields are: {', '.join(fields)}"
+                ) from None
         else:  # pragma: no cover
             raise AssertionError(f"Unknown field type: {field_l}")
 
-        if op == "?":
-            return search(self._get_str_value(value_l))
-        else:
-            raise NotImplementedError(f"Operation {op} is not implemented")
+        return search(value)
 
     def _get_str_value(self, arg: Token) -> str:
         assert isinstance(arg, Token)
@@ -255,6 +568,53 @@ class SearchQueryTransformer(Transformer):
         )
 
 
+@cache
+def _get_parser(parser: str = "lalr") -> Lark:
+    """
+    Get the parser of the search query language
+
+    The parser is constructed upon the first call so that importing this module,
+    e.g., in starting a web worker, doesn't bear the cost of the construction.
+    The analysis of the LALR grammar is also cached on disk by Lark, in the
+    temporary directory, so that it is reused across processes.
+
+    :param parser: "lalr" for the parser of `lalr_grammar`, which is used to parse
+                   the search queries, or "earley" for the parser of the reference
+                   grammar, `grammar`
+    """
+    if parser == "lalr":
+        return Lark(lalr_grammar, parser="lalr", cache=True)
+    elif parser == "earley":
+        return Lark(grammar, parser="earley")
+    else:
+        raise ValueError(f"Unknown parser: {parser}")
+
+
+# The maximum number of parsed search queries to cache
+QUERY_CACHE_SIZE = 1024
+
+
+@lru_cache(maxsize=QUERY_CACHE_SIZE)
+def _parse_query(query: str) -> ColumnElement[bool]:
+    """
+    Parse a search query and return the SQLAlchemy expression
+
+    The SQLAlchemy expressions are cached by the query strings for the same searches
+    are often repeated, e.g., in paginating through the results of a search.
+    (The expressions are immutable, so they can be shared by the requests.)
+    """
+    return transformer.transform(_get_parser().parse(query))
+
+
+def get_query_cache_info():
+    """
+    Get the statistics of the cache of the parsed search queries, i.e.,
+    the hits, misses, maximum size, and current size of the cache, in the form of
+    the return value of `functools.lru_cache`'s `cache_info()`
+    """
+    return _parse_query.cache_info()
+
+
 def parse_query(query: str) -> ColumnElement[bool]:
     """Parse the search query and return the SQLAlchemy expression.
 
@@ -265,9 +625,9 @@ def parse_query(query: str) -> ColumnElement[bool]:
     :raises ValueError: If `query` is an empty string
     :raises ValueError: If `query` contains only whitespace
 
-    A workaround necessary for using "earley" parser.
-    We have to use "earley" parser to support ':op' comparison operations.
-    Operates using the global parser and transformer objects.
+    The query is parsed with the LALR parser of `lalr_grammar`.
+    Operates using the global parser and transformer objects. The expressions of
+    the `QUERY_CACHE_SIZE` most recently parsed queries are cached.
     """
     if query == "":
         raise ValueError("Query string cannot be empty")
@@ -275,13 +635,11 @@ def parse_query(query: str) -> ColumnElement[bool]:
     if query.isspace():
         raise ValueError("Query string cannot contain only whitespace")
 
-    # Parse the input to get a tree
-    parse_tree = parser.parse(query)
-    return transformer.transform(parse_tree)
+    criteria = _parse_query(query)
+    lgr.debug("Search query cache: %s", get_query_cache_info())
+    return criteria
 
 
-# Assuming `grammar` is your grammar definition string
-parser = Lark(grammar, parser="earley")
 transformer = SearchQueryTransformer()
 
 # Example:
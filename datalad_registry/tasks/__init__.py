@@ -1,40 +1,55 @@
+from collections import defaultdict
+from collections.abc import Iterable
 from datetime import datetime, timedelta, timezone
 from enum import auto
 from itertools import chain
 import json
-from pathlib import Path
+import os
+from pathlib import Path, PurePosixPath
+from time import perf_counter
 from typing import Optional, TypedDict
 
-from celery import shared_task
+from celery import Signature, shared_task
 from celery.utils.log import get_task_logger
 from datalad import api as dl
 from datalad.api import Dataset
 from datalad.distribution.dataset import require_dataset
 from datalad.support.exceptions import IncompleteResultsError
 from datalad.utils import rmtree as rm_ds_tree
+from datalad_metalad.extract import get_extractor_class
 from flask import current_app
 from pydantic import StrictInt, StrictStr, parse_obj_as, validate_arguments
 import requests
-from sqlalchemy import and_, case, not_, or_, select
-from yarl import URL
+from sqlalchemy import ARRAY, Row, Select, Text, func, literal, select, true, update
+from sqlalchemy.dialects.postgresql import insert
 
 from datalad_registry.com_models import MetaExtractResult
-from datalad_registry.models import RepoUrl, URLMetadata, db
+from datalad_registry.models import RepoUrl, URLMetadata, UsageDashboardSyncState, db
 from datalad_registry.utils import StrEnum
-from datalad_registry.utils.datalad_tls import (
-    clone,
-    get_head_describe,
-    get_origin_annex_key_count,
-    get_origin_annex_uuid,
-    get_origin_branches,
-    get_wt_annexed_file_info,
-)
+from datalad_registry.utils.datalad_tls import clone, get_blob_ids, introspect_ds
 
-from .utils import allocate_ds_path, update_ds_clone, validate_url_is_processed
+from .utils import (
+    allocate_ds_path,
+    get_git_clone_opts,
+    update_ds_clone,
+    validate_url_is_processed,
+)
+from .utils.builtin_meta_extractors import (
+    DatasetVersion,
+    InvalidRequiredFileError,
+    dlreg_meta_extract,
+    get_ds_version,
+    record_ds_files,
+)
+from .utils.builtin_meta_extractors import (
+    EXTRACTOR_VERSION_MAP as BUILTIN_EXTRACTOR_VERSION_MAP,
+)
 from .utils.builtin_meta_extractors import EXTRACTOR_MAP as BUILTIN_EXTRACTOR_MAP
-from .utils.builtin_meta_extractors import InvalidRequiredFileError, dlreg_meta_extract
 from .utils.usage_dashboard import DASHBOARD_COLLECTION_URL, DashboardCollection, Status
-from ..blueprints.api import DATASET_URLS_PATH
+from ..blueprints.api.dataset_urls.tools import (
+    mark_collection_stats_stale,
+    refresh_collection_stats_snapshot,
+)
 
 lgr = get_task_logger(__name__)
 
@@ -45,6 +60,28 @@ class ExtractMetaStatus(StrEnum):
     SKIPPED = auto()
     NO_RECORD = auto()
 
+    # The extraction has failed with an exception. (This status is only reported by
+    # `extract_ds_meta_all`. `extract_ds_meta` raises the exception instead.)
+    FAILED = auto()
+
+    # The extraction has been skipped because the files required by the extractor
+    # are unchanged in the new version of the dataset, and the metadata extracted
+    # from an older version has been re-stamped with the new version.
+    RESTAMPED = auto()
+
+
+class ExtractMetaAllResult(TypedDict):
+    """
+    A TypedDict representing the result of the task `extract_ds_meta_all`
+    """
+
+    # The status of the extraction with each extractor, keyed by extractor names
+    statuses: dict[str, ExtractMetaStatus]
+
+    # The time, in seconds, spent on the extraction with each extractor,
+    # keyed by extractor names
+    timings: dict[str, float]
+
 
 class ProcessUrlStatus(StrEnum):
     SUCCEEDED = auto()
@@ -81,33 +118,37 @@ def _update_dataset_url_info(dataset_url: RepoUrl, ds: Dataset) -> None:
                ensuring the clone of the dataset in cache is up-to-date.
     """
 
-    dataset_url.ds_id = ds.id
+    ds_info = introspect_ds(ds)
+    lgr.debug(
+        "Introspected dataset at %s in %.3fs (%s)",
+        ds.path,
+        sum(ds_info.timings.values()),
+        ", ".join(f"{step}: {t:.3f}s" for step, t in ds_info.timings.items()),
+    )
+
+    dataset_url.ds_id = ds_info.ds_id
 
     dataset_url.annex_uuid = (
-        str(annex_uuid)
-        if (annex_uuid := get_origin_annex_uuid(ds)) is not None
-        else None
+        str(ds_info.annex_uuid) if ds_info.annex_uuid is not None else None
     )
 
-    dataset_url.annex_key_count = get_origin_annex_key_count(ds)
+    dataset_url.annex_key_count = ds_info.annex_key_count
 
-    if (wt_annexed_file_info := get_wt_annexed_file_info(ds)) is not None:
+    if (wt_annexed_file_info := ds_info.wt_annexed_file_info) is not None:
         dataset_url.annexed_files_in_wt_count = wt_annexed_file_info.count
         dataset_url.annexed_files_in_wt_size = wt_annexed_file_info.size
     else:
         dataset_url.annexed_files_in_wt_count = None
         dataset_url.annexed_files_in_wt_size = None
 
-    dataset_url.head = ds.repo.get_hexsha("origin/HEAD")
-    dataset_url.head_describe = get_head_describe(ds)
+    dataset_url.head = ds_info.head
+    dataset_url.head_describe = ds_info.head_describe
 
-    dataset_url.branches = get_origin_branches(ds)
+    dataset_url.branches = ds_info.branches
 
-    dataset_url.tags = json.dumps(ds.repo.get_tags())
+    dataset_url.tags = json.dumps(ds_info.tags)
 
-    dataset_url.git_objects_kb = (
-        ds.repo.count_objects["size"] + ds.repo.count_objects["size-pack"]
-    )
+    dataset_url.git_objects_kb = ds_info.git_objects_kb
 
     dataset_url.last_update_dt = datetime.now(timezone.utc)
 
@@ -124,6 +165,202 @@ _EXTRACTOR_REQUIRED_FILES = {
     "dandi:files": [".dandi/assets.json"],
 }
 
+# The extractors whose output is determined by the content of their required files
+# alone. The git blob IDs of the required files are recorded with the metadata
+# extracted by these extractors. When the dataset is at a new version in which those
+# blob IDs are unchanged, and the extractor is at the version with which the metadata
+# was extracted, the recorded metadata is re-stamped with the new version of
+# the dataset instead of being extracted again. ("metalad_core" and "bids_dataset" are
+# not among these extractors for their output also depends on the other files of
+# the dataset, and "metalad_studyminimeta" is not for its output contains the version
+# of the dataset.)
+_FINGERPRINTED_EXTRACTORS = frozenset({"datacite_gin", "dandi", "dandi:files"})
+
+# The metalad extractors with which the files of a dataset are recorded, as
+# `DatasetFile` records, along with the extracted metadata. (The built-in "dandi:files"
+# extractor records the assets of a DANDI dataset as `DatasetFile` records itself.)
+_FILE_RECORDING_EXTRACTORS = {"bids_dataset"}
+
+
+def _find_present_required_files(ds_path: Path, extractors: Iterable[str]) -> set[str]:
+    """
+    Find the files required by any of the given extractors that are present in
+    a given dataset
+
+    Each directory containing any of the required files is scanned only once.
+
+    :param ds_path: The path of the dataset
+    :param extractors: The names of the extractors
+    :return: The paths, relative to the root of the dataset, of the required files
+             that are present in the dataset
+    """
+    required_files_by_dir: defaultdict[PurePosixPath, set[str]] = defaultdict(set)
+    for extractor in extractors:
+        for f in _EXTRACTOR_REQUIRED_FILES.get(extractor, []):
+            f_path = PurePosixPath(f)
+            required_files_by_dir[f_path.parent].add(f_path.name)
+
+    present_files: set[str] = set()
+    for dir_path, file_names in required_files_by_dir.items():
+        try:
+            with os.scandir(ds_path / dir_path) as entries:
+                present_files.update(
+                    str(dir_path / entry.name)
+                    for entry in entries
+                    if entry.name in file_names and entry.is_file()
+                )
+        except (FileNotFoundError, NotADirectoryError):
+            continue
+
+    return present_files
+
+
+def _get_required_files_blob_ids(
+    ds: Dataset, extractors: Iterable[str]
+) -> dict[str, dict[str, str]]:
+    """
+    Get the git blob IDs of the files required by each of the given extractors that
+    is one of `_FINGERPRINTED_EXTRACTORS` in the HEAD commit of a given dataset
+
+    The blob IDs of the files required by all the extractors are obtained
+    in a single call to git.
+
+    :param ds: The given dataset
+    :param extractors: The names of the extractors
+    :return: A dictionary mapping the name of each of the given extractors that is one
+             of `_FINGERPRINTED_EXTRACTORS` and has all its required files in the HEAD
+             commit to the blob IDs of its required files keyed by their paths
+    """
+    fingerprinted_extractors = [e for e in extractors if e in _FINGERPRINTED_EXTRACTORS]
+    blob_ids = get_blob_ids(
+        ds,
+        {f for e in fingerprinted_extractors for f in _EXTRACTOR_REQUIRED_FILES[e]},
+    )
+
+    return {
+        e: {f: blob_ids[f] for f in _EXTRACTOR_REQUIRED_FILES[e]}
+        for e in fingerprinted_extractors
+        if all(f in blob_ids for f in _EXTRACTOR_REQUIRED_FILES[e])
+    }
+
+
+def _get_extractor_version(
+    extractor: str, ds: Dataset, ds_version: DatasetVersion
+) -> str:
+    """
+    Get the current version of an extractor, i.e., the version recorded with
+    the metadata extracted by the extractor at this point
+
+    :param extractor: The name of the extractor, a built-in extractor or a metalad
+                      extractor of the current, non-legacy, interface, as are all
+                      the extractors in `_FINGERPRINTED_EXTRACTORS`
+    :param ds: The dataset to extract metadata from
+    :param ds_version: The version of the dataset
+    :return: The version of the extractor
+    """
+    if extractor in BUILTIN_EXTRACTOR_MAP:
+        return BUILTIN_EXTRACTOR_VERSION_MAP[extractor]
+
+    return get_extractor_class(extractor)(ds, ds_version.hexsha).get_version()
+
+
+def _restamp_if_unchanged(
+    url_metadata: URLMetadata,
+    required_files_blob_ids: Optional[dict[str, str]],
+    ds: Dataset,
+    ds_version: DatasetVersion,
+) -> bool:
+    """
+    Re-stamp metadata extracted from an older version of a dataset with a new version
+    of the dataset if the files required by the extractor and the version of
+    the extractor are unchanged
+
+    :param url_metadata: The metadata extracted from the older version
+    :param required_files_blob_ids: The blob IDs of the files required by the extractor
+                                    in the new version, as returned, for the extractor,
+                                    by `_get_required_files_blob_ids`. None if
+                                    the extractor is not one of
+                                    `_FINGERPRINTED_EXTRACTORS`.
+    :param ds: The dataset at the new version
+    :param ds_version: The new version of the dataset
+    :return: True if the metadata has been re-stamped; False otherwise
+    """
+    if (
+        required_files_blob_ids is None
+        or url_metadata.required_files_blob_ids != required_files_blob_ids
+        or url_metadata.extractor_version
+        != _get_extractor_version(url_metadata.extractor_name, ds, ds_version)
+    ):
+        return False
+
+    url_metadata.dataset_version = ds_version.hexsha
+    url_metadata.dataset_describe = ds_version.describe
+    return True
+
+
+def _run_metalad_extractor(
+    extractor: str, url: RepoUrl, ds: Dataset, ds_describe: str
+) -> URLMetadata:
+    """
+    Extract metadata from a dataset with a metalad extractor
+
+    If the extractor is one of `_FILE_RECORDING_EXTRACTORS`, the files of the dataset
+    are recorded as well.
+
+    :param extractor: The name of the metalad extractor
+    :param url: The RepoUrl object representing the URL of the dataset
+    :param ds: The clone of the dataset in the local cache
+    :param ds_describe: The output of `git describe` for the HEAD of the dataset
+    :return: A `URLMetadata` object containing the extracted metadata ready
+             to be written (committed) to the database
+    :raise: RuntimeError if the extractor returns an execution status other than "ok"
+    """
+    results = parse_obj_as(
+        list[MetaExtractResult],
+        dl.meta_extract(
+            extractor,
+            dataset=ds,
+            result_renderer="disabled",
+            on_failure="stop",
+        ),
+    )
+
+    # Assert that `datalad.api.meta_extract()` returns a list of one element
+    # as we understand that `datalad.api.meta_extract()` is supposed to return
+    assert (
+        len(results) == 1
+    ), f"`datalad.api.meta_extract()` returned a list of {len(results)} elements."
+
+    res = results[0]
+    if res.status == "ok":
+        metadata_record = res.metadata_record
+        url_metadata = URLMetadata(
+            dataset_describe=ds_describe,
+            dataset_version=metadata_record.dataset_version,
+            extractor_name=metadata_record.extractor_name,
+            extractor_version=metadata_record.extractor_version,
+            extraction_parameter=metadata_record.extraction_parameter,
+            extracted_metadata=metadata_record.extracted_metadata,
+            url=url,
+        )
+
+        if extractor in _FILE_RECORDING_EXTRACTORS:
+            record_ds_files(url_metadata, ds)
+
+        return url_metadata
+    else:
+        lgr.debug(
+            "The result of extractor %s for %s is not 'ok'."
+            "It will not be recorded to the database.",
+            extractor,
+            url.url,
+        )
+
+        raise RuntimeError(
+            f"The returned execution status from {extractor} for "
+            f"{url.url} is {res.status}."
+        )
+
 
 @shared_task
 def log_error(request, exc, traceback) -> None:
@@ -156,6 +393,14 @@ def extract_ds_meta(ds_url_id: StrictInt, extractor: StrictStr) -> ExtractMetaSt
              `ExtractMetaStatus.SKIPPED` if the extraction has been skipped because the
                  metadata to be extracted is already present in the database,
                  as identified by the extractor name, RepoUrl, and dataset version.
+             `ExtractMetaStatus.RESTAMPED` if the extraction has been skipped because
+                 the files required by the extractor, one of
+                 `_FINGERPRINTED_EXTRACTORS`, have the same git blob IDs in the
+                 current version of the dataset as in the version from which
+                 the metadata in the database was extracted, and the extractor is
+                 at the version with which the metadata was extracted. In this case, the
+                 metadata in the database has been re-stamped with the current
+                 version of the dataset upon return.
              `ExtractMetaStatus.NO_RECORD` if there is no RepoUrl in the database with
                 the specified ID. (This task can be initiated with the argument of a
                 supposed ID of a RepoUrl that doesn't identify any RepoUrl in
@@ -195,17 +440,27 @@ def extract_ds_meta(ds_url_id: StrictInt, extractor: StrictStr) -> ExtractMetaSt
                 # A required file is missing. Abort the extraction
                 return ExtractMetaStatus.ABORTED
 
+    ds = require_dataset(
+        cache_path_abs,
+        check_installed=True,
+        purpose=f"{extractor} metadata extraction",
+    )
+    ds_version = get_ds_version(ds)
+    required_files_blob_ids = _get_required_files_blob_ids(ds, [extractor]).get(
+        extractor
+    )
+
     # Check if the metadata to be extracted is already present in the database
     for data in url.metadata_:  # type: ignore
         if extractor == data.extractor_name:
-            # Get the current version of the dataset as it exists in the local cache
-            ds_version = require_dataset(
-                cache_path_abs, check_installed=True
-            ).repo.get_hexsha()
-
-            if ds_version == data.dataset_version:
+            if ds_version.hexsha == data.dataset_version:
                 # The metadata to be extracted is already present in the database
                 return ExtractMetaStatus.SKIPPED
+            elif _restamp_if_unchanged(data, required_files_blob_ids, ds, ds_version):
+                # The metadata extracted from an older version of the dataset
+                # is also the metadata of the current version
+                db.session.commit()
+                return ExtractMetaStatus.RESTAMPED
             else:
                 # metadata can be extracted for a new version of the dataset
 
@@ -217,7 +472,7 @@ def extract_ds_meta(ds_url_id: StrictInt, extractor: StrictStr) -> ExtractMetaSt
         # === Call upon the built-in extractor to extract metadata ===
 
         try:
-            url_metadata = dlreg_meta_extract(extractor, url)
+            url_metadata = dlreg_meta_extract(extractor, url, ds_version)
         except InvalidRequiredFileError:
             # A required file is invalid. Abort the extraction
             return ExtractMetaStatus.ABORTED
@@ -225,59 +480,193 @@ def extract_ds_meta(ds_url_id: StrictInt, extractor: StrictStr) -> ExtractMetaSt
         # === The extractor is not a built-in extractor ===
         # === Call upon metalad to extract metadata ===
 
-        ds = require_dataset(
-            cache_path_abs,
-            check_installed=True,
-            purpose=f"{extractor} metadata extraction",
+        url_metadata = _run_metalad_extractor(extractor, url, ds, ds_version.describe)
+
+    url_metadata.required_files_blob_ids = required_files_blob_ids
+
+    # Record the metadata to the database
+    db.session.add(url_metadata)
+    db.session.commit()
+
+    return ExtractMetaStatus.SUCCEEDED
+
+
+# `acks_late` is set. Make sure this task is always idempotent
+@shared_task(acks_late=True)
+@validate_arguments
+def extract_ds_meta_all(ds_url_id: StrictInt) -> ExtractMetaAllResult:
+    """
+    Extract dataset level metadata from a dataset with each of the configured
+    extractors, `DATALAD_REGISTRY_METADATA_EXTRACTORS`
+
+    The extraction with each extractor has the same outcome as the task
+    `extract_ds_meta` with the extractor, but the dataset is opened, its version is
+    determined, and the presence and the git blob IDs of the required files are
+    obtained only once for all the extractors, and all the resulting metadata is
+    recorded to the database in a single transaction. A failure of one extractor
+    doesn't prevent the others from running.
+
+    :param ds_url_id: The ID (primary key) of the RepoUrl of the dataset in the database
+    :return: The status of the extraction with each extractor, as described in
+             `extract_ds_meta`, or `ExtractMetaStatus.FAILED` if the extraction has
+             failed with an exception, along with the time spent on the extraction
+             with each extractor
+    :raise: ValueError if the RepoUrl of the specified ID has not been processed yet.
+    """
+    extractors: list[str] = current_app.config["DATALAD_REGISTRY_METADATA_EXTRACTORS"]
+
+    # Get the RepoUrl from the database by ID with a read/share lock
+    url = (
+        db.session.execute(
+            select(RepoUrl).filter_by(id=ds_url_id).with_for_update(read=True)
         )
+        .scalars()
+        .one_or_none()
+    )
 
-        results = parse_obj_as(
-            list[MetaExtractResult],
-            dl.meta_extract(
-                extractor,
-                dataset=ds,
-                result_renderer="disabled",
-                on_failure="stop",
-            ),
+    if url is None:
+        # === there is no RepoUrl in the database with the specified ID ===
+        return ExtractMetaAllResult(
+            statuses={
+                extractor: ExtractMetaStatus.NO_RECORD for extractor in extractors
+            },
+            timings={},
         )
 
-        # Assert that `datalad.api.meta_extract()` returns a list of one element
-        # as we understand that `datalad.api.meta_extract()` is supposed to return
-        assert (
-            len(results) == 1
-        ), f"`datalad.api.meta_extract()` returned a list of {len(results)} elements."
-
-        res = results[0]
-        if res.status == "ok":
-            # Record the metadata to the database
-            metadata_record = res.metadata_record
-            url_metadata = URLMetadata(
-                dataset_describe=get_head_describe(ds),
-                dataset_version=metadata_record.dataset_version,
-                extractor_name=metadata_record.extractor_name,
-                extractor_version=metadata_record.extractor_version,
-                extraction_parameter=metadata_record.extraction_parameter,
-                extracted_metadata=metadata_record.extracted_metadata,
-                url=url,
-            )
+    # Validate that the RepoUrl has been processed
+    validate_url_is_processed(url)
+
+    # Absolute path of the dataset clone in cache
+    cache_path_abs = url.cache_path_abs
+    assert cache_path_abs is not None
+
+    ds = require_dataset(
+        cache_path_abs, check_installed=True, purpose="metadata extraction"
+    )
+    ds_version = get_ds_version(ds)
+    present_files = _find_present_required_files(cache_path_abs, extractors)
+    required_files_blob_ids = _get_required_files_blob_ids(ds, extractors)
+    existing_metadata = {
+        data.extractor_name: data for data in url.metadata_  # type: ignore
+    }
+
+    def extract(extractor: str) -> ExtractMetaStatus:
+        """
+        Extract metadata from the dataset with a given extractor
+        """
+        if not all(
+            f in present_files for f in _EXTRACTOR_REQUIRED_FILES.get(extractor, [])
+        ):
+            # A required file is missing. Abort the extraction
+            return ExtractMetaStatus.ABORTED
+
+        old_metadata = existing_metadata.get(extractor)
+        if (
+            old_metadata is not None
+            and old_metadata.dataset_version == ds_version.hexsha
+        ):
+            # The metadata to be extracted is already present in the database
+            return ExtractMetaStatus.SKIPPED
+
+        if old_metadata is not None and _restamp_if_unchanged(
+            old_metadata, required_files_blob_ids.get(extractor), ds, ds_version
+        ):
+            # The metadata extracted from an older version of the dataset
+            # is also the metadata of the current version
+            return ExtractMetaStatus.RESTAMPED
+
+        if extractor in BUILTIN_EXTRACTOR_MAP:
+            try:
+                url_metadata = dlreg_meta_extract(extractor, url, ds_version)
+            except InvalidRequiredFileError:
+                # A required file is invalid. Abort the extraction
+                return ExtractMetaStatus.ABORTED
         else:
-            lgr.debug(
-                "The result of extractor %s for %s is not 'ok'."
-                "It will not be recorded to the database.",
-                extractor,
-                url.url,
+            url_metadata = _run_metalad_extractor(
+                extractor, url, ds, ds_version.describe
             )
+        url_metadata.required_files_blob_ids = required_files_blob_ids.get(extractor)
+
+        if old_metadata is not None:
+            # Replace the metadata extracted from an older version of the dataset
+            db.session.delete(old_metadata)
+
+        db.session.add(url_metadata)
+        return ExtractMetaStatus.SUCCEEDED
 
-            raise RuntimeError(
-                f"The returned execution status from {extractor} for "
-                f"{url.url} is {res.status}."
+    statuses: dict[str, ExtractMetaStatus] = {}
+    timings: dict[str, float] = {}
+    for extractor in extractors:
+        start = perf_counter()
+
+        # Isolate the database changes made by each extractor in a savepoint so that
+        # the changes made by an extractor that doesn't succeed are discarded
+        savepoint = db.session.begin_nested()
+        try:
+            statuses[extractor] = extract(extractor)
+        except Exception:
+            savepoint.rollback()
+            lgr.error(
+                "Failed to extract metadata from the dataset at %s with %s",
+                url.url,
+                extractor,
+                exc_info=True,
             )
+            statuses[extractor] = ExtractMetaStatus.FAILED
+        else:
+            if statuses[extractor] in (
+                ExtractMetaStatus.SUCCEEDED,
+                ExtractMetaStatus.RESTAMPED,
+            ):
+                savepoint.commit()
+            else:
+                savepoint.rollback()
+        finally:
+            timings[extractor] = perf_counter() - start
 
-    # Record the metadata to the database
-    db.session.add(url_metadata)
+    # Record all the extracted metadata to the database
     db.session.commit()
 
-    return ExtractMetaStatus.SUCCEEDED
+    lgr.info(
+        "Metadata extraction from the dataset at %s: %s",
+        url.url,
+        ", ".join(
+            f"{extractor} {statuses[extractor]} in {timings[extractor]:.3f}s"
+            for extractor in extractors
+        ),
+    )
+
+    return ExtractMetaAllResult(statuses=statuses, timings=timings)
+
+
+def _schedule_next_chk(dataset_url: RepoUrl, now: datetime) -> None:
+    """
+    Schedule the next check for update of the dataset at a given URL
+
+    The interval between now and the next check starts at
+    `DATALAD_REGISTRY_MIN_CHK_INTERVAL_PER_URL` and doubles with each consecutive check
+    that has found no update of the dataset, as counted by `n_unchanged_chks`, up to
+    `DATALAD_REGISTRY_MAX_CHK_INTERVAL_PER_URL`. No next check is scheduled once
+    `DATALAD_REGISTRY_MAX_FAILED_CHKS_PER_URL` consecutive checks of the URL have
+    failed so that the URL, which is no longer checked, leaves the partial indexes
+    scanned by the check dispatcher.
+
+    :param dataset_url: The RepoUrl object representing the URL
+    :param now: The current time
+    """
+    min_chk_interval = current_app.config["DATALAD_REGISTRY_MIN_CHK_INTERVAL_PER_URL"]
+    max_chk_interval = current_app.config["DATALAD_REGISTRY_MAX_CHK_INTERVAL_PER_URL"]
+    max_failed_chks = current_app.config["DATALAD_REGISTRY_MAX_FAILED_CHKS_PER_URL"]
+
+    if dataset_url.n_failed_chks >= max_failed_chks:
+        dataset_url.next_chk_dt = None
+        return
+
+    dataset_url.next_chk_dt = now + timedelta(
+        seconds=min(
+            min_chk_interval * 2**dataset_url.n_unchanged_chks, max_chk_interval
+        )
+    )
 
 
 @shared_task(
@@ -343,6 +732,7 @@ def process_dataset_url(dataset_url_id: StrictInt) -> ProcessUrlStatus:
         ds = clone(
             source=dataset_url.url,
             path=ds_path_absolute,
+            git_clone_opts=get_git_clone_opts(),
             on_failure="stop",
             result_renderer="disabled",
         )
@@ -353,6 +743,11 @@ def process_dataset_url(dataset_url_id: StrictInt) -> ProcessUrlStatus:
         dataset_url.processed = True
         dataset_url.cache_path = str(ds_path_relative)
 
+        dataset_url.n_unchanged_chks = 0
+        _schedule_next_chk(dataset_url, datetime.now(timezone.utc))
+
+        mark_collection_stats_stale()
+
         # Commit the updated RepoUrl object to the database
         db.session.commit()
 
@@ -375,7 +770,8 @@ def process_dataset_url(dataset_url_id: StrictInt) -> ProcessUrlStatus:
 def mark_for_chk(url_id: StrictInt) -> None:
     """
     Mark a dataset url for check for update with a timestamp as the value of
-    `chk_req_dt` of the `RepoUrl` object representing the URL
+    `chk_req_dt` of the `RepoUrl` object representing the URL, and bring the next
+    scheduled check of the URL forward to that time
 
     :param url_id: The ID (primary key) of the `RepoUrl` object representing the URL
     """
@@ -390,13 +786,59 @@ def mark_for_chk(url_id: StrictInt) -> None:
     # Note: It is possible that there is no `RepoUrl` record with the given ID
     #       (possibly due to deletion).
     #       So do something only if there is such a record
-    if url is not None and url.processed and url.chk_req_dt is None:
-        # The dataset url has been processed and there is no unhandled request
-        # for check for update of the dataset at the URL
-        url.chk_req_dt = datetime.now(timezone.utc)
+    if (
+        url is not None
+        and url.processed
+        and url.chk_req_dt is None
+        and url.n_failed_chks
+        < current_app.config["DATALAD_REGISTRY_MAX_FAILED_CHKS_PER_URL"]
+    ):
+        # The dataset url has been processed, is still checked, i.e., its checks
+        # have not failed the maximum number of times in a row, and there is
+        # no unhandled request for check for update of the dataset at the URL
+        url.chk_req_dt = url.next_chk_dt = datetime.now(timezone.utc)
         db.session.commit()
 
 
+def select_urls_due_for_chk(
+    requested: bool, max_failed_chks: int, now: datetime, limit: int
+) -> Select:
+    """
+    Build a statement that selects and locks the processed dataset urls that are due
+    to be checked for update, in the order of due time
+
+    The statement is supported by a range scan of a partial index over `next_chk_dt`,
+    either `ix_repo_url_requested_chk_due` or `ix_repo_url_scheduled_chk_due`,
+    that stops once `limit` rows have been found. (The urls that are no longer checked
+    for having failed `max_failed_chks` consecutive checks have no `next_chk_dt`,
+    see `_schedule_next_chk`, so they are not in the range scanned.)
+
+    :param requested: Whether to select the urls that have a request for check for
+                      update, or the ones that have not
+    :param max_failed_chks: The number of consecutive failed checks at which a url
+                            is no longer checked
+    :param now: The current time
+    :param limit: The maximum number of urls to select
+    :return: The statement selecting the ID and the `last_chk_dt` of each url
+    """
+    return (
+        select(RepoUrl.id, RepoUrl.last_chk_dt)
+        .filter(
+            RepoUrl.processed,
+            (
+                RepoUrl.chk_req_dt.is_not(None)
+                if requested
+                else RepoUrl.chk_req_dt.is_(None)
+            ),
+            RepoUrl.next_chk_dt <= now,
+            RepoUrl.n_failed_chks < max_failed_chks,
+        )
+        .with_for_update(skip_locked=True)  # Skipping already locked rows
+        .order_by(RepoUrl.next_chk_dt, RepoUrl.id)
+        .limit(limit)
+    )
+
+
 @shared_task
 def url_chk_dispatcher() -> list[int]:
     """
@@ -408,86 +850,29 @@ def url_chk_dispatcher() -> list[int]:
     """
 
     max_failed_chks = current_app.config["DATALAD_REGISTRY_MAX_FAILED_CHKS_PER_URL"]
-    min_chk_interval = timedelta(
-        seconds=current_app.config["DATALAD_REGISTRY_MIN_CHK_INTERVAL_PER_URL"]
-    )
     max_chks_to_dispatch = current_app.config[
         "DATALAD_REGISTRY_MAX_URL_CHKS_ISSUED_PER_DISPATCH_CYCLE"
     ]
     chk_url_task_expiration = current_app.config[
         "DATALAD_REGISTRY_DISPATCH_CYCLE_LENGTH"
     ]
-    repeat_cutoff_dt = datetime.now(timezone.utc) - min_chk_interval
 
-    relevant_action_dt = case(
-        (RepoUrl.last_chk_dt.is_not(None), RepoUrl.last_chk_dt),
-        else_=RepoUrl.last_update_dt,
-    )
-
-    # Condition for not yet checked urls
-    not_chked_cond = or_(
-        RepoUrl.last_chk_dt.is_(None),
-        RepoUrl.last_chk_dt < RepoUrl.chk_req_dt,
-    )
+    now = datetime.now(timezone.utc)
 
-    # Condition for requested but not yet checked urls
-    requested_not_chked_cond = and_(RepoUrl.chk_req_dt.is_not(None), not_chked_cond)
+    # Select and lock the dataset urls that are due to be checked, the ones with
+    # a request for check for update first
+    result: list[Row] = []
+    for requested in (True, False):
+        if len(result) >= max_chks_to_dispatch:
+            break
 
-    # Condition for requested and already checked urls
-    requested_chked_cond = and_(RepoUrl.chk_req_dt.is_not(None), not_(not_chked_cond))
-
-    # Select and lock all dataset urls to be checked
-    result = db.session.execute(
-        select(RepoUrl.id, RepoUrl.last_chk_dt)
-        .filter(
-            and_(
-                RepoUrl.processed,
-                RepoUrl.n_failed_chks < max_failed_chks,
-                or_(
-                    and_(
-                        RepoUrl.chk_req_dt.is_not(None),  # requested to be checked
-                        or_(
-                            # The ones that have not been checked since the request
-                            not_chked_cond,
-                            # The ones that have been checked since the request but
-                            # the last check is old enough
-                            RepoUrl.last_chk_dt <= repeat_cutoff_dt,
-                        ),
-                    ),
-                    and_(
-                        RepoUrl.chk_req_dt.is_(None),  # not requested to be checked
-                        relevant_action_dt <= repeat_cutoff_dt,
-                    ),
-                ),
-            )
-        )
-        .with_for_update(skip_locked=True)  # Skipping already locked rows
-        .order_by(
-            case(
-                (
-                    requested_not_chked_cond,
-                    1,
-                ),
-                (
-                    requested_chked_cond,
-                    2,
-                ),
-                else_=3,
-            ),
-            case(
-                (
-                    requested_not_chked_cond,
-                    RepoUrl.chk_req_dt,
-                ),
-                (
-                    requested_chked_cond,
-                    RepoUrl.last_chk_dt,
-                ),
-                else_=relevant_action_dt,
-            ),
+        result.extend(
+            db.session.execute(
+                select_urls_due_for_chk(
+                    requested, max_failed_chks, now, max_chks_to_dispatch - len(result)
+                )
+            ).all()
         )
-        .limit(max_chks_to_dispatch)
-    ).all()
 
     db.session.rollback()  # Release the lock
 
@@ -555,6 +940,7 @@ def chk_url_to_update(
     # ===
 
     is_record_updated = False
+    now = datetime.now(timezone.utc)
     try:
         # Check and potentially update the dataset clone
         ds_clone, is_new_clone = update_ds_clone(url)
@@ -612,12 +998,7 @@ def chk_url_to_update(
                 is_record_updated = True
 
                 # Initiate extraction of metadata of the up-to-date dataset
-                for extractor in current_app.config[
-                    "DATALAD_REGISTRY_METADATA_EXTRACTORS"
-                ]:
-                    extract_ds_meta.apply_async(
-                        (url.id, extractor), link_error=log_error.s()
-                    )
+                extract_ds_meta_all.apply_async((url.id,), link_error=log_error.s())
 
         if is_new_clone:
             # Remove old clone
@@ -632,20 +1013,93 @@ def chk_url_to_update(
 
         url.n_failed_chks = 0
         url.chk_req_dt = None
+        url.n_unchanged_chks = 0 if is_record_updated else url.n_unchanged_chks + 1
     finally:
-        url.last_chk_dt = datetime.now(timezone.utc)
+        url.last_chk_dt = now
+        _schedule_next_chk(url, now)
+        if is_record_updated:
+            mark_collection_stats_stale()
         db.session.commit()
 
     return ChkUrlStatus.OK_UPDATED if is_record_updated else ChkUrlStatus.OK_CHK_ONLY
 
 
-class FailedSubmission(TypedDict):
+@shared_task
+def refresh_collection_stats() -> bool:
+    """
+    A task intended to be periodically initiated by Celery Beat to refresh
+    the precomputed statistics of the entire collection of dataset URLs if
+    the collection may have changed since the last refresh
+
+    :return: Whether the statistics have been refreshed
+    """
+    return refresh_collection_stats_snapshot()
+
+
+def new_url_processing(repo_url_id: int) -> Signature:
     """
-    A failed submission of a repo URL to Datalad-Registry
+    Build the Celery workflow for processing a newly added RepoUrl
+    and extracting metadata from the corresponding dataset
+
+    :param repo_url_id: The ID of the newly added RepoUrl
+    :return: The signature of the workflow
+    """
+    url_processing = process_dataset_url.signature(
+        (repo_url_id,), link_error=log_error.s()
+    )
+    meta_extraction = extract_ds_meta_all.signature(
+        (repo_url_id,), immutable=True, link_error=log_error.s()
+    )
+    return url_processing | meta_extraction
+
+
+@shared_task
+def url_processing_dispatcher() -> list[int]:
+    """
+    A task intended to be periodically initiated by Celery Beat to submit
+    the RepoUrls pending submission for processing, at most
+    `DATALAD_REGISTRY_MAX_URL_PROCESSINGS_ISSUED_PER_DISPATCH_CYCLE` of them per
+    cycle, for processing and extraction of metadata
+
+    Keeping the pending submissions in the database, instead of in the Celery broker
+    as delayed tasks, bounds the number of the tasks in the broker and in the workers
+    no matter how many RepoUrls are pending.
+
+    :return: The list of IDs, the primary keys, of the RepoUrls that have been
+             submitted for processing, in the order of submission
     """
+    max_processings_to_dispatch = current_app.config[
+        "DATALAD_REGISTRY_MAX_URL_PROCESSINGS_ISSUED_PER_DISPATCH_CYCLE"
+    ]
 
-    status_code: int
-    url: str
+    # Take the RepoUrls pending submission off the queue, in the order of their IDs
+    pending_ids = (
+        select(RepoUrl.id)
+        .filter(RepoUrl.processing_pending)
+        .with_for_update(skip_locked=True)  # Skipping already locked rows
+        .order_by(RepoUrl.id)
+        .limit(max_processings_to_dispatch)
+    )
+    repo_url_ids: list[int] = sorted(
+        db.session.execute(
+            update(RepoUrl)
+            .filter(RepoUrl.id.in_(pending_ids.scalar_subquery()))
+            .values(processing_pending=False)
+            .returning(RepoUrl.id)
+            .execution_options(synchronize_session=False)
+        ).scalars()
+    )
+
+    # Submit the RepoUrls before committing their removal from the queue so that
+    # a failed submission leaves them in the queue. (A RepoUrl submitted more than
+    # once is harmless since its processing is idempotent, and its processing waits
+    # for the lock on it held by this transaction.)
+    for repo_url_id in repo_url_ids:
+        new_url_processing(repo_url_id).apply_async()
+
+    db.session.commit()
+
+    return repo_url_ids
 
 
 class UsageDashboardSyncResult(TypedDict):
@@ -653,11 +1107,11 @@ class UsageDashboardSyncResult(TypedDict):
     A TypedDict representing the result of the task `usage_dashboard_sync`
     """
 
-    failed_submissions_count: int
-    update_requested_repos_count: int
+    # Whether the collection of repos in the usage dashboard has changed since
+    # the last sync. If it has not, nothing else is done in the sync.
+    dashboard_modified: bool
+
     newly_registered_repos_count: int
-    failed_submissions: list[FailedSubmission]
-    update_requested_repos: list[str]
     newly_registered_repos: list[str]
 
 
@@ -668,13 +1122,31 @@ def usage_dashboard_sync() -> UsageDashboardSyncResult:
     Datalad-Registry with the datalad-usage-dashboard,
     https://github.com/datalad/datalad-usage-dashboard.
 
+    The collection of repos in the dashboard is fetched with a conditional request
+    validated by the entity tag of the collection as of the last sync so that
+    the sync ends right away if the collection is unchanged. Otherwise, the URLs of
+    the active repos that are not registered are found and registered in a single
+    statement, pending submission for processing by `url_processing_dispatcher`,
+    which submits them at a bounded rate.
+
     Note: Syncing in this context means ensuring all the active repositories listed in
           datalad-usage-dashboard are registered in Datalad-Registry.
     Note: Currently, this script excludes the OSF repositories listed in the
           datalad-usage-dashboard.
     """
+    sync_state = db.session.get(UsageDashboardSyncState, 1)
+
     # Fetch repositories from datalad-usage-dashboard
-    resp = requests.get(DASHBOARD_COLLECTION_URL)
+    headers = {}
+    if sync_state is not None and sync_state.etag is not None:
+        headers["If-None-Match"] = sync_state.etag
+    resp = requests.get(DASHBOARD_COLLECTION_URL, headers=headers)
+    if resp.status_code == 304:
+        return UsageDashboardSyncResult(
+            dashboard_modified=False,
+            newly_registered_repos_count=0,
+            newly_registered_repos=[],
+        )
     resp.raise_for_status()
     dashboard_collection = DashboardCollection.parse_raw(resp.text)
 
@@ -692,46 +1164,52 @@ def usage_dashboard_sync() -> UsageDashboardSyncResult:
         if item.status is Status.active
     )
 
-    # Fetch repositories from database, the registered repositories
-    registered_repos = set(db.session.execute(select(RepoUrl.url)).scalars().all())
-
-    # Calculate the set of active repositories that exist in the usage dashboard
-    # but not in the database, not registered
-    active_repos_to_register = active_repos - registered_repos
-
-    # Submit (register) this set of repositories to Datalad-Registry through the web API
-    with requests.Session() as session:
-        newly_registered_repos: list[str] = []
-        update_requested_repos: list[str] = []
-        failed_submissions: list[FailedSubmission] = []
+    # Register the active repositories that are not registered, found by
+    # an anti-join of their URLs against the registered ones in the database,
+    # pending submission for processing
+    dashboard_urls = (
+        func.unnest(literal(sorted(active_repos), ARRAY(Text)))
+        .table_valued("url", name="dashboard_url")
+        .render_derived()
+    )
+    new_repo_urls: list[Row] = sorted(
+        db.session.execute(
+            insert(RepoUrl)
+            .from_select(
+                ["url", "processing_pending"],
+                select(dashboard_urls.c.url, true()).filter(
+                    ~select(RepoUrl.id)
+                    .filter(RepoUrl.url == dashboard_urls.c.url)
+                    .exists()
+                ),
+            )
+            # In case a URL is registered by another transaction in the meantime
+            .on_conflict_do_nothing(index_elements=[RepoUrl.url])
+            .returning(RepoUrl.id, RepoUrl.url)
+        ),
+        key=lambda r: r.id,
+    )
 
-        submission_endpoint = str(
-            URL(str(current_app.config["DATALAD_REGISTRY_WEB_API_URL"]))
-            / DATASET_URLS_PATH
+    # Record the entity tag of the collection of repos synced with
+    # in the same transaction as the registration of the repos
+    now = datetime.now(timezone.utc)
+    etag = resp.headers.get("ETag")
+    db.session.execute(
+        insert(UsageDashboardSyncState)
+        .values(id=1, etag=etag, synced_dt=now)
+        .on_conflict_do_update(
+            index_elements=[UsageDashboardSyncState.id],
+            set_={"etag": etag, "synced_dt": now},
         )
-        for repo in active_repos_to_register:
-            resp = session.post(
-                submission_endpoint,
-                json={"url": repo},
-            )
+    )
 
-            resp_status_code = resp.status_code
+    if new_repo_urls:
+        mark_collection_stats_stale()
 
-            if resp_status_code == 201:
-                newly_registered_repos.append(repo)
-            elif resp_status_code == 202:
-                update_requested_repos.append(repo)
-            else:
-                failed_submissions.append(
-                    FailedSubmission(status_code=resp_status_code, url=repo)
-                )
+    db.session.commit()
 
-    # Return the result of the submissions
     return UsageDashboardSyncResult(
-        failed_submissions_count=len(failed_submissions),
-        update_requested_repos_count=len(update_requested_repos),
-        newly_registered_repos_count=len(newly_registered_repos),
-        failed_submissions=failed_submissions,
-        update_requested_repos=update_requested_repos,
-        newly_registered_repos=newly_registered_repos,
+        dashboard_modified=True,
+        newly_registered_repos_count=len(new_repo_urls),
+        newly_registered_repos=[url for _, url in new_repo_urls],
     )
@@ -10,15 +10,20 @@ from datalad.support.exceptions import CommandError
 from datalad.utils import rmtree as rm_ds_tree
 from flask import current_app
 
+from datalad_registry.conf import CloneStrategy
 from datalad_registry.models import RepoUrl
 from datalad_registry.utils.datalad_tls import (
+    OriginRefs,
     clone,
-    get_origin_default_branch,
+    get_origin_refs,
     get_origin_upstream_branch,
 )
 
 lgr = get_task_logger(__name__)
 
+# The name of the branch in which git-annex stores its information
+_GIT_ANNEX_BRANCH = "git-annex"
+
 
 def allocate_ds_path() -> Path:
     """
@@ -60,6 +65,125 @@ def validate_url_is_processed(repo_url: RepoUrl) -> None:
         )
 
 
+def _is_origin_unchanged(
+    repo_url: RepoUrl, origin_refs: OriginRefs, origin_upstream_branch: str
+) -> bool:
+    """
+    Determine whether the origin remote of the local clone of the dataset at
+    a given URL has not changed since the last update of the clone and the RepoUrl
+
+    :param repo_url: The RepoUrl object representing the given URL
+    :param origin_refs: The current HEAD and branches of the origin remote
+    :param origin_upstream_branch: The name of the upstream branch at the origin remote
+                                   of the current local branch of the clone
+    :return: True if the HEAD and the branches, other than the git-annex branch,
+             of the origin remote are the same as those recorded in the RepoUrl
+             object and the clone is tracking the default branch of the origin
+             remote; False otherwise
+
+    Note: The git-annex branch is excluded from the comparison since a change
+          only to it, e.g., an update of the availability of annexed content,
+          does not move the HEAD and so doesn't lead to an update of the RepoUrl
+          object, including its record of the branches. Were it compared, every
+          subsequent check would be made in full until the HEAD moves.
+    """
+    return (
+        repo_url.branches is not None
+        and origin_refs.default_branch == origin_upstream_branch
+        and origin_refs.head == repo_url.head
+        and {
+            name: hexsha
+            for name, hexsha in origin_refs.branches.items()
+            if name != _GIT_ANNEX_BRANCH
+        }
+        == {
+            name: branch["hexsha"]
+            for name, branch in repo_url.branches.items()
+            if name != _GIT_ANNEX_BRANCH
+        }
+    )
+
+
+def get_git_clone_opts() -> list[str]:
+    """
+    Get the options to pass to `git clone` when cloning a dataset into the local cache
+    according to the configured clone strategy
+
+    Note: This function requires an active application context of the Flask app
+    """
+    strategy = current_app.config["DATALAD_REGISTRY_CLONE_STRATEGY"]
+
+    if strategy is CloneStrategy.BLOBLESS:
+        return ["--filter=blob:none"]
+    elif strategy is CloneStrategy.TREELESS:
+        return ["--filter=tree:0"]
+    elif strategy is CloneStrategy.SHALLOW:
+        # `--no-single-branch` is needed for fetching the branches other than
+        # the default branch, the git-annex branch in particular
+        return [
+            f"--depth={current_app.config['DATALAD_REGISTRY_CLONE_DEPTH']}",
+            "--no-single-branch",
+        ]
+    else:
+        return []
+
+
+def prefetch_git_annex_branch(ds: Dataset) -> None:
+    """
+    Fetch, in batch, the objects of the tip of the git-annex branch of
+    the origin remote that are missing in a partial clone of a dataset
+
+    In a clone made with the `BLOBLESS` or `TREELESS` clone strategy, a fetch
+    from the origin remote brings in the commits of the git-annex branch without
+    their blobs and, with `TREELESS`, their trees. Without this prefetch,
+    git-annex would have each of them fetched lazily, in a round trip to
+    the origin remote per object, when merging the branch.
+
+    :param ds: The dataset clone
+    Note: This function requires an active application context of the Flask app
+    """
+    if current_app.config["DATALAD_REGISTRY_CLONE_STRATEGY"] not in (
+        CloneStrategy.BLOBLESS,
+        CloneStrategy.TREELESS,
+    ):
+        return
+
+    if (
+        not ds.repo.is_with_annex()
+        or f"origin/{_GIT_ANNEX_BRANCH}" not in ds.repo.get_remote_branches()
+    ):
+        return
+
+    ref = f"refs/remotes/origin/{_GIT_ANNEX_BRANCH}"
+
+    # `--missing=print` lists the missing objects without fetching them
+    missing_objs = [
+        line[1:]
+        for line in ds.repo.call_git_items_(
+            ["rev-list", "--objects", "--no-walk", "--missing=print", ref],
+            read_only=True,
+        )
+        if line.startswith("?")
+    ]
+
+    if missing_objs:
+        # With `--no-filter`, the subtrees and blobs of a missing tree are fetched
+        # along with it
+        ds.repo.call_git(
+            [
+                "-c",
+                "fetch.negotiationAlgorithm=noop",
+                "fetch",
+                "--no-tags",
+                "--no-write-fetch-head",
+                "--recurse-submodules=no",
+                "--no-filter",
+                "origin",
+            ],
+            files=missing_objs,
+        )
+
+
 def update_ds_clone(repo_url: RepoUrl) -> tuple[Dataset, bool]:
     """
     Update the local clone of the dataset at a given URL
@@ -97,6 +221,7 @@ def update_ds_clone(repo_url: RepoUrl) -> tuple[Dataset, bool]:
             ds_clone = clone(
                 source=repo_url.url,
                 path=ds_path_absolute,
+                git_clone_opts=get_git_clone_opts(),
                 on_failure="stop",
                 result_renderer="disabled",
             )
@@ -126,15 +251,30 @@ def update_ds_clone(repo_url: RepoUrl) -> tuple[Dataset, bool]:
         current_ds_clone_path, check_installed=True, purpose="update"
     )
 
-    current_ds_clone.repo.call_git(["fetch"])
-
-    # The current default branch of the origin remote, the copy of the dataset
+    # The current HEAD and branches of the origin remote, the copy of the dataset
     # located at the given URL, that the local clone is tracking
-    current_origin_default_branch = get_origin_default_branch(current_ds_clone)
+    origin_refs = get_origin_refs(current_ds_clone)
 
     # The upstream branch at the origin remote of the current local branch
     origin_upstream_branch = get_origin_upstream_branch(current_ds_clone)
 
+    if _is_origin_unchanged(repo_url, origin_refs, origin_upstream_branch):
+        # The clone is up-to-date. There is no need to fetch from the origin remote.
+        lgr.debug(
+            "The origin remote of the dataset at %s has not changed since "
+            "the last update",
+            repo_url.url,
+        )
+        return current_ds_clone, False
+
+    # Prune the remote-tracking branches of the branches deleted at the origin
+    # remote so that they are no longer recorded as branches of the origin remote
+    current_ds_clone.repo.call_git(["fetch", "--prune"])
+    prefetch_git_annex_branch(current_ds_clone)
+
+    # The current default branch of the origin remote
+    current_origin_default_branch = origin_refs.default_branch
+
     if origin_upstream_branch == current_origin_default_branch:
         try:
             current_ds_clone.repo.call_git(
@@ -1,9 +1,14 @@
 # This file specifies custom metadata extractors, for datalad_registry, and related
 # definitions.
 from collections.abc import Callable
-import json
+from mimetypes import guess_type
+from typing import Any, NamedTuple, Optional, Union
 
+from datalad.api import Dataset
 from datalad.distribution.dataset import require_dataset
+from flask import current_app
+import ijson
+from sqlalchemy import insert
 from yaml import load as yaml_load
 
 try:
@@ -13,8 +18,12 @@ except ImportError:
     # Otherwise, import the Python-based YAML loader
     from yaml import SafeLoader  # type: ignore
 
-from datalad_registry.models import RepoUrl, URLMetadata
-from datalad_registry.utils.datalad_tls import get_head_describe
+from datalad_registry.models import DandiAsset, DatasetFile, RepoUrl, URLMetadata, db
+from datalad_registry.utils.datalad_tls import get_head_describe, iter_ds_files
+
+# The number of `DatasetFile` records written to the database at a time
+# by `record_ds_files()`
+_DS_FILES_BATCH_SIZE = 1000
 
 
 class InvalidRequiredFileError(Exception):
@@ -26,13 +35,35 @@ class InvalidRequiredFileError(Exception):
     pass
 
 
-def dlreg_dandi_meta_extract(url: RepoUrl) -> URLMetadata:
+class DatasetVersion(NamedTuple):
+    """
+    The version of a dataset which metadata is extracted from
+    """
+
+    hexsha: str  # The hexsha of the HEAD of the dataset
+    describe: str  # The output of `git describe` for the HEAD of the dataset
+
+
+def get_ds_version(ds: Dataset) -> DatasetVersion:
+    """
+    Get the version of a given dataset
+
+    :param ds: The given dataset
+    """
+    return DatasetVersion(hexsha=ds.repo.get_hexsha(), describe=get_head_describe(ds))
+
+
+def dlreg_dandi_meta_extract(
+    url: RepoUrl, ds_version: Optional[DatasetVersion] = None
+) -> URLMetadata:
     """
     This function implements the "dandi" extractor: it extracts the metadata specified
     in the `dandiset.yaml` file of the DANDI dataset at a given URL
 
     :param url: The `RepoUrl` object representing the URL
                 at which the dataset is located
+    :param ds_version: The version of the dataset in the local cache if it is already
+                       known. If not provided, it is obtained from the dataset.
     :return: A `URLMetadata` object containing the extracted metadata ready
              to be written (committed) to the database
     :raises FileNotFoundError: If the `dandiset.yaml` file is not found at the dataset
@@ -45,7 +76,7 @@ def dlreg_dandi_meta_extract(url: RepoUrl) -> URLMetadata:
           one that must have been processed already.
     """
     name = "dandi"  # Name of this extractor
-    version = "0.0.1"  # Version of this extractor
+    version = EXTRACTOR_VERSION_MAP[name]  # Version of this extractor
 
     assert url.cache_path_abs is not None, (
         f"Encountered a RepoUrl with no cache path, "
@@ -58,13 +89,18 @@ def dlreg_dandi_meta_extract(url: RepoUrl) -> URLMetadata:
     if extracted_metadata is None:
         raise InvalidRequiredFileError("dandiset.yaml has no document.")
 
-    ds = require_dataset(
-        url.cache_path_abs, check_installed=True, purpose="dandiset metadata extraction"
-    )
+    if ds_version is None:
+        ds_version = get_ds_version(
+            require_dataset(
+                url.cache_path_abs,
+                check_installed=True,
+                purpose="dandiset metadata extraction",
+            )
+        )
 
     return URLMetadata(
-        dataset_describe=get_head_describe(ds),
-        dataset_version=ds.repo.get_hexsha(),
+        dataset_describe=ds_version.describe,
+        dataset_version=ds_version.hexsha,
         extractor_name=name,
         extractor_version=version,
         extraction_parameter={},
@@ -73,15 +109,90 @@ def dlreg_dandi_meta_extract(url: RepoUrl) -> URLMetadata:
     )
 
 
-def dlreg_dandi_files_meta_extract(url: RepoUrl) -> URLMetadata:
+def _insert_rows(
+    model: type[Union[DandiAsset, DatasetFile]], rows: list[dict[str, Any]]
+) -> None:
+    """
+    Insert a batch of rows of a given model to the database and clear the batch
+
+    :param model: The model
+    :param rows: The batch of rows, each given as a dictionary of column values
+    """
+    if rows:
+        db.session.execute(insert(model), rows)
+        rows.clear()
+
+
+def _get_asset_size(asset: dict[str, Any]) -> Optional[int]:
+    """
+    Get the size of an asset of a DANDI dataset
+
+    :param asset: The metadata of the asset as given in `.dandi/assets.json`
+    :return: The value of the `size` field of the asset if it is an integral number,
+             or None otherwise
+
+    Note: The total size of the assets computed with this function must agree
+          with the one computed by the data migration 19707f8489f7
+    """
+    size = asset.get("size")
+    if isinstance(size, bool):
+        return None
+    if isinstance(size, int):
+        return size
+    if isinstance(size, float) and size.is_integer():
+        return int(size)
+    return None
+
+
+def _dandi_asset_file_row(asset: dict[str, Any]) -> Optional[dict[str, Any]]:
+    """
+    Get the column values of the `DatasetFile` record of an asset of a DANDI dataset
+
+    :param asset: The metadata of the asset as given in `.dandi/assets.json`
+    :return: The column values, other than the ID of the associated `URLMetadata`,
+             or None if the asset has no path
+    """
+    path = asset.get("path")
+    if not isinstance(path, str):
+        return None
+
+    metadata = asset.get("metadata")
+    content_type = (
+        metadata.get("encodingFormat") if isinstance(metadata, dict) else None
+    )
+    return {
+        "path": path,
+        "size": _get_asset_size(asset),
+        "content_type": content_type if isinstance(content_type, str) else None,
+        "annex_key": None,
+    }
+
+
+def dlreg_dandi_files_meta_extract(
+    url: RepoUrl, ds_version: Optional[DatasetVersion] = None
+) -> URLMetadata:
     """
     This function implements the "dandi:files" extractor: it extracts the metadata
     specified in the `.dandi/assets.json` file of the DANDI dataset at a given URL
 
+    The file is parsed incrementally. The metadata of each asset is recorded as a
+    `DandiAsset` record, and the path, size, and content type of each asset are
+    recorded as a `DatasetFile` record. The records are written to the database in
+    batches of `DATALAD_REGISTRY_DANDI_ASSETS_BATCH_SIZE` assets. The returned
+    `URLMetadata` object contains a summary of the assets, i.e., their count and
+    total size. Thus, the memory used by this function is bounded by the size of
+    a batch of asset records rather than the size of the file.
+
     :param url: The `RepoUrl` object representing the URL
+    :param ds_version: The version of the dataset in the local cache if it is already
+                       known. If not provided, it is obtained from the dataset.
     :return: A `URLMetadata` object containing the extracted metadata ready
+             to be written (committed) to the database. (The object has been
+             flushed to the database along with the associated `DandiAsset` records.)
     :raises FileNotFoundError: If the `.dandi/assets.json` file is not found
                                at the dataset
+    :raises InvalidRequiredFileError: If the `.dandi/assets.json` file doesn't
+                                      contain a valid JSON array
 
     Note: This function is meant to be called inside a Celery task for it requires
           an active application context of the Flask app
@@ -89,48 +200,162 @@ def dlreg_dandi_files_meta_extract(url: RepoUrl) -> URLMetadata:
           one that must have been processed already.
     """
     name = "dandi:files"  # Name of this extractor
-    version = "0.0.1"  # Version of this extractor
+    version = EXTRACTOR_VERSION_MAP[name]  # Version of this extractor
 
     assert url.cache_path_abs is not None, (
         f"Encountered a RepoUrl with no cache path, "
         f"with a processed flag set to {url.processed}"
     )
 
-    with open(url.cache_path_abs / ".dandi/assets.json") as f:
-        extracted_metadata = json.load(f)
+    batch_size: int = current_app.config["DATALAD_REGISTRY_DANDI_ASSETS_BATCH_SIZE"]
 
-    ds = require_dataset(
-        url.cache_path_abs,
-        check_installed=True,
-        purpose="dandiset files metadata extraction",
-    )
+    if ds_version is None:
+        ds_version = get_ds_version(
+            require_dataset(
+                url.cache_path_abs,
+                check_installed=True,
+                purpose="dandiset files metadata extraction",
+            )
+        )
 
-    return URLMetadata(
-        dataset_describe=get_head_describe(ds),
-        dataset_version=ds.repo.get_hexsha(),
-        extractor_name=name,
-        extractor_version=version,
-        extraction_parameter={},
-        extracted_metadata=extracted_metadata,
-        url=url,
-    )
+    with open(url.cache_path_abs / ".dandi/assets.json", "rb") as f:
+        events = ijson.parse(f, use_float=True)
+        try:
+            first_event = next(events)
+        except ijson.JSONError as e:
+            raise InvalidRequiredFileError(
+                ".dandi/assets.json doesn't contain valid JSON."
+            ) from e
+
+        if first_event != ("", "start_array", None):
+            raise InvalidRequiredFileError(
+                ".dandi/assets.json doesn't contain a JSON array."
+            )
+
+        url_metadata = URLMetadata(
+            dataset_describe=ds_version.describe,
+            dataset_version=ds_version.hexsha,
+            extractor_name=name,
+            extractor_version=version,
+            extraction_parameter={},
+            extracted_metadata={},
+            url=url,
+        )
+
+        # Write the records in a savepoint so that they are discarded if
+        # the file turns out to be invalid partway through
+        savepoint = db.session.begin_nested()
+        try:
+            # Flush the `URLMetadata` object to obtain its ID for
+            # the `DandiAsset` records
+            db.session.add(url_metadata)
+            db.session.flush()
+
+            asset_count = 0
+            total_size = 0
+            batch: list[dict[str, Any]] = []
+            file_batch: list[dict[str, Any]] = []
+            for asset in ijson.items(events, "item"):
+                batch.append(
+                    {
+                        "url_metadata_id": url_metadata.id,
+                        "idx": asset_count,
+                        "asset_metadata": asset,
+                    }
+                )
+                asset_count += 1
+                if isinstance(asset, dict):
+                    if (size := _get_asset_size(asset)) is not None:
+                        total_size += size
+                    if (file_row := _dandi_asset_file_row(asset)) is not None:
+                        file_batch.append(
+                            {"url_metadata_id": url_metadata.id, **file_row}
+                        )
+
+                if len(batch) == batch_size:
+                    _insert_rows(DandiAsset, batch)
+                    _insert_rows(DatasetFile, file_batch)
+
+            _insert_rows(DandiAsset, batch)
+            _insert_rows(DatasetFile, file_batch)
+        except ijson.JSONError as e:
+            savepoint.rollback()
+            raise InvalidRequiredFileError(
+                ".dandi/assets.json doesn't contain valid JSON."
+            ) from e
+        else:
+            savepoint.commit()
+
+    url_metadata.extracted_metadata = {
+        "asset_count": asset_count,
+        "total_size": total_size,
+    }
+
+    return url_metadata
+
+
+def record_ds_files(url_metadata: URLMetadata, ds: Dataset) -> None:
+    """
+    Record the files in the HEAD commit of a dataset as `DatasetFile` records
+    associated with a given `URLMetadata` object
+
+    The `URLMetadata` object is added to the database session and flushed, and
+    the records are written to the database in batches of `_DS_FILES_BATCH_SIZE`.
+
+    :param url_metadata: The `URLMetadata` object containing the metadata extracted
+                         from the HEAD commit of the dataset
+    :param ds: The dataset
+
+    Note: This function is meant to be called inside a Celery task for it requires
+          an active application context of the Flask app
+    """
+    # Flush the `URLMetadata` object to obtain its ID for the `DatasetFile` records
+    db.session.add(url_metadata)
+    db.session.flush()
+
+    batch: list[dict[str, Any]] = []
+    for ds_file in iter_ds_files(ds):
+        batch.append(
+            {
+                "url_metadata_id": url_metadata.id,
+                "path": ds_file.path,
+                "size": ds_file.size,
+                "content_type": guess_type(ds_file.path)[0],
+                "annex_key": ds_file.annex_key,
+            }
+        )
+        if len(batch) == _DS_FILES_BATCH_SIZE:
+            _insert_rows(DatasetFile, batch)
+
+    _insert_rows(DatasetFile, batch)
 
 
 # A mapping from the names of the supported extractors to the functions
 # that implement those extractors respectively
-EXTRACTOR_MAP: dict[str, Callable[[RepoUrl], URLMetadata]] = {
+EXTRACTOR_MAP: dict[str, Callable[[RepoUrl, Optional[DatasetVersion]], URLMetadata]] = {
     "dandi": dlreg_dandi_meta_extract,
     "dandi:files": dlreg_dandi_files_meta_extract,
 }
 
+# A mapping from the names of the supported extractors to their versions. The version
+# of an extractor must be changed whenever the extractor's output changes.
+EXTRACTOR_VERSION_MAP: dict[str, str] = {
+    "dandi": "0.0.1",
+    "dandi:files": "0.1.0",
+}
+
 
-def dlreg_meta_extract(extractor: str, url: RepoUrl) -> URLMetadata:
+def dlreg_meta_extract(
+    extractor: str, url: RepoUrl, ds_version: Optional[DatasetVersion] = None
+) -> URLMetadata:
     """
     Extract metadata from the dataset at a given URL using the specified extractor.
 
     :param extractor: The name of the extractor to use
     :param url: The `RepoUrl` object representing the URL
                 at which the dataset is located
+    :param ds_version: The version of the dataset in the local cache if it is already
+                       known. If not provided, it is obtained from the dataset.
     :return: A `URLMetadata` object containing the extracted metadata ready
              to be written (committed) to the database
     :raises ValueError: If the argument for `extractor` is not one of the extractors
@@ -144,4 +369,4 @@ def dlreg_meta_extract(extractor: str, url: RepoUrl) -> URLMetadata:
     except KeyError as e:
         raise ValueError(f"Extractor {extractor} is not supported") from e
     else:
-        return extractor_func(url)
+        return extractor_func(url, ds_version)
@@ -7,7 +7,7 @@ import pytest
 
 import datalad_registry
 from datalad_registry import create_app
-from datalad_registry.conf import BaseConfig, OperationMode
+from datalad_registry.conf import BaseConfig, CloneStrategy, OperationMode
 
 
 class TestCreateApp:
@@ -80,6 +80,16 @@ class TestCreateApp:
                 "schedule": 60.0 * 60 * 24,
                 "options": {"expires": 60.0 * 60 * 24},
             },
+            "url-processing-dispatcher": {
+                "task": "datalad_registry.tasks.url_processing_dispatcher",
+                "schedule": 60.0 * 10,
+                "options": {"expires": 60.0 * 10},
+            },
+            "collection-stats-refresh": {
+                "task": "datalad_registry.tasks.refresh_collection_stats",
+                "schedule": 60.0 * 5,
+                "options": {"expires": 60.0 * 5},
+            },
         }
 
         default_metadata_extractors = BaseConfig.__fields__[
@@ -124,6 +134,10 @@ class TestCreateApp:
         assert flask_app.config["DATALAD_REGISTRY_DATASET_CACHE"] == Path(cache_path)
         assert str(flask_app.config["DATALAD_REGISTRY_WEB_API_URL"]) == web_api_url
         assert flask_app.config["DATALAD_REGISTRY_MIN_CHK_INTERVAL_PER_URL"] == 3600
+        assert flask_app.config["DATALAD_REGISTRY_MAX_CHK_INTERVAL_PER_URL"] == 604800
+        assert flask_app.config["DATALAD_REGISTRY_CLONE_STRATEGY"] is CloneStrategy.FULL
+        assert flask_app.config["DATALAD_REGISTRY_CLONE_DEPTH"] == 1
+        assert flask_app.config["DATALAD_REGISTRY_DANDI_ASSETS_BATCH_SIZE"] == 1000
         assert flask_app.config["DATALAD_REGISTRY_MAX_FAILED_CHKS_PER_URL"] == 10
         assert (
             flask_app.config["DATALAD_REGISTRY_MAX_URL_CHKS_ISSUED_PER_DISPATCH_CYCLE"]
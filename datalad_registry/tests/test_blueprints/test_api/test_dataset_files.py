@@ -0,0 +1,166 @@
+import pytest
+
+from datalad_registry.blueprints.api.dataset_files.models import DatasetFilePage
+from datalad_registry.models import DatasetFile, RepoUrl, URLMetadata, db
+
+
+@pytest.fixture
+def populate_with_dataset_files(flask_app):
+    """
+    Populate the database with two dataset URLs, each with a piece of metadata
+    along with which the files of the dataset are recorded
+    """
+    url_metadata_lst = [
+        URLMetadata(
+            dataset_describe="1234",
+            dataset_version="v1",
+            extractor_name="bids_dataset",
+            extractor_version="0.0.1",
+            extraction_parameter={},
+            extracted_metadata={},
+            url=RepoUrl(url="https://example.com/ds1"),
+        ),
+        URLMetadata(
+            dataset_describe="5678",
+            dataset_version="v2",
+            extractor_name="dandi:files",
+            extractor_version="0.1.0",
+            extraction_parameter={},
+            extracted_metadata={},
+            url=RepoUrl(url="https://example.com/ds2"),
+        ),
+    ]
+
+    with flask_app.app_context():
+        db.session.add_all(url_metadata_lst)
+        db.session.flush()
+
+        db.session.add_all(
+            [
+                DatasetFile(
+                    url_metadata_id=url_metadata_lst[0].id,
+                    path="sub-01/anat/sub-01_T1w.nii.gz",
+                    size=100,
+                    content_type=None,
+                    annex_key="MD5E-s100--0123456789abcdef0123456789abcdef.nii.gz",
+                ),
+                DatasetFile(
+                    url_metadata_id=url_metadata_lst[0].id,
+                    path="dataset_description.json",
+                    size=50,
+                    content_type="application/json",
+                    annex_key=None,
+                ),
+                DatasetFile(
+                    url_metadata_id=url_metadata_lst[1].id,
+                    path="sub-01/sub-01_ses-1_ecephys.nwb",
+                    size=2000,
+                    content_type="application/x-nwb",
+                    annex_key=None,
+                ),
+                DatasetFile(
+                    url_metadata_id=url_metadata_lst[1].id,
+                    path="sub-02/sub-02_ses-1_ecephys.nwb",
+                    size=3000,
+                    content_type="application/x-nwb",
+                    annex_key=None,
+                ),
+            ]
+        )
+        db.session.commit()
+
+
+@pytest.mark.usefixtures("populate_with_dataset_files")
+class TestDatasetFiles:
+    def test_no_constraint(self, flask_client):
+        """
+        Test that at least one constraint is required
+        """
+        resp = flask_client.get("/api/v2/dataset-files")
+        assert resp.status_code == 422
+
+        resp = flask_client.get("/api/v2/dataset-files", query_string={"page": 1})
+        assert resp.status_code == 422
+
+    @pytest.mark.parametrize(
+        "query_params, expected_paths",
+        [
+            (
+                {"path": "sub-01"},
+                [
+                    "sub-01/anat/sub-01_T1w.nii.gz",
+                    "sub-01/sub-01_ses-1_ecephys.nwb",
+                ],
+            ),
+            ({"path": "T1W.NII"}, ["sub-01/anat/sub-01_T1w.nii.gz"]),
+            ({"path": "sub_01"}, []),
+            ({"content_type": "application/json"}, ["dataset_description.json"]),
+            ({"content_type": "application"}, []),
+            (
+                {"annex_key": "MD5E-s100--0123456789abcdef0123456789abcdef.nii.gz"},
+                ["sub-01/anat/sub-01_T1w.nii.gz"],
+            ),
+            (
+                {"dataset_url_id": 2},
+                [
+                    "sub-01/sub-01_ses-1_ecephys.nwb",
+                    "sub-02/sub-02_ses-1_ecephys.nwb",
+                ],
+            ),
+            (
+                {"dataset_url_id": 2, "path": "sub-02"},
+                ["sub-02/sub-02_ses-1_ecephys.nwb"],
+            ),
+            ({"dataset_url_id": 3}, []),
+        ],
+    )
+    def test_constraints(self, flask_client, query_params, expected_paths):
+        resp = flask_client.get("/api/v2/dataset-files", query_string=query_params)
+        assert resp.status_code == 200
+
+        page = DatasetFilePage.parse_raw(resp.text)
+        assert [f.path for f in page.dataset_files] == expected_paths
+
+    def test_file_representation(self, flask_client):
+        resp = flask_client.get(
+            "/api/v2/dataset-files", query_string={"path": "ses-1", "per_page": 1}
+        )
+        assert resp.status_code == 200
+
+        page = DatasetFilePage.parse_raw(resp.text)
+        assert len(page.dataset_files) == 1
+
+        f = page.dataset_files[0]
+        assert f.path == "sub-01/sub-01_ses-1_ecephys.nwb"
+        assert f.size == 2000
+        assert f.content_type == "application/x-nwb"
+        assert f.annex_key is None
+        assert f.dataset_url_id == 2
+        assert f.dataset_version == "v2"
+        assert f.extractor_name == "dandi:files"
+        assert f.url_metadata == "/api/v2/url-metadata/2"
+
+    def test_pagination(self, flask_client):
+        resp = flask_client.get(
+            "/api/v2/dataset-files", query_string={"path": "sub", "per_page": 2}
+        )
+        assert resp.status_code == 200
+
+        page = DatasetFilePage.parse_raw(resp.text)
+        assert page.cur_pg_num == 1
+        assert page.prev_pg is None
+        assert page.next_pg == "/api/v2/dataset-files?path=sub&per_page=2&page=2"
+        assert page.first_pg == "/api/v2/dataset-files?path=sub&per_page=2&page=1"
+        assert page.last_pg == "/api/v2/dataset-files?path=sub&per_page=2&page=2"
+        assert len(page.dataset_files) == 2
+
+        resp = flask_client.get(page.next_pg)
+        assert resp.status_code == 200
+
+        page = DatasetFilePage.parse_raw(resp.text)
+        assert page.cur_pg_num == 2
+        assert page.prev_pg == "/api/v2/dataset-files?path=sub&per_page=2&page=1"
+        assert page.next_pg is None
+        assert [f.path for f in page.dataset_files] == [
+            "sub-02/sub-02_ses-1_ecephys.nwb"
+        ]
@@ -1,27 +1,43 @@
+from datetime import datetime, timezone
+import gzip
 from typing import Optional
 
+from flask import Response
 import pytest
 from pytest_mock import MockerFixture
+from sqlalchemy import select
 from yarl import URL as YURL
 
 from datalad_registry.blueprints.api.dataset_urls import DatasetURLRespModel
 from datalad_registry.blueprints.api.dataset_urls.models import (
     DEFAULT_PAGE,
+    MAX_BATCH_SIZE,
     AnnexDsCollectionStats,
     CollectionStats,
     DataladDsCollectionStats,
+    DatasetURLBatchRespModel,
     DatasetURLPage,
     MetadataReturnOption,
     NonAnnexDsCollectionStats,
     StatsSummary,
 )
+from datalad_registry.blueprints.api.dataset_urls.tools import (
+    refresh_collection_stats_snapshot,
+)
 from datalad_registry.blueprints.api.url_metadata.models import (
     URLMetadataModel,
     URLMetadataRef,
 )
 from datalad_registry.conf import OperationMode
-from datalad_registry.models import RepoUrl
-from datalad_registry.tests.tools import populate_with_dataset_urls
+from datalad_registry.models import CollectionStatsSnapshot, RepoUrl, URLMetadata, db
+from datalad_registry.tests.tools import (
+    populate_with_dataset_urls,
+    record_sql_statements,
+)
+from datalad_registry.utils.response_cache import (
+    RESPONSE_CACHE_EXT_KEY,
+    MemoryResponseCache,
+)
 
 
 class TestDeclareDatasetURL:
@@ -180,6 +196,133 @@ class TestDeclareDatasetURL:
         assert set(resp.headers["Allow"].split(", ")) == {"GET", "HEAD", "OPTIONS"}
 
 
+class TestDeclareDatasetURLs:
+    def test_without_body(self, flask_client):
+        resp = flask_client.post("/api/v2/dataset-urls/batch")
+        assert resp.status_code == 422
+
+    @pytest.mark.parametrize(
+        "request_json_body",
+        [
+            {},
+            {"url": "https://example.com"},
+            {"urls": "https://example.com"},
+            {"urls": []},
+            {"urls": ["https://example.com", "hehe"]},
+            {"urls": ["haha/hehe"]},
+            {"urls": ["www.example.com"]},
+            {"urls": [f"https://example.com/{i}" for i in range(MAX_BATCH_SIZE + 1)]},
+        ],
+    )
+    def test_invalid_body(self, flask_client, request_json_body):
+        resp = flask_client.post("/api/v2/dataset-urls/batch", json=request_json_body)
+        assert resp.status_code == 422
+
+    @pytest.mark.usefixtures("populate_with_std_ds_urls")
+    def test_valid_body(self, flask_app, flask_client, mocker: MockerFixture):
+        from datalad_registry.blueprints.api import dataset_urls
+
+        new_url_processing_spy = mocker.spy(dataset_urls, "new_url_processing")
+
+        urls = [
+            "https://www.new-example.com",
+            "http://www.datalad.org",  # Processed with no unhandled check request
+            "https://www.example.com",  # Processed with an unhandled check request
+            "/haha/hehe",
+            "https://www.new-example.com",  # Duplicate
+            "https://www.dandiarchive.org",  # Not processed yet
+        ]
+
+        with flask_app.app_context():
+            example_chk_req_dt = db.session.execute(
+                select(RepoUrl.chk_req_dt).filter_by(url="https://www.example.com")
+            ).scalar_one()
+
+        with record_sql_statements(flask_app) as statements:
+            resp = flask_client.post("/api/v2/dataset-urls/batch", json={"urls": urls})
+
+        assert resp.status_code == 200
+
+        results = DatasetURLBatchRespModel.parse_raw(resp.text).results
+
+        # Ensure the outcomes are of the unique URLs in the order of their
+        # first occurrences in the batch
+        assert [str(r.dataset_url.url) for r in results] == [
+            "https://www.new-example.com",
+            "http://www.datalad.org",
+            "https://www.example.com",
+            "/haha/hehe",
+            "https://www.dandiarchive.org",
+        ]
+        assert [r.status for r in results] == [201, 202, 202, 201, 202]
+        assert [r.dataset_url.id for r in results][1:3] == [2, 1]
+        assert [r.dataset_url.id for r in results][4] == 4
+
+        # Ensure the URLs are added in a single statement
+        assert len([s for s in statements if s.startswith("INSERT INTO repo_url")]) == 1
+
+        # Ensure processing is initiated only for the new URLs
+        assert {c.args[0] for c in new_url_processing_spy.call_args_list} == {
+            results[0].dataset_url.id,
+            results[3].dataset_url.id,
+        }
+        assert new_url_processing_spy.call_count == 2
+
+        with flask_app.app_context():
+            repo_urls = {
+                r.url: r for r in db.session.execute(select(RepoUrl)).scalars()
+            }
+
+            assert len(repo_urls) == 6
+            for url in ("https://www.new-example.com", "/haha/hehe"):
+                assert repo_urls[url].processed is False
+                assert repo_urls[url].n_failed_chks == 0
+                assert repo_urls[url].chk_req_dt is None
+
+            # Ensure only the processed URL without an unhandled check request
+            # is marked for check
+            assert repo_urls["http://www.datalad.org"].chk_req_dt is not None
+            assert (
+                repo_urls["http://www.datalad.org"].next_chk_dt
+                == repo_urls["http://www.datalad.org"].chk_req_dt
+            )
+            assert repo_urls["https://www.example.com"].chk_req_dt == (
+                example_chk_req_dt
+            )
+            assert repo_urls["https://www.dandiarchive.org"].chk_req_dt is None
+
+    @pytest.mark.usefixtures("populate_with_std_ds_urls")
+    def test_existing_urls_only(self, flask_client, mocker: MockerFixture):
+        from datalad_registry.blueprints.api import dataset_urls
+
+        new_url_processing_spy = mocker.spy(dataset_urls, "new_url_processing")
+
+        resp = flask_client.post(
+            "/api/v2/dataset-urls/batch",
+            json={"urls": ["https://www.example.com", "http://www.datalad.org"]},
+        )
+        assert resp.status_code == 200
+
+        results = DatasetURLBatchRespModel.parse_raw(resp.text).results
+        assert [r.status for r in results] == [202, 202]
+
+        new_url_processing_spy.assert_not_called()
+
+    def test_read_only_mode(self, flask_app, flask_client, monkeypatch):
+        """
+        Test that the endpoint is disabled in read-only mode
+        """
+
+        monkeypatch.setitem(
+            flask_app.config, "DATALAD_REGISTRY_OPERATION_MODE", OperationMode.READ_ONLY
+        )
+
+        resp = flask_client.post(
+            "/api/v2/dataset-urls/batch", json={"urls": ["https://www.example.com"]}
+        )
+        assert resp.status_code == 405
+
+
 class TestDatasetURLs:
     @pytest.mark.parametrize(
         "query_params",
@@ -208,6 +351,7 @@ class TestDatasetURLs:
             {"per_page": "b"},
             {"order_by": "abc"},
             {"order_dir": "def"},
+            {"count_mode": "approximate"},
             {"search": ""},
             {"search": "    "},
             {"search": "   \t \n"},
@@ -217,6 +361,11 @@ class TestDatasetURLs:
             {"max_annex_key_count": 2, "search": "    "},
             {"max_annex_key_count": 2, "search": "  \t  "},
             {"max_annex_key_count": 2, "search": "  \t  \n  "},
+            {"cursor": "abc"},
+            {"after": "WyJ1cmwiLCJhc2MiLCJhIiwxXQ"},
+            {"cursor": False, "after": "WyJ1cmwiLCJhc2MiLCJhIiwxXQ"},
+            {"with_stats": True},
+            {"cursor": False, "with_stats": True},
         ],
     )
     def test_invalid_query_params(self, flask_client, query_params):
@@ -256,6 +405,10 @@ class TestDatasetURLs:
             {"min_annexed_files_in_wt_size": 33, "search": "   a b c "},
             {"min_annexed_files_in_wt_size": 33, "search": "   a \t b \n c "},
             {"min_annexed_files_in_wt_size": 33, "search": "a"},
+            {"cursor": True},
+            {"cursor": False},
+            {"cursor": True, "with_stats": True},
+            {"cursor": True, "after": "WyJsYXN0X3VwZGF0ZV9kdCIsImRlc2MiLG51bGwsMV0"},
         ],
     )
     def test_valid_query_params(self, flask_client, query_params):
@@ -452,6 +605,29 @@ class TestDatasetURLs:
         assert resp.status_code == 400
         assert resp.json["description"] == "Invalid search string: Mock UnexpectedInput"
 
+    @pytest.mark.usefixtures("populate_with_url_metadata")
+    @pytest.mark.parametrize(
+        "search",
+        [
+            'url:~"(?P<x>a)"',
+            'metadata[metalad_core]:~"(?P<x>a)"',
+        ],
+    )
+    def test_filter_with_search_rejected_by_db(self, search, flask_client):
+        """
+        Test filtering with a search query parameter with a regular expression that
+        is valid in Python but is rejected by PostgreSQL
+        """
+        resp = flask_client.get("/api/v2/dataset-urls", query_string={"search": search})
+        assert resp.status_code == 400
+        assert resp.json["description"].startswith(
+            "Invalid search string: invalid regular expression"
+        )
+
+        # The session is usable again after the rejected search
+        resp = flask_client.get("/api/v2/dataset-urls")
+        assert resp.status_code == 200
+
     @pytest.mark.usefixtures("populate_with_url_metadata")
     @pytest.mark.parametrize(
         "metadata_ret_opt",
@@ -501,6 +677,55 @@ class TestDatasetURLs:
 
                 assert all(type(m) is metadata_ret_type for m in url.metadata)
 
+    @pytest.mark.usefixtures("populate_with_url_metadata")
+    @pytest.mark.parametrize(
+        "cursor, expected_metadata_query_count",
+        [
+            (None, 1),
+            # The page spans both the dataset URLs with a non-null value in the
+            # ordering key and those with a null value, which are fetched
+            # by separate queries in cursor pagination
+            (True, 2),
+        ],
+    )
+    @pytest.mark.parametrize(
+        "metadata_ret_opt, expecting_metadata_content",
+        [
+            (MetadataReturnOption.reference, False),
+            (MetadataReturnOption.content, True),
+        ],
+    )
+    def test_metadata_return_queries(
+        self,
+        cursor,
+        expected_metadata_query_count,
+        metadata_ret_opt,
+        expecting_metadata_content,
+        flask_app,
+        flask_client,
+    ):
+        """
+        Test that the metadata returned as a part of the returned list of dataset URLs
+        is loaded in a batch, instead of a query per dataset URL, and that the content
+        of the metadata is not loaded if it is only returned by reference
+        """
+        query_string = {"return_metadata": metadata_ret_opt.value, "per_page": 100}
+        if cursor is not None:
+            query_string["cursor"] = cursor
+
+        with record_sql_statements(flask_app) as statements:
+            resp = flask_client.get("/api/v2/dataset-urls", query_string=query_string)
+
+        assert resp.status_code == 200
+        assert len(DatasetURLPage.parse_raw(resp.text).dataset_urls) == 4
+
+        metadata_statements = [s for s in statements if "FROM url_metadata" in s]
+        assert len(metadata_statements) == expected_metadata_query_count
+        assert all(
+            ("extracted_metadata" in s) is expecting_metadata_content
+            for s in metadata_statements
+        )
+
     def test_pagination(self, populate_with_std_ds_urls, flask_client):
         """
         Test the pagination of the results
@@ -521,6 +746,8 @@ class TestDatasetURLs:
         assert "prev_pg" not in resp_json
         assert ds_url_pg.prev_pg is None
         assert ds_url_pg.next_pg is not None
+        assert ds_url_pg.total == 4
+        assert ds_url_pg.total_is_exact is True
         assert ds_url_pg.collection_stats.summary.ds_count == 4
 
         next_pg_lk, first_pg_lk, last_pg_lk = (
@@ -559,6 +786,8 @@ class TestDatasetURLs:
         assert ds_url_pg.prev_pg is not None
         assert "next_pg" not in resp_json
         assert ds_url_pg.next_pg is None
+        assert ds_url_pg.total == 4
+        assert ds_url_pg.total_is_exact is True
         assert ds_url_pg.collection_stats.summary.ds_count == 4
 
         prev_pg_lk, first_pg_lk, last_pg_lk = (
@@ -587,6 +816,70 @@ class TestDatasetURLs:
 
         assert ds_urls == set(populate_with_std_ds_urls)
 
+    @pytest.mark.usefixtures("populate_with_std_ds_urls")
+    @pytest.mark.parametrize(
+        "count_mode, count_cap, page, expected_total, expected_total_is_exact, "
+        "expected_last_pg_num",
+        [
+            (None, 2, 1, 4, True, 4),
+            ("exact", 2, 1, 4, True, 4),
+            ("capped", 2, 1, 2, False, 2),
+            ("capped", 2, 2, 3, False, 3),
+            ("capped", 2, 3, 4, False, 4),
+            ("capped", 4, 1, 4, True, 4),
+            ("capped", 2, 4, 4, True, 4),
+            ("estimated", 4, 1, 4, True, 4),
+        ],
+    )
+    def test_count_modes(
+        self,
+        count_mode,
+        count_cap,
+        page,
+        expected_total,
+        expected_total_is_exact,
+        expected_last_pg_num,
+        flask_app,
+        flask_client,
+        monkeypatch,
+    ):
+        """
+        Test the ways of counting the total number of dataset URLs
+        """
+        monkeypatch.setitem(flask_app.config, "DATALAD_REGISTRY_COUNT_CAP", count_cap)
+
+        query_string = {"per_page": 1, "page": page}
+        if count_mode is not None:
+            query_string["count_mode"] = count_mode
+        resp = flask_client.get("/api/v2/dataset-urls", query_string=query_string)
+        assert resp.status_code == 200
+
+        ds_url_pg = DatasetURLPage.parse_raw(resp.text)
+        assert ds_url_pg.total == expected_total
+        assert ds_url_pg.total_is_exact is expected_total_is_exact
+        assert YURL(ds_url_pg.last_pg).query["page"] == str(expected_last_pg_num)
+        assert (ds_url_pg.next_pg is None) is (page == 4)
+
+    @pytest.mark.usefixtures("populate_with_std_ds_urls")
+    def test_estimated_count(self, flask_app, flask_client, monkeypatch):
+        """
+        Test the estimated count of the dataset URLs beyond the cap
+        """
+        monkeypatch.setitem(flask_app.config, "DATALAD_REGISTRY_COUNT_CAP", 2)
+
+        resp = flask_client.get(
+            "/api/v2/dataset-urls",
+            query_string={"per_page": 1, "count_mode": "estimated"},
+        )
+        assert resp.status_code == 200
+
+        ds_url_pg = DatasetURLPage.parse_raw(resp.text)
+        assert ds_url_pg.total_is_exact is False
+
+        # The estimate by the query planner is not to be relied on for
+        # such a small table, but it is never below the cap
+        assert ds_url_pg.total >= 2
+
     @pytest.mark.usefixtures("populate_with_std_ds_urls")
     @pytest.mark.parametrize(
         "query_params, expected_results_by_id_prefix",
@@ -682,6 +975,162 @@ class TestDatasetURLs:
             == expected_results_by_id_prefix
         )
 
+    @pytest.mark.parametrize(
+        "order_by", ["url", "annex_key_count", "last_update_dt", "git_objects_kb"]
+    )
+    @pytest.mark.parametrize("order_dir", ["asc", "desc"])
+    @pytest.mark.parametrize("per_page", [1, 2, 3, 100])
+    def test_cursor_pagination(
+        self, order_by, order_dir, per_page, flask_app, flask_client
+    ):
+        """
+        Test that walking through the dataset URLs with cursor pagination
+        yields the same ordering as page-number pagination,
+        ties and nulls in the ordering key included
+        """
+        populate_with_dataset_urls(
+            [
+                RepoUrl(
+                    url=f"https://www.example.com/{i}",
+                    annex_key_count=annex_key_count,
+                    git_objects_kb=git_objects_kb,
+                    last_update_dt=last_update_dt,
+                )
+                for i, (annex_key_count, git_objects_kb, last_update_dt) in enumerate(
+                    [
+                        (
+                            3,
+                            None,
+                            datetime(2008, 7, 18, 18, 34, 32, tzinfo=timezone.utc),
+                        ),
+                        (None, 10, None),
+                        (3, 10, datetime(2009, 7, 18, 18, 34, 32, tzinfo=timezone.utc)),
+                        (
+                            1,
+                            None,
+                            datetime(2008, 7, 18, 18, 34, 32, tzinfo=timezone.utc),
+                        ),
+                        (None, 5, None),
+                        (3, 20, datetime(2007, 7, 18, 18, 34, 32, tzinfo=timezone.utc)),
+                        (2, None, None),
+                    ]
+                )
+            ],
+            flask_app,
+        )
+        query_params = {"order_by": order_by, "order_dir": order_dir}
+
+        resp = flask_client.get(
+            "/api/v2/dataset-urls", query_string={**query_params, "per_page": 100}
+        )
+        assert resp.status_code == 200
+        expected_ids = [
+            url.id for url in DatasetURLPage.parse_raw(resp.text).dataset_urls
+        ]
+        assert len(expected_ids) == 7
+
+        ids = []
+        next_pg: Optional[str] = None
+        while True:
+            if next_pg is None:
+                resp = flask_client.get(
+                    "/api/v2/dataset-urls",
+                    query_string={**query_params, "per_page": per_page, "cursor": True},
+                )
+            else:
+                resp = flask_client.get(next_pg)
+
+            assert resp.status_code == 200
+
+            resp_json = resp.json
+            ds_url_pg = DatasetURLPage.parse_obj(resp_json)
+
+            # Check the absence of fields not applicable in cursor pagination
+            for field in (
+                "cur_pg_num",
+                "prev_pg",
+                "last_pg",
+                "total",
+                "total_is_exact",
+                "collection_stats",
+            ):
+                assert field not in resp_json
+
+            first_pg_lk = YURL(ds_url_pg.first_pg)
+            assert "after" not in first_pg_lk.query
+            assert "cursor" in first_pg_lk.query
+
+            assert len(ds_url_pg.dataset_urls) <= per_page
+            ids.extend(url.id for url in ds_url_pg.dataset_urls)
+
+            if ds_url_pg.next_pg is None:
+                break
+
+            next_pg_lk = YURL(ds_url_pg.next_pg)
+            assert "cursor" in next_pg_lk.query
+            assert next_pg_lk.query["per_page"] == str(per_page)
+            assert "after" in next_pg_lk.query
+
+            next_pg = ds_url_pg.next_pg
+
+        assert ids == expected_ids
+
+    @pytest.mark.usefixtures("populate_with_std_ds_urls")
+    @pytest.mark.parametrize(
+        "query_params, expecting_stats",
+        [
+            ({"cursor": True}, False),
+            ({"cursor": True, "with_stats": False}, False),
+            ({"cursor": True, "with_stats": True}, True),
+        ],
+    )
+    def test_cursor_pagination_stats(self, query_params, expecting_stats, flask_client):
+        """
+        Test that the collection stats are compiled in cursor pagination
+        only upon request
+        """
+        resp = flask_client.get("/api/v2/dataset-urls", query_string=query_params)
+        assert resp.status_code == 200
+
+        ds_url_pg = DatasetURLPage.parse_raw(resp.text)
+
+        if expecting_stats:
+            assert ds_url_pg.collection_stats is not None
+            assert ds_url_pg.collection_stats.summary.ds_count == 4
+        else:
+            assert ds_url_pg.collection_stats is None
+
+    @pytest.mark.usefixtures("populate_with_std_ds_urls")
+    @pytest.mark.parametrize(
+        "query_params",
+        [
+            # Not a base64 encoding
+            {"after": "@@@"},
+            # Not JSON
+            {"after": "bm90IGpzb24"},
+            # Not a list of 4 elements: `["url", "asc", "a"]`
+            {"after": "WyJ1cmwiLCJhc2MiLCJhIl0"},
+            # Invalid ID: `["last_update_dt", "desc", null, "a"]`
+            {"after": "WyJsYXN0X3VwZGF0ZV9kdCIsImRlc2MiLG51bGwsImEiXQ"},
+            # Invalid value: `["last_update_dt", "desc", "now", 1]`
+            {"after": "WyJsYXN0X3VwZGF0ZV9kdCIsImRlc2MiLCJub3ciLDFd"},
+            # For a different ordering: `["url", "asc", "a", 1]`
+            {"after": "WyJ1cmwiLCJhc2MiLCJhIiwxXQ"},
+            # For a different ordering direction: `["url", "asc", "a", 1]`
+            {"after": "WyJ1cmwiLCJhc2MiLCJhIiwxXQ", "order_by": "url"},
+        ],
+    )
+    def test_cursor_pagination_invalid_cursor(self, query_params, flask_client):
+        """
+        Test cursor pagination with an invalid cursor
+        """
+        resp = flask_client.get(
+            "/api/v2/dataset-urls",
+            query_string={"cursor": True, "order_dir": "desc", **query_params},
+        )
+        assert resp.status_code == 400
+        assert "cursor" in resp.json["description"]
+
     @pytest.mark.parametrize(
         "query_params, expected_stats",
         [
@@ -918,6 +1367,334 @@ class TestDatasetURLs:
 
         assert DatasetURLPage.parse_raw(resp.text).collection_stats == expected_stats
 
+    @pytest.mark.usefixtures("populate_with_std_ds_urls")
+    @pytest.mark.parametrize(
+        "query_params, expecting_snapshot_stats",
+        [
+            ({}, True),
+            ({"per_page": 2, "order_by": "url"}, True),
+            ({"url": "https://www.example.com"}, False),
+            ({"search": "datalad"}, False),
+        ],
+    )
+    def test_stats_snapshot(
+        self, query_params, expecting_snapshot_stats, flask_app, flask_client
+    ):
+        """
+        Test that the precomputed snapshot of the stats of the entire collection
+        is used only when the dataset URLs are not filtered
+        """
+        snapshot_stats = CollectionStats(
+            datalad_ds_stats=DataladDsCollectionStats(
+                unique_ds_stats=AnnexDsCollectionStats(
+                    ds_count=0, annexed_files_size=None, annexed_file_count=None
+                ),
+                stats=AnnexDsCollectionStats(
+                    ds_count=0, annexed_files_size=None, annexed_file_count=None
+                ),
+            ),
+            pure_annex_ds_stats=AnnexDsCollectionStats(
+                ds_count=0, annexed_files_size=None, annexed_file_count=None
+            ),
+            non_annex_ds_stats=NonAnnexDsCollectionStats(ds_count=42),
+            summary=StatsSummary(unique_ds_count=42, ds_count=42),
+        )
+
+        with flask_app.app_context():
+            db.session.add(
+                CollectionStatsSnapshot(
+                    stats=snapshot_stats.dict(),
+                    computed_dt=datetime.now(timezone.utc),
+                )
+            )
+            db.session.commit()
+
+        resp = flask_client.get("/api/v2/dataset-urls", query_string=query_params)
+        assert resp.status_code == 200
+
+        stats = DatasetURLPage.parse_raw(resp.text).collection_stats
+
+        if expecting_snapshot_stats:
+            assert stats == snapshot_stats
+        else:
+            assert stats != snapshot_stats
+            assert stats.summary.ds_count < 4
+
+    def test_declaration_marks_stats_snapshot_stale(self, flask_app, flask_client):
+        """
+        Test that the declaration of a new dataset URL marks the precomputed
+        snapshot of the stats of the entire collection stale
+        """
+        with flask_app.app_context():
+            # The first snapshot is stale until it is confirmed by the next refresh
+            refresh_collection_stats_snapshot()
+            refresh_collection_stats_snapshot()
+            assert not db.session.execute(
+                select(CollectionStatsSnapshot.is_stale)
+            ).scalar_one()
+
+        resp = flask_client.post(
+            "/api/v2/dataset-urls", json={"url": "https://www.example.com"}
+        )
+        assert resp.status_code == 201
+
+        with flask_app.app_context():
+            assert db.session.execute(
+                select(CollectionStatsSnapshot.is_stale)
+            ).scalar_one()
+
+    @pytest.mark.usefixtures("populate_with_std_ds_urls")
+    def test_conditional_requests(self, flask_app, flask_client):
+        """
+        Test the responses to conditional requests, which are validated by
+        the version of the content of the registry
+        """
+        query_string = {"per_page": 2, "search": "example"}
+
+        resp = flask_client.get("/api/v2/dataset-urls", query_string=query_string)
+        assert resp.status_code == 200
+        etag, is_weak = resp.get_etag()
+        assert etag is not None and not is_weak
+        assert "Last-Modified" not in resp.headers
+        assert resp.cache_control.public
+        assert resp.cache_control.no_cache
+
+        # The current representation is validated by the entity tag
+        # without running the search
+        with record_sql_statements(flask_app) as statements:
+            resp = flask_client.get(
+                "/api/v2/dataset-urls",
+                query_string=query_string,
+                headers={"If-None-Match": resp.headers["ETag"]},
+            )
+        assert resp.status_code == 304
+        assert resp.data == b""
+        assert resp.get_etag() == (etag, False)
+        assert not any("FROM repo_url" in s for s in statements)
+
+        # The current representation is not validated by a modification time,
+        # which can't tell apart the versions within the same second
+        resp = flask_client.get(
+            "/api/v2/dataset-urls",
+            query_string=query_string,
+            headers={"If-Modified-Since": "Fri, 01 Jan 2100 00:00:00 GMT"},
+        )
+        assert resp.status_code == 200
+
+        # Change the content of the registry
+        with flask_app.app_context():
+            db.session.add(RepoUrl(url="https://www.example.org"))
+            db.session.commit()
+
+        resp = flask_client.get(
+            "/api/v2/dataset-urls",
+            query_string=query_string,
+            headers={"If-None-Match": f'"{etag}"'},
+        )
+        assert resp.status_code == 200
+        assert resp.get_etag()[0] != etag
+        assert "https://www.example.org" in resp.text
+
+    @pytest.mark.usefixtures("populate_with_std_ds_urls")
+    def test_response_cache(self, flask_app, flask_client, monkeypatch):
+        """
+        Test that the responses are served from the response cache for as long as
+        the content of the registry is unchanged
+        """
+        monkeypatch.setitem(
+            flask_app.extensions,
+            RESPONSE_CACHE_EXT_KEY,
+            MemoryResponseCache(max_bytes=1024 * 1024),
+        )
+
+        def get(query_string: dict) -> tuple[Response, list[str]]:
+            with record_sql_statements(flask_app) as statements_:
+                resp_ = flask_client.get(
+                    "/api/v2/dataset-urls", query_string=query_string
+                )
+            assert resp_.status_code == 200
+            return resp_, statements_
+
+        resp, statements = get({"search": "example", "per_page": 2})
+        assert any("FROM repo_url" in s for s in statements)
+        total = DatasetURLPage.parse_raw(resp.text).total
+
+        # The same request, with the query parameters in a different order,
+        # is served from the cache
+        cached_resp, statements = get({"per_page": 2, "search": "example"})
+        assert not any("FROM repo_url" in s for s in statements)
+        assert cached_resp.data == resp.data
+        assert cached_resp.content_type == resp.content_type
+        assert cached_resp.headers["ETag"] == resp.headers["ETag"]
+
+        # A different request is not served from the cache
+        _, statements = get({"search": "example", "per_page": 3})
+        assert any("FROM repo_url" in s for s in statements)
+
+        # Change the content of the registry
+        with flask_app.app_context():
+            db.session.add(RepoUrl(url="https://www.example.org"))
+            db.session.commit()
+
+        resp, statements = get({"search": "example", "per_page": 2})
+        assert any("FROM repo_url" in s for s in statements)
+        assert resp.headers["ETag"] != cached_resp.headers["ETag"]
+        assert DatasetURLPage.parse_raw(resp.text).total == total + 1
+
+    def test_conditional_requests_cache_max_age(
+        self, flask_app, flask_client, monkeypatch
+    ):
+        monkeypatch.setitem(flask_app.config, "DATALAD_REGISTRY_CACHE_MAX_AGE", 600)
+
+        resp = flask_client.get("/api/v2/dataset-urls")
+        assert resp.status_code == 200
+        assert resp.cache_control.public
+        assert resp.cache_control.max_age == 600
+        assert not resp.cache_control.no_cache
+
+    def test_conditional_requests_error_resp(self, flask_client):
+        """
+        Test that the error responses are not validated
+        """
+        resp = flask_client.get(
+            "/api/v2/dataset-urls", query_string={"search": "url:(a"}
+        )
+        assert resp.status_code == 400
+        assert "ETag" not in resp.headers
+        assert "Cache-Control" not in resp.headers
+
+
+def _parse_ndjson(data: bytes) -> list[DatasetURLRespModel]:
+    """
+    Parse the dataset URLs in an NDJSON export
+    """
+    text = data.decode()
+    assert text == "" or text.endswith("\n")
+    return [DatasetURLRespModel.parse_raw(line) for line in text.splitlines()]
+
+
+class TestExportDatasetURLs:
+    def test_empty(self, flask_client):
+        resp = flask_client.get("/api/v2/dataset-urls/export")
+        assert resp.status_code == 200
+        assert resp.mimetype == "application/x-ndjson"
+        assert resp.data == b""
+
+    @pytest.mark.usefixtures("populate_with_std_ds_urls")
+    @pytest.mark.parametrize(
+        "query_string",
+        [
+            {},
+            {"search": "datalad"},
+            {"search": "url:example OR url:dandi"},
+            {"min_annex_key_count": 40},
+            {"processed": False},
+        ],
+    )
+    def test_filter(self, query_string, flask_client):
+        """
+        Test that the export contains the dataset URLs, in the order of their IDs,
+        as they are listed by the dataset_urls endpoint given the same filters
+        """
+        resp = flask_client.get(
+            "/api/v2/dataset-urls/export", query_string=query_string
+        )
+        assert resp.status_code == 200
+        assert "Content-Encoding" not in resp.headers
+        exported = _parse_ndjson(resp.data)
+
+        resp = flask_client.get(
+            "/api/v2/dataset-urls", query_string={**query_string, "per_page": 100}
+        )
+        listed = DatasetURLPage.parse_raw(resp.text).dataset_urls
+
+        assert exported == sorted(listed, key=lambda u: u.id)
+
+    def test_invalid_search(self, flask_client):
+        resp = flask_client.get(
+            "/api/v2/dataset-urls/export", query_string={"search": "url:(a"}
+        )
+        assert resp.status_code == 400
+        assert resp.mimetype == "application/json"
+
+    @pytest.mark.usefixtures("populate_with_url_metadata")
+    @pytest.mark.parametrize(
+        "metadata_ret_opt, expecting_metadata_content",
+        [
+            (MetadataReturnOption.reference, False),
+            (MetadataReturnOption.content, True),
+        ],
+    )
+    def test_metadata_return(
+        self,
+        metadata_ret_opt,
+        expecting_metadata_content,
+        flask_app,
+        flask_client,
+        monkeypatch,
+    ):
+        """
+        Test the return of metadata in the export and that the dataset URLs, and
+        their metadata, are fetched from the database in batches
+        """
+        from datalad_registry.blueprints.api import dataset_urls
+
+        monkeypatch.setattr(dataset_urls, "_EXPORT_BATCH_SIZE", 3)
+        monkeypatch.setattr(dataset_urls, "_EXPORT_BATCH_SIZE_WITH_METADATA", 3)
+
+        with record_sql_statements(flask_app) as statements:
+            resp = flask_client.get(
+                "/api/v2/dataset-urls/export",
+                query_string={"return_metadata": metadata_ret_opt.value},
+            )
+            assert resp.status_code == 200
+            exported = _parse_ndjson(resp.data)
+
+        resp = flask_client.get(
+            "/api/v2/dataset-urls",
+            query_string={"return_metadata": metadata_ret_opt.value, "per_page": 100},
+        )
+        listed = DatasetURLPage.parse_raw(resp.text).dataset_urls
+        assert len(exported) == 4
+        assert exported == sorted(listed, key=lambda u: u.id)
+
+        # The metadata is loaded in a query per batch of dataset URLs
+        metadata_statements = [s for s in statements if "FROM url_metadata" in s]
+        assert len(metadata_statements) == 2
+        assert all(
+            ("extracted_metadata" in s) is expecting_metadata_content
+            for s in metadata_statements
+        )
+
+    @pytest.mark.usefixtures("populate_with_std_ds_urls")
+    @pytest.mark.parametrize(
+        "accept_encoding, expecting_gzip",
+        [
+            ("gzip", True),
+            ("gzip, deflate, br", True),
+            ("gzip;q=0", False),
+            ("identity", False),
+        ],
+    )
+    def test_gzip(self, accept_encoding, expecting_gzip, flask_client):
+        plain = flask_client.get("/api/v2/dataset-urls/export").data
+
+        resp = flask_client.get(
+            "/api/v2/dataset-urls/export",
+            headers={"Accept-Encoding": accept_encoding},
+        )
+        assert resp.status_code == 200
+        assert resp.headers["Vary"] == "Accept-Encoding"
+
+        if expecting_gzip:
+            assert resp.headers["Content-Encoding"] == "gzip"
+            assert gzip.decompress(resp.data) == plain
+        else:
+            assert "Content-Encoding" not in resp.headers
+            assert resp.data == plain
+
+        assert len(_parse_ndjson(plain)) == 4
+
 
 @pytest.mark.usefixtures("populate_with_2_dataset_urls")
 class TestDatasetURL:
@@ -938,3 +1715,35 @@ class TestDatasetURL:
 
         # Ensure the correct URL is fetched
         assert str(ds_url.url) == url
+
+    def test_conditional_requests(self, flask_app, flask_client):
+        resp = flask_client.get("/api/v2/dataset-urls/1")
+        assert resp.status_code == 200
+        etag = resp.headers["ETag"]
+
+        resp = flask_client.get(
+            "/api/v2/dataset-urls/1", headers={"If-None-Match": etag}
+        )
+        assert resp.status_code == 304
+
+        # Change the metadata of the dataset URL, which is part of the representation
+        # of the dataset URL
+        with flask_app.app_context():
+            db.session.add(
+                URLMetadata(
+                    dataset_describe="abc",
+                    dataset_version="cde",
+                    extractor_name="metalad_core",
+                    extractor_version="0.1.0",
+                    extraction_parameter={},
+                    extracted_metadata={},
+                    url_id=1,
+                )
+            )
+            db.session.commit()
+
+        resp = flask_client.get(
+            "/api/v2/dataset-urls/1", headers={"If-None-Match": etag}
+        )
+        assert resp.status_code == 200
+        assert resp.headers["ETag"] != etag
@@ -2,6 +2,7 @@ import pytest
 
 from datalad_registry.blueprints.api.url_metadata import URLMetadataModel
 from datalad_registry.models import RepoUrl, URLMetadata, db
+from datalad_registry.tests.tools import record_sql_statements
 
 
 @pytest.fixture
@@ -63,3 +64,64 @@ class TestURLMetadata:
         expected_metadata = populated_metadata[url_metadata_id - 1]
 
         assert returned_metadata == expected_metadata
+
+    @pytest.mark.usefixtures("populated_metadata")
+    def test_conditional_requests(self, flask_app, flask_client):
+        resp = flask_client.get("/api/v2/url-metadata/1")
+        assert resp.status_code == 200
+        etag = resp.headers["ETag"]
+        assert resp.cache_control.public
+        assert (
+            resp.cache_control.max_age
+            == flask_app.config["DATALAD_REGISTRY_URL_METADATA_CACHE_MAX_AGE"]
+        )
+
+        # The records have distinct entity tags
+        assert flask_client.get("/api/v2/url-metadata/2").headers["ETag"] != etag
+
+        # The current representation is validated without loading
+        # the extracted metadata
+        with record_sql_statements(flask_app) as statements:
+            resp = flask_client.get(
+                "/api/v2/url-metadata/1", headers={"If-None-Match": etag}
+            )
+        assert resp.status_code == 304
+        assert resp.headers["ETag"] == etag
+        assert not any("extracted_metadata" in s for s in statements)
+
+        # Restamp the record with a new version of the dataset
+        with flask_app.app_context():
+            url_metadata = db.session.get(URLMetadata, 1)
+            url_metadata.dataset_version = "efg"
+            url_metadata.dataset_describe = "def"
+            db.session.commit()
+
+        resp = flask_client.get(
+            "/api/v2/url-metadata/1", headers={"If-None-Match": etag}
+        )
+        assert resp.status_code == 200
+        assert resp.headers["ETag"] != etag
+        assert URLMetadataModel.parse_obj(resp.json).dataset_version == "efg"
+
+    @pytest.mark.usefixtures("populated_metadata")
+    def test_etag_of_app_version(self, flask_client, monkeypatch):
+        """
+        Test that the entity tag of a record changes with the version of the app
+        """
+        from datalad_registry.blueprints.api import url_metadata
+
+        etag = flask_client.get("/api/v2/url-metadata/1").headers["ETag"]
+
+        monkeypatch.setattr(url_metadata, "APP_VERSION", "0.0.0+other")
+
+        resp = flask_client.get(
+            "/api/v2/url-metadata/1", headers={"If-None-Match": etag}
+        )
+        assert resp.status_code == 200
+        assert resp.headers["ETag"] != etag
+
+    def test_conditional_requests_not_found(self, flask_client):
+        resp = flask_client.get(
+            "/api/v2/url-metadata/1", headers={"If-None-Match": "*"}
+        )
+        assert resp.status_code == 404
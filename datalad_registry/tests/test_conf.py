@@ -118,6 +118,16 @@ class TestBaseConfig:
                 "schedule": expected_usage_dashboard_sync_cycle_length,
                 "options": {"expires": expected_usage_dashboard_sync_cycle_length},
             },
+            "url-processing-dispatcher": {
+                "task": "datalad_registry.tasks.url_processing_dispatcher",
+                "schedule": 60.0 * 10,
+                "options": {"expires": 60.0 * 10},
+            },
+            "collection-stats-refresh": {
+                "task": "datalad_registry.tasks.refresh_collection_stats",
+                "schedule": 60.0 * 5,
+                "options": {"expires": 60.0 * 5},
+            },
         }
 
         if dispatch_cycle_length is not None:
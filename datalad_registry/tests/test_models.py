@@ -1,10 +1,18 @@
+from datetime import datetime, timezone
+import importlib.util
 from pathlib import Path
 
 from flask import current_app
 import pytest
 from sqlalchemy import select
 
-from datalad_registry.models import RepoUrl, db
+from datalad_registry.models import (
+    _VERSIONED_TABLE_EVENTS,
+    RegistryVersion,
+    RepoUrl,
+    URLMetadata,
+    db,
+)
 
 
 class TestRepoUrl:
@@ -37,3 +45,100 @@ class TestRepoUrl:
                     repo_url.cache_path_abs
                     == current_app.config["DATALAD_REGISTRY_DATASET_CACHE"] / cache_path
                 )
+
+
+class TestRegistryVersion:
+    @staticmethod
+    def _get_version() -> int:
+        return db.session.execute(select(RegistryVersion.version)).scalar_one()
+
+    def test_initial_version(self, flask_app):
+        with flask_app.app_context():
+            assert db.session.execute(select(RegistryVersion)).scalars().one()
+            assert self._get_version() == 0
+
+    def test_bumped_once_per_transaction(self, flask_app):
+        """
+        Test that the version is incremented once upon the commit of a transaction
+        that changes the content of the registry, however many changes it makes
+        """
+        with flask_app.app_context():
+            url1 = RepoUrl(url="https://www.example.com")
+            url2 = RepoUrl(url="https://www.datalad.org")
+            db.session.add_all([url1, url2])
+            db.session.flush()
+            url1.ds_id = "2a0b7b7b-a984-4c4a-844c-be3132291d7b"
+            db.session.add(
+                URLMetadata(
+                    dataset_describe="abc",
+                    dataset_version="cde",
+                    extractor_name="metalad_core",
+                    extractor_version="0.1.0",
+                    extraction_parameter={},
+                    extracted_metadata={},
+                    url=url2,
+                )
+            )
+            db.session.flush()
+
+            # The version is not incremented before the commit
+            assert self._get_version() == 0
+
+            db.session.commit()
+            assert self._get_version() == 1
+
+            db.session.delete(url2.metadata_[0])
+            db.session.commit()
+            assert self._get_version() == 2
+
+            url2.processed = True
+            db.session.commit()
+            assert self._get_version() == 3
+
+    def test_not_bumped_by_rolled_back_transaction(self, flask_app):
+        with flask_app.app_context():
+            db.session.add(RepoUrl(url="https://www.example.com"))
+            db.session.flush()
+            db.session.rollback()
+
+            assert self._get_version() == 0
+
+    def test_not_bumped_by_scheduling(self, flask_app):
+        """
+        Test that the changes to the columns of `RepoUrl` used only to schedule
+        the checks for update and the processing of the URLs don't increment
+        the version
+        """
+        with flask_app.app_context():
+            url = RepoUrl(url="https://www.example.com")
+            db.session.add(url)
+            db.session.commit()
+            assert self._get_version() == 1
+
+            now = datetime.now(timezone.utc)
+            url.chk_req_dt = now
+            url.next_chk_dt = now
+            url.n_failed_chks = 1
+            url.n_unchanged_chks = 2
+            url.processing_pending = True
+            db.session.commit()
+            assert self._get_version() == 1
+
+    def test_versioned_repo_url_cols_of_migration(self):
+        """
+        Test that the trigger of `repo_url` created by the migration and the one
+        created along with the tables fire upon the changes to the same columns
+        """
+        migration_path = (
+            Path(__file__).parents[2]
+            / "migrations/versions/5b9e2d7c1a04_add_registry_version.py"
+        )
+        spec = importlib.util.spec_from_file_location("migration", migration_path)
+        assert spec is not None and spec.loader is not None
+        migration = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(migration)
+
+        assert (
+            migration._VERSIONED_TABLE_EVENTS["repo_url"]
+            == _VERSIONED_TABLE_EVENTS["repo_url"]
+        )
@@ -4,6 +4,13 @@ from bs4 import BeautifulSoup
 import pytest
 from yarl import URL as YURL
 
+from datalad_registry.conf import CountMode
+from datalad_registry.tests.tools import record_sql_statements
+from datalad_registry.utils.response_cache import (
+    RESPONSE_CACHE_EXT_KEY,
+    MemoryResponseCache,
+)
+
 
 class TestOverView:
     @pytest.mark.usefixtures("populate_with_std_ds_urls")
@@ -206,6 +213,24 @@ class TestOverView:
         assert (error_span := soup.find("span", class_="error"))
         assert error_span.text.startswith(f"ERROR: {err_msg_prefix}")
 
+    @pytest.mark.usefixtures("populate_with_std_ds_urls")
+    def test_search_rejected_by_db(self, flask_client):
+        """
+        Test searching with a regular expression that is valid in Python but is
+        rejected by PostgreSQL
+        """
+
+        resp = flask_client.get("/overview/", query_string={"query": 'url:~"(?P<x>a)"'})
+        assert resp.status_code == 400
+
+        soup = BeautifulSoup(resp.text, "html.parser")
+
+        assert (error_span := soup.find("span", class_="error"))
+        assert error_span.text.startswith("ERROR: invalid regular expression")
+
+        # All the dataset URLs are listed in place of the search results
+        assert len(soup.body.table.find_all("tr")[1:]) == 4
+
     def test_pagination(self, populate_with_std_ds_urls, flask_client):
         """
         Test pagination in Web UI
@@ -274,6 +299,42 @@ class TestOverView:
 
         assert ds_urls == set(populate_with_std_ds_urls)
 
+    @pytest.mark.usefixtures("populate_with_std_ds_urls")
+    @pytest.mark.parametrize(
+        "count_mode, count_cap, page, expected_page_items",
+        [
+            (CountMode.exact, 2, 1, "1 - 1 of 4"),
+            (CountMode.capped, 4, 1, "1 - 1 of 4"),
+            (CountMode.capped, 2, 1, "1 - 1 of 2+"),
+            (CountMode.capped, 2, 4, "4 - 4 of 4"),
+            (CountMode.estimated, 2, 2, "2 - 2 of about"),
+        ],
+    )
+    def test_total_count(
+        self,
+        count_mode,
+        count_cap,
+        page,
+        expected_page_items,
+        flask_app,
+        flask_client,
+        monkeypatch,
+    ):
+        """
+        Test the display of the total number of dataset URLs in the pagination widget
+        """
+        monkeypatch.setitem(flask_app.config, "DATALAD_REGISTRY_COUNT_MODE", count_mode)
+        monkeypatch.setitem(flask_app.config, "DATALAD_REGISTRY_COUNT_CAP", count_cap)
+
+        resp = flask_client.get(
+            "/overview/", query_string={"per_page": 1, "page": page}
+        )
+        assert resp.status_code == 200
+
+        soup = BeautifulSoup(resp.text, "html.parser")
+        page_items = " ".join(soup.find("div", {"class": "page-items"}).text.split())
+        assert page_items.startswith(expected_page_items)
+
     @pytest.mark.usefixtures("populate_with_url_metadata")
     def test_metadata(self, flask_client):
         """
@@ -296,3 +357,55 @@ class TestOverView:
             "https://handbook.datalad.org": {"metalad_core"},
             "https://www.dandiarchive.org": set(),
         }
+
+    @pytest.mark.usefixtures("populate_with_url_metadata")
+    def test_metadata_queries(self, flask_app, flask_client):
+        """
+        Test that the references to the metadata in the overview page are loaded
+        in a single query without the content of the metadata
+        """
+        with record_sql_statements(flask_app) as statements:
+            resp = flask_client.get("/overview/")
+
+        assert resp.status_code == 200
+
+        metadata_statements = [s for s in statements if "FROM url_metadata" in s]
+        assert len(metadata_statements) == 1
+        assert "extracted_metadata" not in metadata_statements[0]
+
+    @pytest.mark.usefixtures("populate_with_std_ds_urls")
+    def test_conditional_requests(self, flask_app, flask_client):
+        resp = flask_client.get("/overview/", query_string={"query": "example"})
+        assert resp.status_code == 200
+        etag = resp.headers["ETag"]
+
+        with record_sql_statements(flask_app) as statements:
+            resp = flask_client.get(
+                "/overview/",
+                query_string={"query": "example"},
+                headers={"If-None-Match": etag},
+            )
+        assert resp.status_code == 304
+        assert len(statements) == 1
+
+    @pytest.mark.usefixtures("populate_with_std_ds_urls")
+    def test_response_cache(self, flask_app, flask_client, monkeypatch):
+        monkeypatch.setitem(
+            flask_app.extensions,
+            RESPONSE_CACHE_EXT_KEY,
+            MemoryResponseCache(max_bytes=1024 * 1024),
+        )
+
+        resp = flask_client.get("/overview/", query_string={"query": "example"})
+        assert resp.status_code == 200
+
+        with record_sql_statements(flask_app) as statements:
+            cached_resp = flask_client.get(
+                "/overview/", query_string={"query": "example"}
+            )
+        assert cached_resp.status_code == 200
+        assert cached_resp.data == resp.data
+        assert cached_resp.mimetype == "text/html"
+
+        # Only the version of the content of the registry is queried
+        assert len(statements) == 1
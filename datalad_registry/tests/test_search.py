@@ -1,13 +1,18 @@
 # This test module contains fixtures and tests for the search functionality
 # enabled by the datalad_registry/search.py module.
 
-from lark.exceptions import VisitError
+import json
+from random import Random
+import re
+
+from lark.exceptions import UnexpectedInput
 import pytest
-from sqlalchemy import select
+from sqlalchemy import select, text, update
+from sqlalchemy.dialects import postgresql
 
-from datalad_registry.models import RepoUrl, URLMetadata, db
+from datalad_registry.models import DatasetFile, RepoUrl, URLMetadata, db
 
-from ..search import parse_query
+from ..search import _get_parser, get_query_cache_info, parse_query, transformer
 
 
 @pytest.fixture
@@ -46,11 +51,70 @@ def populate_with_url_metadata_for_search(
             extracted_metadata=dict(meta1="meta1value", meta2="meta2value"),
             url_id=2,
         ),
+        URLMetadata(
+            dataset_describe="1234",
+            dataset_version="1.0.0",
+            extractor_name="bids_dataset",
+            extractor_version="0.0.1",
+            extraction_parameter={},
+            extracted_metadata={
+                "Name": "Haxby study",
+                "Authors": ["James Haxby", "Jim Doe"],
+                "BIDSVersion": "1.6.0",
+                "Funding": {"Agency name": "NIH"},
+                "year": 2020,
+            },
+            url_id=3,
+        ),
+    ]
+
+    file_lst = [
+        DatasetFile(
+            url_metadata_id=1,
+            path="sub-01/anat/sub-01_T1w.nii.gz",
+            size=100,
+            content_type=None,
+            annex_key="MD5E-s100--0123456789abcdef0123456789abcdef.nii.gz",
+        ),
+        DatasetFile(
+            url_metadata_id=3,
+            path="sub-02/func/sub-02_task-rest_bold.nii.gz",
+            size=200,
+            content_type=None,
+            annex_key="MD5E-s200--fedcba9876543210fedcba9876543210.nii.gz",
+        ),
+        DatasetFile(
+            url_metadata_id=3,
+            path="sub-02/anat/sub-02_T1w.json",
+            size=10,
+            content_type="application/json",
+            annex_key=None,
+        ),
     ]
 
     with flask_app.app_context():
         for metadata in metadata_lst:
             db.session.add(metadata)
+        db.session.flush()
+        for file in file_lst:
+            db.session.add(file)
+        db.session.execute(
+            update(RepoUrl)
+            .filter_by(id=2)
+            .values(
+                tags=json.dumps(
+                    [
+                        {"name": "v1.0", "hexsha": "d5e3b1c07a9f"},
+                        {"name": "0.2.0", "hexsha": "8b2f0a64c3de"},
+                    ]
+                )
+            )
+        )
+        db.session.execute(
+            update(RepoUrl)
+            .filter_by(id=3)
+            .values(tags=json.dumps([{"name": "v1.0.1", "hexsha": "f41c7e92b08a"}]))
+        )
         db.session.commit()
 
 
@@ -60,7 +124,24 @@ def populate_with_url_metadata_for_search(
         ("unknown_field:example", ValueError, None),
         # Lark masks exceptions. We did not provide dedicated ones for all
         # of them, but let's test that error message as expected
-        ("ds_id:=example", VisitError, "Operation = is not implemented"),
+        (
+            "branches:>master",
+            ValueError,
+            "Operation > is not supported for field branches",
+        ),
+        ("tags:>v1.0", ValueError, "Operation > is not supported for field tags"),
+        ("metadata:=example", ValueError, "Operation = is not supported for field"),
+        (
+            "metadata[metalad_core]:>example",
+            ValueError,
+            "Operation > is not supported for field metadata[...]",
+        ),
+        ('url:~"(example"', ValueError, "Invalid regular expression"),
+        (
+            'metadata[bids_dataset][Authors]:~"(example"',
+            ValueError,
+            "Invalid regular expression",
+        ),
         # r'(haxby or halchenko) AND '
         # r'metadata:BIDSmetadata[bids_dataset,metalad_core]:'
         # r'"BIDSVersion\": \"v"',
@@ -140,6 +221,68 @@ def test_with_invalid_query(query, exc, err):
         ('metadata[metalad_core]:"value"', [1, 2]),
         # OR among multiple listed, ok to have unknown
         ('metadata[metalad_core,metalad_studyminimeta,unknown]:"value"', [1, 2]),
+        ("file:T1w", [1, 2]),
+        ("file:T1w.nii", [1]),
+        ("file:sub-02_", [2]),
+        ('file:"anat/sub-01"', [1]),
+        ("file:anat_", []),
+        ("T1w.json", [2]),
+        # exact match
+        ('url:="https://handbook.datalad.org"', [3]),
+        ("url:=handbook.datalad.org", []),
+        ('url:="HTTPS://handbook.datalad.org"', []),  # case sensitive
+        ("ds_id:=2a0b7b7b-a984-4c4a-844c-be3132291d7c", [2]),
+        ("head_describe:=1234", [1, 2, 3]),
+        ("head_describe:=123", []),
+        ("branches:=master", []),
+        ("tags:v1.0", [2, 3]),
+        ("tags:=v1.0", [2]),
+        ("tags:=0.2.0", [2]),
+        ("tags:=v1.0.1", [3]),
+        ("tags:=v1", []),
+        ("tags:=V1.0", []),  # case sensitive
+        ('tags:="[\\"v1.0\\", \\"0.2.0\\"]"', []),
+        ("tags:=d5e3b1c07a9f", []),  # the hexsha of a tag is not its name
+        ("tags:=name", []),
+        ('file:="sub-01/anat/sub-01_T1w.nii.gz"', [1]),
+        ("file:=sub-01_T1w.nii.gz", []),
+        # greater than, as strings
+        ("ds_id:>2a0b7b7b-a984-4c4a-844c-be3132291b", [1, 2]),
+        ("ds_id:>2a0b7b7b-a984-4c4a-844c-be3132291d7b", [2]),
+        ("head_describe:>1234", []),
+        ("NOT ds_id:>2a0b7b7b-a984-4c4a-844c-be3132291b", [3, 4]),
+        # regex match (case-insensitive)
+        ('ds_id:~"^2a0b7b7b-.*d7[bc]$"', [1, 2]),
+        ('ds_id:~"D7C$"', [2]),
+        (r'url:~"^https://www\."', [1, 4]),
+        ("url:~datalad.org", [2, 3]),
+        ('metadata:~"meta[13]value"', [1, 2]),
+        ('metadata[metalad_core]:~"^.*meta1value"', [2]),
+        ('metadata[metalad_studyminimeta]:~"meta[13]value"', []),
+        (r'file:~"\.nii\.gz$"', [1, 2]),
+        ('file:~"json$"', [2]),
+        # values at paths in metadata
+        ("metadata[bids_dataset][Authors]:haxby", [3]),
+        ('metadata[bids_dataset][Authors]:"s h"', [3]),
+        ('metadata[bids_dataset][Authors]:"haxby."', []),
+        ("metadata[bids_dataset][Name]:haxby", [3]),
+        ("metadata[bids_dataset][BIDSVersion]:haxby", []),
+        ("metadata[metalad_core][Authors]:haxby", []),
+        ("NOT metadata[bids_dataset][Authors]:haxby", [1, 2, 4]),
+        ("metadata[metalad_core][meta1]:meta1", [2]),
+        ("metadata[metalad_core, bids_dataset][meta1]:value", [1, 2]),
+        ('metadata[bids_dataset][Authors]:="Jim Doe"', [3]),
+        ('metadata[bids_dataset][Authors]:="jim doe"', []),
+        ("metadata[metalad_core][meta1]:=meta3value", [1]),
+        ('metadata[bids_dataset][Funding]["Agency name"]:=NIH', [3]),
+        ("metadata[bids_dataset][Funding]:=NIH", []),
+        ("metadata[bids_dataset][year]:=2020", [3]),
+        ("metadata[metalad_studyminimeta][c]:=3", [1]),
+        ("metadata[bids_dataset][year]:>2019", [3]),
+        ("metadata[bids_dataset][year]:>2020", []),
+        ("metadata[bids_dataset][BIDSVersion]:>1.5", [3]),
+        ('metadata[bids_dataset][Authors]:~"^j.*doe$"', [3]),
+        ('metadata[bids_dataset][Authors]:~"^haxby"', []),
         # Prototypical query for which we do not have full support yet, e.g.
         # regex matching :~
         #  (r"""((jim AND NOT haxby AND "important\" paper") OR
@@ -147,8 +290,6 @@ def test_with_invalid_query(query, exc, err):
         #   OR url:"example.com") AND metadata:non
         #   AND metadata[ex1,ex2]:"specific data"
         #   AND metadata[extractor2]:data""", []),
-        # Find datasets with the last
-        #  (metadata[bids_dataset][Authors][-1]:haxby ...)
     ],
 )
 def test_with_valid_query(flask_app, query, expected):
@@ -158,7 +299,316 @@ def test_with_valid_query(flask_app, query, expected):
     r = parse_query(query)
     # print(f"QUERY {query}: {r}")
     with flask_app.app_context():
-        result = db.session.execute(select(RepoUrl).filter(r))
+        result = db.session.execute(select(RepoUrl).filter(r).order_by(RepoUrl.id))
         hits = [_.id for _ in result.scalars().all()]
         # print(expected, hits)
         assert hits == expected
+
+
+@pytest.mark.usefixtures("populate_with_url_metadata_for_search")
+@pytest.mark.parametrize(
+    "query, expected_index",
+    [
+        ("url:handbook", "ix_repo_url_url_trgm"),
+        ("ds_id:844c", "ix_repo_url_ds_id_trgm"),
+        ("head_describe:1234", "ix_repo_url_head_describe_trgm"),
+        ("branches:master", "ix_repo_url_branches_text_trgm"),
+        ("metadata:meta1value", "ix_url_metadata_extracted_metadata_text_trgm"),
+        (
+            "metadata[metalad_core]:meta1value",
+            "ix_url_metadata_extracted_metadata_text_trgm",
+        ),
+        ("file:T1w.nii", "ix_dataset_file_path_trgm"),
+    ],
+)
+def test_search_uses_trgm_index(flask_app, query, expected_index):
+    """
+    Test that the searches are answered through the trigram indexes
+    """
+    assert expected_index in _get_query_plan(flask_app, query)
+
+
+@pytest.mark.usefixtures("populate_with_url_metadata_for_search")
+@pytest.mark.parametrize(
+    "query, expected_index",
+    [
+        ('url:="https://www.example.com"', "repo_url_url_key"),
+        ("ds_id:=2a0b7b7b-a984-4c4a-844c-be3132291d7c", "ix_repo_url_ds_id"),
+        ("head:=abc", "ix_repo_url_head"),
+        ("head_describe:=1234", "ix_repo_url_head_describe"),
+        ("ds_id:>2a0b7b7b-a984-4c4a-844c-be3132291b", "ix_repo_url_ds_id"),
+        ('ds_id:~"^2a0b7b7b"', "ix_repo_url_ds_id_trgm"),
+        ('url:~"datalad\\.org$"', "ix_repo_url_url_trgm"),
+        ('file:="sub-01/anat/sub-01_T1w.nii.gz"', "ix_dataset_file_path_trgm"),
+        (
+            'metadata[bids_dataset][Authors]:="Jim Doe"',
+            "ix_url_metadata_extracted_metadata_path_ops",
+        ),
+        (
+            "metadata[bids_dataset][year]:=2020",
+            "ix_url_metadata_extracted_metadata_path_ops",
+        ),
+    ],
+)
+def test_operator_search_uses_index(flask_app, query, expected_index):
+    """
+    Test that the searches with the `=`, `>`, and `~` operators are answered through
+    the btree, the trigram, and the `jsonb_path_ops` indexes
+    """
+    plan = _get_query_plan(flask_app, query)
+    assert re.search(rf"\b{expected_index}\b", plan), plan
+
+
+_PLAN_FILLER_STMTS = [
+    "INSERT INTO repo_url "
+    "(url, ds_id, head, head_describe, processed, processing_pending, "
+    "n_failed_chks, n_unchanged_chks) "
+    "SELECT 'https://filler.test/' || i, md5('ds_id' || i), md5('head' || i), "
+    "'filler-' || i, true, false, 0, 0 FROM generate_series(1, 10000) AS i",
+    "INSERT INTO url_metadata "
+    "(dataset_describe, dataset_version, extractor_name, extractor_version, "
+    "extraction_parameter, extracted_metadata, url_id) "
+    "SELECT head_describe, head_describe, 'bids_dataset', '0', '{}', "
+    "jsonb_build_object('Authors', jsonb_build_array(ds_id, head)), id "
+    "FROM repo_url WHERE url LIKE 'https://filler.test/%'",
+    "INSERT INTO dataset_file (url_metadata_id, path) "
+    "SELECT id, 'filler/' || md5(id::text) FROM url_metadata "
+    "WHERE dataset_version LIKE 'filler-%'",
+    # Move the filler records from the pending lists of the GIN indexes into
+    # the indexes proper, as autovacuum would, lest the planner shun the indexes
+    "SELECT gin_clean_pending_list(c.oid) FROM pg_class AS c "
+    "JOIN pg_am AS a ON c.relam = a.oid WHERE a.amname = 'gin'",
+    "ANALYZE repo_url, url_metadata, dataset_file",
+]
+
+
+def _get_query_plan(flask_app, query: str) -> str:
+    """
+    Get the plan of the query of the dataset URLs satisfying a given search query
+    """
+    with flask_app.app_context():
+        # Fill the tables with records that satisfy none of the searches, within
+        # the transaction rolled back at the end of the app context, and gather
+        # statistics so that the planner chooses among the indexes as it would
+        # on a populated database, instead of by the defaults for empty tables
+        for stmt in _PLAN_FILLER_STMTS:
+            db.session.execute(text(stmt))
+
+        # Disable sequential scans so that the planner uses an index, if it can
+        db.session.execute(text("SET LOCAL enable_seqscan = off"))
+
+        compiled = (
+            select(RepoUrl)
+            .filter(parse_query(query))
+            .compile(
+                dialect=db.engine.dialect, compile_kwargs={"render_postcompile": True}
+            )
+        )
+        return "\n".join(
+            db.session.connection()
+            .exec_driver_sql(f"EXPLAIN {compiled}", compiled.params)
+            .scalars()
+        )
+
+
+def test_query_cache():
+    """
+    Test that the SQLAlchemy expressions of the parsed queries are cached
+    """
+    query = "url:query-cache-test OR NOT metadata:query-cache-test"
+
+    criteria = parse_query(query)
+    info = get_query_cache_info()
+
+    assert parse_query(query) is criteria
+    assert get_query_cache_info().hits == info.hits + 1
+    assert get_query_cache_info().misses == info.misses
+
+
+def test_query_cache_with_invalid_query():
+    """
+    Test that the failures to parse invalid queries are not cached
+    """
+    query = "url:(query-cache-test"
+    info = get_query_cache_info()
+
+    for _ in range(2):
+        with pytest.raises(UnexpectedInput):
+            parse_query(query)
+
+    assert get_query_cache_info().hits == info.hits
+    assert get_query_cache_info().misses == info.misses + 2
+
+
+def _get_outcome(parser: str, query: str):
+    """
+    Get the outcome of parsing a query with a given parser and transforming
+    the parse tree into an SQLAlchemy expression
+
+    :return: The SQL, with the values rendered inline, of the expression if the query
+             is successfully parsed and transformed, "syntax error" if the query
+             is rejected by the parser, or the type and message of the exception
+             raised in the transformation
+    """
+    try:
+        tree = _get_parser(parser).parse(query)
+    except UnexpectedInput:
+        return "syntax error"
+
+    try:
+        criteria = transformer.transform(tree)
+    except Exception as e:
+        return type(e), str(e)
+
+    return str(
+        criteria.compile(
+            dialect=postgresql.dialect(), compile_kwargs={"literal_binds": True}
+        )
+    )
+
+
+# Queries for which the LALR parser is to behave as the Earley parser
+_DIFFERENTIAL_QUERIES = [
+    "haxby",
+    "url",
+    "OR",
+    "AND",
+    "ORx",
+    "metadata",
+    '"quoted string"',
+    r'"escaped \"quote\""',
+    "url:example",
+    "url : example",
+    "url:OR",
+    'url:"a b"',
+    "ds_id:844c AND head:1234",
+    "head_describe:v1.0",
+    "tags:v1 branches:master",
+    "file:T1w.nii.gz",
+    "metadata:BIDSVersion",
+    "metadata :BIDSVersion",
+    "metadata[bids_dataset]:T1w",
+    "metadata [bids_dataset]:T1w",
+    "metadata[bids_dataset,metalad_core]:T1w",
+    "metadata[bids_dataset][Authors]:Haxby",
+    'metadata[bids_dataset, dandi] ["Funding"][ "Agency name"]:=NIH',
+    "metadata[bids_dataset][year]:>2019",
+    'metadata[bids_dataset][Authors]:~"^j.*doe$"',
+    "metadata[bids_dataset][]:x",
+    "metadata[bids_dataset][a,b]:x",
+    "metadata[bids_dataset][a]",
+    "url[a]:x",
+    'metadata[bids_dataset, metalad_core]:"T1w image"',
+    "a b c",
+    "a OR b OR c",
+    "a AND b AND c",
+    "a OR b AND c OR d",
+    "(a OR b) c",
+    "a (b OR c)",
+    "NOT a",
+    "NOT (a OR b)",
+    "a AND NOT b",
+    "((a))",
+    "url:?foo",
+    "url:??foo",
+    "url:=foo",
+    "url:>foo",
+    "url:~foo",
+    "unknown_field:example",
+    "OR:example",
+    "url:",
+    "metadata[]:x",
+    "metadata[x]",
+    "a:b:c",
+    "(a",
+    "a)",
+    "url:~^a",
+    " OR ".join(f"sub-{i:02d}" for i in range(30)),
+]
+
+
+@pytest.mark.parametrize("query", _DIFFERENTIAL_QUERIES)
+def test_lalr_parser_as_earley_parser(query):
+    """
+    Test that the LALR parser produces the same result as the Earley parser
+    of the reference grammar
+    """
+    assert _get_outcome("lalr", query) == _get_outcome("earley", query)
+
+
+def _generate_query(rng: Random, depth: int) -> str:
+    """
+    Generate a random query, free of the constructs for which the LALR parser
+    deliberately deviates from the Earley parser
+    """
+    if depth == 0 or rng.random() < 0.3:
+        value = rng.choice(["haxby", "sub-01", "T1w.nii", "v1.0", '"a b"', '"OR"'])
+        kind = rng.random()
+        if kind < 0.4:
+            return value
+        elif kind < 0.8:
+            field = rng.choice(["url", "ds_id", "metadata", "file", "unknown"])
+            return f"{field}:{value}"
+        else:
+            extractors = ",".join(rng.sample(["bids_dataset", "dandi", "x"], 2))
+            path = rng.choice(["", "[Authors]", '["a b"][c]'])
+            return f"metadata[{extractors}]{path}:{value}"
+
+    sep = rng.choice([" OR ", " AND ", " "])
+    operands = []
+    for _ in range(rng.randint(2, 3)):
+        operand = f"({_generate_query(rng, depth - 1)})"
+        if sep != " " and rng.random() < 0.3:
+            operand = f"NOT {operand}"
+        operands.append(operand)
+    return sep.join(operands)
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_lalr_parser_as_earley_parser_random(seed):
+    """
+    Test that the LALR parser produces the same results as the Earley parser
+    of the reference grammar for randomly generated queries
+    """
+    rng = Random(seed)
+    for _ in range(20):
+        query = _generate_query(rng, 3)
+        assert _get_outcome("lalr", query) == _get_outcome("earley", query), query
+
+
+@pytest.mark.parametrize(
+    "query, equivalent_query",
+    [
+        ("a OR", None),
+        ("a AND", None),
+        ("NOT", None),
+        ("a NOT b", "a AND NOT b"),
+        ("a OR b c", "(a OR b) c"),
+        ("a AND b c", "(a AND b) c"),
+        ("a ORb", 'a AND "ORb"'),
+    ],
+)
+def test_lalr_parser_deviations(query, equivalent_query):
+    """
+    Test the documented deviations of the LALR parser from the Earley parser
+    of the reference grammar
+
+    :param equivalent_query: A query that is to be parsed, by both parsers, as
+                             the query is parsed by the LALR parser. None if
+                             the query is to be rejected by the LALR parser.
+    """
+    if equivalent_query is None:
+        assert _get_outcome("lalr", query) == "syntax error"
+    else:
+        assert _get_outcome("lalr", query) == _get_outcome("earley", equivalent_query)
+
+
+def test_long_or_chain():
+    """
+    Test that a long OR-chain is parsed, into a flat OR expression, without
+    exhausting the Python stack
+    """
+    n = 2000
+    criteria = parse_query(" OR ".join(f"url:w{i}" for i in range(n)))
+
+    assert len(criteria.clauses) == n  # type: ignore[attr-defined]
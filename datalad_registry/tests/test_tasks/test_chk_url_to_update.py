@@ -1,10 +1,10 @@
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
 
 import pytest
 
 from datalad_registry.models import RepoUrl, db
-from datalad_registry.tasks import ChkUrlStatus, chk_url_to_update
+from datalad_registry.tasks import ChkUrlStatus, _schedule_next_chk, chk_url_to_update
 
 from . import FIXED_DATETIME_NOW_VALUE
 
@@ -95,6 +95,16 @@ class TestChkUrlToUpdate:
             # `url_id` is not modified
             assert repo_url.chk_req_dt == original_chk_req_dt
 
+            # Verify that the next check is scheduled without counting the failed
+            # check as an unchanged one, unless the maximum number of consecutive
+            # failed checks has been reached
+            assert repo_url.n_unchanged_chks == 0
+            assert repo_url.next_chk_dt == (
+                FIXED_DATETIME_NOW_VALUE + timedelta(hours=1)
+                if repo_url.n_failed_chks < 10
+                else None
+            )
+
     @pytest.mark.usefixtures("fix_datetime_now")
     @pytest.mark.parametrize(
         "repo_url_name, update_available, resulting_in_new_clone",
@@ -122,6 +132,7 @@ class TestChkUrlToUpdate:
         # to the operation of `chk_url_to_update`
         with flask_app.app_context():
             repo_url.n_failed_chks = 7
+            repo_url.n_unchanged_chks = 3
             repo_url.last_chk_dt = datetime(2023, 6, 18, 18, 33, 7, tzinfo=timezone.utc)
             repo_url.chk_req_dt = datetime(2023, 6, 17, 20, 33, 7, tzinfo=timezone.utc)
 
@@ -141,6 +152,16 @@ class TestChkUrlToUpdate:
         assert repo_url.last_chk_dt == FIXED_DATETIME_NOW_VALUE
         assert repo_url.chk_req_dt is None
 
+        # Verify the scheduling of the next check
+        if update_available:
+            assert repo_url.n_unchanged_chks == 0
+            assert repo_url.next_chk_dt == FIXED_DATETIME_NOW_VALUE + timedelta(hours=1)
+        else:
+            assert repo_url.n_unchanged_chks == 4
+            assert repo_url.next_chk_dt == FIXED_DATETIME_NOW_VALUE + timedelta(
+                hours=16
+            )
+
         if resulting_in_new_clone:
             assert repo_url.cache_path != original_cache_path
 
@@ -230,3 +251,47 @@ class TestChkUrlToUpdate:
 
             # The old clone should not have updated to the remote dataset
             assert old_clone.repo.get_hexsha() != remote_ds.repo.get_hexsha()
+
+
+@pytest.mark.parametrize(
+    "n_unchanged_chks, expected_interval",
+    [
+        (0, timedelta(hours=1)),
+        (1, timedelta(hours=2)),
+        (5, timedelta(hours=32)),
+        (8, timedelta(weeks=1)),  # Capped by the max check interval
+        (1000, timedelta(weeks=1)),
+    ],
+)
+def test_schedule_next_chk(n_unchanged_chks, expected_interval, flask_app):
+    """
+    Test the backoff of the interval between checks of a URL with the number of
+    consecutive checks that have found no update
+    """
+    repo_url = RepoUrl(
+        url="https://example.com", n_unchanged_chks=n_unchanged_chks, n_failed_chks=0
+    )
+
+    with flask_app.app_context():
+        _schedule_next_chk(repo_url, FIXED_DATETIME_NOW_VALUE)
+
+    assert repo_url.next_chk_dt == FIXED_DATETIME_NOW_VALUE + expected_interval
+
+
+@pytest.mark.parametrize("n_failed_chks", [10, 11])
+def test_schedule_next_chk_after_max_failed_chks(n_failed_chks, flask_app):
+    """
+    Test that no next check is scheduled for a URL of which the maximum number of
+    consecutive checks have failed
+    """
+    repo_url = RepoUrl(
+        url="https://example.com",
+        n_unchanged_chks=0,
+        n_failed_chks=n_failed_chks,
+        next_chk_dt=FIXED_DATETIME_NOW_VALUE,
+    )
+
+    with flask_app.app_context():
+        _schedule_next_chk(repo_url, FIXED_DATETIME_NOW_VALUE)
+
+    assert repo_url.next_chk_dt is None
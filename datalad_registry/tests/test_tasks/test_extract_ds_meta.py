@@ -3,7 +3,7 @@ import pytest
 
 from datalad_registry.blueprints.api.url_metadata import URLMetadataModel
 from datalad_registry.com_models import MetadataRecord, MetaExtractResult
-from datalad_registry.models import RepoUrl, URLMetadata, db
+from datalad_registry.models import DatasetFile, RepoUrl, URLMetadata, db
 from datalad_registry.tasks import ExtractMetaStatus, extract_ds_meta
 from datalad_registry.tasks.utils.builtin_meta_extractors import (
     InvalidRequiredFileError,
@@ -279,3 +279,79 @@ class TestExtractDsMeta:
         monkeypatch.setattr(tasks, "dlreg_meta_extract", mock_dlreg_meta_extract)
 
         assert extract_ds_meta(repo_url.id, "dandi") is ExtractMetaStatus.ABORTED
+
+    def test_file_recording_extractor(
+        self, repo_url_with_up_to_date_clone, monkeypatch, flask_app
+    ):
+        """
+        Test that the files of the dataset are recorded along with the metadata
+        extracted by a file recording extractor
+        """
+        repo_url = repo_url_with_up_to_date_clone[0]
+        ds_clone = repo_url_with_up_to_date_clone[2]
+
+        def mock_meta_extract(*_args, **_kwargs):
+            return []
+
+        def mock_parse_obj_as(*_args, **_kwargs):
+            return [
+                MetaExtractResult(
+                    action="meta_extract",
+                    status="ok",
+                    metadata_record=MetadataRecord(
+                        dataset_version=ds_clone.repo.get_hexsha(),
+                        extractor_name="bids_dataset",
+                        extractor_version="0.0.1",
+                        extraction_parameter={},
+                        extracted_metadata={"Name": "test"},
+                    ),
+                )
+            ]
+
+        from datalad_registry import tasks
+
+        monkeypatch.setattr(tasks.dl, "meta_extract", mock_meta_extract)
+        monkeypatch.setattr(tasks, "parse_obj_as", mock_parse_obj_as)
+        monkeypatch.setitem(tasks._EXTRACTOR_REQUIRED_FILES, "bids_dataset", [])
+
+        assert (
+            extract_ds_meta(repo_url.id, "bids_dataset") is ExtractMetaStatus.SUCCEEDED
+        )
+
+        with flask_app.app_context():
+            url_metadata = db.session.execute(db.select(URLMetadata)).scalar_one()
+            paths = db.session.execute(
+                db.select(DatasetFile.path).filter_by(url_metadata_id=url_metadata.id)
+            ).scalars()
+
+            assert {"file1.txt", "file2.txt"} <= set(paths)
+
+    def test_unchanged_required_files(
+        self, dandi_repo_url_with_up_to_date_clone, flask_app
+    ):
+        """
+        Test that the metadata extracted by an extractor with fingerprinted required
+        files is re-stamped with a new version of the dataset in which the required
+        files are unchanged
+        """
+        repo_url = dandi_repo_url_with_up_to_date_clone[0]
+        ds_clone = dandi_repo_url_with_up_to_date_clone[2]
+
+        assert extract_ds_meta(repo_url.id, "dandi") is ExtractMetaStatus.SUCCEEDED
+
+        with flask_app.app_context():
+            old_id = db.session.execute(db.select(URLMetadata.id)).scalar_one()
+
+        with open(ds_clone.pathobj / "new_file.txt", "w") as f:
+            f.write("Hello in new_file.txt\n")
+        ds_clone.save(message="Add new_file.txt", to_git=True)
+
+        assert extract_ds_meta(repo_url.id, "dandi") is ExtractMetaStatus.RESTAMPED
+        assert extract_ds_meta(repo_url.id, "dandi") is ExtractMetaStatus.SKIPPED
+
+        with flask_app.app_context():
+            url_metadata = db.session.execute(db.select(URLMetadata)).scalar_one()
+
+        assert url_metadata.id == old_id
+        assert url_metadata.dataset_version == ds_clone.repo.get_hexsha()
+        assert url_metadata.dataset_describe == get_head_describe(ds_clone)
@@ -0,0 +1,405 @@
+from datalad.api import Dataset
+from datalad_metalad.extract import get_extractor_class
+import pytest
+
+from datalad_registry.models import DandiAsset, DatasetFile, URLMetadata, db
+from datalad_registry.tasks import (
+    ExtractMetaStatus,
+    _find_present_required_files,
+    _get_extractor_version,
+    extract_ds_meta_all,
+)
+from datalad_registry.tasks.utils import builtin_meta_extractors
+from datalad_registry.tasks.utils.builtin_meta_extractors import get_ds_version
+from datalad_registry.utils.datalad_tls import get_head_describe
+
+_EXTRACTORS = ["metalad_core", "dandi", "dandi:files", "bids_dataset"]
+
+
+@pytest.fixture
+def extractors(flask_app, monkeypatch) -> list[str]:
+    """
+    Set the metadata extractors of the Flask app to `_EXTRACTORS` for the
+    duration of a test
+    """
+    monkeypatch.setitem(
+        flask_app.config, "DATALAD_REGISTRY_METADATA_EXTRACTORS", _EXTRACTORS
+    )
+    return _EXTRACTORS
+
+
+def test_get_extractor_version_of_metalad_extractor(tmp_path):
+    """
+    Test getting the version of a metalad extractor in `_FINGERPRINTED_EXTRACTORS`
+    """
+    ds = Dataset(tmp_path).create(result_renderer="disabled")
+    ds_version = get_ds_version(ds)
+
+    assert (
+        _get_extractor_version("datacite_gin", ds, ds_version)
+        == get_extractor_class("datacite_gin")(ds, ds_version.hexsha).get_version()
+    )
+
+
+def test_find_present_required_files(tmp_path):
+    (tmp_path / ".datalad").mkdir()
+    (tmp_path / ".datalad" / "config").touch()
+    (tmp_path / "dandiset.yaml").touch()
+    (tmp_path / "datacite.yml").mkdir()  # A directory is not a file
+
+    assert _find_present_required_files(
+        tmp_path,
+        ["metalad_core", "dandi", "dandi:files", "datacite_gin", "unknown"],
+    ) == {".datalad/config", "dandiset.yaml"}
+
+
+# Use fixture `flask_app` to ensure that the Celery app is initialized,
+# and the db and the cache are clean
+@pytest.mark.usefixtures("flask_app")
+class TestExtractDsMetaAll:
+    @pytest.mark.usefixtures("populate_db_with_unprocessed_dataset_urls")
+    @pytest.mark.parametrize("url_id", [1, 7, 10])
+    def test_nonexistent_ds_url(self, url_id, extractors):
+        """
+        Test the case that the given RepoUrl ID argument has no corresponding
+        RepoUrl in the database
+        """
+        res = extract_ds_meta_all(url_id)
+        assert res["statuses"] == {e: ExtractMetaStatus.NO_RECORD for e in extractors}
+        assert res["timings"] == {}
+
+    @pytest.mark.usefixtures("populate_db_with_unprocessed_dataset_urls")
+    @pytest.mark.parametrize("url_id", [2, 3, 4, 5, 6])
+    def test_unprocessed_ds_url(self, url_id):
+        """
+        Test the case that the specified RepoUrl, by ID, has not been processed
+        """
+        with pytest.raises(ValueError):
+            extract_ds_meta_all(url_id)
+
+    def test_all_extractors(
+        self, dandi_repo_url_with_up_to_date_clone, extractors, flask_app
+    ):
+        """
+        Test extracting metadata with all the configured extractors, and then
+        repeating the extraction with the dataset unchanged
+        """
+        repo_url = dandi_repo_url_with_up_to_date_clone[0]
+        ds_clone = dandi_repo_url_with_up_to_date_clone[2]
+
+        res = extract_ds_meta_all(repo_url.id)
+
+        assert res["statuses"] == {
+            "metalad_core": ExtractMetaStatus.SUCCEEDED,
+            "dandi": ExtractMetaStatus.SUCCEEDED,
+            "dandi:files": ExtractMetaStatus.SUCCEEDED,
+            "bids_dataset": ExtractMetaStatus.ABORTED,
+        }
+        assert res["timings"].keys() == set(extractors)
+        assert all(t >= 0 for t in res["timings"].values())
+
+        with flask_app.app_context():
+            metadata = {
+                m.extractor_name: m
+                for m in db.session.execute(db.select(URLMetadata)).scalars()
+            }
+
+        assert metadata.keys() == {"metalad_core", "dandi", "dandi:files"}
+        for m in metadata.values():
+            assert m.url_id == repo_url.id
+            assert m.dataset_version == ds_clone.repo.get_hexsha()
+            assert m.dataset_describe == get_head_describe(ds_clone)
+        assert metadata["dandi"].extracted_metadata == {"name": "test-dandi-ds"}
+
+        # The metadata is up-to-date in the second run
+        res = extract_ds_meta_all(repo_url.id)
+
+        assert res["statuses"] == {
+            "metalad_core": ExtractMetaStatus.SKIPPED,
+            "dandi": ExtractMetaStatus.SKIPPED,
+            "dandi:files": ExtractMetaStatus.SKIPPED,
+            "bids_dataset": ExtractMetaStatus.ABORTED,
+        }
+
+        with flask_app.app_context():
+            assert len(db.session.execute(db.select(URLMetadata)).all()) == 3
+
+    @pytest.mark.usefixtures("extractors")
+    def test_new_dataset_version(self, dandi_repo_url_with_up_to_date_clone, flask_app):
+        """
+        Test that metadata extracted from an older version of the dataset is replaced
+        """
+        repo_url = dandi_repo_url_with_up_to_date_clone[0]
+        ds_clone = dandi_repo_url_with_up_to_date_clone[2]
+
+        with flask_app.app_context():
+            db.session.add(
+                URLMetadata(
+                    dataset_describe="old",
+                    dataset_version="old",
+                    extractor_name="dandi",
+                    extractor_version="0.0.1",
+                    extraction_parameter={},
+                    extracted_metadata={"name": "old"},
+                    url_id=repo_url.id,
+                )
+            )
+            db.session.commit()
+
+        res = extract_ds_meta_all(repo_url.id)
+        assert res["statuses"]["dandi"] is ExtractMetaStatus.SUCCEEDED
+
+        with flask_app.app_context():
+            dandi_metadata = db.session.execute(
+                db.select(URLMetadata).filter_by(extractor_name="dandi")
+            ).scalar_one()
+
+        assert dandi_metadata.dataset_version == ds_clone.repo.get_hexsha()
+        assert dandi_metadata.extracted_metadata == {"name": "test-dandi-ds"}
+
+    @pytest.mark.usefixtures("extractors")
+    def test_failed_extractor(
+        self, dandi_repo_url_with_up_to_date_clone, monkeypatch, flask_app
+    ):
+        """
+        Test that a failure of one extractor doesn't prevent the others from
+        having their metadata recorded
+        """
+        repo_url = dandi_repo_url_with_up_to_date_clone[0]
+
+        def mock_dlreg_meta_extract(*_args, **_kwargs):
+            raise RuntimeError("Extraction failed")
+
+        from datalad_registry import tasks
+
+        monkeypatch.setattr(tasks, "dlreg_meta_extract", mock_dlreg_meta_extract)
+
+        res = extract_ds_meta_all(repo_url.id)
+
+        assert res["statuses"] == {
+            "metalad_core": ExtractMetaStatus.SUCCEEDED,
+            "dandi": ExtractMetaStatus.FAILED,
+            "dandi:files": ExtractMetaStatus.FAILED,
+            "bids_dataset": ExtractMetaStatus.ABORTED,
+        }
+
+        with flask_app.app_context():
+            assert (
+                db.session.execute(db.select(URLMetadata.extractor_name)).scalar_one()
+                == "metalad_core"
+            )
+
+    @pytest.mark.usefixtures("extractors")
+    @pytest.mark.parametrize("invalid_file", [True, False])
+    def test_failed_extractor_changes_discarded(
+        self, invalid_file, dandi_repo_url_with_up_to_date_clone, flask_app, monkeypatch
+    ):
+        """
+        Test that the database changes made by an extractor before it aborts, due to
+        an invalid required file, or fails are discarded
+        """
+        repo_url = dandi_repo_url_with_up_to_date_clone[0]
+        ds_clone = dandi_repo_url_with_up_to_date_clone[2]
+
+        # Have the assets written to the database one at a time so that some are
+        # written before the extractor aborts or fails
+        monkeypatch.setitem(
+            flask_app.config, "DATALAD_REGISTRY_DANDI_ASSETS_BATCH_SIZE", 1
+        )
+
+        with open(ds_clone.pathobj / ".dandi/assets.json", "w") as f:
+            if invalid_file:
+                # Truncate the file after the first asset
+                f.write('[{"asset_id": "123", "path": "a.nii"}, {"asset_id":')
+            else:
+                f.write(
+                    '[{"asset_id": "123", "path": "a.nii"},'
+                    ' {"asset_id": "456", "path": "b.nii"}]'
+                )
+
+        if not invalid_file:
+            get_asset_size = builtin_meta_extractors._get_asset_size
+            seen_asset_ids = []
+
+            # Fail the extractor upon the second asset
+            def mock_get_asset_size(asset):
+                seen_asset_ids.append(asset["asset_id"])
+                if len(seen_asset_ids) > 1:
+                    raise RuntimeError("Extraction failed")
+                return get_asset_size(asset)
+
+            monkeypatch.setattr(
+                builtin_meta_extractors, "_get_asset_size", mock_get_asset_size
+            )
+
+        res = extract_ds_meta_all(repo_url.id)
+
+        assert res["statuses"]["dandi:files"] is (
+            ExtractMetaStatus.ABORTED if invalid_file else ExtractMetaStatus.FAILED
+        )
+        assert res["statuses"]["dandi"] is ExtractMetaStatus.SUCCEEDED
+
+        with flask_app.app_context():
+            assert set(
+                db.session.execute(db.select(URLMetadata.extractor_name)).scalars()
+            ) == {"metalad_core", "dandi"}
+            assert db.session.execute(db.select(DandiAsset)).first() is None
+            assert db.session.execute(db.select(DatasetFile)).first() is None
+
+    @pytest.mark.usefixtures("extractors")
+    def test_unchanged_required_files(
+        self, dandi_repo_url_with_up_to_date_clone, flask_app
+    ):
+        """
+        Test that the metadata extracted by an extractor in `_FINGERPRINTED_EXTRACTORS`
+        is re-stamped, instead of extracted again, for a new version of the dataset
+        in which the files required by the extractor are unchanged
+        """
+        repo_url = dandi_repo_url_with_up_to_date_clone[0]
+        ds_clone = dandi_repo_url_with_up_to_date_clone[2]
+
+        extract_ds_meta_all(repo_url.id)
+
+        with flask_app.app_context():
+            old_ids = dict(
+                db.session.execute(
+                    db.select(URLMetadata.extractor_name, URLMetadata.id)
+                ).all()
+            )
+            dandi_metadata = db.session.execute(
+                db.select(URLMetadata).filter_by(extractor_name="dandi")
+            ).scalar_one()
+
+        assert dandi_metadata.required_files_blob_ids == {
+            "dandiset.yaml": ds_clone.repo.call_git(
+                ["rev-parse", "HEAD:dandiset.yaml"]
+            ).strip()
+        }
+
+        # Commit a change to a file not required by any of the extractors
+        with open(ds_clone.pathobj / "new_file.txt", "w") as f:
+            f.write("Hello in new_file.txt\n")
+        ds_clone.save(message="Add new_file.txt", to_git=True)
+
+        res = extract_ds_meta_all(repo_url.id)
+        assert res["statuses"] == {
+            "metalad_core": ExtractMetaStatus.SUCCEEDED,
+            "dandi": ExtractMetaStatus.RESTAMPED,
+            "dandi:files": ExtractMetaStatus.RESTAMPED,
+            "bids_dataset": ExtractMetaStatus.ABORTED,
+        }
+
+        with flask_app.app_context():
+            metadata = {
+                data.extractor_name: data
+                for data in db.session.execute(db.select(URLMetadata)).scalars()
+            }
+
+            # The asset records of the re-stamped metadata are retained
+            assert (
+                db.session.execute(db.select(DandiAsset.url_metadata_id)).scalar_one()
+                == old_ids["dandi:files"]
+            )
+
+        assert metadata["metalad_core"].id != old_ids["metalad_core"]
+        for extractor in ["dandi", "dandi:files"]:
+            assert metadata[extractor].id == old_ids[extractor]
+        for data in metadata.values():
+            assert data.dataset_version == ds_clone.repo.get_hexsha()
+            assert data.dataset_describe == get_head_describe(ds_clone)
+
+        # The current versions of the re-stamped extractors are the ones recorded
+        # with the extracted metadata
+        ds_version = get_ds_version(ds_clone)
+        for data in (metadata["dandi"], metadata["dandi:files"]):
+            assert (
+                _get_extractor_version(data.extractor_name, ds_clone, ds_version)
+                == data.extractor_version
+            )
+
+        # Commit a change to a file required by the "dandi" extractor
+        with open(ds_clone.pathobj / "dandiset.yaml", "w") as f:
+            f.write("name: new-name\n")
+        ds_clone.save(message="Modify dandiset.yaml", to_git=True)
+
+        res = extract_ds_meta_all(repo_url.id)
+        assert res["statuses"]["dandi"] is ExtractMetaStatus.SUCCEEDED
+        assert res["statuses"]["dandi:files"] is ExtractMetaStatus.RESTAMPED
+
+        with flask_app.app_context():
+            dandi_metadata = db.session.execute(
+                db.select(URLMetadata).filter_by(extractor_name="dandi")
+            ).scalar_one()
+
+        assert dandi_metadata.id != old_ids["dandi"]
+        assert dandi_metadata.extracted_metadata == {"name": "new-name"}
+
+    @pytest.mark.usefixtures("extractors")
+    def test_new_extractor_version(
+        self, dandi_repo_url_with_up_to_date_clone, flask_app, monkeypatch
+    ):
+        """
+        Test that metadata extracted by an older version of an extractor is extracted
+        again, instead of re-stamped, for a new version of the dataset in which
+        the files required by the extractor are unchanged
+        """
+        repo_url = dandi_repo_url_with_up_to_date_clone[0]
+        ds_clone = dandi_repo_url_with_up_to_date_clone[2]
+
+        extract_ds_meta_all(repo_url.id)
+
+        with flask_app.app_context():
+            old_ids = dict(
+                db.session.execute(
+                    db.select(URLMetadata.extractor_name, URLMetadata.id)
+                ).all()
+            )
+
+        monkeypatch.setitem(
+            builtin_meta_extractors.EXTRACTOR_VERSION_MAP, "dandi", "9.9.9"
+        )
+
+        with open(ds_clone.pathobj / "new_file.txt", "w") as f:
+            f.write("Hello in new_file.txt\n")
+        ds_clone.save(message="Add new_file.txt", to_git=True)
+
+        res = extract_ds_meta_all(repo_url.id)
+        assert res["statuses"]["dandi"] is ExtractMetaStatus.SUCCEEDED
+        assert res["statuses"]["dandi:files"] is ExtractMetaStatus.RESTAMPED
+
+        with flask_app.app_context():
+            dandi_metadata = db.session.execute(
+                db.select(URLMetadata).filter_by(extractor_name="dandi")
+            ).scalar_one()
+
+        assert dandi_metadata.id != old_ids["dandi"]
+        assert dandi_metadata.extractor_version == "9.9.9"
+
+    @pytest.mark.usefixtures("extractors")
+    def test_no_recorded_blob_ids(
+        self, dandi_repo_url_with_up_to_date_clone, flask_app
+    ):
+        """
+        Test that metadata recorded without the blob IDs of the required files,
+        e.g., before their recording was introduced, is extracted again for a new
+        version of the dataset
+        """
+        repo_url = dandi_repo_url_with_up_to_date_clone[0]
+
+        with flask_app.app_context():
+            db.session.add(
+                URLMetadata(
+                    dataset_describe="old",
+                    dataset_version="old",
+                    extractor_name="dandi",
+                    extractor_version="0.0.1",
+                    extraction_parameter={},
+                    extracted_metadata={"name": "test-dandi-ds"},
+                    required_files_blob_ids=None,
+                    url_id=repo_url.id,
+                )
+            )
+            db.session.commit()
+
+        res = extract_ds_meta_all(repo_url.id)
+        assert res["statuses"]["dandi"] is ExtractMetaStatus.SUCCEEDED
@@ -64,6 +64,9 @@ class TestMarkForChk:
             if expecting_chk_req_dt_changed:
                 if original_chk_req_dt is None:
                     assert isinstance(repo_url.chk_req_dt, datetime)
+
+                    # The next check is brought forward to the time of the request
+                    assert repo_url.next_chk_dt == repo_url.chk_req_dt
                 else:
                     raise ValueError("This should not happen")
             else:
@@ -71,3 +74,25 @@ class TestMarkForChk:
                     assert repo_url.chk_req_dt is None
                 else:
                     assert repo_url.chk_req_dt == original_chk_req_dt
+
+    def test_url_no_longer_checked(self, flask_app):
+        """
+        Test that a URL of which the maximum number of consecutive checks have failed
+        is not marked for check
+        """
+        with flask_app.app_context():
+            repo_url = RepoUrl(
+                url="https://www.example.com", processed=True, n_failed_chks=10
+            )
+            db.session.add(repo_url)
+            db.session.commit()
+            url_id = repo_url.id
+
+        mark_for_chk(url_id)
+
+        with flask_app.app_context():
+            repo_url = db.session.execute(
+                db.select(RepoUrl).filter_by(id=url_id)
+            ).scalar_one()
+            assert repo_url.chk_req_dt is None
+            assert repo_url.next_chk_dt is None
@@ -1,4 +1,4 @@
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from itertools import chain
 import os
 from pathlib import Path
@@ -9,8 +9,10 @@ import pytest
 from pytest_mock import MockerFixture
 from sqlalchemy import inspect
 
+from datalad_registry.conf import CloneStrategy
 from datalad_registry.models import RepoUrl, db
 from datalad_registry.tasks import ProcessUrlStatus, process_dataset_url
+from datalad_registry.tasks.utils import get_git_clone_opts
 
 
 def is_there_file_in_tree(top: Union[Path, str]) -> bool:
@@ -39,7 +41,15 @@ def is_dataset_url_unprocessed(dataset_url_id: int) -> bool:
     default_none_fields = [
         f
         for f in fields
-        if (f != "id" and f != "url" and f != "n_failed_chks" and f != "processed")
+        if f
+        not in {
+            "id",
+            "url",
+            "n_failed_chks",
+            "n_unchanged_chks",
+            "processed",
+            "processing_pending",
+        }
     ]
 
     dataset_url: Optional[RepoUrl] = db.session.execute(
@@ -105,6 +115,14 @@ class TestProcessDatasetUrl:
             assert dataset_url.processed
             assert dataset_url.cache_path is not None
 
+            # Verify that the first check for update is scheduled
+            assert dataset_url.n_unchanged_chks == 0
+            assert (
+                time_before_processing + timedelta(hours=1)
+                <= dataset_url.next_chk_dt
+                <= time_after_processing + timedelta(hours=1)
+            )
+
     @pytest.mark.usefixtures("populate_db_with_unprocessed_dataset_urls")
     @pytest.mark.parametrize("dataset_url_id", [3, 4, 5])
     def test_clone_failure(self, dataset_url_id, flask_app, monkeypatch):
@@ -199,3 +217,32 @@ class TestProcessDatasetUrl:
             ).scalar()
 
             assert dataset_url.processed
+
+    @pytest.mark.usefixtures("populate_db_with_unprocessed_dataset_urls")
+    @pytest.mark.parametrize("strategy", list(CloneStrategy))
+    def test_clone_strategy(self, strategy, monkeypatch, mocker, flask_app):
+        """
+        Test that the dataset is cloned with the configured clone strategy
+        """
+        from datalad_registry import tasks
+
+        url_id = 5  # RepoUrl ID of the `two_files_ds_annex` dataset
+
+        monkeypatch.setitem(
+            flask_app.config, "DATALAD_REGISTRY_CLONE_STRATEGY", strategy
+        )
+        clone_spy = mocker.spy(tasks, "clone")
+
+        assert process_dataset_url(url_id) is ProcessUrlStatus.SUCCEEDED
+
+        with flask_app.app_context():
+            assert clone_spy.call_args.kwargs["git_clone_opts"] == (
+                get_git_clone_opts()
+            )
+
+            dataset_url: Optional[RepoUrl] = db.session.execute(
+                db.select(RepoUrl).filter_by(id=url_id)
+            ).scalar()
+
+            assert dataset_url.processed
+            assert dataset_url.annex_key_count is not None
@@ -0,0 +1,202 @@
+import pytest
+from sqlalchemy import insert, select, update
+
+from datalad_registry.blueprints.api.dataset_urls import tools
+from datalad_registry.blueprints.api.dataset_urls.models import CollectionStats
+from datalad_registry.blueprints.api.dataset_urls.tools import (
+    get_collection_stats,
+    mark_collection_stats_stale,
+    refresh_collection_stats_snapshot,
+)
+from datalad_registry.models import CollectionStatsSnapshot, RepoUrl, db
+from datalad_registry.tasks import refresh_collection_stats
+
+
+# Use fixture `flask_app` to ensure that the Celery app is initialized,
+# and the db and the cache are clean
+@pytest.mark.usefixtures("flask_app")
+class TestRefreshCollectionStats:
+    @pytest.mark.usefixtures("populate_with_std_ds_urls")
+    def test_no_snapshot(self, flask_app):
+        """
+        Test the case that there is no snapshot of the collection stats yet
+        """
+        assert refresh_collection_stats() is True
+
+        with flask_app.app_context():
+            snapshot = db.session.execute(select(CollectionStatsSnapshot)).scalar_one()
+
+            # The first snapshot is left stale to be confirmed by the next refresh
+            assert snapshot.is_stale is True
+            assert CollectionStats.parse_obj(snapshot.stats) == get_collection_stats(
+                select(RepoUrl)
+            )
+
+        assert refresh_collection_stats() is True
+
+        with flask_app.app_context():
+            snapshot = db.session.execute(select(CollectionStatsSnapshot)).scalar_one()
+            assert snapshot.is_stale is False
+
+    @pytest.mark.usefixtures("populate_with_std_ds_urls")
+    def test_fresh_snapshot(self, flask_app):
+        """
+        Test the case that the existing snapshot is up-to-date
+        """
+        assert refresh_collection_stats() is True
+        assert refresh_collection_stats() is True
+
+        with flask_app.app_context():
+            computed_dt = db.session.execute(
+                select(CollectionStatsSnapshot.computed_dt)
+            ).scalar_one()
+
+        assert refresh_collection_stats() is False
+
+        with flask_app.app_context():
+            assert (
+                db.session.execute(
+                    select(CollectionStatsSnapshot.computed_dt)
+                ).scalar_one()
+                == computed_dt
+            )
+
+        # A forced refresh recomputes the snapshot regardless
+        with flask_app.app_context():
+            assert refresh_collection_stats_snapshot(force=True) is True
+
+    @pytest.mark.usefixtures("populate_with_std_ds_urls")
+    def test_stale_snapshot(self, flask_app):
+        """
+        Test the case that the existing snapshot has been marked stale
+        """
+        assert refresh_collection_stats() is True
+        assert refresh_collection_stats() is True
+
+        with flask_app.app_context():
+            db.session.add(RepoUrl(url="https://www.new-example.com"))
+            mark_collection_stats_stale()
+            db.session.commit()
+
+            assert (
+                db.session.execute(
+                    select(CollectionStatsSnapshot.is_stale)
+                ).scalar_one()
+                is True
+            )
+
+        assert refresh_collection_stats() is True
+
+        with flask_app.app_context():
+            snapshot = db.session.execute(select(CollectionStatsSnapshot)).scalar_one()
+
+            assert snapshot.is_stale is False
+            assert snapshot.stats["summary"]["ds_count"] == 5
+            assert CollectionStats.parse_obj(snapshot.stats) == get_collection_stats(
+                select(RepoUrl)
+            )
+
+    @pytest.mark.usefixtures("populate_with_std_ds_urls")
+    def test_marking_stale_snapshot(self, flask_app):
+        """
+        Test that marking an already stale snapshot stale increments its generation
+        """
+        assert refresh_collection_stats() is True
+        assert refresh_collection_stats() is True
+
+        with flask_app.app_context():
+            mark_collection_stats_stale()
+            db.session.commit()
+            mark_collection_stats_stale()
+            db.session.commit()
+
+            snapshot = db.session.execute(select(CollectionStatsSnapshot)).scalar_one()
+            assert snapshot.is_stale is True
+            assert snapshot.generation == 2
+
+    @pytest.mark.usefixtures("populate_with_std_ds_urls")
+    def test_marked_stale_during_refresh(self, flask_app, monkeypatch):
+        """
+        Test that the snapshot being marked stale while its statistics are computed
+        in a refresh is not lost to the refresh, even though the snapshot was stale
+        already before the refresh
+        """
+        assert refresh_collection_stats() is True
+        assert refresh_collection_stats() is True
+
+        with flask_app.app_context():
+            mark_collection_stats_stale()
+            db.session.commit()
+            old_stats = db.session.execute(
+                select(CollectionStatsSnapshot.stats)
+            ).scalar_one()
+
+        def get_collection_stats_with_concurrent_change(select_stmt):
+            # Add a dataset URL and mark the snapshot stale in another transaction
+            with db.engine.begin() as conn:
+                conn.execute(insert(RepoUrl).values(url="https://www.new-example.com"))
+                conn.execute(
+                    update(CollectionStatsSnapshot).values(
+                        is_stale=True, generation=CollectionStatsSnapshot.generation + 1
+                    )
+                )
+            return get_collection_stats(select_stmt)
+
+        monkeypatch.setattr(
+            tools, "get_collection_stats", get_collection_stats_with_concurrent_change
+        )
+
+        with flask_app.app_context():
+            assert refresh_collection_stats_snapshot() is False
+
+            snapshot = db.session.execute(select(CollectionStatsSnapshot)).scalar_one()
+            assert snapshot.is_stale is True
+            assert snapshot.generation == 2
+            assert snapshot.stats == old_stats
+
+        monkeypatch.undo()
+
+        # The next refresh brings the snapshot up-to-date
+        assert refresh_collection_stats() is True
+
+        with flask_app.app_context():
+            snapshot = db.session.execute(select(CollectionStatsSnapshot)).scalar_one()
+            assert snapshot.is_stale is False
+            assert snapshot.stats["summary"]["ds_count"] == 5
+
+    @pytest.mark.usefixtures("populate_with_std_ds_urls")
+    def test_changed_during_first_refresh(self, flask_app, monkeypatch):
+        """
+        Test that a change to the collection made while the statistics of the first
+        snapshot are computed is not lost to the refresh
+        """
+
+        def get_collection_stats_with_concurrent_change(select_stmt):
+            stats = get_collection_stats(select_stmt)
+
+            # Add a dataset URL in another transaction, in which there is no
+            # snapshot to mark stale
+            with db.engine.begin() as conn:
+                conn.execute(insert(RepoUrl).values(url="https://www.new-example.com"))
+            return stats
+
+        monkeypatch.setattr(
+            tools, "get_collection_stats", get_collection_stats_with_concurrent_change
+        )
+
+        assert refresh_collection_stats() is True
+
+        monkeypatch.undo()
+
+        with flask_app.app_context():
+            snapshot = db.session.execute(select(CollectionStatsSnapshot)).scalar_one()
+            assert snapshot.is_stale is True
+            assert snapshot.stats["summary"]["ds_count"] == 4
+
+        # The next refresh brings the snapshot up-to-date
+        assert refresh_collection_stats() is True
+
+        with flask_app.app_context():
+            snapshot = db.session.execute(select(CollectionStatsSnapshot)).scalar_one()
+            assert snapshot.is_stale is False
+            assert snapshot.stats["summary"]["ds_count"] == 5
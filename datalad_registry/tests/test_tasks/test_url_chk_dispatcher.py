@@ -20,26 +20,26 @@ class TestUrlChkDispatcher:
     @pytest.mark.parametrize(
         "urls_in_db, expected_result",
         [
-            # Test unqualified by not having processed
+            # Test unqualified by not having been processed
             (
                 [
                     RepoUrl(
                         url="https://example.com/1",
-                        last_update_dt=datetime(
-                            2023, 9, 30, 17, 20, 34, tzinfo=timezone.utc
-                        ),
                         last_chk_dt=None,
                         chk_req_dt=None,
+                        next_chk_dt=datetime(
+                            2023, 9, 30, 17, 20, 34, tzinfo=timezone.utc
+                        ),
                         n_failed_chks=0,
                         processed=True,
                     ),
                     RepoUrl(
                         url="https://example.com/2",
-                        last_update_dt=datetime(
-                            2023, 9, 30, 17, 20, 34, tzinfo=timezone.utc
-                        ),
                         last_chk_dt=None,
                         chk_req_dt=None,
+                        next_chk_dt=datetime(
+                            2023, 9, 30, 17, 20, 34, tzinfo=timezone.utc
+                        ),
                         n_failed_chks=0,
                         processed=False,
                     ),
@@ -51,286 +51,174 @@ class TestUrlChkDispatcher:
                 [
                     RepoUrl(
                         url="https://example.com/1",
-                        last_update_dt=datetime(
-                            2023, 9, 30, 17, 20, 34, tzinfo=timezone.utc
-                        ),
                         last_chk_dt=None,
                         chk_req_dt=None,
+                        next_chk_dt=datetime(
+                            2023, 9, 30, 17, 20, 34, tzinfo=timezone.utc
+                        ),
                         n_failed_chks=10,
                         processed=True,
                     ),
                     RepoUrl(
                         url="https://example.com/2",
-                        last_update_dt=datetime(
-                            2023, 9, 30, 17, 20, 34, tzinfo=timezone.utc
-                        ),
                         last_chk_dt=None,
                         chk_req_dt=None,
+                        next_chk_dt=datetime(
+                            2023, 9, 30, 17, 20, 34, tzinfo=timezone.utc
+                        ),
                         n_failed_chks=0,
                         processed=True,
                     ),
                 ],
                 [2],
             ),
-            # Test unqualified by updated too recently and qualified by
-            # yet-to-be-checked check request
+            # Test unqualified by not being due yet or having no check scheduled
             (
                 [
                     RepoUrl(
                         url="https://example.com/1",
-                        last_update_dt=datetime(
-                            2023, 9, 30, 19, 10, 34, tzinfo=timezone.utc
-                        ),
                         last_chk_dt=datetime(
-                            2023, 9, 30, 19, 15, 33, tzinfo=timezone.utc
+                            2023, 9, 30, 18, 20, 35, tzinfo=timezone.utc
                         ),
-                        chk_req_dt=datetime(
-                            2023, 9, 30, 19, 15, 34, tzinfo=timezone.utc
+                        chk_req_dt=None,
+                        next_chk_dt=datetime(
+                            2023, 9, 30, 19, 20, 35, tzinfo=timezone.utc
                         ),
                         n_failed_chks=0,
                         processed=True,
                     ),
                     RepoUrl(
                         url="https://example.com/2",
-                        last_update_dt=datetime(
-                            2023, 9, 30, 19, 10, 34, tzinfo=timezone.utc
-                        ),
                         last_chk_dt=None,
-                        chk_req_dt=datetime(
-                            2023, 9, 30, 19, 15, 34, tzinfo=timezone.utc
-                        ),
+                        chk_req_dt=None,
+                        next_chk_dt=None,
                         n_failed_chks=0,
                         processed=True,
                     ),
                     RepoUrl(
                         url="https://example.com/3",
-                        last_update_dt=datetime(
-                            2023, 9, 30, 19, 10, 34, tzinfo=timezone.utc
+                        last_chk_dt=datetime(
+                            2023, 9, 30, 18, 20, 34, tzinfo=timezone.utc
                         ),
-                        last_chk_dt=None,
                         chk_req_dt=None,
+                        next_chk_dt=datetime(
+                            2023, 9, 30, 19, 20, 34, tzinfo=timezone.utc
+                        ),
                         n_failed_chks=0,
                         processed=True,
                     ),
                 ],
-                [1, 2],
+                [3],
             ),
-            # Test qualified by handled requested check that has not been handled
-            # for long enough
+            # Test sorting by whether there is a request for check for update first, and
+            # by the time the check is due second
             (
                 [
-                    # This one is not qualified because the last check datetime is
-                    # too recent
+                    # Not requested, due (5th)
                     RepoUrl(
                         url="https://example.com/1",
-                        last_update_dt=datetime(
-                            2023, 9, 30, 12, 20, 34, tzinfo=timezone.utc
-                        ),
                         last_chk_dt=datetime(
-                            2023, 9, 30, 19, 1, 34, tzinfo=timezone.utc
-                        ),
-                        chk_req_dt=datetime(
-                            2023, 9, 30, 15, 20, 34, tzinfo=timezone.utc
-                        ),
-                        n_failed_chks=3,
-                        processed=True,
-                    ),
-                    # This one is qualified because the last check datetime is not
-                    # too recent
-                    RepoUrl(
-                        url="https://example.com/2",
-                        last_update_dt=datetime(
-                            2023, 9, 30, 12, 20, 34, tzinfo=timezone.utc
-                        ),
-                        last_chk_dt=datetime(
-                            2023, 9, 30, 18, 1, 34, tzinfo=timezone.utc
-                        ),
-                        chk_req_dt=datetime(
-                            2023, 9, 30, 15, 20, 34, tzinfo=timezone.utc
+                            2023, 9, 30, 17, 20, 34, tzinfo=timezone.utc
                         ),
-                        n_failed_chks=3,
-                        processed=True,
-                    ),
-                ],
-                [2],
-            ),
-            # Test sorting by category
-            (
-                [
-                    # Not requested but qualified by last update datetime
-                    # (This should be the 4th in the returned list because of the
-                    # category it belongs to and its last update datetime)
-                    RepoUrl(
-                        url="https://example.com/1",
-                        last_update_dt=datetime(
+                        chk_req_dt=None,
+                        next_chk_dt=datetime(
                             2023, 9, 30, 18, 20, 34, tzinfo=timezone.utc
                         ),
-                        last_chk_dt=None,
-                        chk_req_dt=None,
                         n_failed_chks=0,
                         processed=True,
                     ),
-                    # Not requested but qualified by last check datetime
-                    # (This should be the 3rd in the returned list because of the
-                    # category it belongs to and its last check datetime)
+                    # Requested, due (2nd)
                     RepoUrl(
                         url="https://example.com/2",
-                        last_update_dt=datetime(
+                        last_chk_dt=datetime(
                             2023, 9, 30, 17, 20, 34, tzinfo=timezone.utc
                         ),
-                        last_chk_dt=datetime(
-                            2023, 9, 30, 17, 50, 34, tzinfo=timezone.utc
+                        chk_req_dt=datetime(
+                            2023, 9, 30, 19, 15, 34, tzinfo=timezone.utc
+                        ),
+                        next_chk_dt=datetime(
+                            2023, 9, 30, 19, 15, 34, tzinfo=timezone.utc
                         ),
-                        chk_req_dt=None,
                         n_failed_chks=0,
                         processed=True,
                     ),
-                    # Unhandled requested
-                    # (This should be the 1st in the returned list)
+                    # Not requested, due earlier (4th)
                     RepoUrl(
                         url="https://example.com/3",
-                        last_update_dt=datetime(
-                            2023, 9, 30, 18, 50, 34, tzinfo=timezone.utc
-                        ),
                         last_chk_dt=None,
-                        chk_req_dt=datetime(
-                            2023, 9, 30, 18, 40, 34, tzinfo=timezone.utc
+                        chk_req_dt=None,
+                        next_chk_dt=datetime(
+                            2023, 9, 30, 17, 20, 34, tzinfo=timezone.utc
                         ),
                         n_failed_chks=0,
                         processed=True,
                     ),
-                    # Handled requested but handled too recently (not qualified)
-                    # (This should not be returned)
+                    # Requested with a failed check since, due again (1st)
                     RepoUrl(
                         url="https://example.com/4",
-                        last_update_dt=datetime(
-                            2023, 9, 30, 18, 20, 34, tzinfo=timezone.utc
-                        ),
                         last_chk_dt=datetime(
-                            2023, 9, 30, 19, 2, 34, tzinfo=timezone.utc
+                            2023, 9, 30, 17, 50, 34, tzinfo=timezone.utc
                         ),
                         chk_req_dt=datetime(
-                            2023, 9, 30, 18, 55, 34, tzinfo=timezone.utc
-                        ),
-                        n_failed_chks=0,
-                        processed=True,
-                    ),
-                    # Handled requested but not handled for long enough
-                    # (This should be the 2nd in the returned list)
-                    RepoUrl(
-                        url="https://example.com/5",
-                        last_update_dt=datetime(
-                            2023, 9, 30, 17, 20, 34, tzinfo=timezone.utc
-                        ),
-                        last_chk_dt=datetime(
-                            2023, 9, 30, 18, 2, 34, tzinfo=timezone.utc
+                            2023, 9, 30, 17, 50, 34, tzinfo=timezone.utc
                         ),
-                        chk_req_dt=datetime(
-                            2023, 9, 30, 17, 55, 34, tzinfo=timezone.utc
+                        next_chk_dt=datetime(
+                            2023, 9, 30, 18, 50, 34, tzinfo=timezone.utc
                         ),
-                        n_failed_chks=5,
+                        n_failed_chks=3,
                         processed=True,
                     ),
-                ],
-                [3, 5, 2, 1],
-            ),
-            # Test sorting within the unhandled requested category
-            # (The sorting should be done by check request datetime)
-            (
-                [
+                    # Requested just now (3rd)
                     RepoUrl(
-                        url="https://example.com/1",
-                        last_update_dt=datetime(
-                            2023, 9, 30, 18, 20, 34, tzinfo=timezone.utc
-                        ),
+                        url="https://example.com/5",
                         last_chk_dt=None,
                         chk_req_dt=datetime(
-                            2023, 9, 30, 18, 45, 34, tzinfo=timezone.utc
-                        ),
-                        n_failed_chks=0,
-                        processed=True,
-                    ),
-                    RepoUrl(
-                        url="https://example.com/2",
-                        last_update_dt=datetime(
-                            2023, 9, 30, 17, 20, 34, tzinfo=timezone.utc
-                        ),
-                        last_chk_dt=datetime(
-                            2023, 9, 30, 18, 50, 33, tzinfo=timezone.utc
+                            2023, 9, 30, 19, 20, 34, tzinfo=timezone.utc
                         ),
-                        chk_req_dt=datetime(
-                            2023, 9, 30, 18, 50, 34, tzinfo=timezone.utc
+                        next_chk_dt=datetime(
+                            2023, 9, 30, 19, 20, 34, tzinfo=timezone.utc
                         ),
                         n_failed_chks=0,
                         processed=True,
                     ),
                 ],
-                [1, 2],
+                [4, 2, 5, 3, 1],
             ),
-            # Test sorting within the handled requested category
-            # (The sorting should be done by last check datetime)
+            # Test sorting by ID among the URLs that are due at the same time
             (
                 [
                     RepoUrl(
                         url="https://example.com/1",
-                        last_update_dt=datetime(
-                            2023, 9, 30, 17, 20, 34, tzinfo=timezone.utc
-                        ),
-                        last_chk_dt=datetime(
-                            2023, 9, 30, 17, 45, 34, tzinfo=timezone.utc
-                        ),
-                        chk_req_dt=datetime(
-                            2023, 9, 30, 17, 40, 34, tzinfo=timezone.utc
+                        last_chk_dt=None,
+                        chk_req_dt=None,
+                        next_chk_dt=datetime(
+                            2023, 9, 30, 18, 20, 34, tzinfo=timezone.utc
                         ),
-                        n_failed_chks=4,
+                        n_failed_chks=0,
                         processed=True,
                     ),
                     RepoUrl(
                         url="https://example.com/2",
-                        last_update_dt=datetime(
-                            2023, 9, 30, 17, 22, 34, tzinfo=timezone.utc
-                        ),
-                        last_chk_dt=datetime(
-                            2023, 9, 30, 17, 44, 34, tzinfo=timezone.utc
-                        ),
-                        chk_req_dt=datetime(
-                            2023, 9, 30, 17, 42, 34, tzinfo=timezone.utc
-                        ),
-                        n_failed_chks=4,
-                        processed=True,
-                    ),
-                ],
-                [2, 1],
-            ),
-            # Test not requested but qualified by last update or check being old enough
-            # sorted by last update datetime or last check datetime
-            # with the latter having higher priority
-            (
-                [
-                    RepoUrl(
-                        url="https://example.com/1",
-                        last_update_dt=datetime(
-                            2023, 9, 30, 17, 10, 34, tzinfo=timezone.utc
-                        ),
-                        last_chk_dt=datetime(
-                            2023, 9, 30, 17, 25, 34, tzinfo=timezone.utc
-                        ),
+                        last_chk_dt=None,
                         chk_req_dt=None,
+                        next_chk_dt=datetime(
+                            2023, 9, 30, 18, 20, 34, tzinfo=timezone.utc
+                        ),
                         n_failed_chks=0,
                         processed=True,
                     ),
                     RepoUrl(
-                        url="https://example.com/2",
-                        last_update_dt=datetime(
-                            2023, 9, 30, 17, 20, 34, tzinfo=timezone.utc
-                        ),
+                        url="https://example.com/3",
                         last_chk_dt=None,
                         chk_req_dt=None,
+                        next_chk_dt=datetime(
+                            2023, 9, 30, 18, 10, 34, tzinfo=timezone.utc
+                        ),
                         n_failed_chks=0,
                         processed=True,
                     ),
                 ],
-                [2, 1],
+                [3, 1, 2],
             ),
         ],
     )
@@ -344,3 +232,42 @@ class TestUrlChkDispatcher:
             db.session.commit()
 
         assert url_chk_dispatcher() == expected_result
+
+    @pytest.mark.usefixtures("fix_datetime_now")
+    @pytest.mark.parametrize(
+        "max_chks_to_dispatch, expected_result", [(0, []), (2, [1, 3]), (4, [1, 3, 2])]
+    )
+    def test_max_chks_to_dispatch(
+        self, max_chks_to_dispatch, expected_result, monkeypatch, flask_app
+    ):
+        """
+        Test that the number of dispatched checks is limited, with the URLs having
+        a request for check for update taking precedence
+        """
+        monkeypatch.setitem(
+            flask_app.config,
+            "DATALAD_REGISTRY_MAX_URL_CHKS_ISSUED_PER_DISPATCH_CYCLE",
+            max_chks_to_dispatch,
+        )
+
+        with flask_app.app_context():
+            db.session.add_all(
+                [
+                    RepoUrl(
+                        url=f"https://example.com/{i}",
+                        chk_req_dt=(
+                            datetime(2023, 9, 30, 19, 0, i, tzinfo=timezone.utc)
+                            if requested
+                            else None
+                        ),
+                        next_chk_dt=datetime(
+                            2023, 9, 30, 18, 0, i, tzinfo=timezone.utc
+                        ),
+                        processed=True,
+                    )
+                    for i, requested in [(1, True), (2, False), (3, True)]
+                ]
+            )
+            db.session.commit()
+
+        assert url_chk_dispatcher() == expected_result
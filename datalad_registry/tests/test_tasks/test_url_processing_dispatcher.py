@@ -0,0 +1,108 @@
+import pytest
+from sqlalchemy import select
+
+from datalad_registry import tasks
+from datalad_registry.models import RepoUrl, db
+from datalad_registry.tasks import url_processing_dispatcher
+
+
+@pytest.fixture
+def submitted_repo_url_ids(monkeypatch) -> list[int]:
+    """
+    Capture the IDs of the RepoUrls submitted for processing instead of sending
+    the processing tasks to the Celery broker
+
+    :return: The list, to be filled, of the IDs of the RepoUrls submitted for
+             processing in the order of submission
+    """
+    repo_url_ids: list[int] = []
+
+    class MockWorkflow:
+        def __init__(self, repo_url_id: int):
+            self.repo_url_id = repo_url_id
+
+        def apply_async(self):
+            repo_url_ids.append(self.repo_url_id)
+
+    monkeypatch.setattr(tasks, "new_url_processing", MockWorkflow)
+
+    return repo_url_ids
+
+
+# Use fixture `flask_app` to ensure that the Celery app is initialized,
+# and the db and the cache are clean
+@pytest.mark.usefixtures("flask_app")
+class TestUrlProcessingDispatcher:
+    def test_empty_db(self, submitted_repo_url_ids):
+        """
+        Test the case in which the database is empty
+        """
+        assert url_processing_dispatcher() == []
+        assert submitted_repo_url_ids == []
+
+    @pytest.mark.parametrize(
+        "pending_count, max_processings_to_dispatch, expected_batch_sizes",
+        [(5, 2, [2, 2, 1, 0]), (4, 2, [2, 2, 0]), (3, 100, [3, 0])],
+    )
+    def test_dispatch_in_batches(
+        self,
+        pending_count,
+        max_processings_to_dispatch,
+        expected_batch_sizes,
+        submitted_repo_url_ids,
+        flask_app,
+        monkeypatch,
+    ):
+        """
+        Test that the RepoUrls pending submission are submitted for processing in
+        the order of their IDs, at most the configured number of them per dispatch,
+        and that the RepoUrls not pending submission are never submitted
+        """
+        monkeypatch.setitem(
+            flask_app.config,
+            "DATALAD_REGISTRY_MAX_URL_PROCESSINGS_ISSUED_PER_DISPATCH_CYCLE",
+            max_processings_to_dispatch,
+        )
+
+        with flask_app.app_context():
+            repo_urls = [
+                RepoUrl(url=f"https://example.com/{i}", processing_pending=i % 2 == 0)
+                for i in range(pending_count * 2)
+            ]
+            db.session.add_all(repo_urls)
+            db.session.commit()
+            pending_ids = [r.id for r in repo_urls if r.processing_pending]
+
+        batches = [url_processing_dispatcher() for _ in expected_batch_sizes]
+
+        assert [len(batch) for batch in batches] == expected_batch_sizes
+        assert [id_ for batch in batches for id_ in batch] == pending_ids
+        assert submitted_repo_url_ids == pending_ids
+
+        with flask_app.app_context():
+            assert (
+                db.session.execute(
+                    select(RepoUrl.id).filter(RepoUrl.processing_pending)
+                ).all()
+                == []
+            )
+
+    def test_failed_submission(self, flask_app, monkeypatch):
+        """
+        Test that the RepoUrls remain pending submission if their submission fails
+        """
+
+        def mock_new_url_processing(_repo_url_id: int):
+            raise ConnectionError("The broker is unavailable")
+
+        monkeypatch.setattr(tasks, "new_url_processing", mock_new_url_processing)
+
+        with flask_app.app_context():
+            db.session.add(RepoUrl(url="https://example.com", processing_pending=True))
+            db.session.commit()
+
+        with pytest.raises(ConnectionError):
+            url_processing_dispatcher()
+
+        with flask_app.app_context():
+            assert db.session.execute(select(RepoUrl.processing_pending)).scalar_one()
@@ -2,13 +2,31 @@ import json
 
 import pytest
 import responses
+from responses.matchers import header_matcher
+from sqlalchemy import func, select
 
-from datalad_registry.blueprints.api import DATASET_URLS_PATH
-from datalad_registry.models import RepoUrl, db
+from datalad_registry.models import RepoUrl, UsageDashboardSyncState, db
 from datalad_registry.tasks import usage_dashboard_sync
 from datalad_registry.tasks.utils.usage_dashboard import DASHBOARD_COLLECTION_URL
 
 
+def _gin_collection(urls: list[str]) -> dict:
+    """
+    Get a JSON-compatible representation of a usage dashboard collection of
+    active GIN repos at the given URLs
+    """
+    return {
+        "github": [],
+        "osf": [],
+        "gin": [
+            {"id": i, "name": f"repo{i}", "url": url, "stars": 0, "status": "active"}
+            for i, url in enumerate(urls)
+        ],
+        "hub_datalad_org": [],
+        "atris": [],
+    }
+
+
 @pytest.mark.parametrize(
     ("dashboard_collection", "registered_repos", "expected_submitted_repos"),
     [
@@ -251,13 +269,11 @@ from datalad_registry.tasks.utils.usage_dashboard import DASHBOARD_COLLECTION_UR
         ),
     ],
 )
-@pytest.mark.parametrize("post_resp_status_code", [201, 202, 400])
 @responses.activate
 def test_usage_dashboard_sync(
     dashboard_collection: str,
     registered_repos: set[str],
     expected_submitted_repos: set[str],
-    post_resp_status_code,
     flask_app,
 ):
     """
@@ -269,58 +285,96 @@ def test_usage_dashboard_sync(
                              clone URL, that are already registered in the
                              Datalad-Registry instance.
     :param expected_submitted_repos: The set of repos, represented in their respective
-                                     clone URL, that are expected to be submitted to the
-                                     DataLad-Registry instance for registration
+                                     clone URL, that are expected to be registered in
+                                     and submitted for processing by the
+                                     DataLad-Registry instance
 
     """
     # Mock the response from the datalad-usage-dashboard
-    responses.get(DASHBOARD_COLLECTION_URL, json=json.loads(dashboard_collection))
+    responses.get(
+        DASHBOARD_COLLECTION_URL,
+        json=json.loads(dashboard_collection),
+        headers={"ETag": '"v1"'},
+    )
 
     # Insert the registered repos to the database
     with flask_app.app_context():
         db.session.add_all(RepoUrl(url=url) for url in registered_repos)
         db.session.commit()
 
-    # Mock the response from POSTing to the DataLad-Registry instance
-    responses.post(
-        flask_app.config["DATALAD_REGISTRY_WEB_API_URL"] + f"/{DATASET_URLS_PATH}",
-        status=post_resp_status_code,
+    sync_result = usage_dashboard_sync()
+
+    assert sync_result["dashboard_modified"] is True
+    assert sync_result["newly_registered_repos_count"] == len(expected_submitted_repos)
+    assert set(sync_result["newly_registered_repos"]) == expected_submitted_repos
+
+    with flask_app.app_context():
+        processing_pending_by_url: dict[str, bool] = {
+            url: pending
+            for url, pending in db.session.execute(
+                select(RepoUrl.url, RepoUrl.processing_pending)
+            )
+        }
+        sync_state = db.session.execute(select(UsageDashboardSyncState)).scalar_one()
+
+    assert (
+        processing_pending_by_url.keys() == registered_repos | expected_submitted_repos
     )
+    assert sync_state.etag == '"v1"'
 
-    sync_result = usage_dashboard_sync()
+    # Only the newly registered repos are pending submission for processing
+    assert {
+        url for url, pending in processing_pending_by_url.items() if pending
+    } == expected_submitted_repos
 
-    if post_resp_status_code == 201:
-        assert sync_result["failed_submissions_count"] == 0
-        assert sync_result["update_requested_repos_count"] == 0
-        assert sync_result["newly_registered_repos_count"] == len(
-            expected_submitted_repos
-        )
-        assert sync_result["failed_submissions"] == []
-        assert sync_result["update_requested_repos"] == []
-        assert set(sync_result["newly_registered_repos"]) == expected_submitted_repos
-    elif post_resp_status_code == 202:
-        assert sync_result["failed_submissions_count"] == 0
-        assert sync_result["update_requested_repos_count"] == len(
-            expected_submitted_repos
-        )
-        assert sync_result["newly_registered_repos_count"] == 0
-        assert sync_result["failed_submissions"] == []
-        assert set(sync_result["update_requested_repos"]) == expected_submitted_repos
-        assert sync_result["newly_registered_repos"] == []
-    else:
-        assert sync_result["failed_submissions_count"] == len(expected_submitted_repos)
-        assert sync_result["update_requested_repos_count"] == 0
-        assert sync_result["newly_registered_repos_count"] == 0
 
-        failed_submissions = sync_result["failed_submissions"]
-        assert all(
-            submission["status_code"] == post_resp_status_code
-            for submission in failed_submissions
-        )
-        assert (
-            set(submission["url"] for submission in failed_submissions)
-            == expected_submitted_repos
+@pytest.mark.parametrize("etag", ['"v1"', 'W/"v1"', None])
+@responses.activate
+def test_conditional_fetch(etag, flask_app):
+    """
+    Test that the collection of the repos in the usage dashboard is fetched with
+    a conditional request validated by the entity tag of the collection as of
+    the last sync, if there is one
+    """
+    urls = ["https://gin.g-node.org/a/b", "https://gin.g-node.org/c/d"]
+
+    first_resp = responses.get(
+        DASHBOARD_COLLECTION_URL,
+        json=_gin_collection(urls[:1]),
+        headers={} if etag is None else {"ETag": etag},
+    )
+    assert usage_dashboard_sync()["newly_registered_repos"] == urls[:1]
+    assert "If-None-Match" not in first_resp.calls[0].request.headers
+
+    # The collection has changed, but responses to requests conditional on
+    # the entity tag of the collection as of the last sync, if any, report that it
+    # has not
+    responses.replace(
+        responses.GET, DASHBOARD_COLLECTION_URL, json=_gin_collection(urls)
+    )
+    if etag is not None:
+        responses.upsert(
+            responses.GET,
+            DASHBOARD_COLLECTION_URL,
+            status=304,
+            match=[header_matcher({"If-None-Match": etag})],
         )
 
-        assert sync_result["update_requested_repos"] == []
-        assert sync_result["newly_registered_repos"] == []
+    sync_result = usage_dashboard_sync()
+    if etag is not None:
+        # The collection is unchanged since the last sync
+        assert sync_result == {
+            "dashboard_modified": False,
+            "newly_registered_repos_count": 0,
+            "newly_registered_repos": [],
+        }
+    else:
+        # No conditional request can be made without an entity tag
+        assert sync_result["dashboard_modified"] is True
+        assert sync_result["newly_registered_repos"] == urls[1:]
+
+    with flask_app.app_context():
+        synced_url_count = db.session.execute(
+            select(func.count()).select_from(RepoUrl)
+        ).scalar_one()
+    assert synced_url_count == (1 if etag is not None else 2)
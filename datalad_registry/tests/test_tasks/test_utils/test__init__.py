@@ -6,7 +6,16 @@ from datalad.support.exceptions import CommandError
 from flask import current_app
 import pytest
 
-from datalad_registry.tasks.utils import allocate_ds_path, update_ds_clone
+from datalad_registry.conf import CloneStrategy
+from datalad_registry.models import db
+from datalad_registry.tasks import utils as tasks_utils
+from datalad_registry.tasks.utils import (
+    allocate_ds_path,
+    get_git_clone_opts,
+    prefetch_git_annex_branch,
+    update_ds_clone,
+)
+from datalad_registry.utils.datalad_tls import clone, get_origin_branches
 
 _PATH_NAME_CHARS = hexdigits[:-6]
 
@@ -67,6 +76,155 @@ class TestAllocateDsPath:
             assert allocate_ds_path() == final_path
 
 
+@pytest.mark.parametrize(
+    "strategy, depth, expected_opts",
+    [
+        (CloneStrategy.FULL, 1, []),
+        (CloneStrategy.BLOBLESS, 1, ["--filter=blob:none"]),
+        (CloneStrategy.TREELESS, 1, ["--filter=tree:0"]),
+        (CloneStrategy.SHALLOW, 1, ["--depth=1", "--no-single-branch"]),
+        (CloneStrategy.SHALLOW, 50, ["--depth=50", "--no-single-branch"]),
+    ],
+)
+def test_get_git_clone_opts(strategy, depth, expected_opts, monkeypatch, flask_app):
+    monkeypatch.setitem(flask_app.config, "DATALAD_REGISTRY_CLONE_STRATEGY", strategy)
+    monkeypatch.setitem(flask_app.config, "DATALAD_REGISTRY_CLONE_DEPTH", depth)
+
+    with flask_app.app_context():
+        assert get_git_clone_opts() == expected_opts
+
+
+def _get_missing_git_annex_objs(ds_clone) -> list[str]:
+    """
+    Get the objects at the tip of the git-annex branch of the origin remote that
+    are missing in a given clone, without fetching them
+    """
+    return [
+        line[1:]
+        for line in ds_clone.repo.call_git_items_(
+            [
+                "rev-list",
+                "--objects",
+                "--no-walk",
+                "--missing=print",
+                "refs/remotes/origin/git-annex",
+            ],
+            read_only=True,
+        )
+        if line.startswith("?")
+    ]
+
+
+class TestPrefetchGitAnnexBranch:
+    @pytest.mark.parametrize(
+        "strategy, expected_filter",
+        [
+            (CloneStrategy.BLOBLESS, "blob:none"),
+            (CloneStrategy.TREELESS, "tree:0"),
+        ],
+    )
+    def test_partial_clone(
+        self,
+        strategy,
+        expected_filter,
+        two_files_ds_annex_func_scoped,
+        tmp_path,
+        monkeypatch,
+        mocker,
+        flask_app,
+    ):
+        """
+        Test prefetching the git-annex branch after a fetch into a partial clone
+        of a dataset served with filtering allowed
+        """
+        origin_ds = two_files_ds_annex_func_scoped
+        origin_ds.repo.call_git(["config", "uploadpack.allowFilter", "true"])
+
+        monkeypatch.setitem(
+            flask_app.config, "DATALAD_REGISTRY_CLONE_STRATEGY", strategy
+        )
+
+        with flask_app.app_context():
+            ds_clone = clone(
+                source=origin_ds.pathobj.as_uri(),
+                path=tmp_path / "clone",
+                git_clone_opts=get_git_clone_opts(),
+                on_failure="stop",
+                result_renderer="disabled",
+            )
+
+            # The filter is honored, so the clone is a partial clone
+            assert (
+                ds_clone.repo.config.get("remote.origin.partialclonefilter")
+                == expected_filter
+            )
+
+            # Add an annexed file to the origin remote and fetch the change
+            (origin_ds.pathobj / "file3.txt").write_text("Hello in file3.txt\n")
+            origin_ds.save(message="Add file3.txt")
+            ds_clone.repo.call_git(["fetch"])
+
+            assert _get_missing_git_annex_objs(ds_clone)
+
+            call_git_spy = mocker.spy(ds_clone.repo, "call_git")
+            prefetch_git_annex_branch(ds_clone)
+
+        # All the missing objects are fetched in a single fetch
+        assert call_git_spy.call_count == 1
+        assert _get_missing_git_annex_objs(ds_clone) == []
+
+    @pytest.mark.parametrize("strategy", [CloneStrategy.FULL, CloneStrategy.SHALLOW])
+    def test_non_partial_clone_strategy(
+        self, strategy, two_files_ds_annex_func_scoped, monkeypatch, mocker, flask_app
+    ):
+        """
+        Test that nothing is fetched with a clone strategy other than
+        `BLOBLESS` and `TREELESS`
+        """
+        monkeypatch.setitem(
+            flask_app.config, "DATALAD_REGISTRY_CLONE_STRATEGY", strategy
+        )
+        call_git_spy = mocker.spy(two_files_ds_annex_func_scoped.repo, "call_git")
+
+        with flask_app.app_context():
+            prefetch_git_annex_branch(two_files_ds_annex_func_scoped)
+
+        call_git_spy.assert_not_called()
+
+
+@pytest.fixture
+def git_cmds(monkeypatch) -> list[list[str]]:
+    """
+    Record the arguments of every call of `GitRepo.call_git`
+    """
+    from datalad.dataset.gitrepo import GitRepo
+
+    original_call_git = GitRepo.call_git
+    cmds: list[list[str]] = []
+
+    def spy_call_git(*args, **kwargs):
+        cmds.append(args[1])
+        return original_call_git(*args, **kwargs)
+
+    monkeypatch.setattr(GitRepo, "call_git", spy_call_git)
+
+    return cmds
+
+
+def _record_branches(repo_url, ds_clone, flask_app):
+    """
+    Record in the database the branches of the origin remote of a given clone
+    as the branches of a given RepoUrl, as done when the RepoUrl is processed
+    """
+    with flask_app.app_context():
+        repo_url = db.session.merge(repo_url)
+        repo_url.branches = get_origin_branches(ds_clone)
+        db.session.commit()
+        db.session.refresh(repo_url)
+
+    return repo_url
+
+
 class TestUpdateDsClone:
     def test_no_update(self, repo_url_with_up_to_date_clone, flask_app):
         """
@@ -158,3 +316,139 @@ class TestUpdateDsClone:
 
                 with pytest.raises(RuntimeError, match="Failure from the mock clone"):
                     update_ds_clone(url)
+
+    def test_unchanged_origin_short_circuits(
+        self, repo_url_with_up_to_date_clone, git_cmds, flask_app
+    ):
+        """
+        Test the case that the HEAD and the branches of the origin remote match
+        those recorded in the RepoUrl so that no fetch is done
+        """
+        url, origin_remote_ds, initial_ds_clone = repo_url_with_up_to_date_clone
+        url = _record_branches(url, initial_ds_clone, flask_app)
+        git_cmds.clear()
+
+        with flask_app.app_context():
+            up_to_date_clone, is_up_to_date_clone_new = update_ds_clone(url)
+
+        assert not is_up_to_date_clone_new
+        assert up_to_date_clone.path == initial_ds_clone.path
+        assert up_to_date_clone.repo.get_hexsha() == origin_remote_ds.repo.get_hexsha()
+
+        assert "fetch" not in (cmd[0] for cmd in git_cmds)
+        assert "merge" not in (cmd[0] for cmd in git_cmds)
+
+    def test_annex_only_change_short_circuits(
+        self, repo_url_with_up_to_date_clone, git_cmds, flask_app
+    ):
+        """
+        Test the case that only the git-annex branch of the origin remote has changed
+        since the branches were recorded in the RepoUrl so that no fetch is done
+        """
+        url, origin_remote_ds, initial_ds_clone = repo_url_with_up_to_date_clone
+        url = _record_branches(url, initial_ds_clone, flask_app)
+
+        # Change only the git-annex branch of the origin remote
+        annex_branch_hexsha = origin_remote_ds.repo.get_hexsha("git-annex")
+        origin_remote_ds.repo.call_annex(["describe", "here", "A new description"])
+        assert origin_remote_ds.repo.get_hexsha("git-annex") != annex_branch_hexsha
+
+        git_cmds.clear()
+
+        with flask_app.app_context():
+            up_to_date_clone, is_up_to_date_clone_new = update_ds_clone(url)
+
+        assert not is_up_to_date_clone_new
+        assert up_to_date_clone.path == initial_ds_clone.path
+        assert "fetch" not in (cmd[0] for cmd in git_cmds)
+
+    @pytest.mark.parametrize(
+        "fixture_name, expect_new_clone",
+        [
+            ("repo_url_outdated_by_new_file", False),
+            ("repo_url_off_sync_by_new_default_branch", True),
+            ("repo_url_outdated_by_new_file_at_new_default_branch", True),
+        ],
+    )
+    def test_changed_origin_not_short_circuited(
+        self, fixture_name, expect_new_clone, request, git_cmds, flask_app
+    ):
+        """
+        Test the case that the origin remote has changed since the branches
+        were recorded in the RepoUrl so that the clone is updated as usual
+        """
+        url, origin_remote_ds, initial_ds_clone = request.getfixturevalue(fixture_name)
+
+        # The clone has not fetched the change yet, so it still reflects the
+        # branches of the origin remote at the time of the last update
+        url = _record_branches(url, initial_ds_clone, flask_app)
+        git_cmds.clear()
+
+        with flask_app.app_context():
+            up_to_date_clone, is_up_to_date_clone_new = update_ds_clone(url)
+
+        assert is_up_to_date_clone_new is expect_new_clone
+        assert up_to_date_clone.repo.get_hexsha() == origin_remote_ds.repo.get_hexsha()
+        assert ["fetch", "--prune"] in git_cmds
+
+    def test_branch_deleted_at_origin(
+        self, repo_url_with_up_to_date_clone, git_cmds, flask_app
+    ):
+        """
+        Test the case that a branch has been deleted at the origin remote since
+        the branches were recorded in the RepoUrl so that the branch is pruned from
+        the clone and subsequent updates are short-circuited again
+        """
+        url, origin_remote_ds, initial_ds_clone = repo_url_with_up_to_date_clone
+
+        origin_remote_ds.repo.call_git(["branch", "feature"])
+        initial_ds_clone.repo.call_git(["fetch"])
+        url = _record_branches(url, initial_ds_clone, flask_app)
+        assert "feature" in url.branches
+
+        origin_remote_ds.repo.call_git(["branch", "-D", "feature"])
+
+        with flask_app.app_context():
+            up_to_date_clone, is_up_to_date_clone_new = update_ds_clone(url)
+
+        assert not is_up_to_date_clone_new
+        assert "feature" not in get_origin_branches(up_to_date_clone)
+
+        # Record the branches of the origin remote as done when the RepoUrl is
+        # updated with the clone
+        url = _record_branches(url, up_to_date_clone, flask_app)
+        git_cmds.clear()
+
+        with flask_app.app_context():
+            update_ds_clone(url)
+
+        assert "fetch" not in (cmd[0] for cmd in git_cmds)
+
+    @pytest.mark.parametrize("strategy", list(CloneStrategy))
+    def test_reclone_with_clone_strategy(
+        self,
+        repo_url_off_sync_by_new_default_branch,
+        strategy,
+        monkeypatch,
+        mocker,
+        flask_app,
+    ):
+        """
+        Test that recloning the dataset uses the configured clone strategy
+        """
+        url, origin_remote_ds, initial_ds_clone = (
+            repo_url_off_sync_by_new_default_branch
+        )
+
+        monkeypatch.setitem(
+            flask_app.config, "DATALAD_REGISTRY_CLONE_STRATEGY", strategy
+        )
+        clone_spy = mocker.spy(tasks_utils, "clone")
+
+        with flask_app.app_context():
+            up_to_date_clone, is_up_to_date_clone_new = update_ds_clone(url)
+            expected_opts = get_git_clone_opts()
+
+        assert is_up_to_date_clone_new
+        assert up_to_date_clone.repo.get_hexsha() == origin_remote_ds.repo.get_hexsha()
+        assert clone_spy.call_args.kwargs["git_clone_opts"] == expected_opts
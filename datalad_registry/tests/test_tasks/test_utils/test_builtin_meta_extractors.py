@@ -1,7 +1,10 @@
 import importlib
+import json
 
 import pytest
+from sqlalchemy import select
 
+from datalad_registry.models import DandiAsset, DatasetFile, URLMetadata, db
 from datalad_registry.utils.datalad_tls import get_head_describe
 
 
@@ -104,13 +107,210 @@ class TestDlregDandiFilesMetaExtract:
         with flask_app.app_context():
             url_metadata = dlreg_dandi_files_meta_extract(repo_url)
 
+            assets = db.session.execute(
+                select(DandiAsset.idx, DandiAsset.asset_metadata).filter_by(
+                    url_metadata_id=url_metadata.id
+                )
+            ).all()
+
         assert url_metadata.dataset_describe == get_head_describe(ds_clone)
         assert url_metadata.dataset_version == ds_clone.repo.get_hexsha()
         assert url_metadata.extractor_name == "dandi:files"
-        assert url_metadata.extractor_version == "0.0.1"
+        assert url_metadata.extractor_version == "0.1.0"
         assert url_metadata.extraction_parameter == {}
-        assert url_metadata.extracted_metadata == [{"asset_id": "123"}]
+        assert url_metadata.extracted_metadata == {"asset_count": 1, "total_size": 0}
         assert url_metadata.url == repo_url
+        assert assets == [(0, {"asset_id": "123"})]
+
+    @pytest.mark.parametrize("batch_size", [1, 2, 3, 1000])
+    def test_batches(
+        self, batch_size, dandi_repo_url_with_up_to_date_clone, flask_app, monkeypatch
+    ):
+        """
+        Test that all the assets are recorded regardless of the batch size
+        """
+        from datalad_registry.tasks.utils.builtin_meta_extractors import (
+            dlreg_dandi_files_meta_extract,
+        )
+
+        repo_url = dandi_repo_url_with_up_to_date_clone[0]
+        ds_clone = dandi_repo_url_with_up_to_date_clone[2]
+
+        assets = [
+            {"asset_id": "1", "path": "a.nwb", "size": 10},
+            {"asset_id": "2", "path": "b.nwb", "size": 2.5},
+            {
+                "asset_id": "3",
+                "path": "c.nwb",
+                "size": 5,
+                "metadata": {"encodingFormat": "application/x-nwb", "x": [1, 2]},
+            },
+            {"asset_id": "4"},
+        ]
+        with open(ds_clone.pathobj / ".dandi/assets.json", "w") as f:
+            json.dump(assets, f)
+
+        monkeypatch.setitem(
+            flask_app.config, "DATALAD_REGISTRY_DANDI_ASSETS_BATCH_SIZE", batch_size
+        )
+
+        with flask_app.app_context():
+            url_metadata = dlreg_dandi_files_meta_extract(repo_url)
+            db.session.commit()
+
+            recorded_assets = (
+                db.session.execute(
+                    select(DandiAsset.asset_metadata)
+                    .filter_by(url_metadata_id=url_metadata.id)
+                    .order_by(DandiAsset.idx)
+                )
+                .scalars()
+                .all()
+            )
+
+            recorded_files = db.session.execute(
+                select(
+                    DatasetFile.path,
+                    DatasetFile.size,
+                    DatasetFile.content_type,
+                    DatasetFile.annex_key,
+                )
+                .filter_by(url_metadata_id=url_metadata.id)
+                .order_by(DatasetFile.path)
+            ).all()
+
+            assert url_metadata.extracted_metadata == {
+                "asset_count": 4,
+                "total_size": 15,
+            }
+
+        assert recorded_assets == assets
+        assert recorded_files == [
+            ("a.nwb", 10, None, None),
+            ("b.nwb", None, None, None),
+            ("c.nwb", 5, "application/x-nwb", None),
+        ]
+
+    @pytest.mark.parametrize(
+        "content, msg",
+        [
+            ("", "doesn't contain valid JSON"),
+            ("{}", "doesn't contain a JSON array"),
+            ('{"asset_id": "123"}', "doesn't contain a JSON array"),
+            ("null", "doesn't contain a JSON array"),
+            # Invalid partway through
+            ('[{"asset_id": "1", "path": "a.nwb", "size": 1}, {"asset_', "valid JSON"),
+            ('[{"asset_id": "1"}, {"asset_id": "2"},', "doesn't contain valid JSON"),
+            ('[{"asset_id": "1"}, }', "doesn't contain valid JSON"),
+        ],
+    )
+    def test_invalid_file(
+        self, content, msg, dandi_repo_url_with_up_to_date_clone, flask_app
+    ):
+        """
+        Test the case that the `.dandi/assets.json` file doesn't contain
+        a valid JSON array
+        """
+        from datalad_registry.tasks.utils.builtin_meta_extractors import (
+            InvalidRequiredFileError,
+            dlreg_dandi_files_meta_extract,
+        )
+
+        repo_url = dandi_repo_url_with_up_to_date_clone[0]
+        ds_clone = dandi_repo_url_with_up_to_date_clone[2]
+
+        with open(ds_clone.pathobj / ".dandi/assets.json", "w") as f:
+            f.write(content)
+
+        with flask_app.app_context():
+            with pytest.raises(InvalidRequiredFileError, match=msg):
+                dlreg_dandi_files_meta_extract(repo_url)
+
+            # Nothing is written to the database
+            assert len(db.session.new) == 0
+            db.session.commit()
+            assert db.session.execute(select(DandiAsset)).first() is None
+            assert db.session.execute(select(DatasetFile)).first() is None
+            assert db.session.execute(select(URLMetadata)).first() is None
+
+    @pytest.mark.parametrize(
+        "sizes, expected_total_size",
+        [
+            ([], 0),
+            ([1, 2, 3], 6),
+            ([10, 2.5, 2.0, 1e3], 1012),
+            (["12", True, None, [1], {"a": 1}, 7], 7),
+        ],
+    )
+    def test_total_size(
+        self,
+        sizes,
+        expected_total_size,
+        dandi_repo_url_with_up_to_date_clone,
+        flask_app,
+    ):
+        """
+        Test that the total size of the assets counts only the sizes that are
+        integral numbers, as the data migration 19707f8489f7 does
+        """
+        from datalad_registry.tasks.utils.builtin_meta_extractors import (
+            dlreg_dandi_files_meta_extract,
+        )
+
+        repo_url = dandi_repo_url_with_up_to_date_clone[0]
+        ds_clone = dandi_repo_url_with_up_to_date_clone[2]
+
+        assets = [{"asset_id": str(i), "size": size} for i, size in enumerate(sizes)]
+        with open(ds_clone.pathobj / ".dandi/assets.json", "w") as f:
+            json.dump(assets, f)
+
+        with flask_app.app_context():
+            url_metadata = dlreg_dandi_files_meta_extract(repo_url)
+
+        assert url_metadata.extracted_metadata == {
+            "asset_count": len(sizes),
+            "total_size": expected_total_size,
+        }
+
+
+class TestRecordDsFiles:
+    def test_record_ds_files(self, repo_url_with_up_to_date_clone, flask_app):
+        """
+        Test recording the files of a dataset
+        """
+        from datalad_registry.tasks.utils.builtin_meta_extractors import record_ds_files
+
+        repo_url = repo_url_with_up_to_date_clone[0]
+        ds_clone = repo_url_with_up_to_date_clone[2]
+
+        with flask_app.app_context():
+            url_metadata = URLMetadata(
+                dataset_describe=get_head_describe(ds_clone),
+                dataset_version=ds_clone.repo.get_hexsha(),
+                extractor_name="bids_dataset",
+                extractor_version="0.0.1",
+                extraction_parameter={},
+                extracted_metadata={},
+                url_id=repo_url.id,
+            )
+            record_ds_files(url_metadata, ds_clone)
+            db.session.commit()
+
+            recorded_files = {
+                f.path: f
+                for f in db.session.execute(
+                    select(DatasetFile).filter_by(url_metadata_id=url_metadata.id)
+                ).scalars()
+            }
+
+        assert {".datalad/config", "file1.txt", "file2.txt"} <= recorded_files.keys()
+        for name in ["file1.txt", "file2.txt"]:
+            assert recorded_files[name].size == 19
+            assert recorded_files[name].content_type == "text/plain"
+            assert recorded_files[name].annex_key == (
+                ds_clone.repo.get_file_annexinfo(name)["key"]
+            )
+        assert recorded_files[".datalad/config"].annex_key is None
 
 
 class TestDlregMetaExtract:
@@ -5,14 +5,20 @@ from datalad.api import Dataset
 import pytest
 
 from datalad_registry.utils.datalad_tls import (
+    DsFile,
     WtAnnexedFileInfo,
     clone,
+    get_blob_ids,
+    get_head_describe,
     get_origin_annex_key_count,
     get_origin_annex_uuid,
     get_origin_branches,
     get_origin_default_branch,
+    get_origin_refs,
     get_origin_upstream_branch,
     get_wt_annexed_file_info,
+    introspect_ds,
+    iter_ds_files,
 )
 
 _TEST_MIN_DATASET_URL = "https://github.com/datalad/testrepo--minimalds.git"
@@ -172,6 +178,70 @@ def test_get_origin_branches(ds_name, request, tmp_path):
         }
 
 
+class TestIntrospectDs:
+    @pytest.mark.parametrize(
+        "ds_name",
+        [
+            "empty_ds_annex_func_scoped",
+            "two_files_ds_annex_func_scoped",
+            "empty_ds_non_annex_func_scoped",
+            "two_files_ds_non_annex_func_scoped",
+        ],
+    )
+    @pytest.mark.parametrize("tagged", [True, False])
+    def test_consistency(self, ds_name, tagged, request, tmp_path):
+        """
+        Test that the introspection of a dataset yields the same information
+        as the individual queries of the information
+        """
+        ds: Dataset = request.getfixturevalue(ds_name)
+
+        if tagged:
+            ds.repo.tag("v0.1.0")
+            ds.repo.tag("annotated", message="An annotated tag", options=["-a"])
+            ds.repo.call_git(["branch", "feature/x"])
+
+        ds_clone = clone(source=ds.path, path=tmp_path)
+
+        ds_info = introspect_ds(ds_clone)
+
+        assert ds_info.ds_id == ds_clone.id
+        assert ds_info.annex_uuid == get_origin_annex_uuid(ds_clone)
+        assert ds_info.annex_key_count == get_origin_annex_key_count(ds_clone)
+        assert ds_info.wt_annexed_file_info == get_wt_annexed_file_info(ds_clone)
+        assert ds_info.head == ds_clone.repo.get_hexsha("origin/HEAD")
+        assert ds_info.head_describe == get_head_describe(ds_clone)
+        assert ds_info.branches == get_origin_branches(ds_clone)
+        assert ds_info.tags == ds_clone.repo.get_tags()
+        assert ds_info.git_objects_kb == (
+            ds_clone.repo.count_objects["size"]
+            + ds_clone.repo.count_objects["size-pack"]
+        )
+
+        if tagged:
+            assert {t["name"] for t in ds_info.tags} == {"v0.1.0", "annotated"}
+            assert "feature/x" in ds_info.branches
+
+        assert set(ds_info.timings) == {
+            "config",
+            "refs",
+            "annex_info",
+            "describe",
+            "count_objects",
+        }
+        assert all(t >= 0 for t in ds_info.timings.values())
+
+    def test_no_origin_head(self, two_files_ds_non_annex, tmp_path):
+        """
+        Test the case that the origin remote has no HEAD
+        """
+        ds_clone = clone(source=two_files_ds_non_annex.path, path=tmp_path)
+        ds_clone.repo.call_git(["symbolic-ref", "-d", "refs/remotes/origin/HEAD"])
+
+        with pytest.raises(ValueError, match="origin/HEAD"):
+            introspect_ds(ds_clone)
+
+
 def _mock_no_match_re_search(*_args, **_kwargs):
     return None
 
@@ -272,3 +342,120 @@ class TestGetOriginUpstreamBranch:
         l2_clone.repo.call_git(["push", "-u", "origin", branch_name])
 
         assert get_origin_upstream_branch(l2_clone) == branch_name
+
+
+class TestGetOriginRefs:
+    def test_no_head(self, two_files_ds_non_annex, tmp_path, monkeypatch):
+        """
+        Test the case that the HEAD of the origin remote of the given dataset
+        can't be extracted from the output of `git ls-remote`
+        """
+        from datalad.dataset.gitrepo import GitRepo
+
+        ds_clone = clone(source=two_files_ds_non_annex.path, path=tmp_path)
+
+        original_call_git = GitRepo.call_git
+
+        def mock_call_git(*args, **kwargs):
+            return "\n".join(
+                line
+                for line in original_call_git(*args, **kwargs).splitlines()
+                if not line.endswith("\tHEAD")
+            )
+
+        monkeypatch.setattr(GitRepo, "call_git", mock_call_git)
+
+        with pytest.raises(RuntimeError, match="Failed to extract the default branch"):
+            get_origin_refs(ds_clone)
+
+    @pytest.mark.parametrize(
+        "ds_name",
+        [
+            "empty_ds_annex",
+            "two_files_ds_annex",
+            "empty_ds_non_annex",
+            "two_files_ds_non_annex",
+        ],
+    )
+    @pytest.mark.parametrize("branch_name", ["foo", "bar"])
+    def test_normal_operation(self, ds_name, branch_name, request, tmp_path):
+        """
+        Test the normal operation of `get_origin_refs`
+        """
+        ds: Dataset = request.getfixturevalue(ds_name)
+
+        l1_clone, l2_clone = _two_level_clone(ds, tmp_path)
+
+        l1_clone.repo.call_git(["checkout", "-b", branch_name])
+
+        origin_refs = get_origin_refs(l2_clone)
+
+        assert origin_refs.default_branch == branch_name
+        assert origin_refs.head == l1_clone.repo.get_hexsha()
+        assert origin_refs.branches == {
+            b: l1_clone.repo.get_hexsha(b) for b in l1_clone.repo.get_branches()
+        }
+
+
+class TestIterDsFiles:
+    def test_annex_repo(self, two_files_ds_annex):
+        """
+        Test the case that the given dataset is a git-annex repo
+        """
+        ds_files = {f.path: f for f in iter_ds_files(two_files_ds_annex)}
+
+        assert {".datalad/config", ".gitattributes"} <= ds_files.keys()
+        for name in ["file1.txt", "file2.txt"]:
+            assert ds_files[name].size == 19
+            assert ds_files[name].annex_key == (
+                two_files_ds_annex.repo.get_file_annexinfo(name)["key"]
+            )
+        assert ds_files[".datalad/config"].annex_key is None
+
+    def test_non_annex_repo(self, two_files_ds_non_annex):
+        """
+        Test the case that the given dataset is not a git-annex repo
+        """
+        ds_files = {f.path: f for f in iter_ds_files(two_files_ds_non_annex)}
+
+        for name in ["file1.txt", "file2.txt"]:
+            assert ds_files[name] == DsFile(path=name, size=19, annex_key=None)
+
+    def test_subdataset_excluded(self, two_files_ds_non_annex, tmp_path):
+        """
+        Test that subdatasets are not included
+        """
+        ds = clone(
+            source=two_files_ds_non_annex,
+            path=tmp_path / "ds",
+            on_failure="stop",
+            result_renderer="disabled",
+        )
+        ds.create("sub", annex=False, result_renderer="disabled")
+
+        paths = {f.path for f in iter_ds_files(ds)}
+
+        assert "file1.txt" in paths
+        assert ".gitmodules" in paths
+        assert not any(p == "sub" or p.startswith("sub/") for p in paths)
+
+
+class TestGetBlobIds:
+    def test_get_blob_ids(self, two_files_ds_annex):
+        """
+        Test getting the blob IDs of files in the HEAD commit of a dataset
+        """
+        repo = two_files_ds_annex.repo
+
+        assert get_blob_ids(
+            two_files_ds_annex,
+            [".datalad/config", "file1.txt", "nonexistent", ".datalad"],
+        ) == {
+            ".datalad/config": repo.call_git(
+                ["rev-parse", "HEAD:.datalad/config"]
+            ).strip(),
+            "file1.txt": repo.call_git(["rev-parse", "HEAD:file1.txt"]).strip(),
+        }
+
+    def test_no_paths(self, two_files_ds_annex):
+        assert get_blob_ids(two_files_ds_annex, []) == {}
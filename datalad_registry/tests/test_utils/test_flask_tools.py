@@ -0,0 +1,113 @@
+import pytest
+from sqlalchemy import select
+
+from datalad_registry.conf import CountMode
+from datalad_registry.models import RepoUrl
+from datalad_registry.tests.tools import record_sql_statements
+from datalad_registry.utils.flask_tools import paginate
+
+
+@pytest.mark.usefixtures("populate_with_std_ds_urls")
+class TestPaginate:
+    @pytest.mark.parametrize(
+        "count_mode, count_cap, page, per_page, expected_total, "
+        "expected_total_is_exact, expected_pages",
+        [
+            (CountMode.exact, 1, 1, 3, 4, True, 2),
+            (CountMode.exact, 1, 2, 3, 4, True, 2),
+            (CountMode.capped, 10, 1, 3, 4, True, 2),
+            (CountMode.capped, 4, 1, 3, 4, True, 2),
+            (CountMode.capped, 3, 1, 3, 4, False, 2),
+            (CountMode.capped, 2, 1, 1, 2, False, 2),
+            (CountMode.capped, 2, 3, 1, 4, False, 4),
+            (CountMode.capped, 1, 2, 1, 3, False, 3),
+            (CountMode.capped, 1, 2, 3, 4, True, 2),
+            (CountMode.estimated, 10, 1, 3, 4, True, 2),
+            (CountMode.estimated, 1, 4, 1, 4, True, 4),
+            (CountMode.capped, 1, 1, 10, 4, True, 1),
+        ],
+    )
+    def test_count(
+        self,
+        count_mode,
+        count_cap,
+        page,
+        per_page,
+        expected_total,
+        expected_total_is_exact,
+        expected_pages,
+        flask_app,
+    ):
+        with flask_app.app_context():
+            pagination = paginate(
+                select(RepoUrl).order_by(RepoUrl.id),
+                count_mode=count_mode,
+                count_cap=count_cap,
+                page=page,
+                per_page=per_page,
+            )
+
+            assert [u.id for u in pagination.items] == list(
+                range((page - 1) * per_page + 1, min(page * per_page, 4) + 1)
+            )
+            assert pagination.total == expected_total
+            assert pagination.total_is_exact is expected_total_is_exact
+            assert pagination.pages == expected_pages
+            assert pagination.has_next is (page * per_page < 4)
+
+    def test_estimated_count(self, flask_app):
+        """
+        Test that a total beyond the cap is estimated, but never below the cap
+        """
+        with flask_app.app_context():
+            pagination = paginate(
+                select(RepoUrl),
+                count_mode=CountMode.estimated,
+                count_cap=2,
+                per_page=1,
+            )
+
+            assert pagination.total_is_exact is False
+            assert pagination.total >= 2
+
+    def test_estimated_count_below_items(self, monkeypatch, flask_app):
+        """
+        Test that an estimated total is never below the number of items up to
+        the first item of the next page
+        """
+        from datalad_registry.utils import flask_tools
+
+        monkeypatch.setattr(flask_tools, "_get_row_estimate", lambda *_: 0)
+
+        with flask_app.app_context():
+            pagination = paginate(
+                select(RepoUrl).order_by(RepoUrl.id),
+                count_mode=CountMode.estimated,
+                count_cap=1,
+                page=2,
+                per_page=1,
+            )
+
+            assert pagination.total_is_exact is False
+            assert pagination.total == 3
+            assert pagination.pages == 3
+
+    @pytest.mark.parametrize("count_mode", list(CountMode))
+    def test_no_count_query_for_last_page(self, count_mode, flask_app):
+        """
+        Test that no count query is issued if the current page is the last page
+        """
+        with record_sql_statements(flask_app) as statements:
+            with flask_app.app_context():
+                pagination = paginate(
+                    select(RepoUrl),
+                    count_mode=count_mode,
+                    count_cap=1,
+                    page=2,
+                    per_page=3,
+                )
+
+        assert pagination.total == 4
+        assert pagination.total_is_exact is True
+        assert len(statements) == 1
+        assert "count(" not in statements[0].lower()
@@ -0,0 +1,120 @@
+from flask import Flask
+import pytest
+
+from datalad_registry.conf import ResponseCacheBackend
+from datalad_registry.utils.response_cache import (
+    RESPONSE_CACHE_EXT_KEY,
+    MemoryResponseCache,
+    RedisResponseCache,
+    response_cache_init_app,
+)
+
+
+class TestMemoryResponseCache:
+    def test_get_set(self):
+        cache = MemoryResponseCache(max_bytes=100)
+        assert cache.get("a") is None
+
+        cache.set("a", b"123")
+        assert cache.get("a") == b"123"
+
+        cache.set("a", b"4567")
+        assert cache.get("a") == b"4567"
+
+    def test_eviction(self):
+        """
+        Test that the least recently used responses are evicted to keep the total
+        size of the cached responses within the bound
+        """
+        cache = MemoryResponseCache(max_bytes=10)
+        cache.set("a", b"1234")
+        cache.set("b", b"1234")
+        assert cache.get("a") == b"1234"  # "b" is now the least recently used
+
+        cache.set("c", b"1234")
+        assert cache.get("a") == b"1234"
+        assert cache.get("b") is None
+        assert cache.get("c") == b"1234"
+
+        # Replacing a response frees the space of the replaced response
+        cache.set("a", b"12")
+        cache.set("d", b"1234")
+        assert cache.get("a") == b"12"
+        assert cache.get("c") == b"1234"
+        assert cache.get("d") == b"1234"
+
+    def test_oversized_response(self):
+        cache = MemoryResponseCache(max_bytes=4)
+        cache.set("a", b"1234")
+        cache.set("b", b"12345")
+
+        assert cache.get("a") == b"1234"
+        assert cache.get("b") is None
+
+
+class TestRedisResponseCache:
+    def test_unavailable_redis(self):
+        """
+        Test that the failures in accessing Redis are treated as misses
+        """
+        cache = RedisResponseCache("redis://localhost:1", ttl=60)
+
+        cache.set("a", b"1234")
+        assert cache.get("a") is None
+
+
+class TestResponseCacheInitApp:
+    @staticmethod
+    def _app(**config) -> Flask:
+        app = Flask(__name__)
+        app.config.update(
+            DATALAD_REGISTRY_RESPONSE_CACHE_MAX_BYTES=1024,
+            DATALAD_REGISTRY_RESPONSE_CACHE_REDIS_URL=None,
+            DATALAD_REGISTRY_RESPONSE_CACHE_TTL=60,
+            CELERY_RESULT_BACKEND="redis://localhost:6379",
+        )
+        app.config.update(config)
+        return app
+
+    def test_none(self):
+        app = self._app(
+            DATALAD_REGISTRY_RESPONSE_CACHE_BACKEND=ResponseCacheBackend.NONE
+        )
+        assert response_cache_init_app(app) is None
+        assert RESPONSE_CACHE_EXT_KEY not in app.extensions
+
+    def test_memory(self):
+        app = self._app(
+            DATALAD_REGISTRY_RESPONSE_CACHE_BACKEND=ResponseCacheBackend.MEMORY
+        )
+        cache = response_cache_init_app(app)
+        assert isinstance(cache, MemoryResponseCache)
+        assert cache.max_bytes == 1024
+        assert app.extensions[RESPONSE_CACHE_EXT_KEY] is cache
+
+    @pytest.mark.parametrize(
+        "redis_url, result_backend",
+        [
+            (None, "redis://localhost:6379"),
+            ("redis://localhost:6380/1", "dummy://"),
+        ],
+    )
+    def test_redis(self, redis_url, result_backend):
+        app = self._app(
+            DATALAD_REGISTRY_RESPONSE_CACHE_BACKEND=ResponseCacheBackend.REDIS,
+            DATALAD_REGISTRY_RESPONSE_CACHE_REDIS_URL=redis_url,
+            CELERY_RESULT_BACKEND=result_backend,
+        )
+
+        cache = response_cache_init_app(app)
+        assert isinstance(cache, RedisResponseCache)
+        assert cache.ttl == 60
+        assert app.extensions[RESPONSE_CACHE_EXT_KEY] is cache
+
+    def test_redis_without_redis_url(self):
+        app = self._app(
+            DATALAD_REGISTRY_RESPONSE_CACHE_BACKEND=ResponseCacheBackend.REDIS,
+            CELERY_RESULT_BACKEND="dummy://",
+        )
+        with pytest.raises(ValueError, match="not a Redis URL"):
+            response_cache_init_app(app)
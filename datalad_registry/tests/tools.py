@@ -1,6 +1,10 @@
 # This file contains helper functions for testing purposes
 
+from collections.abc import Iterator
+from contextlib import contextmanager
+
 from flask import Flask
+from sqlalchemy import event
 
 from datalad_registry.models import RepoUrl, db
 
@@ -20,3 +24,29 @@ def populate_with_dataset_urls(urls: list[RepoUrl], flask_app: Flask) -> list[st
         db.session.commit()
 
         return [url.url for url in urls]
+
+
+@contextmanager
+def record_sql_statements(flask_app: Flask) -> Iterator[list[str]]:
+    """
+    Record the SQL statements executed through the database engine of a Flask app
+    within the context
+
+    :param flask_app: The Flask app instance which provides the database engine
+    :return: A context manager providing the list to which the executed SQL
+             statements are recorded
+    """
+
+    statements: list[str] = []
+
+    def record(_conn, _cursor, statement, _parameters, _context, _executemany):
+        statements.append(statement)
+
+    with flask_app.app_context():
+        engine = db.engine
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
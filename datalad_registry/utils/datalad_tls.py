@@ -1,5 +1,7 @@
-from dataclasses import dataclass
+from collections.abc import Iterable, Iterator
+from dataclasses import dataclass, field
 import re
+from time import perf_counter
 from typing import Optional
 from uuid import UUID
 
@@ -18,6 +20,61 @@ class WtAnnexedFileInfo:
     size: int
 
 
+@dataclass
+class DsIntrospection:
+    """
+    Represent the information of a datalad dataset, a clone of the dataset at
+    the origin remote, as collected by `introspect_ds()`
+    """
+
+    ds_id: Optional[str]
+    annex_uuid: Optional[UUID]  # The annex UUID of the origin remote
+    annex_key_count: Optional[int]  # The "remote annex keys" of the origin remote
+    wt_annexed_file_info: Optional[WtAnnexedFileInfo]
+    head: str  # The hexsha of the commit at `origin/HEAD`
+    head_describe: str  # The output of `git describe --tags --always`
+
+    # The branches of the origin remote in the format of `get_origin_branches()`
+    branches: dict[str, dict[str, str]]
+
+    # The tags in the format of `datalad.support.gitrepo.GitRepo.get_tags()`
+    tags: list[dict[str, str]]
+
+    git_objects_kb: int  # The size of the `.git/objects` in KiB
+
+    # The time, in seconds, spent in each step of the introspection
+    timings: dict[str, float] = field(default_factory=dict)
+
+
+@dataclass
+class OriginRefs:
+    """
+    Represent the HEAD and the branches of the origin remote of a git repo
+    as reported by `git ls-remote`
+    """
+
+    default_branch: str  # The name of the branch that the HEAD points to
+    head: str  # The hexsha of the commit at the HEAD
+
+    # The hexshas of the commits at the heads of the branches, keyed by branch names
+    branches: dict[str, str]
+
+
+@dataclass
+class DsFile:
+    """
+    Represent a file in the HEAD commit of a datalad dataset
+    """
+
+    path: str  # The path of the file relative to the root of the dataset
+
+    # The size of the file in bytes, which is the size of the annexed content
+    # if the file is annexed. None if the size is unknown.
+    size: Optional[int]
+
+    annex_key: Optional[str]  # The git-annex key of the file if the file is annexed
+
+
 def clone(*args, **kwargs) -> dl.Dataset:
     """
     Clone (copy) a dataset from a given URL or local directory
@@ -94,6 +151,77 @@ def get_wt_annexed_file_info(ds: Dataset) -> Optional[WtAnnexedFileInfo]:
         return None
 
 
+def iter_ds_files(ds: Dataset) -> Iterator[DsFile]:
+    """
+    Iterate over the files in the HEAD commit of a given dataset
+
+    :param ds: The given dataset
+    :return: An iterator over the files, in the order of their paths
+
+    Note: Subdatasets are not traversed, and they are not included in the iteration.
+    """
+    # The keys and the sizes of the annexed files keyed by their paths
+    annexed_files: dict[str, tuple[str, Optional[int]]] = {}
+    if ds.repo.is_with_annex():
+        for record in ds.repo.call_annex_records(["find", "--include=*"]):
+            bytesize = record.get("bytesize")
+            annexed_files[record["file"]] = (
+                record["key"],
+                int(bytesize) if bytesize is not None and bytesize.isdigit() else None,
+            )
+
+    for item in ds.repo.call_git_items_(
+        ["ls-tree", "-r", "-l", "-z", "--full-tree", "HEAD"], sep="\0"
+    ):
+        if not item:
+            continue
+
+        # Each item is in the form of "<mode> <type> <object> <size>\t<path>"
+        info, _, path = item.partition("\t")
+        _, obj_type, _, size = info.split()
+        if obj_type != "blob":
+            # Skip subdatasets
+            continue
+
+        if path in annexed_files:
+            annex_key, annexed_size = annexed_files[path]
+            yield DsFile(path=path, size=annexed_size, annex_key=annex_key)
+        else:
+            yield DsFile(path=path, size=int(size), annex_key=None)
+
+
+def get_blob_ids(ds: Dataset, paths: Iterable[str]) -> dict[str, str]:
+    """
+    Get the git blob IDs of given files in the HEAD commit of a given dataset
+
+    :param ds: The given dataset
+    :param paths: The paths of the files relative to the root of the dataset
+    :return: A dictionary mapping the path of each of the given files that is in the
+             HEAD commit to the ID of its blob. (The blob of an annexed file is its
+             symlink or pointer file, which identifies the annexed content by its key.)
+    """
+    paths = set(paths)
+    if not paths:
+        return {}
+
+    blob_ids: dict[str, str] = {}
+    for item in ds.repo.call_git_items_(
+        ["ls-tree", "-z", "--full-tree", "HEAD", "--", *paths], sep="\0"
+    ):
+        if not item:
+            continue
+
+        # Each item is in the form of "<mode> <type> <object>\t<path>"
+        info, _, path = item.partition("\t")
+        _, obj_type, obj_id = info.split()
+
+        # (The entries in a given directory are listed as well.)
+        if obj_type == "blob" and path in paths:
+            blob_ids[path] = obj_id
+
+    return blob_ids
+
+
 def get_head_describe(ds: Dataset) -> str:
     """
     Get the output of `git describe --tags --always` of a given dataset
@@ -152,6 +280,42 @@ def get_origin_default_branch(ds: Dataset) -> str:
     return match.group(1)
 
 
+def get_origin_refs(ds: Dataset) -> OriginRefs:
+    """
+    Get the HEAD and the branches of the origin remote of a given dataset
+    with a single `git ls-remote`
+
+    :param ds: The given dataset
+    :return: The HEAD and the branches of the origin remote of the given dataset
+
+    Note: The given dataset must be a git repo with a remote named "origin"
+    """
+    ls_remote_output = ds.repo.call_git(
+        ["ls-remote", "--symref", "origin", "HEAD", "refs/heads/*"]
+    )
+
+    default_branch: Optional[str] = None
+    head: Optional[str] = None
+    branches: dict[str, str] = {}
+    for line in ls_remote_output.splitlines():
+        if (match := re.fullmatch(r"ref: refs/heads/(\S+)\s+HEAD", line)) is not None:
+            default_branch = match.group(1)
+        else:
+            hexsha, _, ref_name = line.partition("\t")
+            if ref_name == "HEAD":
+                head = hexsha
+            elif ref_name.startswith("refs/heads/"):
+                branches[ref_name[len("refs/heads/") :]] = hexsha
+
+    if default_branch is None or head is None:
+        raise RuntimeError(
+            "Failed to extract the default branch and the HEAD of the origin remote "
+            "from the output of `git ls-remote --symref origin HEAD refs/heads/*`"
+        )
+
+    return OriginRefs(default_branch=default_branch, head=head, branches=branches)
+
+
 def get_origin_upstream_branch(ds: Dataset) -> str:
     """
     Get the name of the upstream branch at the origin remote of the current local branch
@@ -177,3 +341,103 @@ def get_origin_upstream_branch(ds: Dataset) -> str:
         )
 
     return match.group(1)
+
+
+def introspect_ds(ds: Dataset) -> DsIntrospection:
+    """
+    Collect the information of a given datalad dataset, a clone of the dataset at
+    the origin remote, with as few git and git-annex invocations as possible
+
+    The information is identical to that provided by `get_origin_annex_uuid()`,
+    `get_origin_annex_key_count()`, `get_wt_annexed_file_info()`,
+    `get_head_describe()`, `get_origin_branches()`, `ds.repo.get_hexsha("origin/HEAD")`,
+    `ds.repo.get_tags()`, and `ds.repo.count_objects`, but it is collected with one
+    `git for-each-ref`, for the HEAD, the branches, and the tags, one
+    `git annex info`, for the origin remote and the working tree,
+    one `git describe`, and one `git count-objects`.
+
+    :param ds: The given dataset
+    :return: The information of the dataset along with the time spent in each step
+             of the collection
+    :raises ValueError: If the origin remote has no HEAD
+    """
+    timings: dict[str, float] = {}
+
+    # === Information in the git config ===
+    start = perf_counter()
+    ds_id = ds.id
+    annex_uuid = get_origin_annex_uuid(ds)
+    timings["config"] = perf_counter() - start
+
+    # === HEAD, branches, and tags ===
+    start = perf_counter()
+    head: Optional[str] = None
+    branches: dict[str, dict[str, str]] = {}
+    tags: list[dict[str, str]] = []
+    origin_prefix = "refs/remotes/origin/"
+    tags_prefix = "refs/tags/"
+    for ref in ds.repo.for_each_ref_(
+        fields=["refname", "objectname", "object", "authordate:iso8601-strict"],
+        pattern=[origin_prefix, "refs/tags"],
+        # The order of the tags as listed by `ds.repo.get_tags()`
+        sort="creatordate",
+    ):
+        refname = ref["refname"]
+        if refname.startswith(tags_prefix):
+            tags.append(
+                dict(
+                    name=refname[len(tags_prefix) :],
+                    hexsha=ref["object"] if ref["object"] else ref["objectname"],
+                )
+            )
+        elif (branch_name := refname[len(origin_prefix) :]) == "HEAD":
+            head = ref["objectname"]
+        else:
+            branches[branch_name] = {
+                "hexsha": ref["objectname"],
+                "last_commit_dt": ref["authordate:iso8601-strict"],
+            }
+    if head is None:
+        raise ValueError("Unknown commit identifier: origin/HEAD")
+    timings["refs"] = perf_counter() - start
+
+    # === Annex information of the origin remote and the working tree ===
+    start = perf_counter()
+    annex_key_count: Optional[int] = None
+    wt_annexed_file_info: Optional[WtAnnexedFileInfo] = None
+    if ds.repo.is_with_annex():
+        for annex_record in ds.repo.call_annex_records(
+            ["info", "--bytes"], ["origin", "."]
+        ):
+            if "remote annex keys" in annex_record:
+                annex_key_count = annex_record["remote annex keys"]
+            else:
+                wt_annexed_file_info = WtAnnexedFileInfo(
+                    count=annex_record["annexed files in working tree"],
+                    size=int(annex_record["size of annexed files in working tree"]),
+                )
+    timings["annex_info"] = perf_counter() - start
+
+    # === Description of HEAD ===
+    start = perf_counter()
+    head_describe = get_head_describe(ds)
+    timings["describe"] = perf_counter() - start
+
+    # === Size of the git objects ===
+    start = perf_counter()
+    count_objects = ds.repo.count_objects
+    git_objects_kb = count_objects["size"] + count_objects["size-pack"]
+    timings["count_objects"] = perf_counter() - start
+
+    return DsIntrospection(
+        ds_id=ds_id,
+        annex_uuid=annex_uuid,
+        annex_key_count=annex_key_count,
+        wt_annexed_file_info=wt_annexed_file_info,
+        head=head,
+        head_describe=head_describe,
+        branches=branches,
+        tags=tags,
+        git_objects_kb=git_objects_kb,
+        timings=timings,
+    )
@@ -1,4 +1,26 @@
-from flask import Response, current_app
+from collections.abc import Callable
+from functools import wraps
+from hashlib import sha256
+from http import HTTPStatus
+from importlib.metadata import version
+from typing import Any, Optional
+from urllib.parse import urlencode
+
+from flask import Response, current_app, request
+from flask.typing import ResponseReturnValue
+from flask_sqlalchemy.pagination import SelectPagination
+from sqlalchemy import Select, func, select
+from sqlalchemy.orm import lazyload
+from werkzeug.http import is_resource_modified
+
+from datalad_registry.conf import CountMode
+from datalad_registry.models import RegistryVersion, db
+from datalad_registry.utils.response_cache import RESPONSE_CACHE_EXT_KEY, ResponseCache
+
+# The version of the application, which is to be part of the entity tags of
+# the responses since the representation of the content of the registry may differ
+# between versions of the application
+APP_VERSION = version("datalad-registry")
 
 
 def json_resp_from_str(json_str: str, **kwargs) -> Response:
@@ -15,3 +37,240 @@ def json_resp_from_str(json_str: str, **kwargs) -> Response:
           fixed to `application/json`.
     """
     return current_app.response_class(json_str, mimetype="application/json", **kwargs)
+
+
+class CountedPagination(SelectPagination):
+    """
+    A pagination of the results of a select statement of which the total number
+    of items can be counted in any of the ways enumerated by `CountMode`
+
+    The items of a page are fetched along with the first item of the next page, if
+    any, so that whether there is a next page is known regardless of the total.
+    No count query is issued if the total can be inferred from the items of
+    the current page, i.e., if the current page is the last page.
+
+    `total_is_exact` tells whether `total` is the exact total number of items.
+    If it is not, `total` is still at least the number of the items up to the first
+    item of the next page, if any, so `pages` counts at least up to the next page.
+    """
+
+    def __init__(self, *, count_mode: CountMode, count_cap: int, **kwargs: Any):
+        self.count_mode = count_mode
+        self.count_cap = count_cap
+        self.total_is_exact = True
+        self._has_more = False
+        super().__init__(**kwargs)
+
+    def _query_items(self) -> list[Any]:
+        select_stmt = self._query_args["select"]
+        session = self._query_args["session"]
+        items = list(
+            session.execute(
+                select_stmt.limit(self.per_page + 1).offset(self._query_offset)
+            )
+            .unique()
+            .scalars()
+        )
+        self._has_more = len(items) > self.per_page
+        return items[: self.per_page]
+
+    def _query_count(self) -> int:
+        if not self._has_more and (self.items or self.page == 1):
+            # The current page is the last page
+            return self._query_offset + len(self.items)
+
+        if self.count_mode == CountMode.exact:
+            return super()._query_count()
+
+        select_stmt: Select = (
+            self._query_args["select"].options(lazyload("*")).order_by(None)
+        )
+        session = self._query_args["session"]
+
+        # Count the items up to one beyond the cap
+        capped_count = session.execute(
+            select(func.count()).select_from(
+                select_stmt.limit(self.count_cap + 1).subquery()
+            )
+        ).scalar_one()
+        if capped_count <= self.count_cap:
+            return capped_count
+
+        self.total_is_exact = False
+
+        # The items up to the first item of the next page, if any, are known to exist
+        min_total = max(
+            self.count_cap, self._query_offset + len(self.items) + self._has_more
+        )
+        if self.count_mode == CountMode.capped:
+            return min_total
+        else:
+            return max(_get_row_estimate(session, select_stmt), min_total)
+
+    @property
+    def has_next(self) -> bool:
+        return self._has_more
+
+
+def _get_row_estimate(session, select_stmt: Select) -> int:
+    """
+    Get the estimate, by the query planner of PostgreSQL, of the number of rows
+    returned by a select statement
+    """
+    compiled = select_stmt.compile(
+        dialect=session.get_bind().dialect,
+        compile_kwargs={"render_postcompile": True},
+    )
+    plan = (
+        session.connection()
+        .exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params)
+        .scalar_one()
+    )
+    return int(plan[0]["Plan"]["Plan Rows"])
+
+
+def paginate(
+    select_stmt: Select,
+    *,
+    count_mode: CountMode = CountMode.exact,
+    count_cap: int = 10000,
+    **kwargs: Any,
+) -> CountedPagination:
+    """
+    Paginate the results of a select statement, as `SQLAlchemy.paginate`
+    of Flask-SQLAlchemy does, but with the total number of items counted
+    in a given way
+
+    :param select_stmt: The select statement
+    :param count_mode: The way of counting the total number of items
+    :param count_cap: The cap of the count if `count_mode` is not `CountMode.exact`
+    :param kwargs: The other arguments, `page`, `per_page`, `max_per_page`,
+                   and `error_out`, as accepted by `SQLAlchemy.paginate`
+
+    Note: The execution of this function requires the Flask app's context
+    """
+    return CountedPagination(
+        select=select_stmt,
+        session=db.session(),
+        count_mode=count_mode,
+        count_cap=count_cap,
+        **kwargs,
+    )
+
+
+def conditional_resp(
+    make_resp: Callable[[], ResponseReturnValue],
+    *,
+    etag: str,
+    max_age: int = 0,
+) -> Response:
+    """
+    Respond to the current request, which may be a conditional request, with a
+    response validated by a given entity tag
+
+    If the request is conditional, by the `If-None-Match` header, and the condition
+    shows that the requester has the current representation of the resource,
+    a 304 (Not Modified) response is returned without calling `make_resp`.
+    Otherwise, the response made by `make_resp` is returned, with the entity tag
+    and the `Cache-Control` header if it is a 200 (OK) response.
+
+    :param make_resp: The function that makes the full response
+    :param etag: The (strong) entity tag, unquoted, of the current representation
+                 of the resource
+    :param max_age: The time, in seconds, for which the response can be served by
+                    caches without revalidation
+    :return: The response
+
+    Note: This requires an active request context of Flask
+    """
+    if is_resource_modified(request.environ, etag=etag):
+        resp = current_app.make_response(make_resp())
+        if resp.status_code != HTTPStatus.OK:
+            return resp
+    else:
+        resp = current_app.response_class(status=HTTPStatus.NOT_MODIFIED)
+
+    resp.set_etag(etag)
+    resp.cache_control.public = True
+    if max_age > 0:
+        resp.cache_control.max_age = max_age
+    else:
+        resp.cache_control.no_cache = True
+
+    return resp
+
+
+def get_registry_version() -> int:
+    """
+    Get the version of the content of the registry
+
+    Note: The execution of this function requires the Flask app's context
+    """
+    return db.session.execute(select(RegistryVersion.version)).scalar_one()
+
+
+def conditional_on_registry_version(view_func):
+    """
+    Decorator for view functions of which the responses are determined by
+    the request and the content of the registry
+
+    The responses are validated by the version of the content of the registry,
+    see `RegistryVersion`, so that the view function is not called if the requester,
+    e.g., a cache, has the current response already, as shown by a conditional
+    request. Nor is the view function called if the response to the same request
+    at the current version is in the response cache of the app, if any.
+
+    Note: The responses carry no `Last-Modified` header since the version can change
+          many times within the one-second resolution of the header.
+
+    :param view_func: The view function to decorate
+    :return: The decorated view function
+    """
+
+    @wraps(view_func)
+    def wrapper(*args, **kwargs):
+        # The version is obtained before the response is made so that the content
+        # presented by the response is never older than the version
+        registry_version = get_registry_version()
+        etag = f"{APP_VERSION}-{registry_version}"
+
+        def make_resp() -> ResponseReturnValue:
+            cache: Optional[ResponseCache] = current_app.extensions.get(
+                RESPONSE_CACHE_EXT_KEY
+            )
+            if cache is None:
+                return view_func(*args, **kwargs)
+
+            key = _get_response_cache_key(etag)
+            cached = cache.get(key)
+            if cached is not None:
+                content_type, body = cached.split(b"\n", 1)
+                return current_app.response_class(
+                    body, content_type=content_type.decode()
+                )
+
+            resp = current_app.make_response(view_func(*args, **kwargs))
+            if resp.status_code == HTTPStatus.OK and not resp.is_streamed:
+                cache.set(key, f"{resp.content_type}\n".encode() + resp.get_data())
+            return resp
+
+        return conditional_resp(
+            make_resp,
+            etag=etag,
+            max_age=current_app.config["DATALAD_REGISTRY_CACHE_MAX_AGE"],
+        )
+
+    return wrapper
+
+
+def _get_response_cache_key(etag: str) -> str:
+    """
+    Get the key of the response to the current request in the response cache
+
+    :param etag: The entity tag of the current version of the content of
+                 the registry as presented by the app
+    :return: The key, which identifies the request by its path and its query
+             parameters, in a normalized order, at the current version
+    """
+    args = urlencode(sorted(request.args.items(multi=True)))
+    return sha256(f"{etag}\0{request.path}\0{args}".encode()).hexdigest()
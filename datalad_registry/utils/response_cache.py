@@ -0,0 +1,150 @@
+# This file contains the server-side cache of the responses of the read endpoints
+# presenting the dataset URLs
+
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+import logging
+from threading import Lock
+from typing import Optional
+
+from flask import Flask
+from redis import Redis, RedisError
+
+from datalad_registry.conf import ResponseCacheBackend
+
+lgr = logging.getLogger(__name__)
+
+# The key under which the response cache is stored in `Flask.extensions`
+RESPONSE_CACHE_EXT_KEY = "response_cache"
+
+
+class ResponseCache(ABC):
+    """
+    A cache of the responses, as bytes, of the read endpoints
+
+    The keys of the responses are to include the version of the content of
+    the registry at which the responses were made, so no entry ever needs to be
+    invalidated. Entries of past versions are evicted, or expire, in time.
+    """
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[bytes]:
+        """
+        Get the response cached under a given key
+
+        :return: The response, or `None` if no response is cached under the key
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    def set(self, key: str, value: bytes) -> None:
+        """
+        Cache a response under a given key
+        """
+        raise NotImplementedError
+
+
+class MemoryResponseCache(ResponseCache):
+    """
+    A least-recently-used cache of responses in the memory of the current process
+    that is bounded by the total size of the responses
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, bytes] = OrderedDict()
+        self._size = 0
+        self._lock = Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: bytes) -> None:
+        if len(value) > self.max_bytes:
+            # The response would evict every other response from the cache
+            return
+
+        with self._lock:
+            old_value = self._entries.pop(key, None)
+            if old_value is not None:
+                self._size -= len(old_value)
+
+            self._entries[key] = value
+            self._size += len(value)
+
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+
+class RedisResponseCache(ResponseCache):
+    """
+    A cache of responses in Redis with a fixed time to live for each response
+
+    Failures in accessing Redis are logged and are otherwise treated as misses
+    so that the responses can still be made when Redis is unavailable.
+    """
+
+    # The prefix of the keys of the responses in Redis, which separates them from
+    # other data, such as the results of Celery tasks, in the same database
+    KEY_PREFIX = "datalad_registry:response:"
+
+    def __init__(self, url: str, ttl: int):
+        self.ttl = ttl
+        self._client = Redis.from_url(url, socket_connect_timeout=1, socket_timeout=1)
+
+    def get(self, key: str) -> Optional[bytes]:
+        try:
+            return self._client.get(self.KEY_PREFIX + key)  # type: ignore[return-value]
+        except RedisError:
+            lgr.warning("Failed to get a response from Redis", exc_info=True)
+            return None
+
+    def set(self, key: str, value: bytes) -> None:
+        try:
+            self._client.set(self.KEY_PREFIX + key, value, ex=self.ttl)
+        except RedisError:
+            lgr.warning("Failed to cache a response in Redis", exc_info=True)
+
+
+def response_cache_init_app(flask_app: Flask) -> Optional[ResponseCache]:
+    """
+    Set up the response cache of a given Flask app as configured by
+    the `DATALAD_REGISTRY_RESPONSE_CACHE_*` options in the `config` of the app
+
+    :param flask_app: The given Flask app
+    :return: The response cache, or `None` if responses are not to be cached
+
+    Note: This function sets `flask_app.extensions["response_cache"]`
+          to the response cache if responses are to be cached.
+    """
+    config = flask_app.config
+    backend = config["DATALAD_REGISTRY_RESPONSE_CACHE_BACKEND"]
+
+    cache: Optional[ResponseCache]
+    if backend == ResponseCacheBackend.NONE:
+        cache = None
+    elif backend == ResponseCacheBackend.MEMORY:
+        cache = MemoryResponseCache(config["DATALAD_REGISTRY_RESPONSE_CACHE_MAX_BYTES"])
+    elif backend == ResponseCacheBackend.REDIS:
+        url = config["DATALAD_REGISTRY_RESPONSE_CACHE_REDIS_URL"]
+        if url is None:
+            url = config["CELERY_RESULT_BACKEND"]
+        if not url.startswith(("redis://", "rediss://", "unix://")):
+            raise ValueError(
+                f"The URL of the Redis database for the response cache, {url!r}, "
+                "is not a Redis URL. Set DATALAD_REGISTRY_RESPONSE_CACHE_REDIS_URL."
+            )
+        cache = RedisResponseCache(url, config["DATALAD_REGISTRY_RESPONSE_CACHE_TTL"])
+    else:
+        # This should never happen
+        raise ValueError(f"Unexpected response cache backend: {backend!r}")
+
+    if cache is not None:
+        flask_app.extensions[RESPONSE_CACHE_EXT_KEY] = cache
+
+    return cache
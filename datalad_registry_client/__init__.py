@@ -4,6 +4,14 @@ from importlib.metadata import version
 # that the client interacts with.
 DEFAULT_BASE_ENDPOINT = "http://127.0.0.1:5000/api/v2"
 
+# The path of the dataset URL resources on the DataLad Registry instance relative to
+# the base API endpoint of the instance, `DATASET_URLS_PATH` in
+# `datalad_registry.blueprints.api`.
+# Note: No module of the server is imported by the client since importing any of them
+#       loads the entire server application, which in turn loads the DataLad
+#       extensions, including this one, through `datalad.api`.
+DATASET_URLS_PATH = "dataset-urls"
+
 command_suite = (
     "Interact with DataLad registry",
     [
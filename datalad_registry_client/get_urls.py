@@ -2,23 +2,88 @@
 
 __docformat__ = "restructuredtext"
 
+from concurrent.futures import ThreadPoolExecutor
+import json
 import logging
-from typing import Optional
+from typing import Any, Optional
 
 from datalad.interface.base import Interface, build_doc, eval_results
 from datalad.interface.results import get_status_dict
-from datalad.support.constraints import EnsureNone, EnsureStr
+from datalad.support.constraints import (
+    EnsureBool,
+    EnsureChoice,
+    EnsureInt,
+    EnsureNone,
+    EnsureRange,
+    EnsureStr,
+)
 from datalad.support.param import Parameter
 import requests
 from yarl import URL
 
-from datalad_registry.blueprints.api import DATASET_URLS_PATH
-
-from . import DEFAULT_BASE_ENDPOINT
+from . import DATASET_URLS_PATH, DEFAULT_BASE_ENDPOINT
 from .utils import get_base_endpoint
 
 lgr = logging.getLogger("datalad.registry.get_urls")
 
+# The number of dataset URLs requested per page in the streaming mode,
+# the maximum allowed by the server
+STREAM_PER_PAGE = 100
+
+# The keys by which, and the directions in which, the dataset URLs can be ordered,
+# the values of `OrderKey` and `OrderDir` in
+# `datalad_registry.blueprints.api.dataset_urls.models`, which is not imported
+# for the same reason given for `DATASET_URLS_PATH`
+ORDER_KEYS = (
+    "url",
+    "annex_key_count",
+    "annexed_files_in_wt_count",
+    "annexed_files_in_wt_size",
+    "last_update_dt",
+    "git_objects_kb",
+)
+ORDER_DIRS = ("asc", "desc")
+
+# The options constraining the dataset URLs to fetch by their numeric properties,
+# each of which is passed to the server as the query parameter of the same name
+_RANGE_FILTER_OPTS = [
+    ("min_annex_key_count", "The minimum number of annex keys"),
+    ("max_annex_key_count", "The maximum number of annex keys"),
+    (
+        "min_annexed_files_in_wt_count",
+        "The minimum number of annexed files in the working tree",
+    ),
+    (
+        "max_annexed_files_in_wt_count",
+        "The maximum number of annexed files in the working tree",
+    ),
+    (
+        "min_annexed_files_in_wt_size",
+        "The minimum size of annexed files in the working tree in bytes",
+    ),
+    (
+        "max_annexed_files_in_wt_size",
+        "The maximum size of annexed files in the working tree in bytes",
+    ),
+    ("min_git_objects_kb", "The minimum size of the `.git/objects` in KiB"),
+    ("max_git_objects_kb", "The maximum size of the `.git/objects` in KiB"),
+]
+
+
+def _parse_page(page_json: str) -> tuple[list[str], Optional[str]]:
+    """
+    Parse a page of dataset URLs returned by the server, extracting only the parts
+    used by the client
+
+    :param page_json: The page in JSON
+    :return: The dataset URLs in the page and the link to the next page, if any
+
+    Note: The collection statistics and the other properties of the dataset URLs
+          in the page are not parsed.
+    """
+    page = json.loads(page_json)
+    return [ds_url["url"] for ds_url in page["dataset_urls"]], page.get("next_pg")
+
 
 # decoration auto-generates standard help
 @build_doc
@@ -30,6 +95,13 @@ class RegistryGetURLs(Interface):
 
     Fetch the dataset URLs from a Datalad registry instance that meets the constraints
     specified by the provided options.
+
+    By default, all the dataset URLs are reported in a single result once they are
+    all fetched. In the streaming mode, each dataset URL is reported in a result of
+    its own as soon as the page containing it arrives, while the next page is
+    being fetched, and the pages are fetched by cursor pagination, without the
+    server compiling the statistics of the collection of the dataset URLs.
+    The streaming mode is the efficient way to list a large number of dataset URLs.
     """
 
     # parameters of the command, must be exhaustive
@@ -54,6 +126,44 @@ class RegistryGetURLs(Interface):
             or {DEFAULT_BASE_ENDPOINT} otherwise.""",
             constraints=EnsureStr() | EnsureNone(),
         ),
+        search=Parameter(
+            args=("-s", "--search"),
+            doc="""A search query, in the syntax of the search in the Web UI
+            of the DataLad Registry instance, that the dataset URLs must satisfy""",
+            constraints=EnsureStr() | EnsureNone(),
+        ),
+        **{
+            name: Parameter(
+                args=(f"--{name.replace('_', '-')}",),
+                doc=doc,
+                constraints=EnsureInt() | EnsureNone(),
+            )
+            for name, doc in _RANGE_FILTER_OPTS
+        },
+        order_by=Parameter(
+            args=("--order-by",),
+            doc="""The property of the dataset URLs to order them by""",
+            constraints=EnsureChoice(*ORDER_KEYS) | EnsureNone(),
+        ),
+        order_dir=Parameter(
+            args=("--order-dir",),
+            doc="""The direction to order the dataset URLs in""",
+            constraints=EnsureChoice(*ORDER_DIRS) | EnsureNone(),
+        ),
+        stream=Parameter(
+            args=("--stream",),
+            action="store_true",
+            doc="""Report each dataset URL in a result of its own as soon as it is
+            fetched instead of all dataset URLs in a single result at the end""",
+            constraints=EnsureBool(),
+        ),
+        per_page=Parameter(
+            args=("--per-page",),
+            doc=f"""The number of dataset URLs to fetch per request to the server.
+            This defaults to the default of the server, or to {STREAM_PER_PAGE},
+            the maximum allowed by the server, in the streaming mode.""",
+            constraints=EnsureInt() & EnsureRange(min=1) | EnsureNone(),
+        ),
     )
 
     @staticmethod
@@ -61,19 +171,51 @@ class RegistryGetURLs(Interface):
     @eval_results
     # signature must match parameter list above
     # additional generic arguments are added by decorators
-    def __call__(cache_path: Optional[str] = None, base_endpoint: Optional[str] = None):
-        from datalad_registry.blueprints.api.dataset_urls.models import DatasetURLPage
-
+    def __call__(
+        cache_path: Optional[str] = None,
+        base_endpoint: Optional[str] = None,
+        search: Optional[str] = None,
+        min_annex_key_count: Optional[int] = None,
+        max_annex_key_count: Optional[int] = None,
+        min_annexed_files_in_wt_count: Optional[int] = None,
+        max_annexed_files_in_wt_count: Optional[int] = None,
+        min_annexed_files_in_wt_size: Optional[int] = None,
+        max_annexed_files_in_wt_size: Optional[int] = None,
+        min_git_objects_kb: Optional[int] = None,
+        max_git_objects_kb: Optional[int] = None,
+        order_by: Optional[str] = None,
+        order_dir: Optional[str] = None,
+        stream: bool = False,
+        per_page: Optional[int] = None,
+    ):
         # Set `base_endpoint` based on configuration if it is not provided.
         if base_endpoint is None:
             base_endpoint = get_base_endpoint()
 
         endpoint = URL(base_endpoint) / DATASET_URLS_PATH
 
-        target_url = (
-            endpoint.with_query(cache_path=cache_path)
-            if cache_path is not None
-            else endpoint
+        query: dict[str, Any] = {
+            "cache_path": cache_path,
+            "search": search,
+            "min_annex_key_count": min_annex_key_count,
+            "max_annex_key_count": max_annex_key_count,
+            "min_annexed_files_in_wt_count": min_annexed_files_in_wt_count,
+            "max_annexed_files_in_wt_count": max_annexed_files_in_wt_count,
+            "min_annexed_files_in_wt_size": min_annexed_files_in_wt_size,
+            "max_annexed_files_in_wt_size": max_annexed_files_in_wt_size,
+            "min_git_objects_kb": min_git_objects_kb,
+            "max_git_objects_kb": max_git_objects_kb,
+            "order_by": order_by,
+            "order_dir": order_dir,
+            "per_page": per_page,
+        }
+        if stream:
+            query["cursor"] = "true"
+            if per_page is None:
+                query["per_page"] = STREAM_PER_PAGE
+
+        target_url = endpoint.with_query(
+            {k: v for k, v in query.items() if v is not None}
         )
 
         res_base = get_status_dict(
@@ -85,29 +227,46 @@ class RegistryGetURLs(Interface):
         )
 
         ds_urls: list[str] = []  # For storing returned dataset URLs from the server
-        with requests.Session() as session:
+        with requests.Session() as session, ThreadPoolExecutor(
+            max_workers=1
+        ) as executor:
+            # The pages are fetched in a separate thread so that the next page can be
+            # fetched while the current one is being processed
+            resp_future = executor.submit(session.get, str(target_url))
             while True:
-                resp = session.get(str(target_url))
+                resp = resp_future.result()
 
                 resp_status_code = resp.status_code
 
                 if resp_status_code == 200:
-                    ds_url_pg = DatasetURLPage.parse_raw(resp.text)
-                    ds_urls.extend(str(i.url) for i in ds_url_pg.dataset_urls)
+                    pg_ds_urls, next_pg = _parse_page(resp.text)
 
-                    if ds_url_pg.next_pg is None:
-                        # No more page to fetch
+                    if next_pg is not None:
+                        # More pages to fetch. Start fetching the next one.
+                        target_url = target_url.join(URL(next_pg))
+                        resp_future = executor.submit(session.get, str(target_url))
 
-                        yield get_status_dict(
-                            status="ok",
-                            message=str(ds_urls),
-                            **res_base,
-                        )
-                        break
+                    if stream:
+                        for ds_url in pg_ds_urls:
+                            yield get_status_dict(
+                                status="ok",
+                                message=ds_url,
+                                dataset_url=ds_url,
+                                **res_base,
+                            )
                     else:
-                        # More pages to fetch
+                        ds_urls.extend(pg_ds_urls)
 
-                        target_url = target_url.join(URL(ds_url_pg.next_pg))
+                    if next_pg is None:
+                        # No more page to fetch
+
+                        if not stream:
+                            yield get_status_dict(
+                                status="ok",
+                                message=str(ds_urls),
+                                **res_base,
+                            )
+                        break
 
                 elif resp_status_code == 404:
                     yield get_status_dict(
@@ -1,24 +1,85 @@
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import chain
 import logging
-from typing import Any, Dict, Iterator, List, Optional
+import sys
+from time import perf_counter
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
 
 from datalad.interface.base import Interface, build_doc, eval_results
 from datalad.interface.results import get_status_dict
-from datalad.support.constraints import EnsureNone, EnsureStr
+from datalad.support.constraints import EnsureInt, EnsureNone, EnsureRange, EnsureStr
+from datalad.support.exceptions import InsufficientArgumentsError
 from datalad.support.param import Parameter
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from yarl import URL
 
-from datalad_registry.blueprints.api import DATASET_URLS_PATH
-
-from . import DEFAULT_BASE_ENDPOINT
+from . import DATASET_URLS_PATH, DEFAULT_BASE_ENDPOINT
 from .utils import get_base_endpoint
 
 lgr = logging.getLogger("datalad.registry.submit_urls")
 
+# The HTTP status codes of the responses to a submission that are retried
+RETRY_STATUS_CODES = (500, 502, 503, 504)
+
+# The backoff factor of the retries of a submission. The n-th retry is made after
+# `RETRY_BACKOFF_FACTOR * 2 ** (n - 1)` seconds.
+RETRY_BACKOFF_FACTOR = 0.5
+
+
+def _read_urls(urls_file: TextIO) -> Iterator[str]:
+    """
+    Read URLs from a file, one per line, skipping blank lines and comment lines,
+    lines starting with `#`
+    """
+    for line in urls_file:
+        url = line.strip()
+        if url and not url.startswith("#"):
+            yield url
+
+
+def _build_session(jobs: int, retries: int) -> requests.Session:
+    """
+    Build a session with a pool of connections to the server large enough for
+    a given number of concurrent submissions, and with the submissions retried, with
+    exponential backoff, upon connection errors and upon server errors
+
+    :param jobs: The number of concurrent submissions
+    :param retries: The maximum number of retries of a submission
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=jobs,
+        max_retries=Retry(
+            total=retries,
+            backoff_factor=RETRY_BACKOFF_FACTOR,
+            status_forcelist=RETRY_STATUS_CODES,
+            # A submission of a URL can be repeated safely
+            allowed_methods=frozenset(["POST"]),
+            # Return the last response, instead of raising an exception,
+            # when the retries are exhausted
+            raise_on_status=False,
+        ),
+    )
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
 
 @build_doc
 class RegistrySubmitURLs(Interface):
-    """Submit one or more URLs to a DataLad Registry instance."""
+    """Submit one or more URLs to a DataLad Registry instance.
+
+    The URLs can be given as arguments and/or read from a file, one per line.
+    Multiple URLs can be submitted concurrently. A submission that fails due to
+    a connection error or a server error, with status code 500, 502, 503, or 504,
+    is retried with exponential backoff. The results of the submissions are
+    reported in the order of the URLs, and the throughput of the submissions is
+    logged at the end.
+    """
 
     _params_ = {
         "base_endpoint": Parameter(
@@ -33,16 +94,43 @@ class RegistrySubmitURLs(Interface):
             args=("urls",),
             metavar="URL",
             doc="""URLs to register""",
-            nargs="+",
+            nargs="*",
+            constraints=EnsureStr() | EnsureNone(),
+        ),
+        "urls_file": Parameter(
+            args=("-f", "--urls-file"),
+            metavar="FILE",
+            doc="""A file from which to read URLs to register, one per line, after
+            the URLs given as arguments. Blank lines and lines starting with '#' are
+            skipped. The file is read as the URLs are submitted. Use '-' to read
+            from the standard input.""",
             constraints=EnsureStr() | EnsureNone(),
         ),
+        "jobs": Parameter(
+            args=("-J", "--jobs"),
+            metavar="NJOBS",
+            doc="""The number of URLs to submit concurrently""",
+            constraints=EnsureInt() & EnsureRange(min=1),
+        ),
+        "retries": Parameter(
+            args=("--retries",),
+            doc="""The maximum number of times to retry the submission of a URL""",
+            constraints=EnsureInt() & EnsureRange(min=0),
+        ),
     }
 
     @staticmethod
     @eval_results
     def __call__(
-        urls: List[str], base_endpoint: Optional[str] = None
+        urls: Optional[List[str]] = None,
+        base_endpoint: Optional[str] = None,
+        urls_file: Optional[str] = None,
+        jobs: int = 1,
+        retries: int = 3,
     ) -> Iterator[Dict[str, Any]]:
+        if not urls and urls_file is None:
+            raise InsufficientArgumentsError("No URLs to submit are given")
+
         # Set `base_endpoint` based on configuration if it is not provided.
         if base_endpoint is None:
             base_endpoint = get_base_endpoint()
@@ -57,62 +145,158 @@ class RegistrySubmitURLs(Interface):
             endpoint=endpoint.human_repr(),
         )
 
-        with requests.Session() as session:
-            for url in urls:
-                resp = session.post(endpoint_str, json={"url": url})
-
-                res_base.update(URL=url)
-
-                resp_status_code = resp.status_code
-                if resp_status_code == 201:
-                    yield get_status_dict(
-                        **res_base,
-                        status="ok",
-                        message=("Registered %s", url),
-                    )
-                elif resp_status_code == 404:
-                    yield get_status_dict(
-                        **res_base,
-                        status="error",
-                        error_message=(
-                            "Submitted URL: %s; " "Incorrect endpoint: %s",
-                            url,
-                            endpoint_str,
-                        ),
-                    )
-                elif resp_status_code == 409:
-                    yield get_status_dict(
-                        **res_base,
-                        status="error",
-                        error_message=("The URL, %s, is already registered", url),
-                    )
-                elif resp_status_code == 422:
-                    yield get_status_dict(
-                        **res_base,
-                        status="error",
-                        error_message=(
-                            "Submitted URL: %s; "
-                            "Unprocessable argument(s) to server: %s",
-                            url,
-                            resp.text,
-                        ),
-                    )
-                elif resp_status_code == 500:
-                    yield get_status_dict(
-                        **res_base,
-                        status="error",
-                        error_message=("Submitted URL: %s; " "Server Error", url),
-                    )
-                else:
-                    yield get_status_dict(
-                        **res_base,
-                        status="error",
-                        error_message=(
-                            "Submitted URL: %s; "
-                            "Server HTTP response code: %s; "
-                            "Message from server: %s",
-                            url,
-                            resp_status_code,
-                            resp.text,
-                        ),
-                    )
+        if urls_file is None:
+            yield from _submit(urls or [], endpoint_str, jobs, retries, res_base)
+        elif urls_file == "-":
+            yield from _submit(
+                chain(urls or [], _read_urls(sys.stdin)),
+                endpoint_str,
+                jobs,
+                retries,
+                res_base,
+            )
+        else:
+            with open(urls_file) as f:
+                yield from _submit(
+                    chain(urls or [], _read_urls(f)),
+                    endpoint_str,
+                    jobs,
+                    retries,
+                    res_base,
+                )
+
+
+def _submit(
+    urls: Iterable[str],
+    endpoint_str: str,
+    jobs: int,
+    retries: int,
+    res_base: Dict[str, Any],
+) -> Iterator[Dict[str, Any]]:
+    """
+    Submit URLs to the dataset URLs endpoint of a DataLad Registry instance
+    with a given number of submissions in flight at a time
+
+    :return: An iterator of the results of the submissions, in the order of the URLs
+
+    Note: The URLs are consumed from `urls` only as the submissions progress, so
+          that at most about `2 * jobs` URLs are held in memory at a time.
+    """
+    submitted_count = 0
+    start = perf_counter()
+
+    with _build_session(jobs, retries) as session, ThreadPoolExecutor(
+        max_workers=jobs
+    ) as executor:
+        in_flight: Deque[Tuple[str, Future]] = deque()
+
+        def get_result() -> Dict[str, Any]:
+            url_, resp_future = in_flight.popleft()
+            try:
+                resp = resp_future.result()
+            except requests.RequestException as e:
+                # The submission has failed without a response from the server,
+                # e.g., due to a connection error that persisted through the retries
+                return get_status_dict(
+                    **res_base,
+                    URL=url_,
+                    status="error",
+                    error_message=("Submitted URL: %s; Request failed: %s", url_, e),
+                )
+            return _get_submission_result(url_, resp, endpoint_str, res_base)
+
+        for url in urls:
+            if len(in_flight) >= 2 * jobs:
+                yield get_result()
+
+            in_flight.append(
+                (url, executor.submit(session.post, endpoint_str, json={"url": url}))
+            )
+            submitted_count += 1
+
+        while in_flight:
+            yield get_result()
+
+    elapsed = perf_counter() - start
+    lgr.info(
+        "Submitted %d URLs in %.2f seconds (%.2f URLs per second)",
+        submitted_count,
+        elapsed,
+        submitted_count / elapsed if elapsed > 0 else 0,
+    )
+
+
+def _get_submission_result(
+    url: str,
+    resp: requests.Response,
+    endpoint_str: str,
+    res_base: Dict[str, Any],
+) -> Dict[str, Any]:
+    """
+    Get the result record of the submission of a URL from the response of the server
+    """
+    resp_status_code = resp.status_code
+    if resp_status_code == 201:
+        return get_status_dict(
+            **res_base,
+            URL=url,
+            status="ok",
+            message=("Registered %s", url),
+        )
+    elif resp_status_code == 202:
+        return get_status_dict(
+            **res_base,
+            URL=url,
+            status="ok",
+            message=("%s is already registered and is to be checked for update", url),
+        )
+    elif resp_status_code == 404:
+        return get_status_dict(
+            **res_base,
+            URL=url,
+            status="error",
+            error_message=(
+                "Submitted URL: %s; " "Incorrect endpoint: %s",
+                url,
+                endpoint_str,
+            ),
+        )
+    elif resp_status_code == 409:
+        return get_status_dict(
+            **res_base,
+            URL=url,
+            status="error",
+            error_message=("The URL, %s, is already registered", url),
+        )
+    elif resp_status_code == 422:
+        return get_status_dict(
+            **res_base,
+            URL=url,
+            status="error",
+            error_message=(
+                "Submitted URL: %s; " "Unprocessable argument(s) to server: %s",
+                url,
+                resp.text,
+            ),
+        )
+    elif resp_status_code == 500:
+        return get_status_dict(
+            **res_base,
+            URL=url,
+            status="error",
+            error_message=("Submitted URL: %s; " "Server Error", url),
+        )
+    else:
+        return get_status_dict(
+            **res_base,
+            URL=url,
+            status="error",
+            error_message=(
+                "Submitted URL: %s; "
+                "Server HTTP response code: %s; "
+                "Message from server: %s",
+                url,
+                resp_status_code,
+                resp.text,
+            ),
+        )
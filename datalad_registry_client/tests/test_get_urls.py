@@ -1,5 +1,7 @@
 from datetime import datetime, timezone
 from itertools import chain
+import json
+import threading
 
 import datalad.api as dl
 from datalad.support.exceptions import IncompleteResultsError
@@ -8,6 +10,9 @@ import pytest
 import requests
 from yarl import URL
 
+from datalad_registry.blueprints.api import (
+    DATASET_URLS_PATH as SERVER_DATASET_URLS_PATH,
+)
 from datalad_registry.blueprints.api.dataset_urls.models import (
     AnnexDsCollectionStats,
     CollectionStats,
@@ -15,9 +20,12 @@ from datalad_registry.blueprints.api.dataset_urls.models import (
     DatasetURLPage,
     DatasetURLRespModel,
     NonAnnexDsCollectionStats,
+    OrderDir,
+    OrderKey,
     StatsSummary,
 )
-from datalad_registry_client import DEFAULT_BASE_ENDPOINT
+from datalad_registry_client import DATASET_URLS_PATH, DEFAULT_BASE_ENDPOINT
+from datalad_registry_client.get_urls import ORDER_DIRS, ORDER_KEYS, STREAM_PER_PAGE
 
 
 class MockResponse:
@@ -71,6 +79,18 @@ def test_register():
     assert hasattr(ds, "registry_get_urls")
 
 
+def test_server_constants():
+    """
+    Test that the constants of the server copied to the client match the ones of
+    the server
+    """
+    assert DATASET_URLS_PATH == SERVER_DATASET_URLS_PATH
+
+    # The choices of the ordering options
+    assert ORDER_KEYS == tuple(k.value for k in OrderKey)
+    assert ORDER_DIRS == tuple(d.value for d in OrderDir)
+
+
 class TestRegistryGetURLs:
     @pytest.mark.parametrize(
         "base_endpoint, endpoint",
@@ -108,7 +128,7 @@ class TestRegistryGetURLs:
                         dataset_urls=[
                             DatasetURLRespModel(
                                 **dataset_url_resp_model_template,
-                                url="https://www.example.com"
+                                url="https://www.example.com",
                             )
                         ],
                         collection_stats=collection_stats,
@@ -159,7 +179,7 @@ class TestRegistryGetURLs:
                         dataset_urls=[
                             DatasetURLRespModel(
                                 **dataset_url_resp_model_template,
-                                url="https://www.example.com"
+                                url="https://www.example.com",
                             )
                         ],
                         collection_stats=collection_stats,
@@ -272,7 +292,7 @@ class TestRegistryGetURLs:
                         dataset_urls=[
                             DatasetURLRespModel(
                                 **dataset_url_resp_model_template,
-                                url="https://www.example.com"
+                                url="https://www.example.com",
                             )
                         ],
                         collection_stats=collection_stats,
@@ -299,3 +319,160 @@ class TestRegistryGetURLs:
         assert exc_info.value.failed[0]["status"] == "error"
         assert msg_content in exc_info.value.failed[0]["error_message"]
         assert "message" not in exc_info.value.failed[0]
+
+    @pytest.mark.parametrize(
+        "kwargs, expected_query",
+        [
+            ({}, {}),
+            ({"per_page": 7}, {"per_page": "7"}),
+            (
+                {
+                    "search": "url:example",
+                    "min_annex_key_count": 1,
+                    "max_annexed_files_in_wt_size": 1000,
+                    "min_git_objects_kb": 3,
+                    "order_by": "url",
+                    "order_dir": "asc",
+                },
+                {
+                    "search": "url:example",
+                    "min_annex_key_count": "1",
+                    "max_annexed_files_in_wt_size": "1000",
+                    "min_git_objects_kb": "3",
+                    "order_by": "url",
+                    "order_dir": "asc",
+                },
+            ),
+            (
+                {"stream": True},
+                {"cursor": "true", "per_page": str(STREAM_PER_PAGE)},
+            ),
+            (
+                {"stream": True, "per_page": 10, "max_git_objects_kb": 5},
+                {"cursor": "true", "per_page": "10", "max_git_objects_kb": "5"},
+            ),
+        ],
+    )
+    def test_filter_query_construction(self, kwargs, expected_query, monkeypatch):
+        """
+        Verify the correctness of the query constructed from the filter, ordering,
+        and pagination options
+        """
+        queries = []
+
+        # noinspection PyUnusedLocal
+        def mock_get(s, url):  # noqa: U100 Unused argument
+            queries.append(dict(URL(url).query))
+            return MockResponse(
+                200,
+                json.dumps(
+                    {"dataset_urls": [{"url": "https://www.example.com"}]},
+                ),
+            )
+
+        monkeypatch.setattr(requests.Session, "get", mock_get)
+
+        res = dl.registry_get_urls(**kwargs)
+
+        assert queries == [expected_query]
+        assert len(res) == 1
+        assert res[0]["status"] == "ok"
+
+    @pytest.mark.parametrize(
+        "resp_pgs",
+        [
+            [[]],
+            [["https://www.example.com"]],
+            [
+                ["https://www.example.com", "https://centerforopenneuroscience.org/"],
+                [],
+                ["https://www.datalad.org/"],
+            ],
+        ],
+    )
+    def test_stream(self, resp_pgs: list[list[str]], monkeypatch):
+        """
+        Test that each dataset URL is reported in a result of its own
+        in the streaming mode, with the collection statistics never requested
+        """
+        requested_urls = []
+
+        # noinspection PyUnusedLocal
+        def mock_get(s, url):  # noqa: U100 Unused argument
+            requested_urls.append(URL(url))
+            i = len(requested_urls) - 1
+
+            # Pages in cursor pagination link only to the next page
+            return MockResponse(
+                200,
+                json.dumps(
+                    {
+                        "next_pg": (
+                            f"/api/v2/dataset-urls?cursor=true&after={i}"
+                            if i < len(resp_pgs) - 1
+                            else None
+                        ),
+                        "dataset_urls": [
+                            {
+                                **json.loads(
+                                    DatasetURLRespModel(
+                                        **dataset_url_resp_model_template, url=url
+                                    ).json(exclude_none=True)
+                                ),
+                                "id": i,
+                            }
+                            for url in resp_pgs[i]
+                        ],
+                    }
+                ),
+            )
+
+        monkeypatch.setattr(requests.Session, "get", mock_get)
+
+        res = dl.registry_get_urls(stream=True)
+
+        expected_ds_urls = list(chain(*resp_pgs))
+        assert [r["dataset_url"] for r in res] == expected_ds_urls
+        assert all(r["status"] == "ok" for r in res)
+        assert [r["message"] for r in res] == expected_ds_urls
+
+        assert len(requested_urls) == len(resp_pgs)
+        assert all("with_stats" not in u.query for u in requested_urls)
+        assert [u.query.get("after") for u in requested_urls] == [None] + [
+            str(i) for i in range(len(resp_pgs) - 1)
+        ]
+
+    def test_stream_prefetch(self, monkeypatch):
+        """
+        Test that the next page is fetched while the dataset URLs in the current page
+        are being reported in the streaming mode
+        """
+        second_pg_requested = threading.Event()
+
+        # noinspection PyUnusedLocal
+        def mock_get(s, url):  # noqa: U100 Unused argument
+            if "after" in URL(url).query:
+                second_pg_requested.set()
+                return MockResponse(
+                    200, json.dumps({"dataset_urls": [{"url": "https://b.org"}]})
+                )
+            else:
+                return MockResponse(
+                    200,
+                    json.dumps(
+                        {
+                            "next_pg": "/api/v2/dataset-urls?cursor=true&after=x",
+                            "dataset_urls": [{"url": "https://a.org"}],
+                        }
+                    ),
+                )
+
+        monkeypatch.setattr(requests.Session, "get", mock_get)
+
+        res = dl.registry_get_urls(
+            stream=True, return_type="generator", result_renderer="disabled"
+        )
+
+        assert next(res)["dataset_url"] == "https://a.org"
+        assert second_pg_requested.wait(timeout=10)
+        assert [r["dataset_url"] for r in res] == ["https://b.org"]
@@ -1,9 +1,20 @@
+from http.server import BaseHTTPRequestHandler, HTTPServer
+import io
+import logging
+import socket
+import sys
+import threading
+import time
+
 from datalad import api as dl
-from datalad.support.exceptions import IncompleteResultsError
+from datalad.support.exceptions import (
+    IncompleteResultsError,
+    InsufficientArgumentsError,
+)
 import pytest
 import requests
 
-from datalad_registry_client import DEFAULT_BASE_ENDPOINT
+from datalad_registry_client import DEFAULT_BASE_ENDPOINT, submit_urls
 
 
 def test_register():
@@ -148,3 +159,188 @@ class TestRegistrySubmitURLs:
         assert len(res) == len(urls)
         assert all(r["status"] == "ok" for r in res)
         assert len(urls_in_set) == 0
+
+    def test_no_urls(self):
+        with pytest.raises(InsufficientArgumentsError):
+            dl.registry_submit_urls()
+
+    def test_already_registered(self, monkeypatch):
+        """
+        Test handling of the response to the submission of a URL that is already
+        registered
+        """
+
+        # noinspection PyUnusedLocal
+        def mock_post(s, url, json=None):  # noqa: U100 Unused argument
+            return MockResponse(202, "Accepted")
+
+        monkeypatch.setattr(requests.Session, "post", mock_post)
+
+        res = dl.registry_submit_urls(urls=["http://example.test"])
+        assert len(res) == 1
+        assert res[0]["status"] == "ok"
+        assert "already registered" in res[0]["message"][0]
+
+    @pytest.mark.parametrize("from_stdin", [False, True])
+    def test_urls_file(self, from_stdin, tmp_path, monkeypatch):
+        """
+        Test the submission of URLs read from a file or from the standard input
+        along with URLs given as arguments
+        """
+        urls_text = (
+            "https://www.datalad.org\n"
+            "\n"
+            "# A comment\n"
+            "  https://centerforopenneuroscience.org/  \n"
+            "https://www.example.com"
+        )
+        if from_stdin:
+            monkeypatch.setattr(sys, "stdin", io.StringIO(urls_text))
+            urls_file = "-"
+        else:
+            urls_file = tmp_path / "urls.txt"
+            urls_file.write_text(urls_text)
+
+        submitted_urls = []
+
+        # noinspection PyUnusedLocal
+        def mock_post(s, url, json=None):  # noqa: U100 Unused argument
+            submitted_urls.append(json["url"])
+            return MockResponse(201, "Created")
+
+        monkeypatch.setattr(requests.Session, "post", mock_post)
+
+        res = dl.registry_submit_urls(
+            urls=["http://example.test"], urls_file=str(urls_file)
+        )
+
+        expected_urls = [
+            "http://example.test",
+            "https://www.datalad.org",
+            "https://centerforopenneuroscience.org/",
+            "https://www.example.com",
+        ]
+        assert submitted_urls == expected_urls
+        assert [r["URL"] for r in res] == expected_urls
+        assert all(r["status"] == "ok" for r in res)
+
+    @pytest.mark.parametrize("jobs", [1, 3])
+    def test_request_failure(self, jobs, monkeypatch):
+        """
+        Test that a submission failing without a response from the server is
+        reported as an error without affecting the submissions of the other URLs
+        """
+        urls = [f"https://www.example{i}.com" for i in range(5)]
+
+        # noinspection PyUnusedLocal
+        def mock_post(s, url, json=None):  # noqa: U100 Unused argument
+            if json["url"] == urls[2]:
+                raise requests.ConnectionError("Connection refused")
+            return MockResponse(201, "Created")
+
+        monkeypatch.setattr(requests.Session, "post", mock_post)
+
+        res = dl.registry_submit_urls(urls=urls, jobs=jobs, on_failure="ignore")
+
+        assert [r["URL"] for r in res] == urls
+        assert [r["status"] for r in res] == ["ok", "ok", "error", "ok", "ok"]
+        assert "Connection refused" in str(res[2]["error_message"])
+
+    def test_unreachable_server(self, monkeypatch):
+        """
+        Test the submissions to a server that can't be connected to
+        """
+        monkeypatch.setattr(submit_urls, "RETRY_BACKOFF_FACTOR", 0)
+
+        # Obtain a port that no server listens on
+        with socket.socket() as sock:
+            sock.bind(("127.0.0.1", 0))
+            port = sock.getsockname()[1]
+
+        urls = ["http://example.test", "http://example2.test"]
+        res = dl.registry_submit_urls(
+            urls=urls,
+            base_endpoint=f"http://127.0.0.1:{port}/api/v2",
+            jobs=2,
+            retries=1,
+            on_failure="ignore",
+        )
+
+        assert [r["URL"] for r in res] == urls
+        assert all(r["status"] == "error" for r in res)
+
+    def test_concurrent_submissions(self, monkeypatch, caplog):
+        """
+        Test that URLs are submitted concurrently with the results reported
+        in the order of the URLs and the throughput logged
+        """
+        urls = [f"https://www.example{i}.com" for i in range(20)]
+
+        lock = threading.Lock()
+        in_flight_count = 0
+        max_in_flight_count = 0
+
+        # noinspection PyUnusedLocal
+        def mock_post(s, url, json=None):  # noqa: U100 Unused argument
+            nonlocal in_flight_count, max_in_flight_count
+            with lock:
+                in_flight_count += 1
+                max_in_flight_count = max(max_in_flight_count, in_flight_count)
+            time.sleep(0.01 * (hash(json["url"]) % 3))
+            with lock:
+                in_flight_count -= 1
+            return MockResponse(
+                201 if json["url"] != urls[5] else 422, "Unprocessable URL"
+            )
+
+        monkeypatch.setattr(requests.Session, "post", mock_post)
+
+        with caplog.at_level(logging.INFO, logger="datalad.registry.submit_urls"):
+            res = dl.registry_submit_urls(urls=urls, jobs=4, on_failure="ignore")
+
+        assert [r["URL"] for r in res] == urls
+        assert [r["status"] for r in res] == ["ok"] * 5 + ["error"] + ["ok"] * 14
+        assert 1 < max_in_flight_count <= 4
+        assert "Submitted 20 URLs in" in caplog.text
+
+    @pytest.mark.parametrize(
+        "failure_count, retries, expected_status",
+        [(0, 0, "ok"), (2, 3, "ok"), (3, 3, "ok"), (4, 3, "error"), (1, 0, "error")],
+    )
+    def test_retry(self, failure_count, retries, expected_status, monkeypatch):
+        """
+        Test that a submission is retried upon a server error
+        """
+        monkeypatch.setattr(submit_urls, "RETRY_BACKOFF_FACTOR", 0)
+
+        post_count = 0
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                nonlocal post_count
+                post_count += 1
+                self.rfile.read(int(self.headers["Content-Length"]))
+                self.send_response(503 if post_count <= failure_count else 201)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, *args):  # noqa: U100 Unused argument
+                pass
+
+        with HTTPServer(("127.0.0.1", 0), Handler) as server:
+            server_thread = threading.Thread(target=server.serve_forever)
+            server_thread.start()
+            try:
+                res = dl.registry_submit_urls(
+                    urls=["http://example.test"],
+                    base_endpoint=f"http://127.0.0.1:{server.server_port}/api/v2",
+                    retries=retries,
+                    on_failure="ignore",
+                )
+            finally:
+                server.shutdown()
+                server_thread.join()
+
+        assert len(res) == 1
+        assert res[0]["status"] == expected_status
+        assert post_count == min(failure_count, retries) + 1
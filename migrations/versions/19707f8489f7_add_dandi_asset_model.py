@@ -0,0 +1,95 @@
+"""Add DandiAsset model
+
+Revision ID: 19707f8489f7
+Revises: 9b3f62d5e018
+Create Date: 2026-10-18 15:12:37.480196
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "19707f8489f7"
+down_revision = "9b3f62d5e018"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "dandi_asset",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("url_metadata_id", sa.Integer(), nullable=False),
+        sa.Column("idx", sa.Integer(), nullable=False),
+        sa.Column(
+            "asset_metadata", postgresql.JSONB(astext_type=sa.Text()), nullable=False
+        ),
+        sa.ForeignKeyConstraint(
+            ["url_metadata_id"], ["url_metadata.id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    with op.batch_alter_table("dandi_asset", schema=None) as batch_op:
+        batch_op.create_index(
+            batch_op.f("ix_dandi_asset_url_metadata_id"),
+            ["url_metadata_id"],
+            unique=False,
+        )
+
+    # Move the assets stored in the existing "dandi:files" metadata to the new table,
+    # and replace the metadata with the summary of the assets
+    op.execute(
+        """
+        INSERT INTO dandi_asset (url_metadata_id, idx, asset_metadata)
+        SELECT m.id, a.ordinality - 1, a.value
+        FROM url_metadata AS m,
+            jsonb_array_elements(m.extracted_metadata) WITH ORDINALITY AS a
+        WHERE m.extractor_name = 'dandi:files'
+            AND jsonb_typeof(m.extracted_metadata) = 'array'
+        """
+    )
+    op.execute(
+        """
+        UPDATE url_metadata AS m
+        SET extractor_version = '0.1.0',
+            extracted_metadata = jsonb_build_object(
+                'asset_count', jsonb_array_length(m.extracted_metadata),
+                'total_size', (
+                    -- The sizes that are integral numbers, as counted by
+                    -- `_get_asset_size` in the "dandi:files" extractor
+                    SELECT COALESCE(sum((a.value ->> 'size')::numeric), 0)::bigint
+                    FROM jsonb_array_elements(m.extracted_metadata) AS a
+                    WHERE jsonb_typeof(a.value -> 'size') = 'number'
+                        AND (a.value ->> 'size')::numeric
+                            = trunc((a.value ->> 'size')::numeric)
+                )
+            )
+        WHERE m.extractor_name = 'dandi:files'
+            AND jsonb_typeof(m.extracted_metadata) = 'array'
+        """
+    )
+
+
+def downgrade():
+    # Restore the assets to the "dandi:files" metadata
+    op.execute(
+        """
+        UPDATE url_metadata AS m
+        SET extractor_version = '0.0.1',
+            extracted_metadata = (
+                SELECT COALESCE(
+                    jsonb_agg(a.asset_metadata ORDER BY a.idx), '[]'::jsonb
+                )
+                FROM dandi_asset AS a
+                WHERE a.url_metadata_id = m.id
+            )
+        WHERE m.extractor_name = 'dandi:files'
+        """
+    )
+
+    with op.batch_alter_table("dandi_asset", schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f("ix_dandi_asset_url_metadata_id"))
+
+    op.drop_table("dandi_asset")
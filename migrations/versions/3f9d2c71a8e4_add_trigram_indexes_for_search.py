@@ -0,0 +1,43 @@
+"""Add trigram indexes for search
+
+Revision ID: 3f9d2c71a8e4
+Revises: 7d283978c4a9
+Create Date: 2026-10-18 09:12:40.511233
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "3f9d2c71a8e4"
+down_revision = "7d283978c4a9"
+branch_labels = None
+depends_on = None
+
+# Names of the indexes to create mapped to the table and the indexed column or
+# expression of each
+_TRGM_INDEXES = {
+    "ix_repo_url_url_trgm": ("repo_url", "url"),
+    "ix_repo_url_ds_id_trgm": ("repo_url", "ds_id"),
+    "ix_repo_url_head_trgm": ("repo_url", "head"),
+    "ix_repo_url_head_describe_trgm": ("repo_url", "head_describe"),
+    "ix_repo_url_tags_trgm": ("repo_url", "tags"),
+    "ix_repo_url_branches_text_trgm": ("repo_url", "CAST(branches AS TEXT)"),
+    "ix_url_metadata_extractor_name_trgm": ("url_metadata", "extractor_name"),
+    "ix_url_metadata_extracted_metadata_text_trgm": (
+        "url_metadata",
+        "CAST(extracted_metadata AS TEXT)",
+    ),
+}
+
+
+def upgrade():
+    op.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+
+    for name, (table, col) in _TRGM_INDEXES.items():
+        op.execute(f"CREATE INDEX {name} ON {table} USING gin ({col} gin_trgm_ops)")
+
+
+def downgrade():
+    for name in _TRGM_INDEXES:
+        op.execute(f"DROP INDEX {name}")
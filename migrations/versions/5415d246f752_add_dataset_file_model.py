@@ -0,0 +1,90 @@
+"""Add DatasetFile model
+
+Revision ID: 5415d246f752
+Revises: 19707f8489f7
+Create Date: 2026-10-18 16:05:48.219374
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "5415d246f752"
+down_revision = "19707f8489f7"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "dataset_file",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("url_metadata_id", sa.Integer(), nullable=False),
+        sa.Column("path", sa.Text(), nullable=False),
+        sa.Column("size", sa.BigInteger(), nullable=True),
+        sa.Column("content_type", sa.Text(), nullable=True),
+        sa.Column("annex_key", sa.Text(), nullable=True),
+        sa.ForeignKeyConstraint(
+            ["url_metadata_id"], ["url_metadata.id"], ondelete="CASCADE"
+        ),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+    # Record the files of the DANDI datasets from the assets already extracted
+    # by the "dandi:files" extractor. (The files of the datasets already processed
+    # by the "bids_dataset" extractor are recorded at the next extraction.)
+    op.execute(
+        """
+        INSERT INTO dataset_file (url_metadata_id, path, size, content_type)
+        SELECT
+            url_metadata_id,
+            asset_metadata ->> 'path',
+            CASE
+                WHEN (asset_metadata ->> 'size') ~ '^-?[0-9]+$'
+                    THEN (asset_metadata ->> 'size')::bigint
+            END,
+            CASE
+                WHEN jsonb_typeof(asset_metadata -> 'metadata' -> 'encodingFormat')
+                    = 'string'
+                    THEN asset_metadata -> 'metadata' ->> 'encodingFormat'
+            END
+        FROM dandi_asset
+        WHERE jsonb_typeof(asset_metadata -> 'path') = 'string'
+        ORDER BY id
+        """
+    )
+
+    with op.batch_alter_table("dataset_file", schema=None) as batch_op:
+        batch_op.create_index(
+            batch_op.f("ix_dataset_file_annex_key"), ["annex_key"], unique=False
+        )
+        batch_op.create_index(
+            batch_op.f("ix_dataset_file_content_type"), ["content_type"], unique=False
+        )
+        batch_op.create_index(
+            batch_op.f("ix_dataset_file_url_metadata_id"),
+            ["url_metadata_id"],
+            unique=False,
+        )
+        batch_op.create_index(
+            "ix_dataset_file_path_trgm",
+            ["path"],
+            unique=False,
+            postgresql_using="gin",
+            postgresql_ops={"path": "gin_trgm_ops"},
+        )
+
+
+def downgrade():
+    with op.batch_alter_table("dataset_file", schema=None) as batch_op:
+        batch_op.drop_index(
+            "ix_dataset_file_path_trgm",
+            postgresql_using="gin",
+            postgresql_ops={"path": "gin_trgm_ops"},
+        )
+        batch_op.drop_index(batch_op.f("ix_dataset_file_url_metadata_id"))
+        batch_op.drop_index(batch_op.f("ix_dataset_file_content_type"))
+        batch_op.drop_index(batch_op.f("ix_dataset_file_annex_key"))
+
+    op.drop_table("dataset_file")
@@ -0,0 +1,64 @@
+"""Add the version of the content of the registry maintained by triggers
+
+Revision ID: 5b9e2d7c1a04
+Revises: e8a41c5d7b93
+Create Date: 2026-10-18 21:05:37.418253
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "5b9e2d7c1a04"
+down_revision = "e8a41c5d7b93"
+branch_labels = None
+depends_on = None
+
+_BUMP_REGISTRY_VERSION_FUNC = """
+CREATE OR REPLACE FUNCTION bump_registry_version() RETURNS trigger AS $$
+BEGIN
+    IF current_setting('datalad_registry.version_bumped', true) IS DISTINCT FROM 'on'
+    THEN
+        UPDATE registry_version
+        SET version = version + 1;
+        PERFORM set_config('datalad_registry.version_bumped', 'on', true);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+
+_VERSIONED_TABLE_EVENTS = {
+    "repo_url": "INSERT OR DELETE OR UPDATE OF id, url, ds_id, annex_uuid, "
+    "annex_key_count, annexed_files_in_wt_count, annexed_files_in_wt_size, head, "
+    "head_describe, head_dt, branches, tags, git_objects_kb, last_update_dt, "
+    "last_chk_dt, processed, cache_path",
+    "url_metadata": "INSERT OR DELETE OR UPDATE",
+    "collection_stats_snapshot": "INSERT OR DELETE OR UPDATE",
+}
+
+
+def upgrade():
+    op.create_table(
+        "registry_version",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("version", sa.BigInteger(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.execute("INSERT INTO registry_version (id, version) VALUES (1, 0)")
+    op.execute(_BUMP_REGISTRY_VERSION_FUNC)
+    for table_name, events in _VERSIONED_TABLE_EVENTS.items():
+        op.execute(
+            f"CREATE CONSTRAINT TRIGGER {table_name}_bump_registry_version "
+            f"AFTER {events} ON {table_name} "
+            "DEFERRABLE INITIALLY DEFERRED FOR EACH ROW "
+            "EXECUTE FUNCTION bump_registry_version()"
+        )
+
+
+def downgrade():
+    for table_name in _VERSIONED_TABLE_EVENTS:
+        op.execute(f"DROP TRIGGER {table_name}_bump_registry_version ON {table_name}")
+    op.execute("DROP FUNCTION bump_registry_version()")
+    op.drop_table("registry_version")
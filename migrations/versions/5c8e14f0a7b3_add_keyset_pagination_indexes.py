@@ -0,0 +1,33 @@
+"""Add indexes supporting keyset pagination of dataset URLs
+
+Revision ID: 5c8e14f0a7b3
+Revises: b51e0d8a6c27
+Create Date: 2026-10-18 11:20:41.508317
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "5c8e14f0a7b3"
+down_revision = "b51e0d8a6c27"
+branch_labels = None
+depends_on = None
+
+_KEYSET_INDEXED_COLS = [
+    "annex_key_count",
+    "annexed_files_in_wt_count",
+    "annexed_files_in_wt_size",
+    "last_update_dt",
+    "git_objects_kb",
+]
+
+
+def upgrade():
+    for col in _KEYSET_INDEXED_COLS:
+        op.create_index(f"ix_repo_url_{col}_id", "repo_url", [col, "id"], unique=False)
+
+
+def downgrade():
+    for col in _KEYSET_INDEXED_COLS:
+        op.drop_index(f"ix_repo_url_{col}_id", table_name="repo_url")
@@ -0,0 +1,46 @@
+"""Add partial indexes for the selection of URLs due to be checked
+
+Revision ID: 9b3f62d5e018
+Revises: e4a1c90b7d52
+Create Date: 2026-10-18 14:27:51.083216
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "9b3f62d5e018"
+down_revision = "e4a1c90b7d52"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("repo_url", schema=None) as batch_op:
+        batch_op.drop_index("ix_repo_url_next_chk_dt")
+        batch_op.create_index(
+            "ix_repo_url_requested_chk_due",
+            ["next_chk_dt", "id"],
+            unique=False,
+            postgresql_where=sa.text("processed AND chk_req_dt IS NOT NULL"),
+        )
+        batch_op.create_index(
+            "ix_repo_url_scheduled_chk_due",
+            ["next_chk_dt", "id"],
+            unique=False,
+            postgresql_where=sa.text("processed AND chk_req_dt IS NULL"),
+        )
+
+
+def downgrade():
+    with op.batch_alter_table("repo_url", schema=None) as batch_op:
+        batch_op.drop_index(
+            "ix_repo_url_scheduled_chk_due",
+            postgresql_where=sa.text("processed AND chk_req_dt IS NULL"),
+        )
+        batch_op.drop_index(
+            "ix_repo_url_requested_chk_due",
+            postgresql_where=sa.text("processed AND chk_req_dt IS NOT NULL"),
+        )
+        batch_op.create_index("ix_repo_url_next_chk_dt", ["next_chk_dt"], unique=False)
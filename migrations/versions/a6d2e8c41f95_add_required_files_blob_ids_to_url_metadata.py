@@ -0,0 +1,33 @@
+"""Add the blob IDs of the required files of the extractor to the URLMetadata model
+
+Revision ID: a6d2e8c41f95
+Revises: 5415d246f752
+Create Date: 2026-10-18 17:21:36.402518
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "a6d2e8c41f95"
+down_revision = "5415d246f752"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("url_metadata", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column(
+                "required_files_blob_ids",
+                postgresql.JSONB(astext_type=sa.Text()),
+                nullable=True,
+            )
+        )
+
+
+def downgrade():
+    with op.batch_alter_table("url_metadata", schema=None) as batch_op:
+        batch_op.drop_column("required_files_blob_ids")
@@ -0,0 +1,44 @@
+"""Add the queue of RepoUrls pending submission for processing
+
+Revision ID: a7d4e9b2c6f1
+Revises: f3a8c6e2b917
+Create Date: 2026-10-20 10:41:07.264915
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "a7d4e9b2c6f1"
+down_revision = "f3a8c6e2b917"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("repo_url", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column(
+                "processing_pending",
+                sa.Boolean(),
+                nullable=False,
+                server_default=sa.false(),
+            )
+        )
+        batch_op.alter_column("processing_pending", server_default=None)
+        batch_op.create_index(
+            "ix_repo_url_processing_pending",
+            ["id"],
+            unique=False,
+            postgresql_where=sa.text("processing_pending"),
+        )
+
+
+def downgrade():
+    with op.batch_alter_table("repo_url", schema=None) as batch_op:
+        batch_op.drop_index(
+            "ix_repo_url_processing_pending",
+            postgresql_where=sa.text("processing_pending"),
+        )
+        batch_op.drop_column("processing_pending")
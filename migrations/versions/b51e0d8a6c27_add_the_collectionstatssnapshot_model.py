@@ -0,0 +1,32 @@
+"""Add the CollectionStatsSnapshot model
+
+Revision ID: b51e0d8a6c27
+Revises: 3f9d2c71a8e4
+Create Date: 2026-10-18 10:03:18.274911
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision = "b51e0d8a6c27"
+down_revision = "3f9d2c71a8e4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "collection_stats_snapshot",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("stats", postgresql.JSONB(astext_type=sa.Text()), nullable=False),
+        sa.Column("computed_dt", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("is_stale", sa.Boolean(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+
+def downgrade():
+    op.drop_table("collection_stats_snapshot")
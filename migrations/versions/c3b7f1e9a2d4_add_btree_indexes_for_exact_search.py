@@ -0,0 +1,27 @@
+"""Add btree indexes supporting the exact and range searches of dataset URLs
+
+Revision ID: c3b7f1e9a2d4
+Revises: a6d2e8c41f95
+Create Date: 2026-10-18 18:02:57.183405
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "c3b7f1e9a2d4"
+down_revision = "a6d2e8c41f95"
+branch_labels = None
+depends_on = None
+
+_BTREE_INDEXED_COLS = ["ds_id", "head", "head_describe"]
+
+
+def upgrade():
+    for col in _BTREE_INDEXED_COLS:
+        op.create_index(f"ix_repo_url_{col}", "repo_url", [col], unique=False)
+
+
+def downgrade():
+    for col in _BTREE_INDEXED_COLS:
+        op.drop_index(f"ix_repo_url_{col}", table_name="repo_url")
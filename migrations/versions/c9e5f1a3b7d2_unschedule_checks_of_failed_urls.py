@@ -0,0 +1,37 @@
+"""Unschedule the checks of the URLs that are no longer checked
+
+Revision ID: c9e5f1a3b7d2
+Revises: a7d4e9b2c6f1
+Create Date: 2026-10-21 11:06:52.730418
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "c9e5f1a3b7d2"
+down_revision = "a7d4e9b2c6f1"
+branch_labels = None
+depends_on = None
+
+# The default of `DATALAD_REGISTRY_MAX_FAILED_CHKS_PER_URL`. (With a lower configured
+# limit, the URLs that have failed a number of consecutive checks between that limit
+# and this default remain scheduled, though they are not checked.)
+_MAX_FAILED_CHKS = 10
+
+
+def upgrade():
+    # Remove the URLs that are no longer checked from the partial indexes scanned
+    # by the check dispatcher
+    op.execute(
+        "UPDATE repo_url SET next_chk_dt = NULL "
+        f"WHERE next_chk_dt IS NOT NULL AND n_failed_chks >= {_MAX_FAILED_CHKS}"
+    )
+
+
+def downgrade():
+    op.execute(
+        "UPDATE repo_url "
+        "SET next_chk_dt = COALESCE(last_chk_dt, now()) + interval '1 hour' "
+        "WHERE processed AND next_chk_dt IS NULL"
+    )
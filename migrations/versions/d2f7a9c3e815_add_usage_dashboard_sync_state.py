@@ -0,0 +1,30 @@
+"""Add the state of the syncing with the usage dashboard
+
+Revision ID: d2f7a9c3e815
+Revises: 5b9e2d7c1a04
+Create Date: 2026-10-18 22:14:51.203846
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "d2f7a9c3e815"
+down_revision = "5b9e2d7c1a04"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table(
+        "usage_dashboard_sync_state",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("etag", sa.Text(), nullable=True),
+        sa.Column("synced_dt", sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+
+def downgrade():
+    op.drop_table("usage_dashboard_sync_state")
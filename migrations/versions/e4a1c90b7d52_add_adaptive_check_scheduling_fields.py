@@ -0,0 +1,59 @@
+"""Add fields for adaptive scheduling of checks for update to the RepoUrl model
+
+Revision ID: e4a1c90b7d52
+Revises: 5c8e14f0a7b3
+Create Date: 2026-10-18 13:42:09.615302
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "e4a1c90b7d52"
+down_revision = "5c8e14f0a7b3"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table("repo_url", schema=None) as batch_op:
+        batch_op.add_column(
+            sa.Column(
+                "n_unchanged_chks",
+                sa.Integer(),
+                server_default=sa.text("0"),
+                nullable=False,
+            )
+        )
+        batch_op.add_column(
+            sa.Column("next_chk_dt", sa.DateTime(timezone=True), nullable=True)
+        )
+
+    with op.batch_alter_table("repo_url", schema=None) as batch_op:
+        batch_op.alter_column("n_unchanged_chks", server_default=None)
+        batch_op.create_index(
+            batch_op.f("ix_repo_url_next_chk_dt"), ["next_chk_dt"], unique=False
+        )
+
+    # Schedule the next checks of the processed URLs at the times they would have
+    # become due under the fixed default check interval of an hour
+    op.execute(
+        """
+        UPDATE repo_url
+        SET next_chk_dt = CASE
+            WHEN chk_req_dt IS NOT NULL
+                AND (last_chk_dt IS NULL OR last_chk_dt < chk_req_dt)
+                THEN chk_req_dt
+            ELSE COALESCE(last_chk_dt, last_update_dt, now()) + interval '1 hour'
+        END
+        WHERE processed
+        """
+    )
+
+
+def downgrade():
+    with op.batch_alter_table("repo_url", schema=None) as batch_op:
+        batch_op.drop_index(batch_op.f("ix_repo_url_next_chk_dt"))
+        batch_op.drop_column("next_chk_dt")
+        batch_op.drop_column("n_unchanged_chks")
@@ -0,0 +1,32 @@
+"""Add a jsonb_path_ops GIN index supporting the searches of values in metadata
+
+Revision ID: e8a41c5d7b93
+Revises: c3b7f1e9a2d4
+Create Date: 2026-10-18 19:40:12.906631
+
+"""
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision = "e8a41c5d7b93"
+down_revision = "c3b7f1e9a2d4"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_index(
+        "ix_url_metadata_extracted_metadata_path_ops",
+        "url_metadata",
+        ["extracted_metadata"],
+        unique=False,
+        postgresql_using="gin",
+        postgresql_ops={"extracted_metadata": "jsonb_path_ops"},
+    )
+
+
+def downgrade():
+    op.drop_index(
+        "ix_url_metadata_extracted_metadata_path_ops", table_name="url_metadata"
+    )
@@ -0,0 +1,28 @@
+"""Add the generation of the CollectionStatsSnapshot
+
+Revision ID: f3a8c6e2b917
+Revises: d2f7a9c3e815
+Create Date: 2026-10-19 09:12:40.518372
+
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision = "f3a8c6e2b917"
+down_revision = "d2f7a9c3e815"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.add_column(
+        "collection_stats_snapshot",
+        sa.Column("generation", sa.BigInteger(), nullable=False, server_default="0"),
+    )
+    op.alter_column("collection_stats_snapshot", "generation", server_default=None)
+
+
+def downgrade():
+    op.drop_column("collection_stats_snapshot", "generation")
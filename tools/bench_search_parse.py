@@ -0,0 +1,93 @@
+# This script benchmarks the parsing of search queries by `datalad_registry.search`.
+# For each of a set of representative queries, it reports the latency of parsing
+# the query into an SQLAlchemy expression, without the query cache, with the Earley
+# parser of the reference grammar and with the LALR parser, which is used to parse
+# the search queries, and the latency with the query cache after the query has been
+# parsed once. It also reports the time taken to construct each parser, which is
+# not paid upon importing the module, and, for the LALR parser, the time taken to
+# load it from Lark's on-disk cache.
+#
+# The benchmark doesn't access the database. Thus, it only requires an environment
+# in which datalad-registry is installed.
+
+from functools import partial
+from statistics import median
+from time import perf_counter
+
+import click
+from lark import Lark
+
+from datalad_registry import search
+
+# Representative queries: single-field searches as issued from the overview page,
+# combinations of fields, metadata searches restricted to extractors, and long
+# OR-chains of words as pasted by users
+_QUERIES = [
+    "haxby",
+    "url:openneuro",
+    'metadata:"BIDSVersion"',
+    "metadata[bids_dataset,metalad_core]:T1w",
+    "(haxby OR halchenko) AND NOT ds_id:844c",
+    'url:github.com AND file:T1w.nii.gz AND metadata[dandi]:"Neuropixels"',
+    " OR ".join(f"sub-{i:02d}" for i in range(1, 21)),
+    " OR ".join(f"sub-{i:02d}" for i in range(1, 51)),
+]
+
+
+def _time(func, repeats: int) -> float:
+    """
+    Get the median, in milliseconds, of the times taken by a number of calls
+    to a given function
+    """
+    times = []
+    for _ in range(repeats):
+        start = perf_counter()
+        func()
+        times.append(perf_counter() - start)
+    return median(times) * 1000
+
+
+@click.command()
+@click.option(
+    "--repeats",
+    type=click.IntRange(min=1),
+    default=20,
+    show_default=True,
+    help="The number of times to parse each query in each mode",
+)
+def main(repeats: int) -> None:
+    earley_ms = _time(lambda: Lark(search.grammar, parser="earley"), repeats)
+    lalr_ms = _time(lambda: Lark(search.lalr_grammar, parser="lalr"), repeats)
+    lalr_cached_ms = _time(
+        lambda: Lark(search.lalr_grammar, parser="lalr", cache=True), repeats
+    )
+    click.echo(
+        f"Parser construction: Earley {earley_ms:.2f} ms, LALR {lalr_ms:.2f} ms, "
+        f"LALR from on-disk cache {lalr_cached_ms:.2f} ms"
+    )
+
+    parsers = {p: search._get_parser(p) for p in ["earley", "lalr"]}
+
+    def parse(parser: str, query: str) -> None:
+        search.transformer.transform(parsers[parser].parse(query))
+
+    click.echo(
+        f"{'Earley ms':>10} {'LALR ms':>10} {'speedup':>8} {'cached ms':>10}  query"
+    )
+    for query in _QUERIES:
+        uncached_ms = {p: _time(partial(parse, p, query), repeats) for p in parsers}
+
+        search.parse_query(query)  # Ensure the query is in the cache
+        cached_ms = _time(partial(search.parse_query, query), repeats)
+
+        click.echo(
+            f"{uncached_ms['earley']:10.3f} {uncached_ms['lalr']:10.3f} "
+            f"{uncached_ms['earley'] / uncached_ms['lalr']:7.1f}x "
+            f"{cached_ms:10.4f}  {query[:50]}"
+        )
+
+    click.echo(f"Query cache: {search.get_query_cache_info()}")
+
+
+if __name__ == "__main__":
+    main()
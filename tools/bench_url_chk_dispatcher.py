@@ -0,0 +1,191 @@
+# This script benchmarks the query with which `url_chk_dispatcher` selects the dataset
+# URLs to be checked for update, against the query used before the introduction of
+# `next_chk_dt` and the partial indexes over it, for tables of increasing size.
+#
+# The benchmark is executed in the context of the Flask application of
+# datalad-registry. Thus, one should run this script in an environment that is suitable
+# for running datalad-registry, with the database migrated to the latest revision.
+# The synthetic URLs are added within a single transaction that is rolled back at
+# the end, so the database is left as it was found. Nevertheless, don't run this
+# script against a production database because the transaction holds locks on the
+# table throughout the benchmark.
+
+from datetime import datetime, timedelta, timezone
+from statistics import median
+from time import perf_counter
+
+import click
+from sqlalchemy import Select, and_, case, not_, or_, select, text
+
+from datalad_registry import create_app
+from datalad_registry.models import RepoUrl, db
+from datalad_registry.tasks import select_urls_due_for_chk
+
+flask_app = create_app()
+
+# Insert synthetic URLs with IDs from `:start` to `:stop`. Of these URLs,
+# 95% are processed, 0.1% have a request for check for update, 1% have failed
+# too many times, and the times of the next checks are spread over a week centered
+# at now so that half of the URLs are due.
+_INSERT_SYNTHETIC_URLS = text(
+    """
+    INSERT INTO repo_url (
+        url, processed, n_failed_chks, n_unchanged_chks,
+        last_update_dt, last_chk_dt, chk_req_dt, next_chk_dt
+    )
+    SELECT
+        'https://bench.invalid/' || i,
+        i % 20 <> 0,
+        CASE WHEN i % 100 = 1 THEN :max_failed_chks ELSE 0 END,
+        i % 8,
+        :now - (i % 1000) * interval '1 hour',
+        :now - (i % 997) * interval '1 minute',
+        CASE WHEN i % 1000 = 2 THEN :now - (i % 60) * interval '1 minute' END,
+        :now + ((i::bigint * 7919) % 10080 - 5040) * interval '1 minute'
+    FROM generate_series(:start, :stop) AS i
+    """
+)
+
+
+def _legacy_select(max_failed_chks: int, now: datetime, limit: int) -> Select:
+    """
+    Build the statement with which `url_chk_dispatcher` selected the URLs to be
+    checked before the introduction of `next_chk_dt`
+    """
+    repeat_cutoff_dt = now - timedelta(
+        seconds=flask_app.config["DATALAD_REGISTRY_MIN_CHK_INTERVAL_PER_URL"]
+    )
+    relevant_action_dt = case(
+        (RepoUrl.last_chk_dt.is_not(None), RepoUrl.last_chk_dt),
+        else_=RepoUrl.last_update_dt,
+    )
+    not_chked_cond = or_(
+        RepoUrl.last_chk_dt.is_(None), RepoUrl.last_chk_dt < RepoUrl.chk_req_dt
+    )
+    requested_not_chked_cond = and_(RepoUrl.chk_req_dt.is_not(None), not_chked_cond)
+    requested_chked_cond = and_(RepoUrl.chk_req_dt.is_not(None), not_(not_chked_cond))
+
+    return (
+        select(RepoUrl.id, RepoUrl.last_chk_dt)
+        .filter(
+            RepoUrl.processed,
+            RepoUrl.n_failed_chks < max_failed_chks,
+            or_(
+                and_(
+                    RepoUrl.chk_req_dt.is_not(None),
+                    or_(not_chked_cond, RepoUrl.last_chk_dt <= repeat_cutoff_dt),
+                ),
+                and_(
+                    RepoUrl.chk_req_dt.is_(None),
+                    relevant_action_dt <= repeat_cutoff_dt,
+                ),
+            ),
+        )
+        .with_for_update(skip_locked=True)
+        .order_by(
+            case((requested_not_chked_cond, 1), (requested_chked_cond, 2), else_=3),
+            case(
+                (requested_not_chked_cond, RepoUrl.chk_req_dt),
+                (requested_chked_cond, RepoUrl.last_chk_dt),
+                else_=relevant_action_dt,
+            ),
+        )
+        .limit(limit)
+    )
+
+
+def _current_select(max_failed_chks: int, now: datetime, limit: int) -> list[Select]:
+    """
+    Build the statements with which `url_chk_dispatcher` selects the URLs to be
+    checked, assuming that the first statement doesn't fill up the limit
+    """
+    return [
+        select_urls_due_for_chk(requested, max_failed_chks, now, limit)
+        for requested in (True, False)
+    ]
+
+
+def _time_ms(stmts: list[Select], repeat: int) -> float:
+    """
+    Get the median time, in milliseconds, of executing the given statements in
+    sequence over a number of repetitions
+    """
+    times = []
+    for _ in range(repeat):
+        start = perf_counter()
+        for stmt in stmts:
+            db.session.execute(stmt).all()
+        times.append((perf_counter() - start) * 1000)
+    return median(times)
+
+
+@click.command
+@click.option(
+    "--rows",
+    "-n",
+    type=int,
+    multiple=True,
+    default=(10_000, 100_000, 1_000_000),
+    show_default=True,
+    help="The numbers of synthetic URLs to benchmark with",
+)
+@click.option(
+    "--repeat",
+    "-r",
+    type=int,
+    default=20,
+    show_default=True,
+    help="The number of repetitions of each query to take the median time from",
+)
+@click.option(
+    "--explain",
+    is_flag=True,
+    help="Print the query plans of the statements at each table size",
+)
+def bench_url_chk_dispatcher(rows: tuple[int, ...], repeat: int, explain: bool) -> None:
+    max_failed_chks = flask_app.config["DATALAD_REGISTRY_MAX_FAILED_CHKS_PER_URL"]
+    limit = flask_app.config["DATALAD_REGISTRY_MAX_URL_CHKS_ISSUED_PER_DISPATCH_CYCLE"]
+    now = datetime.now(timezone.utc)
+
+    with flask_app.app_context():
+        try:
+            print(f"{'rows':>10} {'legacy (ms)':>12} {'current (ms)':>13}")
+
+            inserted = 0
+            for n in sorted(rows):
+                db.session.execute(
+                    _INSERT_SYNTHETIC_URLS,
+                    {
+                        "start": inserted + 1,
+                        "stop": n,
+                        "now": now,
+                        "max_failed_chks": max_failed_chks,
+                    },
+                )
+                inserted = max(inserted, n)
+                db.session.execute(text("ANALYZE repo_url"))
+
+                legacy = [_legacy_select(max_failed_chks, now, limit)]
+                current = _current_select(max_failed_chks, now, limit)
+
+                print(
+                    f"{n:>10} {_time_ms(legacy, repeat):>12.2f} "
+                    f"{_time_ms(current, repeat):>13.2f}"
+                )
+
+                if explain:
+                    for stmt in legacy + current:
+                        compiled = stmt.compile(
+                            dialect=db.engine.dialect,
+                            compile_kwargs={"literal_binds": True},
+                        )
+                        plan = db.session.execute(
+                            text(f"EXPLAIN ANALYZE {compiled}")
+                        ).scalars()
+                        print("\n".join(plan), end="\n\n")
+        finally:
+            db.session.rollback()
+
+
+if __name__ == "__main__":
+    bench_url_chk_dispatcher()
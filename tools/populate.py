@@ -27,7 +27,15 @@ from datalad_registry_client.submit_urls import RegistrySubmitURLs
     default=None,
     help="One past the index of the last dataset to populate",
 )
-def populate(start: Optional[int], stop: Optional[int]) -> None:
+@click.option(
+    "-J",
+    "--jobs",
+    type=click.IntRange(min=1),
+    default=1,
+    show_default=True,
+    help="The number of datasets to submit concurrently",
+)
+def populate(start: Optional[int], stop: Optional[int], jobs: int) -> None:
     """
     Populate the running datalad-registry instance with selected datasets from
     the datalad-usage-dashboard
@@ -61,7 +69,7 @@ def populate(start: Optional[int], stop: Optional[int]) -> None:
 
     # Submit selected URLs of active GitHub datasets to the datalad-registry
     registry_submit_urls = RegistrySubmitURLs()
-    registry_submit_urls(selected_dataset_urls)
+    registry_submit_urls(selected_dataset_urls, jobs=jobs)
 
 
 if __name__ == "__main__":